@@ -7,6 +7,7 @@ import { ToastProvider } from './components/ToastProvider';
 import { db } from './lib/db';
 import { ProtectedRoute, AdminRoute } from './components/ProtectedRoute';
 import { performGlobalLogout } from './lib/authUtils';
+import { trackRouteChange } from './lib/telemetry';
 import { WhatsAppButton } from './components/WhatsAppButton';
 import { Profile } from './types';
 
@@ -330,6 +331,14 @@ const RootRedirect: React.FC = () => {
 
 import { ThemeProvider } from './components/ThemeProvider';
 
+const RouteTelemetry: React.FC = () => {
+  const location = useLocation();
+  useEffect(() => {
+    trackRouteChange(location.pathname);
+  }, [location.pathname]);
+  return null;
+};
+
 const WhatsAppButtonWrapper: React.FC = () => {
   const location = useLocation();
   // In HashRouter, location.pathname matches the route after the #
@@ -346,6 +355,7 @@ const App: React.FC = () => {
         <ToastProvider>
           {/* <UpdateNotification /> Removed in favor of dashboard banner */}
           <HashRouter future={{ v7_startTransition: true, v7_relativeSplatPath: true }}>
+            <RouteTelemetry />
             <WhatsAppButtonWrapper />
             <Suspense fallback={<PageLoader />}>
               <AnnouncementModal /> {/* Added globally */}
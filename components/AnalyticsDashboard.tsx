@@ -22,8 +22,8 @@ const AnalyticsDashboard: React.FC = () => {
 
         try {
             const [statsData, growth] = await Promise.all([
-                fetchSystemStats(),
-                fetchGrowthData()
+                fetchSystemStats(isRefresh),
+                fetchGrowthData(isRefresh)
             ]);
             setStats(statsData);
             setGrowthData(growth);
@@ -1,9 +1,13 @@
-import React, { useEffect, useState } from 'react';
+import React, { useEffect, useMemo, useState } from 'react';
+import { useOutletContext } from 'react-router-dom';
 import { supabase } from '../lib/supabaseClient';
-import { Asset, Car, Driver, Transaction } from '../types';
+import { fetchQuery, invalidateQueries, unwrap } from '../lib/queryCache';
+import { Asset, Car, Driver } from '../types';
+import { LayoutContextType } from './Layout';
 import { Plus, Car as CarIcon, Truck, Building, FileText, Trash2, Edit, TrendingUp, TrendingDown, Wallet } from 'lucide-react';
 
 const Assets: React.FC = () => {
+    const { user } = useOutletContext<LayoutContextType>();
     const [assets, setAssets] = useState<Asset[]>([]);
     const [loading, setLoading] = useState(true);
     const [showModal, setShowModal] = useState(false);
@@ -19,8 +23,12 @@ const Assets: React.FC = () => {
     const [driverActionLoading, setDriverActionLoading] = useState(false);
 
 
-    const [currentUserRole, setCurrentUserRole] = useState<string>('');
-    const [currentUser, setCurrentUser] = useState<{ id: string, org_id: string, role: string } | null>(null);
+    // The signed-in profile is already loaded by Layout - no extra profiles lookups here
+    const currentUser = useMemo(
+        () => user ? { id: user.id, org_id: user.org_id || '', role: user.role || '' } : null,
+        [user?.id, user?.org_id, user?.role]
+    );
+    const currentUserRole = currentUser?.role || '';
 
     // Form State
     const [formData, setFormData] = useState<Partial<Asset>>({
@@ -30,10 +38,6 @@ const Assets: React.FC = () => {
         current_value: 0
     });
 
-    useEffect(() => {
-        fetchCurrentUser();
-    }, []);
-
     // 🔒 Security Fix: Only fetch data AFTER currentUser is fully loaded
     useEffect(() => {
         if (currentUser) {
@@ -46,33 +50,26 @@ const Assets: React.FC = () => {
         }
     }, [currentUser]);
 
-    const fetchCurrentUser = async () => {
-        const { data: { session } } = await supabase.auth.getSession();
-        if (session?.user) {
-            const { data } = await supabase.from('profiles').select('id, org_id, role').eq('id', session.user.id).maybeSingle();
-            if (data) {
-                setCurrentUserRole(data.role || '');
-                setCurrentUser(data);
-            }
-        }
-    };
-
     const fetchOrgUsers = async () => {
         // Get current user from localStorage as fallback
         const session = JSON.parse(localStorage.getItem('securefleet_session') || '{}');
         const userOrgId = currentUser?.org_id || session.org_id;
 
-        let query = supabase.from('profiles').select('id, full_name').neq('status', 'disabled');
-
-        if (userOrgId) {
-            query = query.eq('org_id', userOrgId);
-        } else {
-            // 🔒 Fix: If Super Admin (no org_id), ONLY fetch platform staff (no org_id), 
-            // do NOT show users from other organizations to preserve privacy.
-            query = query.is('org_id', null);
-        }
-
-        const { data } = await query;
+        const data = await fetchQuery<{ id: string, full_name: string }[]>(
+            { table: 'profiles', filters: { org_id: userOrgId || null, active: true, select: 'id, full_name' } },
+            () => {
+                let query = supabase.from('profiles').select('id, full_name').neq('status', 'disabled');
+
+                if (userOrgId) {
+                    query = query.eq('org_id', userOrgId);
+                } else {
+                    // 🔒 Fix: If Super Admin (no org_id), ONLY fetch platform staff (no org_id), 
+                    // do NOT show users from other organizations to preserve privacy.
+                    query = query.is('org_id', null);
+                }
+                return unwrap(query);
+            }
+        ).catch(() => null);
         if (data) setOrgUsers(data);
     };
 
@@ -82,66 +79,12 @@ const Assets: React.FC = () => {
             const session = JSON.parse(localStorage.getItem('securefleet_session') || '{}');
             const userOrgId = currentUser?.org_id || session.org_id;
 
+            // One row per asset with car totals and installment progress (grouped server-side).
+            // Super Admin (no org_id) passes null and sees every asset RLS allows.
+            const { data, error } = await supabase.rpc('get_asset_roi', { p_org_id: userOrgId || null });
+            if (error) throw error;
 
-            // Build query - Super Admin (no org_id) can see all assets
-            let query = supabase
-                .from('assets')
-                .select(`
-          *,
-          car:cars(name, make, model, plate_number),
-          driver:drivers(full_name)
-        `);
-
-            // Only filter by org_id if user has one (not Super Admin)
-            if (userOrgId) {
-                query = query.eq('org_id', userOrgId);
-            }
-
-            // 1. Fetch Assets
-            const { data: assetsData, error: assetsError } = await query.order('created_at', { ascending: false });
-
-            if (assetsError) throw assetsError;
-
-            const currentAssets = assetsData || [];
-
-            // 2. Fetch Transactions for Assets linked to Cars
-            const carIds = currentAssets
-                .filter(a => a.car_id)
-                .map(a => a.car_id);
-
-            let transactions: Transaction[] = [];
-            if (carIds.length > 0) {
-                const { data: txData } = await supabase
-                    .from('transactions')
-                    .select('*')
-                    .in('car_id', carIds);
-                transactions = txData || [];
-            }
-
-            // 3. Calculate Stats for each asset
-            const assetsWithStats = currentAssets.map(asset => {
-                const assetTx = asset.car_id ? transactions.filter(t => t.car_id === asset.car_id) : [];
-
-                const total_income = assetTx
-                    .filter(t => t.type === 'income')
-                    .reduce((sum, t) => sum + Number(t.amount), 0);
-
-                const total_expense = assetTx
-                    .filter(t => t.type === 'expense')
-                    .reduce((sum, t) => sum + Number(t.amount), 0);
-
-                // ROI = Net Profit 
-                const roi = total_income - total_expense;
-
-                return {
-                    ...asset,
-                    total_income,
-                    total_expense,
-                    roi
-                };
-            });
-
-            setAssets(assetsWithStats);
+            setAssets((data || []) as Asset[]);
         } catch (error) {
             console.error('Error fetching assets:', error);
         } finally {
@@ -166,12 +109,17 @@ const Assets: React.FC = () => {
         const session = JSON.parse(localStorage.getItem('securefleet_session') || '{}');
         const userOrgId = currentUser?.org_id || session.org_id;
 
-        let query = supabase.from('drivers').select('*');
-        if (userOrgId) {
-            query = query.eq('org_id', userOrgId);
-        }
-
-        const { data } = await query;
+        // Same key as Settings' drivers tab so both screens share one cached list
+        const data = await fetchQuery<Driver[]>(
+            { table: 'drivers', filters: { org_id: userOrgId || null } },
+            () => {
+                let query = supabase.from('drivers').select();
+                if (userOrgId) {
+                    query = query.eq('org_id', userOrgId);
+                }
+                return unwrap(query.order('created_at', { ascending: false }));
+            }
+        ).catch(() => null);
         if (data) setDrivers(data);
     };
 
@@ -193,6 +141,7 @@ const Assets: React.FC = () => {
             alert('خطأ في الإضافة: ' + error.message);
         } else if (data) {
             setDrivers([data, ...drivers]);
+            invalidateQueries('drivers');
             setNewDriver({ full_name: '', phone_number: '', license_number: '' });
         }
     };
@@ -202,6 +151,7 @@ const Assets: React.FC = () => {
         const { error } = await supabase.from('drivers').delete().eq('id', id);
         if (!error) {
             setDrivers(drivers.filter(d => d.id !== id));
+            invalidateQueries('drivers');
         } else {
             alert('خطأ في الحذف');
         }
@@ -209,22 +159,18 @@ const Assets: React.FC = () => {
 
     const handleSave = async () => {
         try {
-            const { data: { user } } = await supabase.auth.getUser();
-            if (!user) return;
-
-            const { data: profile } = await supabase.from('profiles').select('org_id').eq('id', user.id).maybeSingle();
-            if (!profile?.org_id) return;
+            if (!currentUser?.org_id) return;
 
             // Remove calculated fields before saving
             const payload: any = {
                 ...formData,
-                org_id: profile.org_id
+                org_id: currentUser.org_id
             };
-            delete payload.total_income;
-            delete payload.total_expense;
-            delete payload.roi;
-            delete payload.car;
-            delete payload.driver;
+            [
+                'total_income', 'total_expense', 'roi', 'car', 'driver', 'car_details', 'driver_name',
+                'installments', 'installments_count', 'installments_paid_count', 'installments_total',
+                'installments_paid', 'next_due_date', 'remaining_value'
+            ].forEach(field => delete payload[field]);
 
             if (formData.id) {
                 // Update
@@ -385,6 +331,25 @@ const Assets: React.FC = () => {
                                             </div>
                                         </div>
                                     )}
+
+                                    {/* Installments Progress */}
+                                    {(asset.installments_count || 0) > 0 && (
+                                        <div className="mt-2">
+                                            <div className="flex justify-between text-[10px] text-slate-500 mb-1">
+                                                <span>الأقساط المسددة ({asset.installments_paid_count}/{asset.installments_count})</span>
+                                                <span>{Number(asset.installments_paid || 0).toLocaleString()} / {Number(asset.installments_total || 0).toLocaleString()} ر.س</span>
+                                            </div>
+                                            <div className="h-1.5 w-full bg-slate-200 dark:bg-slate-700 rounded-full overflow-hidden">
+                                                <div
+                                                    className="h-full rounded-full bg-amber-500 transition-all duration-500"
+                                                    style={{ width: `${Number(asset.installments_total) > 0 ? Math.min(100, (Number(asset.installments_paid) / Number(asset.installments_total)) * 100) : 0}%` }}
+                                                ></div>
+                                            </div>
+                                            {asset.next_due_date && (
+                                                <div className="text-[10px] text-slate-500 mt-1">القسط القادم: {new Date(asset.next_due_date).toLocaleDateString('ar-EG')}</div>
+                                            )}
+                                        </div>
+                                    )}
                                 </div>
 
                                 <div className="pt-4 border-t border-slate-200 dark:border-slate-700 flex gap-2">
@@ -1,9 +1,20 @@
-import React, { useState } from 'react';
+import React, { useEffect, useState } from 'react';
 import { useOutletContext } from 'react-router-dom';
-import { AlertTriangle, CheckCircle2, DatabaseBackup, Download, FileJson, Loader2, Upload } from 'lucide-react';
+import { AlertTriangle, CheckCircle2, DatabaseBackup, Download, FileJson, GitBranch, Loader2, Upload } from 'lucide-react';
 import { LayoutContextType } from './Layout';
 import { useToast } from './ToastProvider';
-import { downloadBackupFile, exportTenantBackup, importTenantBackup, TenantBackupFile } from '../lib/tenantBackup';
+import {
+  BackupProgress,
+  BackupReference,
+  downloadBackupFile,
+  exportTenantBackup,
+  getLastBackup,
+  hasPendingBackupExport,
+  importBackupChain,
+  RestoreProgress,
+  TenantBackupFile
+} from '../lib/tenantBackup';
+import { readBackupFile } from '../lib/backupFormat';
 
 const BackupPage: React.FC = () => {
   const { user: currentUser, org } = useOutletContext<LayoutContextType>();
@@ -11,8 +22,20 @@ const BackupPage: React.FC = () => {
   const [backupLoading, setBackupLoading] = useState(false);
   const [importLoading, setImportLoading] = useState(false);
   const [lastImportTotal, setLastImportTotal] = useState<number | null>(null);
+  const [exportProgress, setExportProgress] = useState<BackupProgress | null>(null);
+  const [pendingExport, setPendingExport] = useState(false);
+  const [importProgress, setImportProgress] = useState<RestoreProgress | null>(null);
+  const [atomicRestore, setAtomicRestore] = useState(false);
+  const [lastBackup, setLastBackup] = useState<BackupReference | null>(null);
 
-  const handleExportBackup = async () => {
+  useEffect(() => {
+    if (currentUser?.org_id) {
+      hasPendingBackupExport(currentUser.org_id).then(setPendingExport).catch(() => setPendingExport(false));
+      setLastBackup(getLastBackup(currentUser.org_id));
+    }
+  }, [currentUser?.org_id]);
+
+  const handleExportBackup = async (differential = false) => {
     if (!currentUser?.org_id) {
       showToast('لم يتم العثور على الوكالة الحالية', 'error');
       return;
@@ -20,27 +43,40 @@ const BackupPage: React.FC = () => {
 
     setBackupLoading(true);
     try {
-      const backup = await exportTenantBackup(currentUser.org_id);
-      downloadBackupFile(backup, org?.name);
-      showToast('تم تنزيل النسخة الاحتياطية بنجاح', 'success');
+      const backup = await exportTenantBackup(currentUser.org_id, {
+        onProgress: setExportProgress,
+        since: differential && lastBackup ? lastBackup : undefined
+      });
+      await downloadBackupFile(backup, org?.name);
+      setPendingExport(false);
+      setLastBackup(getLastBackup(currentUser.org_id));
+      showToast(differential ? 'تم تنزيل النسخة التفاضلية بنجاح' : 'تم تنزيل النسخة الاحتياطية بنجاح', 'success');
     } catch (error) {
       const message = error instanceof Error ? error.message : 'حدث خطأ أثناء تنزيل النسخة';
-      showToast(message, 'error');
+      // Fetched pages are checkpointed; the next attempt resumes from there
+      setPendingExport(true);
+      showToast(`${message} - يمكنك إعادة المحاولة وسيتم الاستكمال من حيث توقف التنزيل`, 'error');
     } finally {
       setBackupLoading(false);
+      setExportProgress(null);
     }
   };
 
-  const handleImportBackup = async (file: File | null) => {
-    if (!file || !currentUser?.org_id) return;
+  const handleImportBackup = async (files: File[]) => {
+    if (files.length === 0 || !currentUser?.org_id) return;
     if (!confirm('سيتم دمج بيانات النسخة الاحتياطية مع بيانات الوكالة الحالية. هل تريد المتابعة؟')) return;
 
     setImportLoading(true);
     setLastImportTotal(null);
     try {
-      const text = await file.text();
-      const backup = JSON.parse(text) as TenantBackupFile;
-      const counts = await importTenantBackup(currentUser.org_id, backup);
+      // v2 files are checksum-verified here, before anything is written
+      const backups: TenantBackupFile[] = [];
+      for (const file of files) backups.push(await readBackupFile(file));
+      // A base backup plus its differential backups are replayed in chain order
+      const counts = await importBackupChain(currentUser.org_id, backups, {
+        transactional: atomicRestore,
+        onProgress: setImportProgress
+      });
       const total = Object.values(counts).reduce((sum, count) => sum + count, 0);
       setLastImportTotal(total);
       showToast(`تم استيراد النسخة الاحتياطية بنجاح (${total} سجل)`, 'success');
@@ -49,6 +85,7 @@ const BackupPage: React.FC = () => {
       showToast(message, 'error');
     } finally {
       setImportLoading(false);
+      setImportProgress(null);
     }
   };
 
@@ -78,7 +115,7 @@ const BackupPage: React.FC = () => {
           <div className="grid grid-cols-1 md:grid-cols-2 gap-4">
             <button
               type="button"
-              onClick={handleExportBackup}
+              onClick={() => handleExportBackup(false)}
               disabled={backupLoading || !currentUser?.org_id}
               className="min-h-36 rounded-2xl border border-blue-200 dark:border-blue-900/50 bg-blue-50 dark:bg-blue-950/20 hover:bg-blue-100 dark:hover:bg-blue-950/30 text-blue-700 dark:text-blue-300 p-5 text-right transition disabled:opacity-60 disabled:cursor-not-allowed"
             >
@@ -86,21 +123,24 @@ const BackupPage: React.FC = () => {
                 <span className="w-11 h-11 rounded-xl bg-blue-600 text-white flex items-center justify-center">
                   {backupLoading ? <Loader2 className="w-5 h-5 animate-spin" /> : <Download className="w-5 h-5" />}
                 </span>
-                <span className="font-bold">تنزيل نسخة احتياطية</span>
+                <span className="font-bold">{pendingExport && !backupLoading ? 'استكمال تنزيل النسخة' : 'تنزيل نسخة احتياطية'}</span>
               </div>
               <span className="block text-xs leading-6 text-slate-600 dark:text-slate-400">
-                يحفظ ملف JSON يحتوي على السيارات، الحركات، السائقين، الأصول، الفريق، والبيانات المرتبطة بالوكالة.
+                {exportProgress
+                  ? `جاري التنزيل: ${exportProgress.table} (${exportProgress.rows.toLocaleString()} سجل) - ${exportProgress.completedUnits}/${exportProgress.totalUnits}`
+                  : 'يحفظ ملفاً مضغوطاً يحتوي على السيارات، الحركات، السائقين، الأصول، الفريق، والبيانات المرتبطة بالوكالة.'}
               </span>
             </button>
 
             <label className={`min-h-36 rounded-2xl border border-emerald-200 dark:border-emerald-900/50 bg-emerald-50 dark:bg-emerald-950/20 hover:bg-emerald-100 dark:hover:bg-emerald-950/30 text-emerald-700 dark:text-emerald-300 p-5 text-right transition ${importLoading ? 'opacity-60 cursor-not-allowed' : 'cursor-pointer'}`}>
               <input
                 type="file"
-                accept="application/json,.json"
+                multiple
+                accept="application/json,.json,.mfbk"
                 className="hidden"
                 disabled={importLoading || !currentUser?.org_id}
                 onChange={(event) => {
-                  handleImportBackup(event.target.files?.[0] || null);
+                  handleImportBackup(Array.from(event.target.files || []));
                   event.currentTarget.value = '';
                 }}
               />
@@ -111,10 +151,43 @@ const BackupPage: React.FC = () => {
                 <span className="font-bold">استيراد نسخة احتياطية</span>
               </div>
               <span className="block text-xs leading-6 text-slate-600 dark:text-slate-400">
-                اختر ملف النسخة السابق لاسترجاع البيانات داخل نفس الوكالة.
+                {importProgress
+                  ? `جاري الاستيراد${importProgress.steps && importProgress.steps > 1 ? ` (${(importProgress.step || 0) + 1}/${importProgress.steps})` : ''}: ${importProgress.table} (${importProgress.done.toLocaleString()}/${importProgress.total.toLocaleString()}) - ${importProgress.tableIndex + 1}/${importProgress.tableCount}`
+                  : 'اختر ملف النسخة السابق (أو النسخة الكاملة مع نسخها التفاضلية) لاسترجاع البيانات داخل نفس الوكالة.'}
               </span>
             </label>
           </div>
+
+          <button
+            type="button"
+            onClick={() => handleExportBackup(true)}
+            disabled={backupLoading || !currentUser?.org_id || !lastBackup}
+            className="mt-4 w-full flex items-center gap-3 rounded-2xl border border-indigo-200 dark:border-indigo-900/50 bg-indigo-50 dark:bg-indigo-950/20 hover:bg-indigo-100 dark:hover:bg-indigo-950/30 text-indigo-700 dark:text-indigo-300 p-4 text-right transition disabled:opacity-60 disabled:cursor-not-allowed"
+          >
+            <GitBranch className="w-5 h-5 shrink-0" />
+            <span>
+              <span className="font-bold block">نسخة تفاضلية</span>
+              <span className="text-xs text-slate-600 dark:text-slate-400">
+                {lastBackup
+                  ? `تحتوي فقط على التغييرات منذ آخر نسخة (${new Date(lastBackup.exported_at).toLocaleString('ar-EG')})`
+                  : 'قم بتنزيل نسخة كاملة أولاً لتفعيل النسخ التفاضلية'}
+              </span>
+            </span>
+          </button>
+
+          <label className="mt-4 flex items-start gap-3 text-sm text-slate-600 dark:text-slate-300 cursor-pointer">
+            <input
+              type="checkbox"
+              className="mt-1 w-4 h-4 accent-emerald-600"
+              checked={atomicRestore}
+              disabled={importLoading}
+              onChange={(event) => setAtomicRestore(event.target.checked)}
+            />
+            <span>
+              <span className="font-bold block">استعادة ذرية</span>
+              <span className="text-xs text-slate-500 dark:text-slate-400">يتم رفع الملف أولاً ثم تطبيقه على الخادم؛ النسخ الصغيرة تُطبق دفعة واحدة فإذا فشل أي جزء لا يتغير شيء، والكبيرة على دفعات متتالية.</span>
+            </span>
+          </label>
         </div>
 
         <div className="space-y-4">
@@ -127,6 +200,7 @@ const BackupPage: React.FC = () => {
               <li>النسخة تشمل بيانات الوكالة الحالية فقط.</li>
               <li>الاستيراد يدمج السجلات الموجودة ولا يمس وكالات أخرى.</li>
               <li>ملف وكالة مختلفة سيتم رفضه تلقائياً.</li>
+              <li>لاستعادة نسخة تفاضلية اختر النسخة الكاملة مع كل النسخ التفاضلية التالية لها معاً.</li>
             </ul>
           </div>
 
@@ -5,12 +5,14 @@ import { supabase } from '../lib/supabaseClient';
 import { Transaction, Plan } from '../types';
 import { LayoutContextType } from './Layout';
 import { db } from '../lib/db';
+import { syncRecentTransactions } from '../lib/syncManager';
 import {
     Activity, Calendar, AlertTriangle, BarChart3, Crown,
     History, TrendingUp, TrendingDown
 } from 'lucide-react';
 import { getArabicDayName } from './inventory/utils';
 import WelcomeModal from './WelcomeModal';
+import { useRealtimeRefresh } from '../hooks/useRealtimeRefresh';
 
 // Helper Component for Stats Card
 import { UpdateBanner } from './UpdateBanner';
@@ -62,6 +64,21 @@ const getStartOfCurrentWeek = (date: Date) => {
     return d;
 };
 
+// Helper: Format a Date as a local YYYY-MM-DD string (toISOString would shift to UTC)
+const toLocalISODate = (d: Date) =>
+    `${d.getFullYear()}-${String(d.getMonth() + 1).padStart(2, '0')}-${String(d.getDate()).padStart(2, '0')}`;
+
+// Shape returned by the get_dashboard_summary RPC
+interface DashboardSummary {
+    monthly_income: number;
+    monthly_expense: number;
+    weekly_income: number;
+    weekly_expense: number;
+    total_cars: number;
+    total_users: number;
+    recent_transactions: Transaction[];
+}
+
 // Helper: Process Transaction Data to reduce complexity in useEffect
 const processTransactionStats = (txData: Transaction[]) => {
     let mInc = 0, mExp = 0, wInc = 0, wExp = 0;
@@ -89,6 +106,10 @@ const Dashboard: React.FC = () => {
     const { user, org, isExpired, systemConfig } = useOutletContext<LayoutContextType>();
     const [loading, setLoading] = useState(true);
     const [showWelcome, setShowWelcome] = useState(false);
+    const [reloadKey, setReloadKey] = useState(0);
+
+    // Recompute KPIs when Realtime reports changes to this org's cars/transactions
+    useRealtimeRefresh(['transactions', 'cars', 'profiles'], () => setReloadKey(k => k + 1));
 
     // Data States
     const [stats, setStats] = useState({
@@ -113,50 +134,76 @@ const Dashboard: React.FC = () => {
                 return;
             }
 
-            let carsCount = 0;
-            let usersCount = 0;
-            let txData: Transaction[] = [];
-
             const today = new Date();
             const startOfMonth = new Date(today.getFullYear(), today.getMonth(), 1);
             const startOfWeek = getStartOfCurrentWeek(today);
-            const fetchStartDate = startOfMonth < startOfWeek ? startOfMonth.toISOString().split('T')[0] : startOfWeek.toISOString().split('T')[0];
+            const monthStart = toLocalISODate(startOfMonth);
+            const weekStart = toLocalISODate(startOfWeek);
+            const fetchStartDate = startOfMonth < startOfWeek ? monthStart : weekStart;
+
+            const applyStats = (carsCount: number, usersCount: number, txData: Transaction[]) => {
+                const { mInc, mExp, wInc, wExp } = processTransactionStats(txData);
+                const recentTx = [...txData].reverse().slice(0, 5);
+
+                setStats({
+                    totalCars: carsCount,
+                    totalUsers: usersCount,
+                    recentTx: recentTx,
+                    monthlyIncome: mInc,
+                    monthlyExpense: mExp,
+                    weeklyIncome: wInc,
+                    weeklyExpense: wExp
+                });
+                setLoading(false);
+            };
+
+            // Render instantly from IndexedDB, then revalidate from Supabase when online
+            if (user.org_id) {
+                const [localCars, localTxs] = await Promise.all([
+                    db.countCars(user.org_id),
+                    db.getTransactionsInRange(user.org_id, fetchStartDate)
+                ]);
+                if (localCars > 0 || localTxs.length > 0 || !navigator.onLine) {
+                    applyStats(localCars, 0, localTxs as unknown as Transaction[]);
+                }
+            }
 
             if (navigator.onLine && user.org_id) {
-                const { count: cCount } = await supabase.from('cars').select('*', { count: 'exact', head: true }).eq('org_id', user.org_id);
-                const { count: uCount } = await supabase.from('profiles').select('*', { count: 'exact', head: true }).eq('org_id', user.org_id);
-                const { data: remoteTxs } = await supabase.from('transactions').select('*').eq('org_id', user.org_id).gte('date', fetchStartDate).is('deleted_at', null).order('date', { ascending: true });
-
-                carsCount = cCount || 0;
-                usersCount = uCount || 0;
-                txData = remoteTxs || [];
-
-                if (remoteTxs) await db.transactions.bulkPut(remoteTxs);
-            } else if (user.org_id) {
-                carsCount = await db.cars.where('org_id').equals(user.org_id).count();
-                // usersCount already 0
-                txData = await db.transactions.where('org_id').equals(user.org_id).and(t => t.date >= fetchStartDate).toArray();
-                txData.sort((a, b) => a.date.localeCompare(b.date));
+                // Write-through for the offline view; runs beside the summary, never blocks it
+                syncRecentTransactions(user.org_id, fetchStartDate).catch(err => console.warn('Local transaction sync failed:', err));
+
+                // All KPIs aggregated server-side in a single round trip
+                const { data, error } = await supabase.rpc('get_dashboard_summary', {
+                    p_org_id: user.org_id,
+                    p_month_start: monthStart,
+                    p_week_start: weekStart,
+                    p_recent_limit: 5
+                });
+
+                if (error || !data) {
+                    console.error('Dashboard summary error:', error);
+                    setLoading(false);
+                    return;
+                }
+
+                const summary = data as DashboardSummary;
+                setStats({
+                    totalCars: Number(summary.total_cars) || 0,
+                    totalUsers: Number(summary.total_users) || 0,
+                    recentTx: summary.recent_transactions || [],
+                    monthlyIncome: Number(summary.monthly_income) || 0,
+                    monthlyExpense: Number(summary.monthly_expense) || 0,
+                    weeklyIncome: Number(summary.weekly_income) || 0,
+                    weeklyExpense: Number(summary.weekly_expense) || 0
+                });
+                setLoading(false);
+            } else if (!user.org_id) {
+                applyStats(0, 0, []);
             }
-
-            const { mInc, mExp, wInc, wExp } = processTransactionStats(txData);
-
-            const recentTx = [...txData].reverse().slice(0, 5);
-
-            setStats({
-                totalCars: carsCount,
-                totalUsers: usersCount,
-                recentTx: recentTx,
-                monthlyIncome: mInc,
-                monthlyExpense: mExp,
-                weeklyIncome: wInc,
-                weeklyExpense: wExp
-            });
-            setLoading(false);
         };
 
         loadData();
-    }, [user, org?.subscription_plan]);
+    }, [user, org?.subscription_plan, reloadKey]);
 
     if (loading) {
         return <div className="p-8 text-center text-slate-500">جاري تحميل البيانات...</div>;
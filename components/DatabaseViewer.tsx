@@ -1,8 +1,8 @@
-
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef, useCallback } from 'react';
 import { supabase } from '../lib/supabaseClient';
-import { Loader2, Trash2, RefreshCw, Database, AlertTriangle, ArrowLeft } from 'lucide-react';
+import { Loader2, Trash2, RefreshCw, Database, AlertTriangle, ArrowLeft, ArrowUp, ArrowDown, Plus, X, Columns } from 'lucide-react';
 import { useToast } from './ToastProvider';
+import VirtualTable, { VirtualTableColumn } from './VirtualTable';
 
 const TABLES = [
     { name: 'organizations', label: 'المنشآت (Organizations)' },
@@ -13,6 +13,82 @@ const TABLES = [
     { name: 'auth.users', label: 'حسابات الدخول (Auth Users - Read Only)', readonly: true } // Note: auth.users usually not accessible via client
 ];
 
+const PAGE_SIZE = 100;
+// Columns shown by default when a table is opened (the rest can be toggled on)
+const DEFAULT_VISIBLE_COLUMNS = 8;
+
+type Row = Record<string, any>;
+type CountMode = 'exact' | 'estimated';
+type FilterOperator = 'eq' | 'neq' | 'ilike' | 'gt' | 'gte' | 'lt' | 'lte' | 'is_null' | 'not_null';
+
+interface ColumnFilter {
+    id: number;
+    column: string;
+    operator: FilterOperator;
+    value: string;
+}
+
+interface SortState {
+    column: string;
+    ascending: boolean;
+}
+
+const OPERATORS: { value: FilterOperator; label: string }[] = [
+    { value: 'eq', label: '=' },
+    { value: 'neq', label: '≠' },
+    { value: 'ilike', label: 'يحتوي' },
+    { value: 'gt', label: '>' },
+    { value: 'gte', label: '≥' },
+    { value: 'lt', label: '<' },
+    { value: 'lte', label: '≤' },
+    { value: 'is_null', label: 'فارغ' },
+    { value: 'not_null', label: 'غير فارغ' }
+];
+
+// Column names per table, discovered once per session from a single row
+const columnCache = new Map<string, string[]>();
+
+/**
+ * Quote a value for PostgREST logic filters (or/and), which split on , . ( )
+ */
+const quoteFilterValue = (value: unknown) =>
+    `"${String(value).replace(/\\/g, '\\\\').replace(/"/g, '\\"')}"`;
+
+/**
+ * Keyset condition for the page after `last`, ordered by (sort column, id)
+ * with NULLs last in both directions
+ */
+const keysetCondition = (sort: SortState, last: Row): string => {
+    const op = sort.ascending ? 'gt' : 'lt';
+    const id = quoteFilterValue(last.id);
+    if (sort.column === 'id') return `id.${op}.${id}`;
+
+    const value = last[sort.column];
+    if (value === null || value === undefined) {
+        return `and(${sort.column}.is.null,id.${op}.${id})`;
+    }
+    const quoted = quoteFilterValue(typeof value === 'object' ? JSON.stringify(value) : value);
+    return `${sort.column}.${op}.${quoted},and(${sort.column}.eq.${quoted},id.${op}.${id}),${sort.column}.is.null`;
+};
+
+const applyFilter = (query: any, filter: ColumnFilter) => {
+    switch (filter.operator) {
+        case 'is_null': return query.is(filter.column, null);
+        case 'not_null': return query.not(filter.column, 'is', null);
+        case 'ilike': return query.ilike(filter.column, `%${filter.value}%`);
+        default: return query.filter(filter.column, filter.operator, filter.value);
+    }
+};
+
+const formatCell = (value: unknown) => {
+    if (value === null || value === undefined) return String(value);
+    if (typeof value !== 'object') return String(value);
+    const json = JSON.stringify(value);
+    return json.substring(0, 30) + (json.length > 30 ? '...' : '');
+};
+
+const getRowKey = (row: Row, index: number) => String(row.id ?? index);
+
 type DatabaseViewerProps = {
     onClose: () => void;
 };
@@ -20,48 +96,120 @@ type DatabaseViewerProps = {
 const DatabaseViewer: React.FC<DatabaseViewerProps> = ({ onClose }) => {
     const { showToast } = useToast();
     const [selectedTable, setSelectedTable] = useState('organizations');
-    const [data, setData] = useState<any[]>([]);
+    const [data, setData] = useState<Row[]>([]);
     const [loading, setLoading] = useState(false);
-    const [columns, setColumns] = useState<string[]>([]);
+    const [loadingMore, setLoadingMore] = useState(false);
+    const [hasMore, setHasMore] = useState(false);
+    const [allColumns, setAllColumns] = useState<string[]>([]);
+    const [visibleColumns, setVisibleColumns] = useState<string[]>([]);
+    const [showColumnPicker, setShowColumnPicker] = useState(false);
+    const [sort, setSort] = useState<SortState>({ column: 'created_at', ascending: false });
+    const [filters, setFilters] = useState<ColumnFilter[]>([]);
+    const [countMode, setCountMode] = useState<CountMode>('estimated');
+    const [totalCount, setTotalCount] = useState<number | null>(null);
     const [refreshTrigger, setRefreshTrigger] = useState(0);
+    // Ignore responses of superseded queries (table / filter / sort changed meanwhile)
+    const requestIdRef = useRef(0);
 
+    // Only filters with a value (or null checks) are sent to the server
+    const activeFilters = filters.filter(f => f.column && (f.operator === 'is_null' || f.operator === 'not_null' || f.value !== ''));
+    const filtersKey = JSON.stringify(activeFilters.map(({ column, operator, value }) => [column, operator, value]));
+
+    // Discover columns when the table changes
     useEffect(() => {
-        fetchData();
-    }, [selectedTable, refreshTrigger]);
+        // Clear the previous table's columns so no query mixes tables
+        setAllColumns([]);
+        setVisibleColumns([]);
+        if (selectedTable === 'auth.users') return;
+        let cancelled = false;
+        const discover = async () => {
+            let names = columnCache.get(selectedTable);
+            if (!names) {
+                const { data: sample, error } = await supabase.from(selectedTable).select('*').limit(1);
+                if (error) {
+                    showToast('خطأ في جلب البيانات: ' + error.message, 'error');
+                    return;
+                }
+                names = sample && sample.length > 0 ? Object.keys(sample[0]) : ['id'];
+                columnCache.set(selectedTable, names);
+            }
+            if (cancelled) return;
+            setAllColumns(names);
+            setVisibleColumns(names.slice(0, DEFAULT_VISIBLE_COLUMNS));
+            setSort({ column: names.includes('created_at') ? 'created_at' : 'id', ascending: false });
+            setFilters([]);
+        };
+        discover();
+        return () => {
+            cancelled = true;
+        };
+    }, [selectedTable]);
+
+    const fetchPage = useCallback(async (after: Row | null) => {
+        // Projection: only visible columns, plus the keyset columns
+        const projected = Array.from(new Set(['id', sort.column, ...visibleColumns]));
+        let query: any = supabase
+            .from(selectedTable)
+            .select(projected.join(','), after ? undefined : { count: countMode });
+
+        activeFilters.forEach(filter => {
+            query = applyFilter(query, filter);
+        });
+        if (after) query = query.or(keysetCondition(sort, after));
 
-    const fetchData = async () => {
+        query = query.order(sort.column, { ascending: sort.ascending, nullsFirst: false });
+        if (sort.column !== 'id') query = query.order('id', { ascending: sort.ascending });
+
+        const { data: rows, error, count } = await query.limit(PAGE_SIZE);
+        if (error) throw error;
+        return { rows: (rows || []) as Row[], count: count as number | null };
+    }, [selectedTable, sort, visibleColumns, countMode, filtersKey]);
+
+    // First page whenever the query shape changes
+    useEffect(() => {
+        if (selectedTable === 'auth.users' || visibleColumns.length === 0) {
+            requestIdRef.current++;
+            setLoading(false);
+            setData([]);
+            setHasMore(false);
+            setTotalCount(null);
+            return;
+        }
+        const requestId = ++requestIdRef.current;
         setLoading(true);
-        try {
-            if (selectedTable === 'auth.users') {
-                // Try fetching profiles instead as proxy or just show warning
-                // Actually we can't fetch auth.users from client usually.
-                // We will skip or use a specific RPC if available. 
-                // For now, let's just show profiles with extra user info if possible.
+        fetchPage(null)
+            .then(({ rows, count }) => {
+                if (requestId !== requestIdRef.current) return;
+                setData(rows);
+                setHasMore(rows.length === PAGE_SIZE);
+                setTotalCount(count);
+            })
+            .catch((err: any) => {
+                if (requestId !== requestIdRef.current) return;
+                console.error(err);
+                showToast('خطأ في جلب البيانات: ' + err.message, 'error');
                 setData([]);
-                setColumns([]);
-            } else {
-                const response = await supabase
-                    .from(selectedTable)
-                    .select('*')
-                    .limit(100)
-                    .order('created_at', { ascending: false }); // Assuming created_at exists, else might warn
-
-                if (response.error) throw response.error;
-                const rows = response.data;
-
-                if (rows && rows.length > 0) {
-                    setData(rows);
-                    setColumns(Object.keys(rows[0]));
-                } else {
-                    setData([]);
-                    setColumns([]);
-                }
-            }
+                setHasMore(false);
+            })
+            .finally(() => {
+                if (requestId === requestIdRef.current) setLoading(false);
+            });
+    }, [fetchPage, refreshTrigger]);
+
+    const loadMore = async () => {
+        if (loading || loadingMore || !hasMore || data.length === 0) return;
+        const requestId = requestIdRef.current;
+        setLoadingMore(true);
+        try {
+            const { rows } = await fetchPage(data[data.length - 1]);
+            if (requestId !== requestIdRef.current) return;
+            setData(prev => [...prev, ...rows]);
+            setHasMore(rows.length === PAGE_SIZE);
         } catch (err: any) {
-            console.error(err);
             showToast('خطأ في جلب البيانات: ' + err.message, 'error');
+        } finally {
+            setLoadingMore(false);
         }
-        setLoading(false);
     };
 
     const handleDelete = async (id: string) => {
@@ -71,12 +219,65 @@ const DatabaseViewer: React.FC<DatabaseViewerProps> = ({ onClose }) => {
             const { error } = await supabase.from(selectedTable).delete().eq('id', id);
             if (error) throw error;
             showToast('تم الحذف بنجاح', 'success');
-            setRefreshTrigger(prev => prev + 1);
+            // Drop the row locally instead of reloading every loaded page
+            setData(prev => prev.filter(row => row.id !== id));
+            setTotalCount(prev => (prev === null ? prev : Math.max(0, prev - 1)));
         } catch (err: any) {
             showToast('فشل الحذف: ' + err.message, 'error');
         }
     };
 
+    const toggleSort = (column: string) => {
+        setSort(prev => prev.column === column ? { column, ascending: !prev.ascending } : { column, ascending: false });
+    };
+
+    const toggleColumn = (column: string) => {
+        setVisibleColumns(prev => prev.includes(column)
+            ? prev.filter(c => c !== column)
+            : allColumns.filter(c => c === column || prev.includes(c)));
+    };
+
+    const updateFilter = (id: number, patch: Partial<ColumnFilter>) => {
+        setFilters(prev => prev.map(f => (f.id === id ? { ...f, ...patch } : f)));
+    };
+
+    const columns: VirtualTableColumn<Row>[] = [
+        {
+            key: '#',
+            header: '#',
+            className: 'p-4 w-10 text-slate-500 font-mono',
+            headerClassName: 'p-4 w-10',
+            render: (_row, idx) => idx + 1
+        },
+        ...visibleColumns.map((col): VirtualTableColumn<Row> => ({
+            key: col,
+            header: (
+                <button type="button" onClick={() => toggleSort(col)} className="flex items-center gap-1 hover:text-white">
+                    {col}
+                    {sort.column === col && (sort.ascending ? <ArrowUp className="w-3 h-3" /> : <ArrowDown className="w-3 h-3" />)}
+                </button>
+            ),
+            headerClassName: 'p-4 whitespace-nowrap border-b border-slate-700',
+            className: 'p-4 whitespace-nowrap text-slate-300 max-w-[200px] overflow-hidden text-ellipsis truncate',
+            render: row => <span title={String(row[col])}>{formatCell(row[col])}</span>
+        })),
+        {
+            key: 'actions',
+            header: 'Actions',
+            headerClassName: 'p-4 w-10 sticky left-0 bg-slate-800 border-l border-slate-700',
+            className: 'p-4 sticky left-0 bg-[#1e293b] border-l border-slate-700 text-center shadow-[-5px_0_10px_rgba(0,0,0,0.2)]',
+            render: row => (
+                <button
+                    onClick={() => handleDelete(row.id)}
+                    className="p-2 bg-red-600/20 text-red-500 hover:bg-red-600 hover:text-white rounded-lg transition"
+                    title="حذف السجل"
+                >
+                    <Trash2 className="w-4 h-4" />
+                </button>
+            )
+        }
+    ];
+
     return (
         <div className="bg-[#0f172a] min-h-screen p-6 font-[Cairo] text-white">
             <div className="max-w-7xl mx-auto space-y-6">
@@ -123,6 +324,80 @@ const DatabaseViewer: React.FC<DatabaseViewerProps> = ({ onClose }) => {
                     </div>
                 </div>
 
+                {/* Filters, columns and count */}
+                <div className="bg-[#1e293b] p-4 rounded-2xl border border-slate-700 space-y-3">
+                    <div className="flex flex-wrap items-center gap-3">
+                        <button
+                            onClick={() => setFilters(prev => [...prev, { id: Date.now(), column: allColumns[0] || 'id', operator: 'eq', value: '' }])}
+                            disabled={allColumns.length === 0}
+                            className="flex items-center gap-2 bg-slate-800 hover:bg-slate-700 border border-slate-600 px-3 py-2 rounded-xl text-sm disabled:opacity-50"
+                        >
+                            <Plus className="w-4 h-4" /> إضافة فلتر
+                        </button>
+                        <button
+                            onClick={() => setShowColumnPicker(prev => !prev)}
+                            disabled={allColumns.length === 0}
+                            className="flex items-center gap-2 bg-slate-800 hover:bg-slate-700 border border-slate-600 px-3 py-2 rounded-xl text-sm disabled:opacity-50"
+                        >
+                            <Columns className="w-4 h-4" /> الأعمدة ({visibleColumns.length}/{allColumns.length})
+                        </button>
+                        <div className="flex items-center gap-2 text-sm mr-auto">
+                            <span className="text-slate-400">العدد:</span>
+                            <select
+                                className="bg-[#0f172a] border border-slate-600 rounded-xl px-3 py-2 outline-none focus:border-indigo-500"
+                                value={countMode}
+                                onChange={(e) => setCountMode(e.target.value as CountMode)}
+                            >
+                                <option value="estimated">تقديري (سريع)</option>
+                                <option value="exact">دقيق</option>
+                            </select>
+                            <span className="font-mono text-indigo-300">
+                                {totalCount === null ? '-' : `${countMode === 'estimated' ? '~' : ''}${totalCount.toLocaleString()}`}
+                            </span>
+                        </div>
+                    </div>
+
+                    {showColumnPicker && (
+                        <div className="flex flex-wrap gap-2 pt-2 border-t border-slate-700">
+                            {allColumns.map(col => (
+                                <label key={col} className="flex items-center gap-1 text-xs bg-slate-800 px-2 py-1 rounded-lg cursor-pointer">
+                                    <input type="checkbox" checked={visibleColumns.includes(col)} onChange={() => toggleColumn(col)} />
+                                    {col}
+                                </label>
+                            ))}
+                        </div>
+                    )}
+
+                    {filters.map(filter => (
+                        <div key={filter.id} className="flex flex-wrap items-center gap-2">
+                            <select
+                                className="bg-[#0f172a] border border-slate-600 rounded-xl px-3 py-2 text-sm outline-none focus:border-indigo-500"
+                                value={filter.column}
+                                onChange={(e) => updateFilter(filter.id, { column: e.target.value })}
+                            >
+                                {allColumns.map(col => <option key={col} value={col}>{col}</option>)}
+                            </select>
+                            <select
+                                className="bg-[#0f172a] border border-slate-600 rounded-xl px-3 py-2 text-sm outline-none focus:border-indigo-500"
+                                value={filter.operator}
+                                onChange={(e) => updateFilter(filter.id, { operator: e.target.value as FilterOperator })}
+                            >
+                                {OPERATORS.map(op => <option key={op.value} value={op.value}>{op.label}</option>)}
+                            </select>
+                            {filter.operator !== 'is_null' && filter.operator !== 'not_null' && (
+                                <FilterValueInput value={filter.value} onCommit={(value) => updateFilter(filter.id, { value })} />
+                            )}
+                            <button
+                                onClick={() => setFilters(prev => prev.filter(f => f.id !== filter.id))}
+                                className="p-2 text-slate-400 hover:text-red-400"
+                                title="إزالة الفلتر"
+                            >
+                                <X className="w-4 h-4" />
+                            </button>
+                        </div>
+                    ))}
+                </div>
+
                 {/* Data Table */}
                 <div className="bg-[#1e293b] rounded-2xl border border-slate-700 overflow-hidden shadow-xl min-h-[400px]">
                     {loading ? (
@@ -136,40 +411,23 @@ const DatabaseViewer: React.FC<DatabaseViewerProps> = ({ onClose }) => {
                             <p>لا توجد بيانات للعرض في هذا الجدول.</p>
                         </div>
                     ) : (
-                        <div className="overflow-x-auto pb-4">
-                            <table className="w-full text-right text-sm">
-                                <thead className="bg-slate-800 text-slate-400 font-bold uppercase">
-                                    <tr>
-                                        <th className="p-4 w-10">#</th>
-                                        {columns.map(col => (
-                                            <th key={col} className="p-4 whitespace-nowrap border-b border-slate-700">{col}</th>
-                                        ))}
-                                        <th className="p-4 w-10 sticky left-0 bg-slate-800 border-l border-slate-700">Actions</th>
-                                    </tr>
-                                </thead>
-                                <tbody className="divide-y divide-slate-700">
-                                    {data.map((row, idx) => (
-                                        <tr key={row.id || idx} className="hover:bg-slate-700/50 transition">
-                                            <td className="p-4 text-slate-500 font-mono">{idx + 1}</td>
-                                            {columns.map(col => (
-                                                <td key={`${row.id}_${col}`} className="p-4 whitespace-nowrap text-slate-300 max-w-[200px] overflow-hidden text-ellipsis truncate" title={String(row[col])}>
-                                                    {typeof row[col] === 'object' ? JSON.stringify(row[col]).substring(0, 30) + (JSON.stringify(row[col]).length > 30 ? '...' : '') : String(row[col])}
-                                                </td>
-                                            ))}
-                                            <td className="p-4 sticky left-0 bg-[#1e293b] group-hover:bg-slate-800 border-l border-slate-700 text-center shadow-[-5px_0_10px_rgba(0,0,0,0.2)]">
-                                                <button
-                                                    onClick={() => handleDelete(row.id)}
-                                                    className="p-2 bg-red-600/20 text-red-500 hover:bg-red-600 hover:text-white rounded-lg transition"
-                                                    title="حذف السجل"
-                                                >
-                                                    <Trash2 className="w-4 h-4" />
-                                                </button>
-                                            </td>
-                                        </tr>
-                                    ))}
-                                </tbody>
-                            </table>
-                        </div>
+                        <VirtualTable
+                            rows={data}
+                            columns={columns}
+                            getRowKey={getRowKey}
+                            rowHeight={57}
+                            tableClassName="w-full text-right text-sm"
+                            headerClassName="bg-slate-800 text-slate-400 font-bold uppercase"
+                            bodyClassName="divide-y divide-slate-700"
+                            rowClassName="hover:bg-slate-700/50 transition"
+                            onEndReached={loadMore}
+                            resetScrollKey={`${selectedTable}:${sort.column}:${sort.ascending}:${filtersKey}`}
+                            footer={loadingMore ? (
+                                <div className="flex items-center justify-center gap-2 p-3 text-slate-400 text-sm">
+                                    <Loader2 className="w-4 h-4 animate-spin" /> جاري تحميل المزيد...
+                                </div>
+                            ) : null}
+                        />
                     )}
                 </div>
             </div>
@@ -177,4 +435,24 @@ const DatabaseViewer: React.FC<DatabaseViewerProps> = ({ onClose }) => {
     );
 };
 
+/**
+ * Filter value box: the query only re-runs on Enter / blur, not on every keystroke
+ */
+const FilterValueInput: React.FC<{ value: string; onCommit: (value: string) => void }> = ({ value, onCommit }) => {
+    const [draft, setDraft] = useState(value);
+    useEffect(() => setDraft(value), [value]);
+    return (
+        <input
+            className="bg-[#0f172a] border border-slate-600 rounded-xl px-3 py-2 text-sm outline-none focus:border-indigo-500"
+            value={draft}
+            placeholder="القيمة"
+            onChange={(e) => setDraft(e.target.value)}
+            onBlur={() => onCommit(draft)}
+            onKeyDown={(e) => {
+                if (e.key === 'Enter') onCommit(draft);
+            }}
+        />
+    );
+};
+
 export default DatabaseViewer;
@@ -1,24 +1,39 @@
-import React, { useState } from 'react';
-import { Download, FileSpreadsheet, Database, FileJson } from 'lucide-react';
+import React, { useRef, useState } from 'react';
+import { Download, FileSpreadsheet, Database, FileJson, Loader2, X } from 'lucide-react';
+import { exportRows, runExport, ExportSource } from '../lib/exportEngine';
+import { ExportFormat as EngineFormat } from '../lib/exportFormats';
 
-type ExportType = 'users' | 'organizations' | 'cars';
+type ExportType = 'users' | 'organizations' | 'cars' | 'transactions';
 type ExportFormat = 'csv' | 'excel' | 'json';
 
 interface ExportButtonProps {
     type: ExportType;
-    data: any[];
+    /** Rows already in memory (small lists) */
+    data?: any[];
+    /** Table to stream from the server page by page (large lists) */
+    source?: ExportSource;
     filename?: string;
+    columns?: string[];
 }
 
-const ExportButton: React.FC<ExportButtonProps> = ({ type, data, filename }) => {
+const ENGINE_FORMATS: Record<ExportFormat, EngineFormat> = {
+    csv: 'csv',
+    excel: 'xlsx',
+    json: 'ndjson'
+};
+
+const ExportButton: React.FC<ExportButtonProps> = ({ type, data, source, filename, columns }) => {
     const [format, setFormat] = useState<ExportFormat>('csv');
     const [isOpen, setIsOpen] = useState(false);
+    const [progress, setProgress] = useState<{ rows: number; total: number | null } | null>(null);
+    const abortRef = useRef<AbortController | null>(null);
 
     const getTypeLabel = () => {
         switch (type) {
             case 'users': return 'المستخدمين';
             case 'organizations': return 'المنظمات';
             case 'cars': return 'السيارات';
+            case 'transactions': return 'المعاملات';
         }
     };
 
@@ -27,75 +42,70 @@ const ExportButton: React.FC<ExportButtonProps> = ({ type, data, filename }) =>
             case 'users': return <Database className="w-5 h-5" />;
             case 'organizations': return <FileSpreadsheet className="w-5 h-5" />;
             case 'cars': return <Database className="w-5 h-5" />;
+            case 'transactions': return <FileSpreadsheet className="w-5 h-5" />;
         }
     };
 
-    const exportToCSV = () => {
-        if (!data.length) {
-            alert('لا توجد بيانات للتصدير');
-            return;
-        }
-
-        const headers = Object.keys(data[0]);
-        const csvContent = [
-            headers.join(','),
-            ...data.map(row => headers.map(header => {
-                const value = row[header];
-                // Escape commas and quotes
-                const stringValue = String(value || '');
-                return stringValue.includes(',') || stringValue.includes('"')
-                    ? `"${stringValue.replace(/"/g, '""')}"`
-                    : stringValue;
-            }).join(','))
-        ].join('\n');
-
-        downloadFile(csvContent, `${filename || type}_${Date.now()}.csv`, 'text/csv;charset=utf-8;');
-    };
-
-    const exportToJSON = () => {
-        if (!data.length) {
-            alert('لا توجد بيانات للتصدير');
-            return;
-        }
-
-        const jsonContent = JSON.stringify(data, null, 2);
-        downloadFile(jsonContent, `${filename || type}_${Date.now()}.json`, 'application/json;charset=utf-8;');
-    };
-
-    const downloadFile = (content: string, filename: string, mimeType: string) => {
-        const blob = new Blob([content], { type: mimeType });
-        const url = URL.createObjectURL(blob);
-        const link = document.createElement('a');
-        link.href = url;
-        link.download = filename;
-        document.body.appendChild(link);
-        link.click();
-        document.body.removeChild(link);
-        URL.revokeObjectURL(url);
-    };
-
-    const handleExport = () => {
-        if (format === 'csv') {
-            exportToCSV();
-        } else if (format === 'json') {
-            exportToJSON();
-        } else if (format === 'excel') {
-            alert('Excel export requires additional library. Using CSV instead.');
-            exportToCSV();
-        }
-
+    const handleExport = async () => {
         setIsOpen(false);
+        const engineFormat = ENGINE_FORMATS[format];
+        const name = filename || type;
+
+        try {
+            if (source) {
+                // Paged + encoded in a worker, written to disk chunk by chunk
+                const controller = new AbortController();
+                abortRef.current = controller;
+                setProgress({ rows: 0, total: null });
+                await runExport({
+                    ...source,
+                    format: engineFormat,
+                    filename: name,
+                    columns,
+                    sheetName: getTypeLabel(),
+                    signal: controller.signal,
+                    onProgress: setProgress
+                });
+            } else {
+                if (!data?.length) {
+                    alert('لا توجد بيانات للتصدير');
+                    return;
+                }
+                await exportRows(data, engineFormat, name, { columns, sheetName: getTypeLabel() });
+            }
+        } catch (error) {
+            if ((error as DOMException)?.name !== 'AbortError') {
+                console.error('Export failed:', error);
+                alert('حدث خطأ أثناء التصدير: ' + (error instanceof Error ? error.message : ''));
+            }
+        } finally {
+            abortRef.current = null;
+            setProgress(null);
+        }
     };
 
     return (
         <div className="relative">
-            <button
-                onClick={() => setIsOpen(!isOpen)}
-                className="flex items-center gap-2 bg-emerald-600 hover:bg-emerald-500 text-white px-4 py-2 rounded-lg font-bold transition"
-            >
-                <Download className="w-5 h-5" />
-                تصدير {getTypeLabel()}
-            </button>
+            {progress ? (
+                <div className="flex items-center gap-2 bg-emerald-600 text-white px-4 py-2 rounded-lg font-bold">
+                    <Loader2 className="w-5 h-5 animate-spin" />
+                    <span>
+                        {progress.rows.toLocaleString()}
+                        {progress.total ? ` / ${progress.total.toLocaleString()}` : ''}
+                    </span>
+                    <button onClick={() => abortRef.current?.abort()} className="hover:text-red-200" title="إلغاء">
+                        <X className="w-4 h-4" />
+                    </button>
+                </div>
+            ) : (
+                <button
+                    onClick={() => setIsOpen(!isOpen)}
+                    className="flex items-center gap-2 bg-emerald-600 hover:bg-emerald-500 text-white px-4 py-2 rounded-lg font-bold transition"
+                >
+                    <Download className="w-5 h-5" />
+                    تصدير {getTypeLabel()}
+                </button>
+            )}
 
             {isOpen && (
                 <div className="absolute right-0 mt-2 bg-slate-900 border border-slate-700 rounded-xl shadow-2xl z-50 w-48">
@@ -113,6 +123,17 @@ const ExportButton: React.FC<ExportButtonProps> = ({ type, data, filename }) =>
                                 <span className="text-white">CSV</span>
                                 <FileSpreadsheet className="w-4 h-4 text-slate-400" />
                             </label>
+                            <label className="flex items-center gap-3 cursor-pointer">
+                                <input
+                                    type="radio"
+                                    value="excel"
+                                    checked={format === 'excel'}
+                                    onChange={(e) => setFormat(e.target.value as ExportFormat)}
+                                    className="w-4 h-4 text-emerald-500"
+                                />
+                                <span className="text-white">Excel</span>
+                                <FileSpreadsheet className="w-4 h-4 text-slate-400" />
+                            </label>
                             <label className="flex items-center gap-3 cursor-pointer">
                                 <input
                                     type="radio"
@@ -121,7 +142,7 @@ const ExportButton: React.FC<ExportButtonProps> = ({ type, data, filename }) =>
                                     onChange={(e) => setFormat(e.target.value as ExportFormat)}
                                     className="w-4 h-4 text-emerald-500"
                                 />
-                                <span className="text-white">JSON</span>
+                                <span className="text-white">JSON Lines</span>
                                 <FileJson className="w-4 h-4 text-slate-400" />
                             </label>
                         </div>
@@ -1,15 +1,141 @@
-import React, { useState } from 'react';
+import React, { useState, useEffect, useCallback, useMemo, useRef } from 'react';
 import { useOutletContext } from 'react-router-dom';
-import { DollarSign, TrendingUp, TrendingDown, Plus, Minus, Filter, Download } from 'lucide-react';
+import { DollarSign, TrendingUp, TrendingDown, Plus, Minus, Filter, Download, Loader2 } from 'lucide-react';
 import { supabase } from '../lib/supabaseClient';
+import { db } from '../lib/db';
+import { Transaction } from '../types';
 import { LayoutContextType } from './Layout';
 import { assertPermission } from '../lib/planPermissionGuard';
+import { useRealtimeRefresh } from '../hooks/useRealtimeRefresh';
+import VirtualTable, { VirtualTableColumn } from './VirtualTable';
+import ExportButton from './ExportButton';
+
+// Rows fetched per ledger page
+const PAGE_SIZE = 100;
+
+type TypeFilter = 'all' | 'income' | 'expense';
+
+interface LedgerFilters {
+  type: TypeFilter;
+  from: string;
+  to: string;
+  category: string;
+}
+
+interface LedgerTotals {
+  income: number;
+  expense: number;
+  balance: number;
+  count: number;
+}
+
+const EMPTY_TOTALS: LedgerTotals = { income: 0, expense: 0, balance: 0, count: 0 };
+
+const getTransactionRowKey = (t: Transaction) => t.id as string;
+
+const ledgerColumns: VirtualTableColumn<Transaction>[] = [
+  {
+    key: 'date',
+    header: 'التاريخ',
+    headerClassName: 'text-right py-4 px-6 text-sm font-medium text-slate-600 dark:text-slate-400',
+    className: 'py-4 px-6 text-sm text-slate-900 dark:text-white',
+    render: (transaction) => new Date(transaction.date).toLocaleDateString('ar-EG')
+  },
+  {
+    key: 'type',
+    header: 'النوع',
+    headerClassName: 'text-right py-4 px-6 text-sm font-medium text-slate-600 dark:text-slate-400',
+    className: 'py-4 px-6',
+    render: (transaction) => (
+      <span className={`inline-flex items-center gap-1 px-3 py-1 rounded-full text-xs font-medium ${
+        transaction.type === 'income'
+          ? 'bg-emerald-100 text-emerald-700 dark:bg-emerald-900 dark:text-emerald-300'
+          : 'bg-red-100 text-red-700 dark:bg-red-900 dark:text-red-300'
+      }`}>
+        {transaction.type === 'income' ? (
+          <><TrendingUp className="w-3 h-3" /> وارد</>
+        ) : (
+          <><TrendingDown className="w-3 h-3" /> منصرف</>
+        )}
+      </span>
+    )
+  },
+  {
+    key: 'amount',
+    header: 'المبلغ',
+    headerClassName: 'text-right py-4 px-6 text-sm font-medium text-slate-600 dark:text-slate-400',
+    className: 'py-4 px-6 text-sm font-medium',
+    render: (transaction) => (
+      <span className={transaction.type === 'income' ? 'text-emerald-600' : 'text-red-600'}>
+        {Number(transaction.amount).toLocaleString()} ج.م
+      </span>
+    )
+  },
+  {
+    key: 'reason',
+    header: 'السبب',
+    headerClassName: 'text-right py-4 px-6 text-sm font-medium text-slate-600 dark:text-slate-400',
+    className: 'py-4 px-6 text-sm text-slate-600 dark:text-slate-400',
+    render: (transaction) => transaction.reason || '-'
+  }
+];
+
+/**
+ * Fetch one ledger page ordered by (date DESC, id DESC)
+ * The cursor is the last row of the previous page (keyset pagination)
+ */
+const fetchLedgerPage = async (orgId: string, filters: LedgerFilters, cursor: Transaction | null) => {
+  let query = supabase
+    .from('transactions')
+    .select('id, car_id, type, amount, reason, category, notes, date, created_at')
+    .eq('org_id', orgId)
+    .is('deleted_at', null);
+
+  if (filters.type !== 'all') query = query.eq('type', filters.type);
+  if (filters.from) query = query.gte('date', filters.from);
+  if (filters.to) query = query.lte('date', filters.to);
+  if (filters.category) query = query.eq('category', filters.category);
+  if (cursor) query = query.or(`date.lt.${cursor.date},and(date.eq.${cursor.date},id.lt.${cursor.id})`);
+
+  const { data, error } = await query
+    .order('date', { ascending: false })
+    .order('id', { ascending: false })
+    .limit(PAGE_SIZE);
+
+  if (error) throw error;
+  return (data || []) as Transaction[];
+};
+
+/**
+ * Offline fallback: filter and sum the IndexedDB copy
+ */
+const filterLocal = (rows: Transaction[], filters: LedgerFilters) => rows.filter(t =>
+  (filters.type === 'all' || t.type === filters.type) &&
+  (!filters.from || t.date >= filters.from) &&
+  (!filters.to || t.date <= filters.to) &&
+  (!filters.category || t.category === filters.category)
+);
+
+const sumLocal = (rows: Transaction[]): LedgerTotals => rows.reduce((acc, t) => {
+  const amount = Number(t.amount) || 0;
+  if (t.type === 'income') acc.income += amount;
+  else acc.expense += amount;
+  acc.balance = acc.income - acc.expense;
+  acc.count += 1;
+  return acc;
+}, { ...EMPTY_TOTALS });
 
 const Financials: React.FC = () => {
   const { user, org } = useOutletContext<LayoutContextType>();
-  const [transactions, setTransactions] = useState<any[]>([]);
+  const [transactions, setTransactions] = useState<Transaction[]>([]);
+  const [totals, setTotals] = useState<LedgerTotals>(EMPTY_TOTALS);
   const [loading, setLoading] = useState(true);
-  const [filter, setFilter] = useState<'all' | 'income' | 'expense'>('all');
+  const [loadingMore, setLoadingMore] = useState(false);
+  const [hasMore, setHasMore] = useState(false);
+  const [filters, setFilters] = useState<LedgerFilters>({ type: 'all', from: '', to: '', category: '' });
+  const filter = filters.type;
+  const setFilter = (type: TypeFilter) => setFilters(prev => ({ ...prev, type }));
+  const requestIdRef = useRef(0);
 
   // التحقق من الصلاحيات
   React.useEffect(() => {
@@ -22,36 +148,95 @@ const Financials: React.FC = () => {
     }
   }, [user, org]);
 
-  React.useEffect(() => {
-    fetchTransactions();
-  }, []);
+  const categoryOptions = useMemo(() => {
+    const cats = user?.settings?.transaction_categories || org?.settings?.transaction_categories;
+    if (!cats) return [];
+    const list = filters.type === 'all' ? [...cats.income, ...cats.expense] : cats[filters.type];
+    const seen = new Set<string>();
+    return list.filter(c => {
+      if (seen.has(c.id)) return false;
+      seen.add(c.id);
+      return true;
+    });
+  }, [user, org, filters.type]);
 
-  const fetchTransactions = async () => {
+  const fetchTransactions = useCallback(async () => {
     if (!org?.id) return;
+    const requestId = ++requestIdRef.current;
 
-    const { data } = await supabase
-      .from('transactions')
-      .select('*')
-      .eq('org_id', org.id)
-      .is('deleted_at', null)
-      .order('date', { ascending: false });
+    // Render instantly from IndexedDB, then revalidate from Supabase
+    const localTxs = filterLocal((await db.getTransactionsInRange(org.id)).reverse() as unknown as Transaction[], filters);
+    if (requestId !== requestIdRef.current) return;
+    if (localTxs.length > 0 || !navigator.onLine) {
+      setTransactions(localTxs.slice(0, PAGE_SIZE));
+      setTotals(sumLocal(localTxs));
+      setHasMore(false);
+      setLoading(false);
+    }
+    if (!navigator.onLine) return;
 
-    if (data) setTransactions(data);
-    setLoading(false);
-  };
+    try {
+      const [page, totalsRes] = await Promise.all([
+        fetchLedgerPage(org.id, filters, null),
+        supabase.rpc('get_transaction_totals', {
+          p_org_id: org.id,
+          p_type: filters.type === 'all' ? null : filters.type,
+          p_from: filters.from || null,
+          p_to: filters.to || null,
+          p_category: filters.category || null
+        })
+      ]);
+      if (requestId !== requestIdRef.current) return;
 
-  const filteredTransactions = transactions.filter(t =>
-    filter === 'all' || t.type === filter
-  );
+      setTransactions(page);
+      setHasMore(page.length === PAGE_SIZE);
+      if (totalsRes.data) setTotals(totalsRes.data as LedgerTotals);
+    } catch (err) {
+      console.error('Ledger fetch error:', err);
+    } finally {
+      if (requestId === requestIdRef.current) setLoading(false);
+    }
+  }, [org?.id, filters]);
 
-  const totalIncome = filteredTransactions
-    .filter(t => t.type === 'income')
-    .reduce((sum, t) => sum + (t.amount || 0), 0);
+  const loadMore = useCallback(async () => {
+    if (!org?.id || loadingMore || !hasMore || transactions.length === 0) return;
+    const requestId = requestIdRef.current;
+    setLoadingMore(true);
+    try {
+      const page = await fetchLedgerPage(org.id, filters, transactions[transactions.length - 1]);
+      if (requestId !== requestIdRef.current) return;
+      setTransactions(prev => [...prev, ...page]);
+      setHasMore(page.length === PAGE_SIZE);
+    } catch (err) {
+      console.error('Ledger page error:', err);
+    } finally {
+      setLoadingMore(false);
+    }
+  }, [org?.id, filters, transactions, loadingMore, hasMore]);
+
+  useEffect(() => {
+    setLoading(true);
+    fetchTransactions();
+  }, [fetchTransactions]);
 
-  const totalExpense = filteredTransactions
-    .filter(t => t.type === 'expense')
-    .reduce((sum, t) => sum + (t.amount || 0), 0);
+  useRealtimeRefresh(['transactions'], () => {
+    fetchTransactions();
+  });
 
+  // Same filters as the ledger, in PostgREST syntax for the streaming export
+  const exportFilters = useMemo(() => {
+    const result: Record<string, string> = { org_id: `eq.${org?.id}`, deleted_at: 'is.null' };
+    if (filters.type !== 'all') result.type = `eq.${filters.type}`;
+    if (filters.from && filters.to) result.and = `(date.gte.${filters.from},date.lte.${filters.to})`;
+    else if (filters.from) result.date = `gte.${filters.from}`;
+    else if (filters.to) result.date = `lte.${filters.to}`;
+    if (filters.category) result.category = `eq.${filters.category}`;
+    return result;
+  }, [org?.id, filters]);
+
+  const filteredTransactions = transactions;
+  const totalIncome = Number(totals.income) || 0;
+  const totalExpense = Number(totals.expense) || 0;
   const balance = totalIncome - totalExpense;
 
   const canAdd = user?.permissions?.finance?.add_income || user?.permissions?.finance?.add_expense;
@@ -143,70 +328,68 @@ const Financials: React.FC = () => {
           </button>
         </div>
 
-        {canExport && (
-          <button className="flex items-center gap-2 text-slate-600 dark:text-slate-400 hover:bg-slate-100 dark:hover:bg-slate-800 px-4 py-2 rounded-lg transition">
-            <Download className="w-4 h-4" />
-            <span>تصدير</span>
-          </button>
+        <div className="flex items-center gap-2">
+          <Filter className="w-4 h-4 text-slate-400" />
+          <input
+            type="date"
+            value={filters.from}
+            onChange={(e) => setFilters(prev => ({ ...prev, from: e.target.value }))}
+            className="bg-white dark:bg-slate-800 border border-slate-200 dark:border-slate-700 rounded-lg px-3 py-2 text-sm text-slate-700 dark:text-slate-200"
+            title="من تاريخ"
+          />
+          <input
+            type="date"
+            value={filters.to}
+            onChange={(e) => setFilters(prev => ({ ...prev, to: e.target.value }))}
+            className="bg-white dark:bg-slate-800 border border-slate-200 dark:border-slate-700 rounded-lg px-3 py-2 text-sm text-slate-700 dark:text-slate-200"
+            title="إلى تاريخ"
+          />
+          {categoryOptions.length > 0 && (
+            <select
+              value={filters.category}
+              onChange={(e) => setFilters(prev => ({ ...prev, category: e.target.value }))}
+              className="bg-white dark:bg-slate-800 border border-slate-200 dark:border-slate-700 rounded-lg px-3 py-2 text-sm text-slate-700 dark:text-slate-200"
+            >
+              <option value="">كل التصنيفات</option>
+              {categoryOptions.map(c => (
+                <option key={c.id} value={c.id}>{c.label}</option>
+              ))}
+            </select>
+          )}
+        </div>
+
+        {canExport && org?.id && (
+          <ExportButton
+            type="transactions"
+            filename="transactions"
+            source={{ table: 'transactions', select: 'id,date,type,amount,category,reason,notes,car_id', filters: exportFilters }}
+          />
         )}
       </div>
 
       {/* Transactions Table */}
       <div className="bg-white dark:bg-slate-800 rounded-xl border border-slate-200 dark:border-slate-700 overflow-hidden">
-        <div className="overflow-x-auto">
-          <table className="w-full">
-            <thead className="bg-slate-50 dark:bg-slate-900">
-              <tr>
-                <th className="text-right py-4 px-6 text-sm font-medium text-slate-600 dark:text-slate-400">التاريخ</th>
-                <th className="text-right py-4 px-6 text-sm font-medium text-slate-600 dark:text-slate-400">النوع</th>
-                <th className="text-right py-4 px-6 text-sm font-medium text-slate-600 dark:text-slate-400">المبلغ</th>
-                <th className="text-right py-4 px-6 text-sm font-medium text-slate-600 dark:text-slate-400">السبب</th>
-              </tr>
-            </thead>
-            <tbody className="divide-y divide-slate-200 dark:divide-slate-700">
-              {loading ? (
-                <tr>
-                  <td colSpan={4} className="text-center py-8 text-slate-500">جاري التحميل...</td>
-                </tr>
-              ) : filteredTransactions.length === 0 ? (
-                <tr>
-                  <td colSpan={4} className="text-center py-8 text-slate-500">
-                    لا توجد معاملات
-                  </td>
-                </tr>
-              ) : (
-                filteredTransactions.map((transaction) => (
-                  <tr key={transaction.id} className="hover:bg-slate-50 dark:hover:bg-slate-700">
-                    <td className="py-4 px-6 text-sm text-slate-900 dark:text-white">
-                      {new Date(transaction.date).toLocaleDateString('ar-EG')}
-                    </td>
-                    <td className="py-4 px-6">
-                      <span className={`inline-flex items-center gap-1 px-3 py-1 rounded-full text-xs font-medium ${
-                        transaction.type === 'income'
-                          ? 'bg-emerald-100 text-emerald-700 dark:bg-emerald-900 dark:text-emerald-300'
-                          : 'bg-red-100 text-red-700 dark:bg-red-900 dark:text-red-300'
-                      }`}>
-                        {transaction.type === 'income' ? (
-                          <><TrendingUp className="w-3 h-3" /> وارد</>
-                        ) : (
-                          <><TrendingDown className="w-3 h-3" /> منصرف</>
-                        )}
-                      </span>
-                    </td>
-                    <td className={`py-4 px-6 text-sm font-medium ${
-                      transaction.type === 'income' ? 'text-emerald-600' : 'text-red-600'
-                    }`}>
-                      {transaction.amount.toLocaleString()} ج.م
-                    </td>
-                    <td className="py-4 px-6 text-sm text-slate-600 dark:text-slate-400">
-                      {transaction.reason || '-'}
-                    </td>
-                  </tr>
-                ))
-              )}
-            </tbody>
-          </table>
-        </div>
+        <VirtualTable
+          rows={loading ? [] : filteredTransactions}
+          columns={ledgerColumns}
+          getRowKey={getTransactionRowKey}
+          rowHeight={61}
+          resetScrollKey={filters}
+          onEndReached={loadMore}
+          headerClassName="bg-slate-50 dark:bg-slate-900"
+          bodyClassName="divide-y divide-slate-200 dark:divide-slate-700"
+          rowClassName="hover:bg-slate-50 dark:hover:bg-slate-700"
+          emptyState={
+            <div className="text-center py-8 text-slate-500">
+              {loading ? 'جاري التحميل...' : 'لا توجد معاملات'}
+            </div>
+          }
+          footer={loadingMore && (
+            <div className="flex justify-center py-4">
+              <Loader2 className="w-5 h-5 text-blue-500 animate-spin" />
+            </div>
+          )}
+        />
       </div>
     </div>
   );
@@ -1,5 +1,5 @@
 
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useMemo } from 'react';
 import { useOutletContext } from 'react-router-dom';
 import { supabase } from '../lib/supabaseClient';
 import { Transaction, Car } from '../types';
@@ -8,13 +8,20 @@ import {
     Trash2, RefreshCcw, Search, TrendingUp, TrendingDown, 
     Info, Loader2, ChevronRight, Trash
 } from 'lucide-react';
+import VirtualTable, { VirtualTableColumn } from './VirtualTable';
+import { useDebouncedValue, normalizeSearchText } from '../hooks/useDebouncedValue';
+
+type TrashRow = Transaction & { car?: Car };
+
+const getTrashRowKey = (t: TrashRow) => t.id as string;
 
 const GlobalTrash: React.FC = () => {
     const { org, isReadOnly } = useOutletContext<LayoutContextType>();
-    const [trashTxs, setTrashTxs] = useState<(Transaction & { car?: Car })[]>([]);
+    const [trashTxs, setTrashTxs] = useState<TrashRow[]>([]);
     const [loading, setLoading] = useState(true);
     const [searchTerm, setSearchTerm] = useState('');
     const [actionLoading, setActionLoading] = useState<string | null>(null);
+    const debouncedSearch = useDebouncedValue(searchTerm);
 
     useEffect(() => {
         if (org?.id) fetchTrash();
@@ -78,15 +85,119 @@ const GlobalTrash: React.FC = () => {
         }
     };
 
-    const filteredTrash = trashTxs.filter(t => {
-        const s = searchTerm.toLowerCase();
-        return (
-            (t.notes || '').toLowerCase().includes(s) ||
-            (t.car?.make || '').toLowerCase().includes(s) ||
-            (t.car?.model || '').toLowerCase().includes(s) ||
-            (t.car?.plate_number || '').toLowerCase().includes(s)
-        );
-    });
+    // Search keys are normalized once per data load, not per keystroke
+    const searchIndex = useMemo(() => trashTxs.map(t => ({
+        row: t,
+        key: normalizeSearchText([t.notes, t.car?.make, t.car?.model, t.car?.plate_number].join(' '))
+    })), [trashTxs]);
+
+    const filteredTrash = useMemo(() => {
+        const s = normalizeSearchText(debouncedSearch);
+        if (!s) return trashTxs;
+        return searchIndex.filter(entry => entry.key.includes(s)).map(entry => entry.row);
+    }, [searchIndex, trashTxs, debouncedSearch]);
+
+    const columns: VirtualTableColumn<TrashRow>[] = [
+        {
+            key: 'deleted_at',
+            header: 'تاريخ الحذف',
+            headerClassName: 'p-4',
+            className: 'p-4 text-slate-500 dark:text-slate-400 font-mono text-xs',
+            render: (t) => (t.deleted_at ? new Date(t.deleted_at).toLocaleString('ar-EG') : '-')
+        },
+        {
+            key: 'car',
+            header: 'السيارة',
+            headerClassName: 'p-4',
+            className: 'p-4',
+            render: (t) => (
+                <div className="flex items-center gap-2">
+                    <div className="p-1.5 bg-blue-50 dark:bg-blue-900/20 rounded-lg text-blue-600">
+                        <ChevronRight className="w-4 h-4" />
+                    </div>
+                    <div>
+                        <p className="font-bold text-slate-800 dark:text-white leading-none mb-1">
+                            {t.car?.make} {t.car?.model}
+                        </p>
+                        <p className="text-[10px] text-slate-500 font-mono">{t.car?.plate_number}</p>
+                    </div>
+                </div>
+            )
+        },
+        {
+            key: 'type',
+            header: 'النوع',
+            headerClassName: 'p-4',
+            className: 'p-4',
+            render: (t) => {
+                const isIncome = t.type === 'income';
+                const colorClass = isIncome ? 'bg-emerald-50 text-emerald-600 dark:bg-emerald-900/20' : 'bg-red-50 text-red-600 dark:bg-red-900/20';
+                const Icon = isIncome ? TrendingUp : TrendingDown;
+                const label = isIncome ? 'وارد' : 'منصرف';
+
+                return (
+                    <span className={`px-2.5 py-1 rounded-lg text-[10px] font-bold inline-flex items-center gap-1.5 ${colorClass}`}>
+                        <Icon className="w-3 h-3" />
+                        {label}
+                    </span>
+                );
+            }
+        },
+        {
+            key: 'amount',
+            header: 'المبلغ',
+            headerClassName: 'p-4',
+            className: 'p-4 font-bold font-mono text-slate-800 dark:text-white',
+            render: (t) => Number(t.amount).toLocaleString()
+        },
+        {
+            key: 'notes',
+            header: 'الملاحظات',
+            headerClassName: 'p-4',
+            className: 'p-4 max-w-xs',
+            render: (t) => (
+                <p className="text-slate-500 dark:text-slate-400 truncate text-xs" title={t.notes || ''}>
+                    {t.notes || '-'}
+                </p>
+            )
+        },
+        {
+            key: 'actions',
+            header: 'إجراءات',
+            headerClassName: 'p-4 text-center',
+            className: 'p-4',
+            render: (t) => (
+                <div className="flex justify-center gap-2">
+                    <button
+                        onClick={() => handleRestore(t.id)}
+                        disabled={!!actionLoading}
+                        className="p-2 bg-emerald-50 dark:bg-emerald-900/20 text-emerald-600 hover:bg-emerald-100 rounded-xl transition-all flex items-center gap-1.5 font-bold text-xs"
+                        title="استعادة"
+                    >
+                        {actionLoading === t.id ? (
+                            <Loader2 className="w-3.5 h-3.5 animate-spin" />
+                        ) : (
+                            <RefreshCcw className="w-3.5 h-3.5" />
+                        )}
+                        استعادة
+                    </button>
+                    <button
+                        onClick={() => handlePermanentDelete(t.id)}
+                        disabled={!!actionLoading}
+                        className="p-2 bg-red-50 dark:bg-red-900/20 text-red-600 hover:bg-red-100 rounded-xl transition-all flex items-center gap-1.5 font-bold text-xs"
+                        title="حذف نهائي"
+                    >
+                        {actionLoading === t.id ? (
+                            <Loader2 className="w-3.5 h-3.5 animate-spin" />
+                        ) : (
+                            <Trash className="w-3.5 h-3.5" />
+                        )}
+                        حذف نهائي
+                    </button>
+                </div>
+            )
+        }
+    ];
 
     return (
         <div className="space-y-6 animate-in fade-in duration-500">
@@ -138,95 +249,17 @@ const GlobalTrash: React.FC = () => {
                 )}
 
                 {!loading && filteredTrash.length > 0 && (
-                    <div className="overflow-x-auto">
-                        <table className="w-full text-right text-sm">
-                            <thead>
-                                <tr className="bg-slate-50 dark:bg-slate-900/50 text-slate-500 font-bold border-b border-slate-200 dark:border-slate-700 font-[Cairo]">
-                                    <th className="p-4">تاريخ الحذف</th>
-                                    <th className="p-4">السيارة</th>
-                                    <th className="p-4">النوع</th>
-                                    <th className="p-4">المبلغ</th>
-                                    <th className="p-4">الملاحظات</th>
-                                    <th className="p-4 text-center">إجراءات</th>
-                                </tr>
-                            </thead>
-                            <tbody className="divide-y divide-slate-100 dark:divide-slate-700">
-                                {filteredTrash.map((t) => (
-                                    <tr key={t.id} className="hover:bg-slate-50 dark:hover:bg-slate-800/50 transition-colors group">
-                                        <td className="p-4 text-slate-500 dark:text-slate-400 font-mono text-xs">
-                                            {t.deleted_at ? new Date(t.deleted_at).toLocaleString('ar-EG') : '-'}
-                                        </td>
-                                        <td className="p-4">
-                                            <div className="flex items-center gap-2">
-                                                <div className="p-1.5 bg-blue-50 dark:bg-blue-900/20 rounded-lg text-blue-600">
-                                                    <ChevronRight className="w-4 h-4" />
-                                                </div>
-                                                <div>
-                                                    <p className="font-bold text-slate-800 dark:text-white leading-none mb-1">
-                                                        {t.car?.make} {t.car?.model}
-                                                    </p>
-                                                    <p className="text-[10px] text-slate-500 font-mono">{t.car?.plate_number}</p>
-                                                </div>
-                                            </div>
-                                        </td>
-                                        <td className="p-4">
-                                            {(() => {
-                                                const isIncome = t.type === 'income';
-                                                const colorClass = isIncome ? 'bg-emerald-50 text-emerald-600 dark:bg-emerald-900/20' : 'bg-red-50 text-red-600 dark:bg-red-900/20';
-                                                const Icon = isIncome ? TrendingUp : TrendingDown;
-                                                const label = isIncome ? 'وارد' : 'منصرف';
-                                                
-                                                return (
-                                                    <span className={`px-2.5 py-1 rounded-lg text-[10px] font-bold inline-flex items-center gap-1.5 ${colorClass}`}>
-                                                        <Icon className="w-3 h-3" />
-                                                        {label}
-                                                    </span>
-                                                );
-                                            })()}
-                                        </td>
-                                        <td className="p-4 font-bold font-mono text-slate-800 dark:text-white">
-                                            {Number(t.amount).toLocaleString()}
-                                        </td>
-                                        <td className="p-4 max-w-xs">
-                                            <p className="text-slate-500 dark:text-slate-400 truncate text-xs" title={t.notes || ''}>
-                                                {t.notes || '-'}
-                                            </p>
-                                        </td>
-                                        <td className="p-4">
-                                            <div className="flex justify-center gap-2">
-                                                <button
-                                                    onClick={() => handleRestore(t.id)}
-                                                    disabled={!!actionLoading}
-                                                    className="p-2 bg-emerald-50 dark:bg-emerald-900/20 text-emerald-600 hover:bg-emerald-100 rounded-xl transition-all flex items-center gap-1.5 font-bold text-xs"
-                                                    title="استعادة"
-                                                >
-                                                    {actionLoading === t.id ? (
-                                                        <Loader2 className="w-3.5 h-3.5 animate-spin" />
-                                                    ) : (
-                                                        <RefreshCcw className="w-3.5 h-3.5" />
-                                                    )}
-                                                    استعادة
-                                                </button>
-                                                <button
-                                                    onClick={() => handlePermanentDelete(t.id)}
-                                                    disabled={!!actionLoading}
-                                                    className="p-2 bg-red-50 dark:bg-red-900/20 text-red-600 hover:bg-red-100 rounded-xl transition-all flex items-center gap-1.5 font-bold text-xs"
-                                                    title="حذف نهائي"
-                                                >
-                                                    {actionLoading === t.id ? (
-                                                        <Loader2 className="w-3.5 h-3.5 animate-spin" />
-                                                    ) : (
-                                                        <Trash className="w-3.5 h-3.5" />
-                                                    )}
-                                                    حذف نهائي
-                                                </button>
-                                            </div>
-                                        </td>
-                                    </tr>
-                                ))}
-                            </tbody>
-                        </table>
-                    </div>
+                    <VirtualTable
+                        rows={filteredTrash}
+                        columns={columns}
+                        getRowKey={getTrashRowKey}
+                        rowHeight={72}
+                        resetScrollKey={debouncedSearch}
+                        tableClassName="text-right text-sm"
+                        headerClassName="bg-slate-50 dark:bg-slate-900 text-slate-500 font-bold font-[Cairo]"
+                        bodyClassName="divide-y divide-slate-100 dark:divide-slate-700"
+                        rowClassName="hover:bg-slate-50 dark:hover:bg-slate-800/50 transition-colors group"
+                    />
                 )}
             </div>
 
@@ -1,4 +1,4 @@
-import React, { useState, useEffect, useMemo, useCallback } from 'react';
+import React, { useState, useEffect, useMemo, useCallback, useRef } from 'react';
 import { useOutletContext, useLocation } from 'react-router-dom';
 import { supabase } from '../lib/supabaseClient';
 import { 
@@ -7,6 +7,9 @@ import {
 } from '../types';
 import { LayoutContextType } from './Layout';
 import { db, LocalCar, LocalTransaction } from '../lib/db';
+import { fetchQuery, unwrap } from '../lib/queryCache';
+import { useRealtimeRefresh } from '../hooks/useRealtimeRefresh';
+import { useDebouncedValue, normalizeSearchText } from '../hooks/useDebouncedValue';
 import {
     Plus, Search, Loader2, CheckCircle, Lock
 } from 'lucide-react';
@@ -18,6 +21,36 @@ import AddEditTransactionModal from './inventory/AddEditTransactionModal';
 import ReportModal from './inventory/ReportModal';
 import DeleteConfirmationModal from './inventory/DeleteConfirmationModal';
 import CategoryManagerModal from './inventory/CategoryManagerModal';
+import { VirtualList } from './VirtualTable';
+
+// Cars per page returned by get_car_profit_summary
+const PAGE_SIZE = 50;
+// get_car_profit_summary caps p_limit at this many rows per call
+const MAX_RPC_PAGE = 500;
+
+// Row shape returned by get_car_profit_summary
+interface CarProfitRow {
+    car: Car;
+    total_income: number;
+    total_expense: number;
+    balance: number;
+}
+
+interface CarProfitPage {
+    total_count: number;
+    cars: CarProfitRow[];
+}
+
+const getCarRowKey = (row: Car[]) => row.map(c => c.id).join('|');
+
+const toCarWithStats = (row: CarProfitRow): Car => ({
+    ...row.car,
+    stats: {
+        total_income: Number(row.total_income) || 0,
+        total_expense: Number(row.total_expense) || 0,
+        balance: Number(row.balance) || 0
+    }
+});
 
 /**
  * Inventory Component
@@ -34,6 +67,14 @@ const Inventory: React.FC = () => {
     const [loading, setLoading] = useState(true);
     const [saveLoading, setSaveLoading] = useState(false);
     const [searchTerm, setSearchTerm] = useState('');
+    const debouncedSearch = useDebouncedValue(searchTerm.trim(), 300);
+    const [gridColumns, setGridColumns] = useState(() =>
+        typeof globalThis.matchMedia === 'function' && globalThis.matchMedia('(min-width: 768px)').matches ? 2 : 1
+    );
+    const [totalCars, setTotalCars] = useState(0);
+    const [loadingMore, setLoadingMore] = useState(false);
+    const loadedCountRef = useRef(PAGE_SIZE);
+    const openedTargetRef = useRef<string | null>(null);
     const [successMsg, setSuccessMsg] = useState<string | null>(null);
 
     // Modals Visibility
@@ -94,28 +135,76 @@ const Inventory: React.FC = () => {
     const canDeleteCar = !isReadOnly && (user?.role === 'owner' || user?.permissions?.inventory?.delete);
 
     // --- Data Fetching ---
+    const fetchCarsPage = useCallback(async (orgId: string, search: string, offset: number, limit: number) => {
+        const { data, error } = await supabase.rpc('get_car_profit_summary', {
+            p_org_id: orgId,
+            p_search: search || null,
+            p_limit: limit,
+            p_offset: offset
+        });
+        if (error) throw error;
+        return data as CarProfitPage;
+    }, []);
+
+    // Fetch the first `limit` cars, in MAX_RPC_PAGE slices when more are shown than one call returns
+    const fetchCarsRange = useCallback(async (orgId: string, search: string, limit: number) => {
+        const first = await fetchCarsPage(orgId, search, 0, Math.min(limit, MAX_RPC_PAGE));
+        const cars = [...first.cars];
+        const target = Math.min(limit, Number(first.total_count) || 0);
+        while (cars.length < target) {
+            const next = await fetchCarsPage(orgId, search, cars.length, Math.min(target - cars.length, MAX_RPC_PAGE));
+            if (!next.cars.length) break;
+            cars.push(...next.cars);
+        }
+        return { total_count: first.total_count, cars } as CarProfitPage;
+    }, [fetchCarsPage]);
+
     const fetchData = useCallback(async (orgId: string) => {
         if (!orgId || !user) return;
         setLoading(true);
-        const controller = new AbortController();
+
+        // Render instantly from IndexedDB; the Supabase fetch below revalidates
+        try {
+            const [localCars, localTotals] = await Promise.all([
+                db.getCarsByStatus(orgId),
+                db.getCarStatsByOrg(orgId)
+            ]);
+            if (localCars.length > 0) {
+                setCars(localCars.map(c => {
+                    const totals = localTotals.get(c.id as string);
+                    const income = totals?.income || 0;
+                    const expense = totals?.expense || 0;
+                    return {
+                        ...(c as unknown as Car),
+                        stats: { total_income: income, total_expense: expense, balance: income - expense, partial: totals?.partial ?? true }
+                    };
+                }));
+            }
+        } catch (err) {
+            console.warn('Local inventory read failed:', err);
+        }
+
+        if (!navigator.onLine) {
+            setLoading(false);
+            return;
+        }
 
         try {
-            const [carsRes, txRes, templatesRes] = await Promise.all([
-                supabase.from('cars').select('*').eq('org_id', orgId).order('created_at', { ascending: false }).abortSignal(controller.signal),
-                supabase.from('transactions').select('car_id, type, amount').eq('org_id', orgId).is('deleted_at', null).abortSignal(controller.signal),
-                supabase.from('expense_templates').select('*').eq('user_id', user.id).abortSignal(controller.signal)
+            // Refetch as many cars as are already shown so a refresh doesn't collapse "load more"
+            const limit = Math.max(PAGE_SIZE, loadedCountRef.current);
+            const [page, templatesRes] = await Promise.all([
+                fetchCarsRange(orgId, debouncedSearch, limit),
+                fetchQuery<ExpenseTemplate[]>(
+                    { table: 'expense_templates', filters: { user_id: user.id } },
+                    () => unwrap(supabase.from('expense_templates').select().eq('user_id', user.id).order('created_at', { ascending: false }))
+                ).then(data => ({ data }), () => ({ data: null }))
             ]);
 
-            if (carsRes.data && txRes.data) {
-                const txData = txRes.data as Transaction[];
-                const carsWithStats = (carsRes.data as Car[]).map(c => {
-                    const carTxs = txData.filter(t => t.car_id === c.id);
-                    const income = carTxs.filter(t => t.type === 'income').reduce((s, t) => s + Number(t.amount), 0);
-                    const expense = carTxs.filter(t => t.type === 'expense').reduce((s, t) => s + Number(t.amount), 0);
-                    return { ...c, stats: { total_income: income, total_expense: expense, balance: income - expense } };
-                });
-                setCars(carsWithStats);
-                await db.cars.bulkPut(carsRes.data as LocalCar[]);
+            if (page) {
+                setCars(page.cars.map(toCarWithStats));
+                setTotalCars(Number(page.total_count) || 0);
+                loadedCountRef.current = Math.max(PAGE_SIZE, page.cars.length);
+                await db.putCarsWithTotals(page.cars);
             }
             if (templatesRes.data) setTemplates(templatesRes.data as ExpenseTemplate[]);
         } catch (err) {
@@ -123,27 +212,74 @@ const Inventory: React.FC = () => {
         } finally {
             setLoading(false);
         }
-    }, [user]);
+    }, [user, debouncedSearch, fetchCarsRange]);
+
+    const handleLoadMore = useCallback(async () => {
+        if (!user?.org_id || loadingMore || loading || cars.length >= totalCars) return;
+        setLoadingMore(true);
+        try {
+            const page = await fetchCarsPage(user.org_id, debouncedSearch, cars.length, PAGE_SIZE);
+            const next = page.cars.map(toCarWithStats);
+            setCars(prev => {
+                const seen = new Set(prev.map(c => c.id));
+                return [...prev, ...next.filter(c => !seen.has(c.id))];
+            });
+            setTotalCars(Number(page.total_count) || 0);
+            loadedCountRef.current = cars.length + next.length;
+            await db.putCarsWithTotals(page.cars);
+        } catch (err) {
+            console.error('Load more error:', err);
+        } finally {
+            setLoadingMore(false);
+        }
+    }, [user, loadingMore, loading, cars.length, totalCars, debouncedSearch, fetchCarsPage]);
+
+    // Server-side search: a new (debounced) term restarts from the first page
+    useEffect(() => {
+        loadedCountRef.current = PAGE_SIZE;
+    }, [debouncedSearch]);
+
+    // Cards are laid out in rows of 1 (mobile) or 2 (md+) for the virtual list
+    useEffect(() => {
+        if (typeof globalThis.matchMedia !== 'function') return;
+        const query = globalThis.matchMedia('(min-width: 768px)');
+        const update = () => setGridColumns(query.matches ? 2 : 1);
+        query.addEventListener('change', update);
+        return () => query.removeEventListener('change', update);
+    }, []);
 
     useEffect(() => {
         if (user?.org_id) fetchData(user.org_id);
     }, [user, fetchData]);
 
-    // Auto-open report if redirected from Dashboard
+    // Pick up changes made by other users / tabs without polling
+    useRealtimeRefresh(['cars', 'transactions'], () => {
+        if (user?.org_id) fetchData(user.org_id);
+    });
+
+    // Auto-open report if redirected from Dashboard (the car may not be on the loaded page)
     useEffect(() => {
-        if (location.state?.targetCarId && cars.length > 0) {
-            const targetCar = cars.find((c: Car) => c.id === location.state.targetCarId);
+        const targetCarId = location.state?.targetCarId;
+        if (!targetCarId || loading || openedTargetRef.current === targetCarId) return;
+        openedTargetRef.current = targetCarId;
+        const openTarget = async () => {
+            let targetCar = cars.find((c: Car) => c.id === targetCarId);
+            if (!targetCar) {
+                const { data } = await supabase.from('cars').select('*').eq('id', targetCarId).maybeSingle();
+                targetCar = (data as Car) || undefined;
+            }
             if (targetCar) {
                 handleOpenReport(targetCar);
                 globalThis.history.replaceState({}, '');
             }
-        }
-    }, [location.state, cars]);
+        };
+        openTarget();
+    }, [location.state, cars, loading]);
 
     // --- Action Handlers ---
     const handleOpenAddCar = useCallback(() => {
         if (isReadOnly || !canAddCar) return;
-        if (org && cars.length >= org.max_cars) {
+        if (org && Math.max(totalCars, cars.length) >= org.max_cars) {
             alert("لقد وصلت للحد الأقصى من السيارات المسموح به في باقتك.");
             return;
         }
@@ -153,7 +289,7 @@ const Inventory: React.FC = () => {
             current_odometer: 0, status: 'active'
         });
         setShowAddCar(true);
-    }, [isReadOnly, canAddCar, org, cars.length]);
+    }, [isReadOnly, canAddCar, org, cars.length, totalCars]);
 
     const handleOpenEditCar = useCallback((car: Car) => {
         if (isReadOnly || !canEditCar) return;
@@ -407,11 +543,26 @@ const Inventory: React.FC = () => {
         return id;
     }, [activeCategories]);
 
-    const filteredCars = useMemo(() => cars.filter(car =>
-        (car.make || '').toLowerCase().includes(searchTerm.toLowerCase()) ||
-        (car.model || '').toLowerCase().includes(searchTerm.toLowerCase()) ||
-        (car.plate_number || '').includes(searchTerm)
-    ), [cars, searchTerm]);
+    // Search keys are normalized once per load; the server already filtered online pages,
+    // this covers the IndexedDB render and offline use
+    const carSearchIndex = useMemo(() => cars.map(car => ({
+        car,
+        key: normalizeSearchText(`${car.make || ''} ${car.model || ''} ${car.plate_number || ''}`)
+    })), [cars]);
+
+    const filteredCars = useMemo(() => {
+        const term = normalizeSearchText(debouncedSearch);
+        if (!term) return cars;
+        return carSearchIndex.filter(entry => entry.key.includes(term)).map(entry => entry.car);
+    }, [carSearchIndex, cars, debouncedSearch]);
+
+    const carRows = useMemo(() => {
+        const rows: Car[][] = [];
+        for (let i = 0; i < filteredCars.length; i += gridColumns) {
+            rows.push(filteredCars.slice(i, i + gridColumns));
+        }
+        return rows;
+    }, [filteredCars, gridColumns]);
 
     // --- Render ---
     return (
@@ -427,7 +578,7 @@ const Inventory: React.FC = () => {
                 <div className="flex gap-2 w-full md:w-auto">
                     {canAddCar && (
                         <button onClick={handleOpenAddCar} disabled={isReadOnly} className={`flex-1 md:flex-none px-4 py-2 rounded-xl text-sm font-bold flex items-center justify-center gap-2 transition ${isReadOnly ? 'bg-slate-300 cursor-not-allowed' : 'bg-slate-800 hover:bg-slate-700 text-white'}`}>
-                            {org && cars.length >= org.max_cars ? <Lock className="w-4 h-4" /> : <Plus className="w-4 h-4" />}
+                            {org && Math.max(totalCars, cars.length) >= org.max_cars ? <Lock className="w-4 h-4" /> : <Plus className="w-4 h-4" />}
                             إضافة سيارة
                         </button>
                     )}
@@ -452,21 +603,36 @@ const Inventory: React.FC = () => {
                     <Loader2 className="w-8 h-8 text-blue-500 animate-spin" />
                 </div>
             ) : (
-                <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-2 gap-6">
-                    {filteredCars.map(car => (
-                        <CarCard
-                            key={car.id}
-                            car={car}
-                            canEdit={!!canEditCar}
-                            canDelete={!!canDeleteCar}
-                            isReadOnly={isReadOnly}
-                            onOpenReport={handleOpenReport}
-                            onQuickAction={handleQuickAction}
-                            onEdit={handleOpenEditCar}
-                            onDelete={initiateDeleteCar}
-                        />
-                    ))}
-                </div>
+                <VirtualList
+                    items={carRows}
+                    getItemKey={getCarRowKey}
+                    itemHeight={340}
+                    dynamicItemHeight
+                    onEndReached={handleLoadMore}
+                    renderItem={(row) => (
+                        <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-2 gap-6 pb-6">
+                            {row.map(car => (
+                                <CarCard
+                                    key={car.id}
+                                    car={car}
+                                    canEdit={!!canEditCar}
+                                    canDelete={!!canDeleteCar}
+                                    isReadOnly={isReadOnly}
+                                    onOpenReport={handleOpenReport}
+                                    onQuickAction={handleQuickAction}
+                                    onEdit={handleOpenEditCar}
+                                    onDelete={initiateDeleteCar}
+                                />
+                            ))}
+                        </div>
+                    )}
+                    footer={cars.length < totalCars && (
+                        <div className="flex justify-center py-4 text-xs text-slate-500 gap-2 items-center">
+                            {loadingMore && <Loader2 className="w-4 h-4 animate-spin text-blue-500" />}
+                            {cars.length} من {totalCars}
+                        </div>
+                    )}
+                />
             )}
 
             {/* Modals Container */}
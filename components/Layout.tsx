@@ -10,9 +10,14 @@ import {
 import { seedLocalDB, syncData } from '../lib/syncManager';
 import { Profile, Organization, UserPermissions, SystemConfig } from '../types';
 import { db } from '../lib/db';
+import { fetchQuery, unwrap } from '../lib/queryCache';
+import { startRealtime, stopRealtime, subscribeRealtime } from '../lib/realtimeManager';
 import { useTheme } from '../components/ThemeProvider';
 import { performGlobalLogout, isLogoutInProgress } from '../lib/authUtils';
 import { checkPermission as checkPlanPermission } from '../lib/planPermissionGuard';
+import { compilePermissions, hasPermissionBit } from '../lib/permissionBits';
+import { primeProfileCache } from '../lib/profileCache';
+import { setTelemetryContext, TelemetryToken } from '../lib/telemetry';
 import { WhatsAppButton } from './WhatsAppButton';
 
 export interface LayoutContextType {
@@ -134,9 +139,46 @@ const Layout: React.FC = () => {
     }
   }, [org?.id, isOnline]);
 
-  const fetchSystemConfig = async () => {
-    const { data } = await supabase.from('public_config').select('*').single();
-    if (data) setSystemConfig(data);
+  // Realtime: one multiplexed channel per org replaces re-fetching on every change
+  useEffect(() => {
+    if (!org?.id) return;
+    startRealtime(org.id);
+
+    const unsubscribers = [
+      subscribeRealtime('organizations', (change) => {
+        if (change.eventType === 'UPDATE') {
+          setOrg(prev => (prev ? { ...prev, ...(change.new as Partial<Organization>) } : prev));
+        }
+      }),
+      subscribeRealtime('public_config', () => {
+        fetchSystemConfig(true);
+      }),
+      subscribeRealtime('profiles', (change) => {
+        const changedId = (change.new?.id || change.old?.id) as string | undefined;
+        if (changedId && changedId === userProfile?.id) {
+          fetchUserDataOnline(changedId);
+        }
+      })
+    ];
+
+    return () => {
+      unsubscribers.forEach(unsubscribe => unsubscribe());
+    };
+  }, [org?.id, userProfile?.id]);
+
+  useEffect(() => () => stopRealtime(), []);
+
+  const fetchSystemConfig = async (force = false) => {
+    try {
+      const data = await fetchQuery<SystemConfig>(
+        { table: 'public_config', filters: { select: '*' } },
+        () => unwrap(supabase.from('public_config').select('*').single()),
+        { ttl: 5 * 60 * 1000, force }
+      );
+      if (data) setSystemConfig(data);
+    } catch (e) {
+      console.warn('Failed to load system config:', e);
+    }
   };
 
   const fetchUserDataOnline = async (userId: string) => {
@@ -157,6 +199,19 @@ const Layout: React.FC = () => {
       return;
     }
 
+    // Guards with validateWithServer start from this copy (permissions_version check only)
+    primeProfileCache(profile);
+    setTelemetryContext({
+      role: profile.role ?? null,
+      issueToken: profile.org_id
+        ? async () => {
+            const { data, error } = await supabase.rpc('issue_telemetry_token');
+            if (error) throw error;
+            return data as TelemetryToken | null;
+          }
+        : null
+    });
+
     if (profile.org_id) {
       const { data: orgData } = await supabase
         .from('organizations')
@@ -236,15 +291,11 @@ const Layout: React.FC = () => {
   const isReadOnly = isFullyBlocked;
 
 
-  const checkUserPermissions = (module: keyof UserPermissions, action?: string): boolean => {
-    if (!userProfile?.permissions) return false;
-    const mod = userProfile.permissions[module];
-    if (typeof mod === 'object' && mod !== null) {
-      if (action) return (mod as Record<string, boolean>)[action] === true;
-      return (mod as Record<string, boolean>).view === true;
-    }
-    return false;
-  };
+  // Compiled once per permissions object, every menu item is a bit test
+  const permissionBits = compilePermissions(userProfile?.permissions);
+
+  const checkUserPermissions = (module: keyof UserPermissions, action?: string): boolean =>
+    hasPermissionBit(permissionBits, module, action || 'view');
 
   const can = (module: keyof UserPermissions, action?: string) => {
     if (isFullyBlocked) return false;
@@ -9,6 +9,8 @@ import {
   Building, CreditCard, Lock, Save, Loader2, Printer, TrendingUp, TrendingDown, Edit
 } from 'lucide-react';
 import { performGlobalLogout } from '../lib/authUtils';
+import { invalidateQueries, unwrap } from '../lib/queryCache';
+import { useCachedQuery } from '../hooks/useCachedQuery';
 
 const Settings: React.FC = () => {
   const { showToast } = useToast();
@@ -31,12 +33,22 @@ const Settings: React.FC = () => {
   const [actionLoading, setActionLoading] = useState(false);
 
   // Drivers State
-  const [drivers, setDrivers] = useState<Driver[]>([]);
+  const driversQuery = useCachedQuery<Driver[]>(
+    currentUser?.org_id ? { table: 'drivers', filters: { org_id: currentUser.org_id } } : null,
+    () => unwrap(supabase.from('drivers').select().eq('org_id', currentUser!.org_id!).order('created_at', { ascending: false }))
+  );
+  const drivers = driversQuery.data || [];
+  const setDrivers = driversQuery.mutate;
   const [showAddDriver, setShowAddDriver] = useState(false);
   const [newDriver, setNewDriver] = useState({ full_name: '', phone_number: '', license_number: '' });
 
   // Expense Templates State
-  const [templates, setTemplates] = useState<any[]>([]);
+  const templatesQuery = useCachedQuery<any[]>(
+    currentUser?.org_id ? { table: 'expense_templates', filters: { user_id: currentUser.id } } : null,
+    () => unwrap(supabase.from('expense_templates').select().eq('user_id', currentUser!.id).order('created_at', { ascending: false }))
+  );
+  const templates = templatesQuery.data || [];
+  const setTemplates = templatesQuery.mutate;
   const [showAddTemplate, setShowAddTemplate] = useState(false);
   const [editingTemplateId, setEditingTemplateId] = useState<string | null>(null); // To track editing
   const [newTemplate, setNewTemplate] = useState({ title: '', amount: '', category: '', type: 'expense', is_active: true });
@@ -54,24 +66,12 @@ const Settings: React.FC = () => {
   });
 
   useEffect(() => {
-    const loadData = async () => {
-      // Use currentUser from context instead of localStorage
-      if (currentUser?.org_id) {
-        // 2. Fetch Drivers
-        const { data: driversData } = await supabase.from('drivers').select().eq('org_id', currentUser.org_id).order('created_at', { ascending: false });
-        if (driversData) setDrivers(driversData as Driver[]);
-
-        // 3. Fetch Templates
-        const { data: templatesData } = await supabase.from('expense_templates').select().eq('user_id', currentUser.id).order('created_at', { ascending: false });
-        if (templatesData) setTemplates(templatesData);
-      }
+    if (!currentUser) return;
+    // Drivers & templates come from the shared query cache; wait for the first load only
+    if (!currentUser.org_id || (!driversQuery.isLoading && !templatesQuery.isLoading)) {
       setLoading(false);
-    };
-
-    if (currentUser) {
-      loadData();
     }
-  }, [currentUser]);
+  }, [currentUser, driversQuery.isLoading, templatesQuery.isLoading]);
 
   // --- Handlers ---
 
@@ -706,6 +706,7 @@ const AnnouncementSettings: React.FC = () => {
     }).eq('id', 1);
 
     setLoading(false);
+    if (!error) invalidateQueries('public_config');
     if (!error) alert('تم حفظ ونشر التحديث بنجاح ✅');
     else alert('خطأ: ' + error.message);
   };
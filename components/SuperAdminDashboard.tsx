@@ -10,9 +10,12 @@ import { Profile, Organization, SystemConfig, Plan, AuditLog, UserPermissions, P
 import { supabase } from '../lib/supabaseClient';
 import { useNavigate } from 'react-router-dom';
 import { createClient, SupabaseClient } from '@supabase/supabase-js';
-import { Bell, Menu, X, Users, Settings, Plus, Check, Save, Trash2, Eye, EyeOff, Building, Package, CreditCard, Lock, Loader2, Edit, UserPlus, Clock, Car, LayoutDashboard, Sparkles, ChevronLeft, Target, ArrowUpRight, PieChart, Power, UserCheck, UserX, Shield, FileText, AlertCircle, Search, Calendar, Tag, Receipt, CheckCircle2, XCircle, DollarSign, Percent, Image, ExternalLink, Activity } from 'lucide-react';
+import { Bell, Menu, X, Users, Settings, Plus, Check, Save, Trash2, Eye, EyeOff, Building, Package, CreditCard, Lock, Loader2, Edit, UserPlus, Clock, Car, LayoutDashboard, Sparkles, ChevronLeft, Target, ArrowUpRight, PieChart, Power, UserCheck, UserX, Shield, FileText, AlertCircle, Search, Calendar, Tag, Receipt, CheckCircle2, XCircle, DollarSign, Percent, Image, ExternalLink, Activity, Gauge } from 'lucide-react';
 import WhatsAppSection from './WhatsAppSection';
 import HealthMonitorSection from './whatsapp/HealthMonitorSection';
+import { fetchOrgPreview, fetchOrgSummaries, invalidateOrgSummaries, OrgPreview, OrgSummary } from '../lib/adminOrgSummaries';
+import { useDebouncedValue } from '../hooks/useDebouncedValue';
+import { fetchClientPerfReport, ClientPerfRow } from '../lib/clientPerfReport';
 
 // Types
 type OrgTab = 'info' | 'plan' | 'users' | 'permissions' | 'security' | 'whatsapp';
@@ -49,7 +52,7 @@ const SuperAdminDashboard: React.FC = () => {
     const [currentUser, setCurrentUser] = useState<Profile | null>(null);
     const [sidebarOpen, setSidebarOpen] = useState(true);
     const [mobileMenuOpen, setMobileMenuOpen] = useState(false);
-    const [activeSection, setActiveSection] = useState<'overview' | 'users' | 'organizations' | 'announcements' | 'plans' | 'discounts' | 'payments' | 'logs' | 'settings' | 'analytics' | 'whatsapp' | 'health'>('overview');
+    const [activeSection, setActiveSection] = useState<'overview' | 'users' | 'organizations' | 'announcements' | 'plans' | 'discounts' | 'payments' | 'logs' | 'settings' | 'analytics' | 'whatsapp' | 'health' | 'performance'>('overview');
 
     // RADICAL FIX: Start with FALSE to force render immediately. No more white screen.
     // Page loading state removed as it was unused and hardcoded to false
@@ -57,9 +60,6 @@ const SuperAdminDashboard: React.FC = () => {
     // Data loading: for stats fetching (background)
     const [statsLoading, setStatsLoading] = useState(false);
 
-    // Data states
-    const [allOrgs, setAllOrgs] = useState<Organization[]>([]);
-
     // Stats
     const [stats, setStats] = useState({
         totalOrgs: 0,
@@ -132,30 +132,26 @@ const SuperAdminDashboard: React.FC = () => {
         if (!isMounted.current) return;
         setStatsLoading(true);
         try {
-            // Optimized: Fetch full orgs data ONCE here to pass down
-            const [orgsRes, usersRes, carsRes] = await Promise.all([
-                supabase.from('organizations').select('*').order('created_at', { ascending: false }),
+            // Org counters come from the summaries RPC (limit 0 = counters only)
+            const [summary, usersRes, carsRes] = await Promise.all([
+                fetchOrgSummaries({ limit: 0, offset: 0 }, true),
                 supabase.from('profiles').select('id', { count: 'exact', head: true }),
                 supabase.from('cars').select('id', { count: 'exact', head: true })
             ]);
 
             if (!isMounted.current) return;
 
-            const orgs = orgsRes.data || [];
-            if (isMounted.current) setAllOrgs(orgs); // Store full data
-
-            const now = new Date();
-
+            const orgStats = summary.stats;
             setStats({
-                totalOrgs: orgs.length,
+                totalOrgs: orgStats.total,
                 totalUsers: usersRes.count || 0,
                 totalCars: carsRes.count || 0,
-                activeSubscriptions: orgs.filter(o => o.is_active).length,
-                trialOrgs: orgs.filter(o => o.subscription_plan === 'trial').length,
-                proOrgs: orgs.filter(o => o.subscription_plan === 'pro').length,
-                starterOrgs: orgs.filter(o => o.subscription_plan === 'starter').length,
-                expiredOrgs: orgs.filter(o => o.subscription_end && new Date(o.subscription_end) < now).length,
-                disabledOrgs: orgs.filter(o => !o.is_active).length
+                activeSubscriptions: orgStats.active,
+                trialOrgs: orgStats.trial,
+                proOrgs: orgStats.pro,
+                starterOrgs: orgStats.starter,
+                expiredOrgs: orgStats.expired,
+                disabledOrgs: orgStats.disabled
             });
         } catch (err) {
             console.error('Error fetching stats:', err);
@@ -174,6 +170,7 @@ const SuperAdminDashboard: React.FC = () => {
         { id: 'payments', label: 'طلبات الدفع', icon: Receipt },
         { id: 'whatsapp', label: 'واتساب', icon: ExternalLink },
         { id: 'health', label: 'مراقبة النظام', icon: Activity },
+        { id: 'performance', label: 'أداء المستخدمين', icon: Gauge },
         { id: 'logs', label: 'سجل النشاطات', icon: Shield },
         { id: 'settings', label: 'إعدادات النظام', icon: Settings },
     ];
@@ -251,7 +248,7 @@ transition-all duration-300 ease-in-out
                         <button
                             key={item.id}
                             onClick={() => {
-                                setActiveSection(item.id as 'overview' | 'users' | 'organizations' | 'announcements' | 'plans' | 'discounts' | 'payments' | 'logs' | 'settings' | 'analytics' | 'whatsapp' | 'health');
+                                setActiveSection(item.id as 'overview' | 'users' | 'organizations' | 'announcements' | 'plans' | 'discounts' | 'payments' | 'logs' | 'settings' | 'analytics' | 'whatsapp' | 'health' | 'performance');
                                 setMobileMenuOpen(false);
                             }}
                             className={`
@@ -312,13 +309,14 @@ w-full flex items-center gap-3 px-3 lg:px-4 py-3 lg:py-3.5 rounded-xl transition
                             {activeSection === 'overview' && <OverviewSection stats={stats} loading={statsLoading} />}
                             {activeSection === 'analytics' && <AnalyticsDashboard />}
                             {activeSection === 'users' && <UsersSection />}
-                            {activeSection === 'organizations' && <OrganizationsSection initialOrgs={allOrgs} onRefresh={fetchStats} />}
+                            {activeSection === 'organizations' && <OrganizationsSection onRefresh={fetchStats} />}
                             {activeSection === 'announcements' && <AnnouncementsSection />}
                             {activeSection === 'plans' && <PlansSection />}
                             {activeSection === 'discounts' && <DiscountCodesSection />}
                             {activeSection === 'payments' && <PaymentRequestsSection currentUser={currentUser} />}
                             {activeSection === 'whatsapp' && <WhatsAppSection />}
                             {activeSection === 'health' && <HealthMonitorSection />}
+                            {activeSection === 'performance' && <PerformanceSection />}
                             {activeSection === 'logs' && <AuditLogsSection />}
                             {activeSection === 'settings' && <SystemSettingsSection />}
                         </>
@@ -458,20 +456,17 @@ const generateSecretKey = (orgId: string): string => {
 
 // ==================== ORGANIZATIONS SECTION ====================
 
-const OrganizationsSection: React.FC<{ initialOrgs: Organization[]; onRefresh: () => void }> = ({ initialOrgs, onRefresh }) => {
-    // Props Sync
-    const [orgs, setOrgs] = useState<Organization[]>(initialOrgs);
-    const [filteredOrgs, setFilteredOrgs] = useState<Organization[]>(initialOrgs);
+const OrganizationsSection: React.FC<{ onRefresh: () => void }> = ({ onRefresh }) => {
+    // Server-side page of orgs (filters, counts and balance computed by the RPC)
+    const [summaries, setSummaries] = useState<OrgSummary[]>([]);
+    const [totalCount, setTotalCount] = useState(0);
+    const [listLoading, setListLoading] = useState(true);
+    const [reloadKey, setReloadKey] = useState(0);
     const [currentPage, setCurrentPage] = useState(1);
     const ITEMS_PER_PAGE = 20;
     // Bulk selection state - reserved for future bulk actions UI
     // const [selectedOrgIds, setSelectedOrgIds] = useState<Set<string>>(new Set());
 
-    useEffect(() => {
-        setOrgs(initialOrgs);
-        setFilteredOrgs(initialOrgs);
-    }, [initialOrgs]);
-
     type DashboardTab = 'info' | 'plan' | 'users' | 'permissions' | 'security';
     const [searchTerm, setSearchTerm] = useState('');
     const [filterPlan, setFilterPlan] = useState<string>('all');
@@ -480,30 +475,51 @@ const OrganizationsSection: React.FC<{ initialOrgs: Organization[]; onRefresh: (
     const [previewOrg, setPreviewOrg] = useState<Organization | null>(null);
     const [selectedOrgTab, setSelectedOrgTab] = useState<DashboardTab>('info');
 
-    useEffect(() => {
-        applyFilters();
-    }, [orgs, searchTerm, filterPlan, filterStatus]);
+    const debouncedSearch = useDebouncedValue(searchTerm, 300);
 
-    const applyFilters = () => {
-        let result = [...orgs];
-        if (searchTerm) result = result.filter(o => o.name?.toLowerCase().includes(searchTerm.toLowerCase()));
-        if (filterPlan !== 'all') result = result.filter(o => o.subscription_plan === filterPlan);
-        if (filterStatus === 'active') result = result.filter(o => o.is_active);
-        else if (filterStatus === 'disabled') result = result.filter(o => !o.is_active);
-        else if (filterStatus === 'expired') {
-            const now = new Date();
-            result = result.filter(o => o.subscription_end && new Date(o.subscription_end) < now);
-        }
-        setFilteredOrgs(result);
+    useEffect(() => {
         setCurrentPage(1); // Reset to first page when filters change
+    }, [debouncedSearch, filterPlan, filterStatus]);
+
+    useEffect(() => {
+        let cancelled = false;
+        setListLoading(true);
+        fetchOrgSummaries({
+            search: debouncedSearch,
+            plan: filterPlan,
+            status: filterStatus,
+            limit: ITEMS_PER_PAGE,
+            offset: (currentPage - 1) * ITEMS_PER_PAGE
+        }, reloadKey > 0)
+            .then(page => {
+                if (cancelled) return;
+                setSummaries(page.orgs);
+                setTotalCount(page.total_count);
+            })
+            .catch(err => {
+                console.error('❌ [Admin] Failed to load organizations:', err);
+                if (!cancelled) setSummaries([]);
+            })
+            .finally(() => {
+                if (!cancelled) setListLoading(false);
+            });
+        return () => {
+            cancelled = true;
+        };
+    }, [debouncedSearch, filterPlan, filterStatus, currentPage, reloadKey]);
+
+    const reloadPage = (orgId?: string) => {
+        invalidateOrgSummaries(orgId);
+        setReloadKey(key => key + 1);
+        onRefresh();
     };
 
-    // Calculate paginated organizations
-    const totalPages = Math.ceil(filteredOrgs.length / ITEMS_PER_PAGE);
-    const paginatedOrgs = filteredOrgs.slice(
-        (currentPage - 1) * ITEMS_PER_PAGE,
-        currentPage * ITEMS_PER_PAGE
-    );
+    const totalPages = Math.max(1, Math.ceil(totalCount / ITEMS_PER_PAGE));
+    const paginatedOrgs = summaries.map(summary => summary.org);
+    const summaryById = new Map(summaries.map(summary => [summary.org.id, summary]));
+
+    const formatActivity = (date: string | null | undefined) =>
+        date ? new Date(date).toLocaleDateString('en-CA') : '-';
 
     const handleDelete = async (org: Organization) => {
         if (!confirm('هل أنت متأكد من حذف المنظمة "' + (org.name || '') + '"؟\nلن يتمكن المستخدمون من الوصول إلى حساباتهم.')) return;
@@ -511,8 +527,7 @@ const OrganizationsSection: React.FC<{ initialOrgs: Organization[]; onRefresh: (
         if (error) {
             alert('خطأ: ' + error.message);
         } else {
-            setOrgs(orgs.filter(o => o.id !== org.id));
-            onRefresh();
+            reloadPage(org.id);
         }
     };
 
@@ -522,8 +537,7 @@ const OrganizationsSection: React.FC<{ initialOrgs: Organization[]; onRefresh: (
         if (error) {
             alert('خطأ: ' + error.message);
         } else {
-            setOrgs(orgs.map(o => o.id === org.id ? { ...o, is_active: newActiveState } : o));
-            onRefresh();
+            reloadPage(org.id);
         }
     };
 
@@ -588,6 +602,8 @@ const OrganizationsSection: React.FC<{ initialOrgs: Organization[]; onRefresh: (
                                 <th className="px-6 py-4">المنظمة</th>
                                 <th className="px-6 py-4">الباقة</th>
                                 <th className="px-6 py-4">الحالة</th>
+                                <th className="px-6 py-4">الاستخدام</th>
+                                <th className="px-6 py-4">آخر نشاط</th>
                                 <th className="px-6 py-4">تاريخ البداية</th>
                                 <th className="px-6 py-4">تاريخ الانتهاء</th>
                                 <th className="px-6 py-4 text-center">الإجراءات</th>
@@ -619,6 +635,19 @@ const OrganizationsSection: React.FC<{ initialOrgs: Organization[]; onRefresh: (
                                             {org.is_active === false ? 'معطل' : 'نشط'}
                                         </span>
                                     </td>
+                                    <td className="px-6 py-4 text-xs text-slate-300 whitespace-nowrap">
+                                        <div className="flex items-center gap-3">
+                                            <span className="flex items-center gap-1" title="السيارات"><Car className="w-3 h-3 text-blue-400" />{summaryById.get(org.id)?.cars_count ?? '-'}</span>
+                                            <span className="flex items-center gap-1" title="المستخدمين"><Users className="w-3 h-3 text-purple-400" />{summaryById.get(org.id)?.users_count ?? '-'}</span>
+                                            <span className="flex items-center gap-1" title="الحركات"><Receipt className="w-3 h-3 text-emerald-400" />{summaryById.get(org.id)?.transactions_count ?? '-'}</span>
+                                        </div>
+                                        <div className={`mt-1 font-mono ${(summaryById.get(org.id)?.balance || 0) >= 0 ? 'text-emerald-400' : 'text-red-400'}`}>
+                                            {Number(summaryById.get(org.id)?.balance || 0).toLocaleString('ar-EG')} ج.م
+                                        </div>
+                                    </td>
+                                    <td className="px-6 py-4 text-xs text-slate-300 font-mono">
+                                        {formatActivity(summaryById.get(org.id)?.last_activity_at)}
+                                    </td>
 
                                     <td className="px-6 py-4 text-sm text-slate-300">
                                         {org.subscription_start ? (
@@ -683,7 +712,14 @@ const OrganizationsSection: React.FC<{ initialOrgs: Organization[]; onRefresh: (
                     </table>
                 </div>
                 {
-                    filteredOrgs.length === 0 && (
+                    listLoading && paginatedOrgs.length === 0 && (
+                        <div className="p-12 flex items-center justify-center text-slate-400">
+                            <Loader2 className="w-6 h-6 animate-spin ml-2" /> جاري التحميل...
+                        </div>
+                    )
+                }
+                {
+                    !listLoading && paginatedOrgs.length === 0 && (
                         <div className="p-12 text-center text-slate-500">
                             <Building className="w-12 h-12 mx-auto mb-3 opacity-20" />
                             <p>لا توجد بيانات للعرض</p>
@@ -718,6 +754,12 @@ const OrganizationsSection: React.FC<{ initialOrgs: Organization[]; onRefresh: (
                         </div>
 
                         <div className="grid grid-cols-2 gap-2 text-xs bg-slate-950/50 p-3 rounded-xl border border-slate-800/50">
+                            <div className="text-slate-400">سيارات / مستخدمين / حركات:</div>
+                            <div className="text-slate-200 text-left font-mono">
+                                {summaryById.get(org.id)?.cars_count ?? '-'} / {summaryById.get(org.id)?.users_count ?? '-'} / {summaryById.get(org.id)?.transactions_count ?? '-'}
+                            </div>
+                            <div className="text-slate-400">آخر نشاط:</div>
+                            <div className="text-slate-200 text-left font-mono">{formatActivity(summaryById.get(org.id)?.last_activity_at)}</div>
                             <div className="text-slate-400">تاريخ البداية:</div>
                             <div className="text-slate-200 text-left font-mono">{org.subscription_start ? new Date(org.subscription_start).toLocaleDateString('en-CA') : '-'}</div>
                             <div className="text-slate-400">تاريخ الانتهاء:</div>
@@ -746,7 +788,7 @@ const OrganizationsSection: React.FC<{ initialOrgs: Organization[]; onRefresh: (
                     </div>
                 ))}
 
-                {filteredOrgs.length === 0 && (
+                {!listLoading && paginatedOrgs.length === 0 && (
                     <div className="p-8 text-center text-slate-500 bg-slate-900 border border-slate-800 rounded-2xl">
                         <Building className="w-10 h-10 mx-auto mb-3 opacity-20" />
                         <p className="text-sm">لا توجد بيانات للعرض</p>
@@ -755,10 +797,10 @@ const OrganizationsSection: React.FC<{ initialOrgs: Organization[]; onRefresh: (
             </div>
 
             {/* Pagination Controls */}
-            {filteredOrgs.length > 0 && (
+            {totalCount > 0 && (
                 <div className="flex items-center justify-between bg-slate-900 border border-slate-800 rounded-xl p-4 mt-4">
                     <div className="text-sm text-slate-400">
-                        عرض {(currentPage - 1) * ITEMS_PER_PAGE + 1} - {Math.min(currentPage * ITEMS_PER_PAGE, filteredOrgs.length)} من {filteredOrgs.length}
+                        عرض {(currentPage - 1) * ITEMS_PER_PAGE + 1} - {Math.min(currentPage * ITEMS_PER_PAGE, totalCount)} من {totalCount}
                     </div>
                     <div className="flex items-center gap-2">
                         <button
@@ -805,7 +847,7 @@ const OrganizationsSection: React.FC<{ initialOrgs: Organization[]; onRefresh: (
                             setSelectedOrgTab('info');
                         }}
                         onUpdate={() => {
-                            onRefresh();
+                            reloadPage(selectedOrg.id);
                             setSelectedOrg(null);
                             setSelectedOrgTab('info');
                         }}
@@ -816,27 +858,17 @@ const OrganizationsSection: React.FC<{ initialOrgs: Organization[]; onRefresh: (
     );
 };
 
-interface OrganizationPreviewData {
-    carsCount: number;
-    usersCount: number;
-    transactionsCount: number;
-    balance: number;
-    recentCars: Array<Record<string, unknown>>;
-    recentUsers: Array<Record<string, unknown>>;
-    recentTransactions: Array<Record<string, unknown>>;
-}
-
 const OrganizationPreviewModal: React.FC<{ org: Organization; onClose: () => void; onManage: () => void }> = ({ org, onClose, onManage }) => {
     const [loading, setLoading] = useState(true);
     const [error, setError] = useState('');
-    const [preview, setPreview] = useState<OrganizationPreviewData>({
-        carsCount: 0,
-        usersCount: 0,
-        transactionsCount: 0,
+    const [preview, setPreview] = useState<OrgPreview>({
+        cars_count: 0,
+        users_count: 0,
+        transactions_count: 0,
         balance: 0,
-        recentCars: [],
-        recentUsers: [],
-        recentTransactions: []
+        recent_cars: [],
+        recent_users: [],
+        recent_transactions: []
     });
 
     useEffect(() => {
@@ -847,42 +879,9 @@ const OrganizationPreviewModal: React.FC<{ org: Organization; onClose: () => voi
             setError('');
 
             try {
-                const [
-                    carsCountRes,
-                    usersCountRes,
-                    transactionsCountRes,
-                    carsRes,
-                    usersRes,
-                    transactionsRes
-                ] = await Promise.all([
-                    supabase.from('cars').select('id', { count: 'exact', head: true }).eq('org_id', org.id),
-                    supabase.from('profiles').select('id', { count: 'exact', head: true }).eq('org_id', org.id),
-                    supabase.from('transactions').select('id', { count: 'exact', head: true }).eq('org_id', org.id),
-                    supabase.from('cars').select('id, name, make, model, plate_number, status, created_at').eq('org_id', org.id).order('created_at', { ascending: false }).limit(5),
-                    supabase.from('profiles').select('id, full_name, email, role, status').eq('org_id', org.id).limit(5),
-                    supabase.from('transactions').select('id, type, amount, date, category, reason').eq('org_id', org.id).order('date', { ascending: false }).limit(8)
-                ]);
-
-                const firstError = carsCountRes.error || usersCountRes.error || transactionsCountRes.error || carsRes.error || usersRes.error || transactionsRes.error;
-                if (firstError) throw firstError;
-
-                const transactions = (transactionsRes.data || []) as Array<Record<string, unknown>>;
-                const balance = transactions.reduce((total, tx) => {
-                    const amount = typeof tx.amount === 'number' ? tx.amount : Number(tx.amount || 0);
-                    return tx.type === 'income' ? total + amount : total - amount;
-                }, 0);
-
-                if (mounted) {
-                    setPreview({
-                        carsCount: carsCountRes.count || 0,
-                        usersCount: usersCountRes.count || 0,
-                        transactionsCount: transactionsCountRes.count || 0,
-                        balance,
-                        recentCars: (carsRes.data || []) as Array<Record<string, unknown>>,
-                        recentUsers: (usersRes.data || []) as Array<Record<string, unknown>>,
-                        recentTransactions: transactions
-                    });
-                }
+                // Batched + cached: one RPC call serves every preview requested in the same tick
+                const data = await fetchOrgPreview(org.id);
+                if (mounted) setPreview(data);
             } catch (err) {
                 const message = err instanceof Error ? err.message : 'تعذر تحميل معاينة الوكالة';
                 if (mounted) setError(message);
@@ -903,10 +902,10 @@ const OrganizationPreviewModal: React.FC<{ org: Organization; onClose: () => voi
     const formatMoney = (amount: number) => `${amount.toLocaleString('ar-EG')} ج.م`;
 
     const previewStats = [
-        { label: 'السيارات', value: preview.carsCount, icon: Car, color: 'text-blue-400', bg: 'bg-blue-500/10' },
-        { label: 'المستخدمين', value: preview.usersCount, icon: Users, color: 'text-purple-400', bg: 'bg-purple-500/10' },
-        { label: 'الحركات', value: preview.transactionsCount, icon: Receipt, color: 'text-emerald-400', bg: 'bg-emerald-500/10' },
-        { label: 'صافي آخر الحركات', value: formatMoney(preview.balance), icon: DollarSign, color: preview.balance >= 0 ? 'text-emerald-400' : 'text-red-400', bg: preview.balance >= 0 ? 'bg-emerald-500/10' : 'bg-red-500/10' },
+        { label: 'السيارات', value: preview.cars_count, icon: Car, color: 'text-blue-400', bg: 'bg-blue-500/10' },
+        { label: 'المستخدمين', value: preview.users_count, icon: Users, color: 'text-purple-400', bg: 'bg-purple-500/10' },
+        { label: 'الحركات', value: preview.transactions_count, icon: Receipt, color: 'text-emerald-400', bg: 'bg-emerald-500/10' },
+        { label: 'صافي الرصيد', value: formatMoney(Number(preview.balance) || 0), icon: DollarSign, color: preview.balance >= 0 ? 'text-emerald-400' : 'text-red-400', bg: preview.balance >= 0 ? 'bg-emerald-500/10' : 'bg-red-500/10' },
     ];
 
     return (
@@ -977,8 +976,8 @@ const OrganizationPreviewModal: React.FC<{ org: Organization; onClose: () => voi
                                         <Car className="w-5 h-5 text-blue-400" /> آخر السيارات
                                     </h4>
                                     <div className="space-y-3">
-                                        {preview.recentCars.length === 0 && <div className="text-sm text-slate-500">لا توجد سيارات</div>}
-                                        {preview.recentCars.map(car => (
+                                        {preview.recent_cars.length === 0 && <div className="text-sm text-slate-500">لا توجد سيارات</div>}
+                                        {preview.recent_cars.map(car => (
                                             <div key={String(car.id)} className="flex items-center justify-between bg-slate-950 rounded-xl p-3 border border-slate-800">
                                                 <div>
                                                     <div className="text-sm font-bold text-white">{String(car.name || `${car.make || ''} ${car.model || ''}`.trim() || 'سيارة')}</div>
@@ -995,8 +994,8 @@ const OrganizationPreviewModal: React.FC<{ org: Organization; onClose: () => voi
                                         <Users className="w-5 h-5 text-purple-400" /> آخر المستخدمين
                                     </h4>
                                     <div className="space-y-3">
-                                        {preview.recentUsers.length === 0 && <div className="text-sm text-slate-500">لا يوجد مستخدمون</div>}
-                                        {preview.recentUsers.map(user => (
+                                        {preview.recent_users.length === 0 && <div className="text-sm text-slate-500">لا يوجد مستخدمون</div>}
+                                        {preview.recent_users.map(user => (
                                             <div key={String(user.id)} className="flex items-center justify-between bg-slate-950 rounded-xl p-3 border border-slate-800">
                                                 <div className="min-w-0">
                                                     <div className="text-sm font-bold text-white truncate">{String(user.full_name || 'مستخدم')}</div>
@@ -1014,8 +1013,8 @@ const OrganizationPreviewModal: React.FC<{ org: Organization; onClose: () => voi
                                     <Receipt className="w-5 h-5 text-emerald-400" /> آخر الحركات المالية
                                 </h4>
                                 <div className="grid gap-2">
-                                    {preview.recentTransactions.length === 0 && <div className="text-sm text-slate-500 py-4">لا توجد حركات مالية</div>}
-                                    {preview.recentTransactions.map(tx => {
+                                    {preview.recent_transactions.length === 0 && <div className="text-sm text-slate-500 py-4">لا توجد حركات مالية</div>}
+                                    {preview.recent_transactions.map(tx => {
                                         const amount = typeof tx.amount === 'number' ? tx.amount : Number(tx.amount || 0);
                                         const isIncome = tx.type === 'income';
                                         return (
@@ -2878,6 +2877,148 @@ const UsersSection: React.FC = () => {
     );
 };
 
+// ==================== PERFORMANCE SECTION ====================
+
+const PERF_WINDOWS = [
+    { hours: 1, label: 'آخر ساعة' },
+    { hours: 24, label: 'آخر 24 ساعة' },
+    { hours: 24 * 7, label: 'آخر 7 أيام' },
+];
+
+const PERF_KIND_LABELS: Record<string, string> = {
+    table: 'جدول',
+    rpc: 'RPC',
+    auth: 'مصادقة',
+    storage: 'تخزين',
+    function: 'دالة',
+    route: 'صفحة',
+    vital: 'Web Vital',
+    custom: 'مخصص',
+};
+
+const getLatencyColor = (ms: number | null) => {
+    if (ms === null) return 'text-slate-500';
+    if (ms >= 2000) return 'text-red-400';
+    if (ms >= 800) return 'text-amber-400';
+    return 'text-emerald-400';
+};
+
+const PerfTable: React.FC<{ title: string; rows: ClientPerfRow[]; unit?: string }> = ({ title, rows, unit = 'ms' }) => (
+    <div className="bg-slate-900 border border-slate-800 rounded-2xl p-6">
+        <h3 className="text-lg font-bold text-white mb-4">{title}</h3>
+        {rows.length === 0 ? (
+            <div className="text-center py-8 text-slate-500 text-sm">لا توجد قياسات في هذه الفترة</div>
+        ) : (
+            <div className="overflow-x-auto">
+                <table className="w-full text-sm text-right">
+                    <thead className="text-slate-500 border-b border-slate-800">
+                        <tr>
+                            <th className="py-2 px-3 font-medium">الاسم</th>
+                            <th className="py-2 px-3 font-medium">النوع</th>
+                            <th className="py-2 px-3 font-medium">العينات</th>
+                            <th className="py-2 px-3 font-medium">p50</th>
+                            <th className="py-2 px-3 font-medium">p95</th>
+                            <th className="py-2 px-3 font-medium">p99</th>
+                            <th className="py-2 px-3 font-medium">الأخطاء</th>
+                            <th className="py-2 px-3 font-medium">الوكالات</th>
+                        </tr>
+                    </thead>
+                    <tbody>
+                        {rows.map(row => (
+                            <tr key={`${row.kind}|${row.name}|${row.method ?? ''}`} className="border-b border-slate-800/50 hover:bg-slate-800/30">
+                                <td className="py-2 px-3 font-mono text-slate-200" dir="ltr">
+                                    {row.method && <span className="text-slate-500 ml-2">{row.method}</span>}
+                                    {row.name}
+                                </td>
+                                <td className="py-2 px-3 text-slate-400">{PERF_KIND_LABELS[row.kind] || row.kind}</td>
+                                <td className="py-2 px-3 text-slate-300">{row.samples.toLocaleString('ar-EG')}</td>
+                                <td className="py-2 px-3 text-slate-300">{row.p50_ms ?? '-'} {unit}</td>
+                                <td className={`py-2 px-3 font-bold ${getLatencyColor(row.p95_ms)}`}>{row.p95_ms ?? '-'} {unit}</td>
+                                <td className="py-2 px-3 text-slate-300">{row.p99_ms ?? '-'} {unit}</td>
+                                <td className={`py-2 px-3 ${row.errors > 0 ? 'text-red-400' : 'text-slate-500'}`}>
+                                    {row.error_rate !== null ? `${(row.error_rate * 100).toFixed(1)}%` : '-'}
+                                </td>
+                                <td className="py-2 px-3 text-slate-400">{row.orgs}</td>
+                            </tr>
+                        ))}
+                    </tbody>
+                </table>
+            </div>
+        )}
+    </div>
+);
+
+const PerformanceSection: React.FC = () => {
+    const [hours, setHours] = useState(24);
+    const [rows, setRows] = useState<ClientPerfRow[]>([]);
+    const [loading, setLoading] = useState(true);
+    const [error, setError] = useState('');
+
+    const loadReport = async (force = false) => {
+        setLoading(true);
+        setError('');
+        try {
+            setRows(await fetchClientPerfReport({ hours }, force));
+        } catch (err) {
+            console.error(err);
+            setError('تعذر تحميل بيانات الأداء');
+        } finally {
+            setLoading(false);
+        }
+    };
+
+    useEffect(() => {
+        loadReport();
+    }, [hours]);
+
+    const apiRows = rows.filter(r => r.kind !== 'route' && r.kind !== 'vital');
+    const routeRows = rows.filter(r => r.kind === 'route');
+    const vitalRows = rows.filter(r => r.kind === 'vital');
+
+    return (
+        <div className="space-y-6 animate-in fade-in duration-500">
+            <div className="flex flex-col sm:flex-row sm:items-center justify-between gap-4">
+                <div>
+                    <h2 className="text-xl font-bold text-white flex items-center gap-2">
+                        <Gauge className="w-6 h-6 text-blue-500" />
+                        أداء المستخدمين الفعلي
+                    </h2>
+                    <p className="text-sm text-slate-500 mt-1">زمن الاستجابة (p95) لكل جدول و RPC وصفحة عبر جميع الوكالات - عينة من الجلسات</p>
+                </div>
+                <div className="flex items-center gap-2">
+                    {PERF_WINDOWS.map(w => (
+                        <button
+                            key={w.hours}
+                            onClick={() => setHours(w.hours)}
+                            className={`px-3 py-2 rounded-lg text-xs font-bold transition ${hours === w.hours ? 'bg-blue-600 text-white' : 'bg-slate-800 text-slate-400 hover:bg-slate-700'}`}
+                        >
+                            {w.label}
+                        </button>
+                    ))}
+                    <button onClick={() => loadReport(true)} className="text-sm text-blue-400 hover:text-blue-300 mr-2">تحديث</button>
+                </div>
+            </div>
+
+            {error && (
+                <div className="bg-red-500/10 border border-red-500/20 text-red-400 rounded-xl p-4 text-sm flex items-center gap-2">
+                    <AlertCircle className="w-4 h-4" />
+                    {error}
+                </div>
+            )}
+
+            {loading ? (
+                <div className="flex justify-center py-12"><Loader2 className="w-8 h-8 animate-spin text-blue-500" /></div>
+            ) : (
+                <>
+                    <PerfTable title="الجداول و RPC" rows={apiRows} />
+                    <PerfTable title="الصفحات (من التفاعل حتى العرض)" rows={routeRows} />
+                    <PerfTable title="Web Vitals (CLS × 1000)" rows={vitalRows} />
+                </>
+            )}
+        </div>
+    );
+};
+
 // ==================== AUDIT LOGS SECTION ====================
 
 const AuditLogsSection: React.FC = () => {
@@ -1,5 +1,5 @@
 
-import React, { useEffect, useState } from 'react';
+import React, { useEffect, useMemo, useState } from 'react';
 import { useOutletContext } from 'react-router-dom';
 import { supabase } from '../lib/supabaseClient';
 import { createClient } from '@supabase/supabase-js'; // Import
@@ -10,6 +10,8 @@ import {
     UserPlus, Search, Shield, Loader2, Lock, Trash2, X, AlertCircle, Crown
 } from 'lucide-react';
 import { PLAN_MAX_PERMISSIONS, PLAN_NAMES_AR, getDefaultPermissionsForPlan } from '../lib/planPermissionGuard';
+import VirtualTable, { VirtualTableColumn } from './VirtualTable';
+import { useDebouncedValue, normalizeSearchText } from '../hooks/useDebouncedValue';
 
 // Default empty permissions structure
 const defaultPermissions: UserPermissions = {
@@ -127,6 +129,8 @@ const getRoleBadgeStyles = (role?: string) => {
     }
 };
 
+const getMemberRowKey = (member: Profile) => member.id;
+
 const Team: React.FC = () => {
     const { user, org, isReadOnly } = useOutletContext<LayoutContextType>();
     const { showToast } = useToast();
@@ -134,6 +138,7 @@ const Team: React.FC = () => {
     const [members, setMembers] = useState<Profile[]>([]);
     const [loading, setLoading] = useState(false);
     const [searchTerm, setSearchTerm] = useState('');
+    const debouncedSearch = useDebouncedValue(searchTerm);
 
     // Modal State
     const [isModalOpen, setIsModalOpen] = useState(false);
@@ -467,6 +472,84 @@ const Team: React.FC = () => {
         }));
     };
 
+    // Search keys are normalized once per members load, not per keystroke
+    const memberSearchIndex = useMemo(() => members.map(m => ({
+        member: m,
+        key: normalizeSearchText(`${m.full_name} ${m.username || ''}`)
+    })), [members]);
+
+    const filteredMembers = useMemo(() => {
+        const term = normalizeSearchText(debouncedSearch);
+        if (!term) return members;
+        return memberSearchIndex.filter(entry => entry.key.includes(term)).map(entry => entry.member);
+    }, [memberSearchIndex, members, debouncedSearch]);
+
+    const memberColumns: VirtualTableColumn<Profile>[] = [
+        {
+            key: 'member',
+            header: 'الموظف',
+            headerClassName: 'p-5',
+            className: 'p-5',
+            render: (member) => (
+                <div className="flex items-center gap-3">
+                    <div className="w-10 h-10 rounded-full bg-slate-100 dark:bg-slate-700 flex items-center justify-center text-slate-600 dark:text-slate-300 font-bold border border-slate-200 dark:border-slate-600">
+                        {member.full_name.charAt(0)}
+                    </div>
+                    <div>
+                        <div className="font-bold text-slate-800 dark:text-white text-sm">{member.full_name}</div>
+                        <div className="text-xs text-slate-500 font-mono">@{member.username}</div>
+                    </div>
+                </div>
+            )
+        },
+        {
+            key: 'role',
+            header: 'الدور (Role)',
+            headerClassName: 'p-5',
+            className: 'p-5',
+            render: (member) => (
+                <span className={`px-2.5 py-1 rounded-lg text-xs font-bold uppercase tracking-wide border ${getRoleBadgeStyles(member.role)}`}>
+                    {member.role}
+                </span>
+            )
+        },
+        {
+            key: 'status',
+            header: 'الحالة',
+            headerClassName: 'p-5',
+            className: 'p-5',
+            render: (member) => (
+                member.role !== 'owner' && canManageTeam ? (
+                    <button onClick={() => handleToggleStatus(member)} disabled={isReadOnly} className={`relative w-10 h-6 rounded-full transition-colors ${isReadOnly ? 'opacity-50' : ''} ${member.status === 'active' ? 'bg-emerald-500' : 'bg-slate-600'}`}>
+                        <div className={`absolute top-1 w-4 h-4 bg-white rounded-full transition-all shadow-sm ${member.status === 'active' ? 'left-5' : 'left-1'}`}></div>
+                    </button>
+                ) : (
+                    <span className={`text-xs font-bold ${member.status === 'active' ? 'text-emerald-500' : 'text-slate-500'}`}>
+                        {member.status === 'active' ? 'نشط' : 'معطل'}
+                    </span>
+                )
+            )
+        },
+        {
+            key: 'actions',
+            header: 'الإجراءات',
+            headerClassName: 'p-5',
+            className: 'p-5',
+            render: (member) => (
+                canManageTeam && member.role !== 'owner' && (
+                    <div className="flex gap-2 transition">
+                        <button onClick={() => handleOpenEdit(member)} disabled={isReadOnly} className="p-2 bg-slate-100 dark:bg-slate-800 hover:text-blue-600 rounded-lg text-slate-400 transition" title="تعديل الصلاحيات">
+                            <Shield className="w-4 h-4" />
+                        </button>
+                        <button type="button" onClick={() => handleDeleteUser(member)} className="p-2 bg-red-50 dark:bg-red-900/10 hover:bg-red-100 text-red-400 hover:text-red-600 rounded-lg transition" title="حذف">
+                            <Trash2 className="w-4 h-4" />
+                        </button>
+                    </div>
+                )
+            )
+        }
+    ];
+
     return (
         <div className="space-y-6 font-[Cairo] pb-20">
 
@@ -496,63 +579,17 @@ const Team: React.FC = () => {
 
             {/* Rich List Table */}
             <div className="bg-white dark:bg-[#1e293b] rounded-2xl border border-gray-200 dark:border-slate-700 overflow-hidden shadow-sm">
-                <div className="overflow-x-auto">
-                    <table className="w-full text-right">
-                        <thead className="bg-gray-50 dark:bg-slate-800/50 text-slate-500 text-xs font-bold border-b border-gray-100 dark:border-slate-700">
-                            <tr>
-                                <th className="p-5">الموظف</th>
-                                <th className="p-5">الدور (Role)</th>
-                                <th className="p-5">الحالة</th>
-                                <th className="p-5">الإجراءات</th>
-                            </tr>
-                        </thead>
-                        <tbody className="divide-y divide-gray-100 dark:divide-slate-800">
-                            {members.filter(m => m.full_name.includes(searchTerm)).map(member => (
-                                <tr key={member.id} className="hover:bg-slate-50 dark:hover:bg-slate-800/30 transition group">
-                                    <td className="p-5">
-                                        <div className="flex items-center gap-3">
-                                            <div className="w-10 h-10 rounded-full bg-slate-100 dark:bg-slate-700 flex items-center justify-center text-slate-600 dark:text-slate-300 font-bold border border-slate-200 dark:border-slate-600">
-                                                {member.full_name.charAt(0)}
-                                            </div>
-                                            <div>
-                                                <div className="font-bold text-slate-800 dark:text-white text-sm">{member.full_name}</div>
-                                                <div className="text-xs text-slate-500 font-mono">@{member.username}</div>
-                                            </div>
-                                        </div>
-                                    </td>
-                                    <td className="p-5">
-                                        <span className={`px-2.5 py-1 rounded-lg text-xs font-bold uppercase tracking-wide border ${getRoleBadgeStyles(member.role)}`}>
-                                            {member.role}
-                                        </span>
-                                    </td>
-                                    <td className="p-5">
-                                        {member.role !== 'owner' && canManageTeam ? (
-                                            <button onClick={() => handleToggleStatus(member)} disabled={isReadOnly} className={`relative w-10 h-6 rounded-full transition-colors ${isReadOnly ? 'opacity-50' : ''} ${member.status === 'active' ? 'bg-emerald-500' : 'bg-slate-600'}`}>
-                                                <div className={`absolute top-1 w-4 h-4 bg-white rounded-full transition-all shadow-sm ${member.status === 'active' ? 'left-5' : 'left-1'}`}></div>
-                                            </button>
-                                        ) : (
-                                            <span className={`text-xs font-bold ${member.status === 'active' ? 'text-emerald-500' : 'text-slate-500'}`}>
-                                                {member.status === 'active' ? 'نشط' : 'معطل'}
-                                            </span>
-                                        )}
-                                    </td>
-                                    <td className="p-5">
-                                        {canManageTeam && member.role !== 'owner' && (
-                                            <div className="flex gap-2 transition">
-                                                <button onClick={() => handleOpenEdit(member)} disabled={isReadOnly} className="p-2 bg-slate-100 dark:bg-slate-800 hover:text-blue-600 rounded-lg text-slate-400 transition" title="تعديل الصلاحيات">
-                                                    <Shield className="w-4 h-4" />
-                                                </button>
-                                                <button type="button" onClick={() => handleDeleteUser(member)} className="p-2 bg-red-50 dark:bg-red-900/10 hover:bg-red-100 text-red-400 hover:text-red-600 rounded-lg transition" title="حذف">
-                                                    <Trash2 className="w-4 h-4" />
-                                                </button>
-                                            </div>
-                                        )}
-                                    </td>
-                                </tr>
-                            ))}
-                        </tbody>
-                    </table>
-                </div>
+                <VirtualTable
+                    rows={filteredMembers}
+                    columns={memberColumns}
+                    getRowKey={getMemberRowKey}
+                    rowHeight={81}
+                    resetScrollKey={debouncedSearch}
+                    tableClassName="text-right"
+                    headerClassName="bg-gray-50 dark:bg-slate-800 text-slate-500 text-xs font-bold"
+                    bodyClassName="divide-y divide-gray-100 dark:divide-slate-800"
+                    rowClassName="hover:bg-slate-50 dark:hover:bg-slate-800/30 transition group"
+                />
             </div>
 
             {/* LIMIT REACHED MODAL */}
@@ -1,47 +1,11 @@
 
-import React, { useEffect, useState } from 'react';
+import React from 'react';
 import { RefreshCw, ArrowUpCircle } from 'lucide-react';
+import { useAutoUpdate } from '../hooks/useAutoUpdate';
 
 export const UpdateNotification = () => {
-    const [hasUpdate, setHasUpdate] = useState(false);
-    const [currentVersion, setCurrentVersion] = useState<string | null>(null);
-
-    const reloadPage = () => {
-        // Force reload and ignore cache (deprecated but effective with our Nginx config)
-        window.location.reload();
-    };
-
-    useEffect(() => {
-        // 1. Get initial version on load
-        const initialVersion = (window as any)._env_?.APP_VERSION;
-        setCurrentVersion(initialVersion);
-
-        if (!initialVersion) return;
-
-        // 2. Check for updates every 30 seconds
-        const checkUpdate = async () => {
-            try {
-                // Fetch config with cache busting
-                const response = await fetch(`/env-config.js?t=${new Date().getTime()}`);
-                const text = await response.text();
-
-                // Parse the file content manually since it's a JS file assignment
-                const match = text.match(/APP_VERSION:\s*"([^"]+)"/);
-                if (match && match[1]) {
-                    const newVersion = match[1];
-                    if (newVersion !== initialVersion) {
-                        console.log(`New version detected: ${newVersion} (Current: ${initialVersion})`);
-                        setHasUpdate(true);
-                    }
-                }
-            } catch (error) {
-                console.error("Failed to check for updates:", error);
-            }
-        };
-
-        const interval = setInterval(checkUpdate, 30 * 1000); // Check every 30s
-        return () => clearInterval(interval);
-    }, []);
+    // Shares the leader-tab version check with UpdateBanner
+    const { hasUpdate, reloadPage } = useAutoUpdate();
 
     if (!hasUpdate) return null;
 
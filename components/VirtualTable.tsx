@@ -0,0 +1,201 @@
+import React, { useEffect, useMemo, useRef } from 'react';
+import { useVirtualRows } from '../hooks/useVirtualRows';
+
+/**
+ * VirtualTable
+ * Windowed table for long lists: only the rows in view (plus overscan) are in the DOM,
+ * so screens stay smooth with 10k+ rows. The header is sticky inside the scroll area
+ * and the table inherits the page direction (RTL by default in this app).
+ */
+
+export interface VirtualTableColumn<T> {
+    key: string;
+    header: React.ReactNode;
+    render: (row: T, index: number) => React.ReactNode;
+    className?: string;
+    headerClassName?: string;
+}
+
+interface VirtualTableProps<T> {
+    rows: T[];
+    columns: VirtualTableColumn<T>[];
+    /** Keep this referentially stable (module-level or useCallback) */
+    getRowKey: (row: T, index: number) => string;
+    /** Row height in px (exact, or the initial estimate when dynamicRowHeight is set) */
+    rowHeight: number;
+    dynamicRowHeight?: boolean;
+    /** Max height of the scroll area (the table shrinks to fit short lists) */
+    maxHeight?: number | string;
+    overscan?: number;
+    className?: string;
+    tableClassName?: string;
+    headerClassName?: string;
+    bodyClassName?: string;
+    rowClassName?: string | ((row: T, index: number) => string);
+    emptyState?: React.ReactNode;
+    /** Called when the last rows come into view (infinite scroll) */
+    onEndReached?: () => void;
+    endReachedThreshold?: number;
+    /** Changing this value scrolls back to the top (e.g. a new filter) */
+    resetScrollKey?: unknown;
+    footer?: React.ReactNode;
+}
+
+function VirtualTable<T>({
+    rows,
+    columns,
+    getRowKey,
+    rowHeight,
+    dynamicRowHeight = false,
+    maxHeight = '70vh',
+    overscan,
+    className = '',
+    tableClassName = '',
+    headerClassName = '',
+    bodyClassName = '',
+    rowClassName,
+    emptyState,
+    onEndReached,
+    endReachedThreshold = 10,
+    resetScrollKey,
+    footer
+}: VirtualTableProps<T>) {
+    const scrollRef = useRef<HTMLDivElement>(null);
+    const keys = useMemo(() => rows.map(getRowKey), [rows, getRowKey]);
+    const { start, end, paddingTop, paddingBottom, measureRow, scrollToIndex } = useVirtualRows(scrollRef, {
+        keys,
+        estimateHeight: rowHeight,
+        dynamic: dynamicRowHeight,
+        overscan
+    });
+
+    useEffect(() => {
+        scrollToIndex(0);
+    }, [resetScrollKey]);
+
+    useEffect(() => {
+        if (onEndReached && rows.length > 0 && end >= rows.length - endReachedThreshold) {
+            onEndReached();
+        }
+    }, [end, rows.length]);
+
+    const spacer = (height: number) => (
+        <tr aria-hidden="true" style={{ height }}>
+            <td colSpan={columns.length} style={{ padding: 0, border: 0 }} />
+        </tr>
+    );
+
+    return (
+        <div ref={scrollRef} className={`overflow-auto ${className}`} style={{ maxHeight }}>
+            <table className={`w-full ${tableClassName}`}>
+                <thead className={`sticky top-0 z-10 ${headerClassName}`}>
+                    <tr>
+                        {columns.map(col => (
+                            <th key={col.key} className={col.headerClassName}>{col.header}</th>
+                        ))}
+                    </tr>
+                </thead>
+                <tbody className={bodyClassName}>
+                    {rows.length === 0 && emptyState !== undefined ? (
+                        <tr>
+                            <td colSpan={columns.length}>{emptyState}</td>
+                        </tr>
+                    ) : (
+                        <>
+                            {paddingTop > 0 && spacer(paddingTop)}
+                            {rows.slice(start, end).map((row, offset) => {
+                                const index = start + offset;
+                                const key = keys[index];
+                                const cls = typeof rowClassName === 'function' ? rowClassName(row, index) : rowClassName;
+                                return (
+                                    <tr
+                                        key={key}
+                                        ref={dynamicRowHeight ? measureRow(key) : undefined}
+                                        className={cls}
+                                        style={dynamicRowHeight ? undefined : { height: rowHeight }}
+                                    >
+                                        {columns.map(col => (
+                                            <td key={col.key} className={col.className}>{col.render(row, index)}</td>
+                                        ))}
+                                    </tr>
+                                );
+                            })}
+                            {paddingBottom > 0 && spacer(paddingBottom)}
+                        </>
+                    )}
+                </tbody>
+            </table>
+            {footer}
+        </div>
+    );
+}
+
+interface VirtualListProps<T> {
+    items: T[];
+    getItemKey: (item: T, index: number) => string;
+    renderItem: (item: T, index: number) => React.ReactNode;
+    itemHeight: number;
+    dynamicItemHeight?: boolean;
+    maxHeight?: number | string;
+    overscan?: number;
+    className?: string;
+    onEndReached?: () => void;
+    endReachedThreshold?: number;
+    footer?: React.ReactNode;
+}
+
+/**
+ * VirtualList
+ * Same windowing for non-tabular layouts (e.g. rows of cards)
+ */
+export function VirtualList<T>({
+    items,
+    getItemKey,
+    renderItem,
+    itemHeight,
+    dynamicItemHeight = false,
+    maxHeight = '75vh',
+    overscan,
+    className = '',
+    onEndReached,
+    endReachedThreshold = 3,
+    footer
+}: VirtualListProps<T>) {
+    const scrollRef = useRef<HTMLDivElement>(null);
+    const keys = useMemo(() => items.map(getItemKey), [items, getItemKey]);
+    const { start, end, paddingTop, paddingBottom, measureRow } = useVirtualRows(scrollRef, {
+        keys,
+        estimateHeight: itemHeight,
+        dynamic: dynamicItemHeight,
+        overscan
+    });
+
+    useEffect(() => {
+        if (onEndReached && items.length > 0 && end >= items.length - endReachedThreshold) {
+            onEndReached();
+        }
+    }, [end, items.length]);
+
+    return (
+        <div ref={scrollRef} className={`overflow-y-auto ${className}`} style={{ maxHeight }}>
+            <div style={{ paddingTop, paddingBottom }}>
+                {items.slice(start, end).map((item, offset) => {
+                    const index = start + offset;
+                    const key = keys[index];
+                    return (
+                        <div
+                            key={key}
+                            ref={dynamicItemHeight ? measureRow(key) : undefined}
+                            style={dynamicItemHeight ? undefined : { height: itemHeight }}
+                        >
+                            {renderItem(item, index)}
+                        </div>
+                    );
+                })}
+            </div>
+            {footer}
+        </div>
+    );
+}
+
+export default VirtualTable;
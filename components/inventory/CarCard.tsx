@@ -87,6 +87,11 @@ const CarCard: React.FC<CarCardProps> = ({
                     <span>العداد: {Number(car.current_odometer || 0).toLocaleString()} كم</span>
                 </div>
 
+                {stats.partial && (
+                    <div className="mb-1 text-[10px] font-bold text-amber-600 dark:text-amber-400">
+                        أرقام جزئية من البيانات المحفوظة على الجهاز
+                    </div>
+                )}
                 <div className="bg-slate-50 dark:bg-slate-800/50 p-3 rounded-xl border border-slate-100 dark:border-slate-700 mb-4 grid grid-cols-3 gap-2 text-center">
                     <div>
                         <div className="text-[10px] text-emerald-600 dark:text-emerald-400 font-bold mb-1">الوارد</div>
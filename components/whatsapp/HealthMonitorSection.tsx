@@ -6,13 +6,14 @@
 import React, { useState, useEffect } from 'react';
 import { supabase } from '../../lib/supabaseClient';
 import { AlertTriangle, CheckCircle, XCircle, Clock, RefreshCw, X, Info, Activity } from 'lucide-react';
-import { getActiveIncidents, resolveIncident, getHealthSummary, checkSystemHealth, runHealthChecks } from '../../lib/healthMonitor';
-import { SystemIncident, HealthSummary } from '../../lib/healthMonitor';
+import { resolveIncident, getHealthSnapshot, runHealthChecks, HEALTH_CHECK_TASK } from '../../lib/healthMonitor';
+import { onTaskResult } from '../../lib/tabCoordinator';
+import { SystemIncident, HealthSnapshot } from '../../lib/healthMonitor';
 import { Trash2, Trash, Loader2 } from 'lucide-react';
 
 const HealthMonitorSection: React.FC = () => {
   const [incidents, setIncidents] = useState<SystemIncident[]>([]);
-  const [summary, setSummary] = useState<HealthSummary | null>(null);
+  const [summary, setSummary] = useState<HealthSnapshot['summary'] | null>(null);
   const [loading, setLoading] = useState(true);
   const [refreshing, setRefreshing] = useState(false);
   const [selectedSeverity, setSelectedSeverity] = useState<string>('all');
@@ -21,33 +22,28 @@ const HealthMonitorSection: React.FC = () => {
 
   useEffect(() => {
     loadData();
-    // Refresh every 30 seconds
-    const interval = setInterval(loadData, 30000);
-    return () => clearInterval(interval);
+    // The leader tab's monitoring pass (every 5 minutes) shares its snapshot
+    const unsubscribe = onTaskResult<HealthSnapshot>(HEALTH_CHECK_TASK, applySnapshot);
+    return () => {
+      unsubscribe();
+    };
   }, []);
 
+  const applySnapshot = (snapshot: HealthSnapshot | null) => {
+    if (!snapshot) return;
+    setIncidents(snapshot.incident_list || []);
+    setSummary(snapshot.summary || null);
+  };
+
   const loadData = async () => {
     setLoading(true);
-    const [summaryData] = await Promise.all([
-      getHealthSummary()
-    ]);
-    
-    // Fetch all incidents directly not just active
-    const { data: incidentsData } = await supabase
-        .from('system_incidents')
-        .select('*')
-        .order('created_at', { ascending: false })
-        .limit(200);
-        
-    setIncidents(incidentsData as SystemIncident[] || []);
-    setSummary(summaryData);
+    applySnapshot(await getHealthSnapshot());
     setLoading(false);
   };
 
   const handleRefresh = async () => {
     setRefreshing(true);
-    await runHealthChecks();
-    await loadData();
+    applySnapshot(await runHealthChecks(true));
     setRefreshing(false);
   };
 
@@ -256,6 +252,11 @@ const HealthMonitorSection: React.FC = () => {
                       <span className="px-2 py-0.5 rounded-full text-xs font-bold bg-slate-700 text-slate-300">
                         {getIncidentTypeLabel(incident.incident_type)}
                       </span>
+                      {(incident.occurrences || 1) > 1 && (
+                        <span className="px-2 py-0.5 rounded-full text-xs font-bold bg-slate-700 text-slate-300" title="عدد مرات التكرار">
+                          ×{incident.occurrences}
+                        </span>
+                      )}
                     </div>
                     {incident.message && (
                       <p className="text-slate-400 text-sm mb-2">{incident.message}</p>
@@ -266,7 +267,7 @@ const HealthMonitorSection: React.FC = () => {
                         {incident.time_ago || 'الآن'}
                       </span>
                       <span>
-                        {new Date(incident.created_at).toLocaleDateString('ar-EG', {
+                        {new Date(incident.last_seen_at || incident.created_at).toLocaleDateString('ar-EG', {
                           year: 'numeric',
                           month: 'short',
                           day: 'numeric',
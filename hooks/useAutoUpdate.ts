@@ -1,5 +1,13 @@
-
 import { useState, useEffect } from 'react';
+import { subscribeRealtime } from '../lib/realtimeManager';
+import { onTaskResult, runLeaderTask } from '../lib/tabCoordinator';
+
+// Poll every 30 seconds: APP_VERSION lives in /env-config.js, which a deploy
+// replaces without touching the database, so Realtime cannot stand in for the poll
+const UPDATE_CHECK_INTERVAL_MS = 30 * 1000;
+
+// Only the leader tab polls; the version it reads is shared with every tab
+const UPDATE_CHECK_TASK = 'app_update_check';
 
 export const useAutoUpdate = () => {
     const [hasUpdate, setHasUpdate] = useState(false);
@@ -17,28 +25,43 @@ export const useAutoUpdate = () => {
 
         if (!initialVersion) return;
 
-        // 2. Check for updates
-        const checkUpdate = async () => {
+        // 2. Check for updates (leader tab only); returns the deployed version
+        const checkUpdate = async (): Promise<string | undefined> => {
             try {
                 const response = await fetch(`/env-config.js?t=${new Date().getTime()}`);
                 const text = await response.text();
 
                 const match = text.match(/APP_VERSION:\s*"([^"]+)"/);
-                if (match && match[1]) {
-                    const latestVersion = match[1];
-                    if (latestVersion !== initialVersion) {
-                        setNewVersion(latestVersion);
-                        setHasUpdate(true);
-                    }
-                }
+                return match?.[1];
             } catch (error) {
                 console.error("Failed to check for updates:", error);
+                return undefined;
             }
         };
 
-        // Check every 30 seconds
-        const interval = setInterval(checkUpdate, 30 * 1000);
-        return () => clearInterval(interval);
+        // 3. Every tab (the leader included) reacts to the shared version
+        const unsubscribeResult = onTaskResult<string>(UPDATE_CHECK_TASK, latestVersion => {
+            if (latestVersion && latestVersion !== initialVersion) {
+                setNewVersion(latestVersion);
+                setHasUpdate(true);
+            }
+        });
+
+        // 4. Leader tab polls on a fixed interval
+        const task = runLeaderTask(UPDATE_CHECK_TASK, checkUpdate, {
+            interval: () => UPDATE_CHECK_INTERVAL_MS
+        });
+
+        // 5. A public_config change triggers an immediate check on top of the poll
+        const unsubscribe = subscribeRealtime('public_config', () => {
+            task.runNow();
+        });
+
+        return () => {
+            task.stop();
+            unsubscribeResult();
+            unsubscribe();
+        };
     }, []);
 
     return { hasUpdate, currentVersion, newVersion, reloadPage };
@@ -0,0 +1,64 @@
+import { useCallback, useEffect, useReducer, useRef } from 'react';
+import {
+    QueryKey,
+    QueryOptions,
+    fetchQuery,
+    getQuerySnapshot,
+    serializeQueryKey,
+    setQueryData,
+    subscribeQuery
+} from '../lib/queryCache';
+
+/**
+ * Read a Supabase query through the shared SWR cache (lib/queryCache.ts)
+ *
+ * Cached data renders immediately on mount; stale data is revalidated in the
+ * background and components sharing the same key re-render together.
+ * Pass `null` as key to skip the query (e.g. while the user is loading).
+ */
+export const useCachedQuery = <T>(
+    key: QueryKey | null,
+    fetcher: () => Promise<T>,
+    options: QueryOptions = {}
+) => {
+    const [, forceRender] = useReducer((x: number) => x + 1, 0);
+    const serialized = key ? serializeQueryKey(key) : null;
+
+    // Keep the latest fetcher/key without re-running effects on every render
+    const fetcherRef = useRef(fetcher);
+    fetcherRef.current = fetcher;
+    const keyRef = useRef(key);
+    keyRef.current = key;
+
+    useEffect(() => {
+        const currentKey = keyRef.current;
+        if (!currentKey) return;
+
+        const unsubscribe = subscribeQuery(currentKey, forceRender);
+        fetchQuery(currentKey, () => fetcherRef.current(), options)
+            .catch(error => console.warn(`⚠️ [useCachedQuery] ${currentKey.table} failed:`, error))
+            .finally(forceRender);
+        return unsubscribe;
+    }, [serialized, options.ttl]);
+
+    const refetch = useCallback(() => {
+        const currentKey = keyRef.current;
+        if (!currentKey) return Promise.resolve(undefined);
+        return fetchQuery(currentKey, () => fetcherRef.current(), { ...options, force: true });
+    }, [serialized]);
+
+    const mutate = useCallback((updater: T | ((prev: T | undefined) => T)) => {
+        if (keyRef.current) setQueryData(keyRef.current, updater);
+    }, [serialized]);
+
+    const snapshot = key ? getQuerySnapshot<T>(key) : null;
+
+    return {
+        data: snapshot?.data,
+        error: snapshot?.error ?? null,
+        isLoading: !!key && snapshot?.data === undefined && snapshot?.error == null,
+        isValidating: !!snapshot?.isFetching,
+        refetch,
+        mutate
+    };
+};
@@ -0,0 +1,30 @@
+import { useEffect, useState } from 'react';
+
+/**
+ * Return `value` only after it has stopped changing for `delayMs`
+ *
+ * Used by search inputs so filtering (or a server query) runs once typing
+ * pauses instead of on every keystroke.
+ */
+export const useDebouncedValue = <T>(value: T, delayMs = 250): T => {
+    const [debounced, setDebounced] = useState(value);
+
+    useEffect(() => {
+        const timer = setTimeout(() => setDebounced(value), delayMs);
+        return () => clearTimeout(timer);
+    }, [value, delayMs]);
+
+    return debounced;
+};
+
+/**
+ * Normalize text for search: lowercase, trimmed, Arabic letter variants folded
+ * (أ/إ/آ → ا, ة → ه, ى → ي) so "احمد" matches "أحمد"
+ */
+export const normalizeSearchText = (text: string | null | undefined): string =>
+    (text || '')
+        .toLowerCase()
+        .replace(/[أإآ]/g, 'ا')
+        .replace(/ة/g, 'ه')
+        .replace(/ى/g, 'ي')
+        .trim();
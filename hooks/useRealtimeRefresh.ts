@@ -0,0 +1,30 @@
+import { useEffect, useRef } from 'react';
+import { RealtimeTable, subscribeRealtime } from '../lib/realtimeManager';
+
+/**
+ * Re-run a loader when any of the given tables change via Realtime
+ *
+ * Bursts of changes (bulk inserts, restores) are coalesced into one call.
+ */
+export const useRealtimeRefresh = (
+    tables: RealtimeTable[],
+    onChange: () => void,
+    debounceMs = 500
+) => {
+    const onChangeRef = useRef(onChange);
+    onChangeRef.current = onChange;
+    const tablesKey = tables.join(',');
+
+    useEffect(() => {
+        let timer: ReturnType<typeof setTimeout> | null = null;
+        const schedule = () => {
+            if (timer) clearTimeout(timer);
+            timer = setTimeout(() => onChangeRef.current(), debounceMs);
+        };
+        const unsubscribers = tablesKey.split(',').map(table => subscribeRealtime(table as RealtimeTable, schedule));
+        return () => {
+            if (timer) clearTimeout(timer);
+            unsubscribers.forEach(unsubscribe => unsubscribe());
+        };
+    }, [tablesKey, debounceMs]);
+};
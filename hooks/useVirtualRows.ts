@@ -0,0 +1,137 @@
+import { RefObject, useCallback, useEffect, useLayoutEffect, useMemo, useRef, useState } from 'react';
+
+export interface VirtualRowsOptions {
+    /** Stable key per row (measured heights are remembered by key) */
+    keys: string[];
+    /** Row height in px (exact for fixed rows, initial guess for dynamic rows) */
+    estimateHeight: number;
+    /** Measure rendered rows and use their real height */
+    dynamic?: boolean;
+    /** Extra rows rendered above and below the viewport */
+    overscan?: number;
+}
+
+export interface VirtualRowsResult {
+    start: number;
+    end: number;
+    paddingTop: number;
+    paddingBottom: number;
+    totalHeight: number;
+    /** Ref callback for a rendered row (no-op for fixed heights) */
+    measureRow: (key: string) => (el: HTMLElement | null) => void;
+    scrollToIndex: (index: number) => void;
+}
+
+/**
+ * First index whose bottom edge is below `offset` (offsets has count + 1 entries)
+ */
+const findIndex = (offsets: number[], offset: number) => {
+    let lo = 0;
+    let hi = offsets.length - 2;
+    while (lo < hi) {
+        const mid = (lo + hi) >> 1;
+        if (offsets[mid + 1] <= offset) lo = mid + 1;
+        else hi = mid;
+    }
+    return Math.max(lo, 0);
+};
+
+/**
+ * Windowing for a vertically scrolling container
+ *
+ * Only the rows intersecting the viewport (plus overscan) are rendered; the
+ * rest is replaced by top/bottom padding. Only scrollTop is read, so RTL
+ * layouts (where scrollLeft semantics differ between browsers) are unaffected.
+ */
+export const useVirtualRows = (
+    scrollRef: RefObject<HTMLElement>,
+    { keys, estimateHeight, dynamic = false, overscan = 6 }: VirtualRowsOptions
+): VirtualRowsResult => {
+    const [scrollTop, setScrollTop] = useState(0);
+    const [viewportHeight, setViewportHeight] = useState(0);
+    const [measureVersion, setMeasureVersion] = useState(0);
+    const heightsRef = useRef(new Map<string, number>());
+    const pendingFrameRef = useRef<number | null>(null);
+
+    // Track scroll position (one state update per animation frame)
+    useEffect(() => {
+        const el = scrollRef.current;
+        if (!el) return;
+        let frame: number | null = null;
+        const onScroll = () => {
+            if (frame !== null) return;
+            frame = requestAnimationFrame(() => {
+                frame = null;
+                setScrollTop(el.scrollTop);
+            });
+        };
+        el.addEventListener('scroll', onScroll, { passive: true });
+        return () => {
+            el.removeEventListener('scroll', onScroll);
+            if (frame !== null) cancelAnimationFrame(frame);
+        };
+    }, [scrollRef]);
+
+    // Track viewport size
+    useLayoutEffect(() => {
+        const el = scrollRef.current;
+        if (!el) return;
+        setViewportHeight(el.clientHeight);
+        if (typeof ResizeObserver === 'undefined') return;
+        const observer = new ResizeObserver(() => setViewportHeight(el.clientHeight));
+        observer.observe(el);
+        return () => observer.disconnect();
+    }, [scrollRef]);
+
+    useEffect(() => () => {
+        if (pendingFrameRef.current !== null) cancelAnimationFrame(pendingFrameRef.current);
+    }, []);
+
+    const offsets = useMemo(() => {
+        const result = new Array<number>(keys.length + 1);
+        result[0] = 0;
+        for (let i = 0; i < keys.length; i++) {
+            const measured = dynamic ? heightsRef.current.get(keys[i]) : undefined;
+            result[i + 1] = result[i] + (measured ?? estimateHeight);
+        }
+        return result;
+    }, [keys, estimateHeight, dynamic, measureVersion]);
+
+    const totalHeight = offsets[keys.length];
+    const visibleStart = keys.length === 0 ? 0 : findIndex(offsets, scrollTop);
+    const visibleEnd = keys.length === 0 ? 0 : findIndex(offsets, scrollTop + (viewportHeight || estimateHeight * 10)) + 1;
+    const start = Math.max(0, visibleStart - overscan);
+    const end = Math.min(keys.length, visibleEnd + overscan);
+
+    const measureRow = useCallback((key: string) => (el: HTMLElement | null) => {
+        if (!dynamic || !el) return;
+        const height = el.getBoundingClientRect().height;
+        if (height <= 0) return;
+        const previous = heightsRef.current.get(key);
+        if (previous !== undefined && Math.abs(previous - height) < 1) return;
+        heightsRef.current.set(key, height);
+        // Batch all measurements of a render into a single offsets recompute
+        if (pendingFrameRef.current === null) {
+            pendingFrameRef.current = requestAnimationFrame(() => {
+                pendingFrameRef.current = null;
+                setMeasureVersion(v => v + 1);
+            });
+        }
+    }, [dynamic]);
+
+    const scrollToIndex = useCallback((index: number) => {
+        const el = scrollRef.current;
+        if (!el) return;
+        el.scrollTop = offsets[Math.min(Math.max(index, 0), keys.length)] || 0;
+    }, [scrollRef, offsets, keys.length]);
+
+    return {
+        start,
+        end,
+        paddingTop: offsets[start] || 0,
+        paddingBottom: Math.max(0, totalHeight - (offsets[end] || 0)),
+        totalHeight,
+        measureRow,
+        scrollToIndex
+    };
+};
@@ -0,0 +1,165 @@
+/**
+ * @file adminOrgSummaries.ts
+ * @description Super-admin organization list and previews backed by RPCs
+ *
+ * - fetchOrgSummaries(): one request per page (filters, counts, balance and
+ *   last activity are computed by get_admin_org_summaries)
+ * - fetchOrgPreview(): previews requested in the same tick are merged into a
+ *   single get_admin_org_previews call and cached for a short while
+ *
+ * Usage:
+ * ```typescript
+ * const page = await fetchOrgSummaries({ search, plan: 'pro', status: 'all', limit: 20, offset: 0 });
+ * const preview = await fetchOrgPreview(org.id);
+ * ```
+ */
+
+import { supabase } from './supabaseClient';
+import { fetchQuery, invalidateQueries, unwrap } from './queryCache';
+import type { Organization } from '../types';
+
+// ====================================================================
+// Types
+// ====================================================================
+
+export interface OrgSummaryFilters {
+    search?: string;
+    plan?: string;
+    status?: 'all' | 'active' | 'disabled' | 'expired' | string;
+    limit: number;
+    offset: number;
+}
+
+export interface OrgSummary {
+    org: Organization;
+    cars_count: number;
+    users_count: number;
+    transactions_count: number;
+    balance: number;
+    last_activity_at: string | null;
+}
+
+export interface PlatformOrgStats {
+    total: number;
+    active: number;
+    disabled: number;
+    expired: number;
+    trial: number;
+    starter: number;
+    pro: number;
+}
+
+export interface OrgSummaryPage {
+    total_count: number;
+    stats: PlatformOrgStats;
+    orgs: OrgSummary[];
+}
+
+export interface OrgPreview {
+    cars_count: number;
+    users_count: number;
+    transactions_count: number;
+    balance: number;
+    recent_cars: Array<Record<string, unknown>>;
+    recent_users: Array<Record<string, unknown>>;
+    recent_transactions: Array<Record<string, unknown>>;
+}
+
+// ====================================================================
+// Configuration
+// ====================================================================
+
+const SUMMARY_TTL_MS = 30 * 1000;
+const PREVIEW_TTL_MS = 60 * 1000;
+const CACHE_TABLE = 'admin_org_summaries';
+
+// ====================================================================
+// State
+// ====================================================================
+
+const previewCache = new Map<string, { preview: OrgPreview; fetchedAt: number }>();
+let pendingPreviews = new Map<string, { resolve: (p: OrgPreview) => void; reject: (e: unknown) => void }[]>();
+let flushScheduled = false;
+
+// ====================================================================
+// Private Helpers
+// ====================================================================
+
+const flushPreviews = async () => {
+    flushScheduled = false;
+    const batch = pendingPreviews;
+    pendingPreviews = new Map();
+    const ids = Array.from(batch.keys());
+
+    try {
+        const result = await unwrap(supabase.rpc('get_admin_org_previews', { p_org_ids: ids })) as Record<string, OrgPreview>;
+        const now = Date.now();
+        batch.forEach((waiters, id) => {
+            const preview = result?.[id];
+            if (!preview) {
+                waiters.forEach(w => w.reject(new Error('تعذر تحميل معاينة الوكالة')));
+                return;
+            }
+            previewCache.set(id, { preview, fetchedAt: now });
+            waiters.forEach(w => w.resolve(preview));
+        });
+    } catch (error) {
+        batch.forEach(waiters => waiters.forEach(w => w.reject(error)));
+    }
+};
+
+// ====================================================================
+// Public API
+// ====================================================================
+
+/**
+ * One page of organizations with per-org counts and platform counters
+ */
+export const fetchOrgSummaries = (filters: OrgSummaryFilters, force = false): Promise<OrgSummaryPage> =>
+    fetchQuery(
+        { table: CACHE_TABLE, filters: { ...filters } },
+        async () => {
+            const data = await unwrap(supabase.rpc('get_admin_org_summaries', {
+                p_search: filters.search?.trim() || null,
+                p_plan: filters.plan || 'all',
+                p_status: filters.status || 'all',
+                p_limit: filters.limit,
+                p_offset: filters.offset
+            })) as OrgSummaryPage;
+            return {
+                total_count: Number(data?.total_count || 0),
+                stats: data?.stats,
+                orgs: data?.orgs || []
+            };
+        },
+        { ttl: SUMMARY_TTL_MS, force }
+    );
+
+/**
+ * Preview of one organization; concurrent calls share one batched request
+ */
+export const fetchOrgPreview = (orgId: string): Promise<OrgPreview> => {
+    const cached = previewCache.get(orgId);
+    if (cached && Date.now() - cached.fetchedAt < PREVIEW_TTL_MS) {
+        return Promise.resolve(cached.preview);
+    }
+
+    return new Promise((resolve, reject) => {
+        const waiters = pendingPreviews.get(orgId) || [];
+        waiters.push({ resolve, reject });
+        pendingPreviews.set(orgId, waiters);
+        if (!flushScheduled) {
+            flushScheduled = true;
+            queueMicrotask(flushPreviews);
+        }
+    });
+};
+
+/**
+ * Forget cached pages/previews after an organization was changed
+ */
+export const invalidateOrgSummaries = (orgId?: string) => {
+    invalidateQueries(CACHE_TABLE);
+    if (orgId) previewCache.delete(orgId);
+    else previewCache.clear();
+};
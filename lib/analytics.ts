@@ -1,5 +1,5 @@
-
 import { supabase } from './supabaseClient';
+import { fetchQuery, unwrap } from './queryCache';
 
 
 export interface SystemStats {
@@ -12,75 +12,62 @@ export interface SystemStats {
     monthlyRevenue: number;
 }
 
-export const fetchSystemStats = async (): Promise<SystemStats> => {
-    try {
-        // 1. Fetch Organizations
-        const { data: orgs, count: orgCount, error: orgError } = await supabase
-            .from('organizations')
-            .select('id, subscription_plan, is_active', { count: 'exact' });
-
-        if (orgError) throw orgError;
-
-        // 2. Fetch Users
-        const { count: userCount, error: userError } = await supabase
-            .from('profiles')
-            .select('id', { count: 'exact', head: true });
-
-        if (userError) throw userError;
-
-        // 3. Fetch Revenue (Total)
-        const { data: totalPayments, error: revenueError } = await supabase
-            .from('payment_requests')
-            .select('final_amount')
-            .eq('status', 'approved');
-
-        if (revenueError) throw revenueError;
-
-        const totalRevenue = totalPayments?.reduce((sum, p) => sum + (p.final_amount || 0), 0) || 0;
-
-        // 4. Fetch Revenue (Current Month)
-        const startOfMonth = new Date();
-        startOfMonth.setDate(1);
-        startOfMonth.setHours(0, 0, 0, 0);
-
-        const { data: monthPayments, error: monthError } = await supabase
-            .from('payment_requests')
-            .select('final_amount')
-            .eq('status', 'approved')
-            .gte('created_at', startOfMonth.toISOString());
-
-        if (monthError) throw monthError;
-
-        const monthlyRevenue = monthPayments?.reduce((sum, p) => sum + (p.final_amount || 0), 0) || 0;
-
-        // 5. Calculate Subscription Breakdown
-        let active = 0;
-        let trial = 0;
-        let cancelled = 0;
-
-        if (orgs) {
-            orgs.forEach((org: { is_active: boolean | null, subscription_plan: string | null }) => {
-                const isOrgActive = org.is_active !== false;
-                const planName = (org.subscription_plan || '').toLowerCase();
+/**
+ * Snapshot row of platform_stats_mv (see migration 20261019170000)
+ */
+interface PlatformStatsSnapshot {
+    total_orgs: number;
+    total_users: number;
+    active_subscriptions: number;
+    trial_subscriptions: number;
+    cancelled_subscriptions: number;
+    plan_breakdown: Record<string, number>;
+    total_revenue: number;
+    monthly_revenue: number;
+    growth: { month: string; organizations: number; users: number; revenue: number }[];
+    refreshed_at: string;
+}
 
-                if (!isOrgActive) {
-                    cancelled++;
-                } else if (planName.includes('trial')) {
-                    trial++;
-                } else {
-                    active++;
-                }
-            });
-        }
+// The view is refreshed by pg_cron every 10 minutes; older snapshots are refreshed on read
+const SNAPSHOT_MAX_AGE_MS = 15 * 60 * 1000;
+const SNAPSHOT_TTL_MS = 60 * 1000;
+
+/**
+ * Read the precomputed platform stats (one small RPC call for the whole page)
+ *
+ * fetchSystemStats() and fetchGrowthData() share this request.
+ */
+const fetchPlatformStats = (force = false): Promise<PlatformStatsSnapshot | null> =>
+    fetchQuery(
+        { table: 'platform_stats' },
+        async () => {
+            if (force) await unwrap(supabase.rpc('refresh_platform_stats'));
+            let snapshot = await unwrap(supabase.rpc('get_platform_stats')) as PlatformStatsSnapshot | null;
+
+            const age = snapshot ? Date.now() - new Date(snapshot.refreshed_at).getTime() : Infinity;
+            if (!force && age > SNAPSHOT_MAX_AGE_MS) {
+                console.log('🔄 [Analytics] Platform stats snapshot is stale, refreshing');
+                await unwrap(supabase.rpc('refresh_platform_stats'));
+                snapshot = await unwrap(supabase.rpc('get_platform_stats')) as PlatformStatsSnapshot | null;
+            }
+            return snapshot;
+        },
+        { ttl: SNAPSHOT_TTL_MS, force }
+    );
+
+export const fetchSystemStats = async (force = false): Promise<SystemStats> => {
+    try {
+        const snapshot = await fetchPlatformStats(force);
+        if (!snapshot) throw new Error('Platform stats snapshot is empty');
 
         return {
-            totalOrganizations: orgCount || 0,
-            totalUsers: userCount || 0,
-            activeSubscriptions: active,
-            trialSubscriptions: trial,
-            cancelledSubscriptions: cancelled,
-            totalRevenue,
-            monthlyRevenue
+            totalOrganizations: Number(snapshot.total_orgs) || 0,
+            totalUsers: Number(snapshot.total_users) || 0,
+            activeSubscriptions: Number(snapshot.active_subscriptions) || 0,
+            trialSubscriptions: Number(snapshot.trial_subscriptions) || 0,
+            cancelledSubscriptions: Number(snapshot.cancelled_subscriptions) || 0,
+            totalRevenue: Number(snapshot.total_revenue) || 0,
+            monthlyRevenue: Number(snapshot.monthly_revenue) || 0
         };
 
     } catch (error) {
@@ -103,60 +90,20 @@ export interface GrowthData {
     users: number;
 }
 
-export const fetchGrowthData = async (): Promise<GrowthData[]> => {
+export const fetchGrowthData = async (force = false): Promise<GrowthData[]> => {
     try {
-        const today = new Date();
-        const twelveMonthsAgo = new Date();
-        twelveMonthsAgo.setMonth(today.getMonth() - 11);
-        twelveMonthsAgo.setDate(1); // Start of that month
-
-        // Fetch Orgs created in last 12 months
-        const { data: orgs } = await supabase
-            .from('organizations')
-            .select('created_at')
-            .gte('created_at', twelveMonthsAgo.toISOString());
-
-        // Fetch Users created in last 12 months
-        const { data: users } = await supabase
-            .from('profiles')
-            .select('created_at')
-            .gte('created_at', twelveMonthsAgo.toISOString());
-
-        // Initialize map for last 12 months
-        const statsMap = new Map<string, { orgs: number, users: number }>();
+        const snapshot = await fetchPlatformStats(force);
         const months = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'];
 
-        for (let i = 0; i < 12; i++) {
-            const d = new Date(twelveMonthsAgo);
-            d.setMonth(d.getMonth() + i);
-            const key = `${months[d.getMonth()]} ${d.getFullYear().toString().substr(2)}`;
-            // Use ISO string YYYY-MM for sorting/matching if needed, but for display:
-            statsMap.set(key, { orgs: 0, users: 0 });
-        }
-
-        // Aggregation Helper
-        const aggregate = (data: { created_at: string }[], type: 'orgs' | 'users') => {
-            if (!data) return;
-            data.forEach(item => {
-                if (!item.created_at) return;
-                const d = new Date(item.created_at);
-                const key = `${months[d.getMonth()]} ${d.getFullYear().toString().substr(2)}`;
-                if (statsMap.has(key)) {
-                    const entry = statsMap.get(key)!;
-                    entry[type]++;
-                }
-            });
-        };
-
-        aggregate(orgs || [], 'orgs');
-        aggregate(users || [], 'users');
-
-        // Convert map to array
-        return Array.from(statsMap.entries()).map(([month, counts]) => ({
-            month,
-            organizations: counts.orgs,
-            users: counts.users
-        }));
+        // Buckets arrive as YYYY-MM, already covering the last 12 months
+        return (snapshot?.growth || []).map(bucket => {
+            const [year, month] = bucket.month.split('-');
+            return {
+                month: `${months[Number(month) - 1]} ${year.substr(2)}`,
+                organizations: Number(bucket.organizations) || 0,
+                users: Number(bucket.users) || 0
+            };
+        });
 
     } catch (error) {
         console.error('Error fetching growth data:', error);
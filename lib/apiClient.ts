@@ -9,6 +9,9 @@
  * - Log auth-related events for debugging
  * - Use centralized auth utilities for logout (authUtils.ts)
  * - Support permission guards for sensitive operations
+ * - Share one cached access token and one in-flight refresh between all callers
+ * - Coalesce identical in-flight GET requests into a single network call
+ * - Cap concurrent requests per host, with high/normal/low priority lanes
  */
 
 import { supabase } from './supabaseClient';
@@ -40,13 +43,34 @@ const AUTH_ERROR_PATTERNS = [
     'credentials'
 ];
 
+/**
+ * A cached token is refreshed this long before it actually expires
+ */
+const TOKEN_EXPIRY_MARGIN_MS = 60 * 1000;
+
+/**
+ * Maximum number of requests in flight per host (browsers allow ~6 per origin on HTTP/1.1)
+ */
+const MAX_CONCURRENT_PER_HOST = 6;
+
+/**
+ * Lanes are drained in this order when a slot frees up
+ */
+const PRIORITY_LANES = ['high', 'normal', 'low'] as const;
+
 // ====================================================================
 // Type Definitions
 // ====================================================================
 
+export type RequestPriority = typeof PRIORITY_LANES[number];
+
 interface AuthenticatedFetchOptions extends RequestInit {
     skipAuth?: boolean;
     skipRetry?: boolean;
+    /** Lane in the per-host queue (default: normal) */
+    priority?: RequestPriority;
+    /** Share identical in-flight GETs (default: true for GET without a signal) */
+    dedupe?: boolean;
 }
 
 interface ApiError extends Error {
@@ -83,6 +107,164 @@ function createApiError(message: string, status?: number, code?: string): ApiErr
     return error;
 }
 
+// ====================================================================
+// Single-Flight Token Provider
+// ====================================================================
+
+let cachedToken: { accessToken: string; expiresAt: number } | null = null;
+let inFlightRefresh: Promise<string | null> | null = null;
+
+const cacheSession = (session: { access_token: string; expires_at?: number } | null) => {
+    cachedToken = session?.access_token
+        ? {
+            accessToken: session.access_token,
+            // expires_at is in seconds; without it, trust the token for a minute
+            expiresAt: session.expires_at ? session.expires_at * 1000 : Date.now() + 60 * 1000
+        }
+        : null;
+};
+
+const isTokenFresh = () =>
+    !!cachedToken && cachedToken.expiresAt - TOKEN_EXPIRY_MARGIN_MS > Date.now();
+
+// Keep the cache in step with sign-in / sign-out / refreshes done by supabase-js itself
+supabase.auth.onAuthStateChange((_event, session) => {
+    cacheSession(session);
+});
+
+/**
+ * Refresh the session once, however many callers ask at the same time
+ *
+ * All concurrent callers await the same promise, so a burst of 401s results
+ * in a single refreshSession() round trip.
+ */
+export const refreshAccessToken = (): Promise<string | null> => {
+    if (!inFlightRefresh) {
+        inFlightRefresh = (async () => {
+            try {
+                console.log('🔄 [apiClient] Refreshing access token...');
+                const { data: { session }, error } = await supabase.auth.refreshSession();
+                if (error || !session) {
+                    cacheSession(null);
+                    return null;
+                }
+                cacheSession(session);
+                return session.access_token;
+            } finally {
+                inFlightRefresh = null;
+            }
+        })();
+    }
+    return inFlightRefresh;
+};
+
+/**
+ * Current access token, read from memory while it is not about to expire
+ *
+ * @returns The token, or null when there is no session
+ */
+export const getAccessToken = async (options: { forceRefresh?: boolean } = {}): Promise<string | null> => {
+    if (options.forceRefresh) return refreshAccessToken();
+    if (isTokenFresh()) return cachedToken!.accessToken;
+    if (inFlightRefresh) return inFlightRefresh;
+
+    const { data: { session } } = await supabase.auth.getSession();
+    cacheSession(session);
+    if (!session) return null;
+    if (isTokenFresh()) return session.access_token;
+
+    // Stored session is (nearly) expired: refresh it once for everybody
+    return refreshAccessToken();
+};
+
+// ====================================================================
+// Per-Host Concurrency Limiter
+// ====================================================================
+
+interface HostQueue {
+    active: number;
+    lanes: Record<RequestPriority, Array<() => void>>;
+}
+
+const hostQueues = new Map<string, HostQueue>();
+
+const hostOf = (url: string) => {
+    try {
+        return new URL(url, globalThis.location?.href).host;
+    } catch {
+        return '';
+    }
+};
+
+const getHostQueue = (host: string): HostQueue => {
+    let queue = hostQueues.get(host);
+    if (!queue) {
+        queue = { active: 0, lanes: { high: [], normal: [], low: [] } };
+        hostQueues.set(host, queue);
+    }
+    return queue;
+};
+
+const acquireSlot = (host: string, priority: RequestPriority): Promise<void> => {
+    const queue = getHostQueue(host);
+    if (queue.active < MAX_CONCURRENT_PER_HOST) {
+        queue.active++;
+        return Promise.resolve();
+    }
+    return new Promise(resolve => queue.lanes[priority].push(resolve));
+};
+
+const releaseSlot = (host: string) => {
+    const queue = getHostQueue(host);
+    for (const lane of PRIORITY_LANES) {
+        const next = queue.lanes[lane].shift();
+        if (next) {
+            // Slot is handed over directly, active count stays the same
+            next();
+            return;
+        }
+    }
+    queue.active--;
+};
+
+/**
+ * fetch() that waits for a free slot on the target host
+ */
+const limitedFetch = async (url: string, init: RequestInit, priority: RequestPriority): Promise<Response> => {
+    const host = hostOf(url);
+    await acquireSlot(host, priority);
+    try {
+        return await fetch(url, init);
+    } finally {
+        releaseSlot(host);
+    }
+};
+
+// ====================================================================
+// GET De-duplication
+// ====================================================================
+
+const inFlightGets = new Map<string, Promise<Response>>();
+
+const dedupeKey = (url: string, headers: Headers) => {
+    const sorted = Array.from(headers.entries()).sort(([a], [b]) => a.localeCompare(b));
+    return `${url}\n${JSON.stringify(sorted)}`;
+};
+
+/**
+ * Run `send` once per identical in-flight GET; every caller gets its own clone
+ */
+const dedupeGet = (key: string, send: () => Promise<Response>): Promise<Response> => {
+    let shared = inFlightGets.get(key);
+    if (!shared) {
+        shared = send().finally(() => inFlightGets.delete(key));
+        inFlightGets.set(key, shared);
+    } else {
+        console.log('♻️ [apiClient] Joined identical in-flight GET');
+    }
+    return shared.then(response => response.clone());
+};
+
 // ====================================================================
 // Authenticated Fetch Wrapper
 // ====================================================================
@@ -95,6 +277,8 @@ function createApiError(message: string, status?: number, code?: string): ApiErr
  * - On 401: refreshes session and retries the request once
  * - Handles Supabase token refresh automatically
  * - Provides consistent error handling
+ * - Identical in-flight GETs share one network call
+ * - Waits for a free per-host slot (`priority` picks the lane)
  *
  * @param url - The URL to fetch
  * @param options - Request options (can include skipAuth, skipRetry)
@@ -128,7 +312,13 @@ export const authenticatedFetch = async (
     url: string,
     options: AuthenticatedFetchOptions = {}
 ): Promise<Response> => {
-    const { skipAuth = false, skipRetry = false, ...fetchOptions } = options;
+    const {
+        skipAuth = false,
+        skipRetry = false,
+        priority = 'normal',
+        dedupe,
+        ...fetchOptions
+    } = options;
 
     // ====================================================================
     // Step 1: Prepare Request with Auth Headers
@@ -147,11 +337,10 @@ export const authenticatedFetch = async (
 
     // Add auth header if not explicitly skipped
     if (!skipAuth) {
-        const session = await supabase.auth.getSession();
-        const { data: { session: authSession } } = session;
+        const accessToken = await getAccessToken();
 
-        if (authSession?.access_token) {
-            headers.set('Authorization', `Bearer ${authSession.access_token}`);
+        if (accessToken) {
+            headers.set('Authorization', `Bearer ${accessToken}`);
         } else {
             // No active session - fail fast
             throw createApiError('No active session. Please log in.', 401);
@@ -165,10 +354,11 @@ export const authenticatedFetch = async (
     // Step 2: Make Initial Request
     // ====================================================================
 
-    let response = await fetch(url, {
-        ...fetchOptions,
-        headers
-    });
+    const method = (fetchOptions.method || 'GET').toUpperCase();
+    const shouldDedupe = (dedupe ?? true) && method === 'GET' && !fetchOptions.body && !fetchOptions.signal;
+
+    const send = () => limitedFetch(url, { ...fetchOptions, headers }, priority);
+    let response = await (shouldDedupe ? dedupeGet(dedupeKey(url, headers), send) : send());
 
     // ====================================================================
     // Step 3: Handle Auth Failures with Refresh + Retry (unless skipped)
@@ -182,10 +372,10 @@ export const authenticatedFetch = async (
     if (needsAuthRetry) {
         console.log('🔄 Received 401, attempting token refresh and retry...');
 
-        // Attempt to refresh the session
-        const { data: { session: newSession }, error: refreshError } = await supabase.auth.refreshSession();
+        // Attempt to refresh the session (shared with any other caller that got a 401)
+        const newToken = await refreshAccessToken();
 
-        if (refreshError || !newSession) {
+        if (!newToken) {
             // Refresh failed - session is truly expired
             console.error('❌ Session refresh failed, triggering global logout');
 
@@ -205,13 +395,10 @@ export const authenticatedFetch = async (
         console.log('✅ Token refreshed, retrying request...');
 
         // Update headers with new token
-        headers.set('Authorization', `Bearer ${newSession.access_token}`);
+        headers.set('Authorization', `Bearer ${newToken}`);
 
         // Retry the exact same request with new token
-        response = await fetch(url, {
-            ...fetchOptions,
-            headers
-        });
+        response = await (shouldDedupe ? dedupeGet(dedupeKey(url, headers), send) : send());
 
         // Log retry result
         if (response.ok) {
@@ -295,11 +482,10 @@ export const secureRpcCall = async <T = unknown>(
                     if (attemptCount <= MAX_RETRY_ATTEMPTS) {
                         console.log(`🔄 Auth error detected, attempting token refresh...`);
 
-                        // Try to refresh the session
-                        const { data: { session: newSession }, error: refreshError } =
-                            await supabase.auth.refreshSession();
+                        // Try to refresh the session (single-flight across callers)
+                        const newToken = await refreshAccessToken();
 
-                        if (refreshError) {
+                        if (!newToken) {
                             // Refresh failed - use centralized logout
                             console.error('❌ Session refresh failed during RPC call');
 
@@ -394,9 +580,9 @@ export const batchRpcCalls = async <T = unknown>(
 
     try {
         // Ensure we have a fresh session before batch
-        const { data: { session } } = await supabase.auth.getSession();
+        const accessToken = await getAccessToken();
 
-        if (!session) {
+        if (!accessToken) {
             throw createApiError('No active session for batch RPC calls.', 401);
         }
 
@@ -581,5 +767,8 @@ export const apiDelete = (url: string, options?: Omit<AuthenticatedFetchOptions,
 export const apiClientConfig = {
     MAX_RETRY_ATTEMPTS,
     AUTH_FAILURE_STATUSES,
-    AUTH_ERROR_PATTERNS
+    AUTH_ERROR_PATTERNS,
+    TOKEN_EXPIRY_MARGIN_MS,
+    MAX_CONCURRENT_PER_HOST,
+    PRIORITY_LANES
 };
@@ -23,7 +23,8 @@
  */
 
 import { supabase } from './supabaseClient';
-import { db } from './db';
+import { db, clearTransactionSyncMarkers } from './db';
+import { clearQueryCache } from './queryCache';
 
 // ====================================================================
 // Types
@@ -51,12 +52,20 @@ export interface LogoutOptions {
  * Broadcast channel message types for cross-tab auth synchronization
  */
 export interface AuthBroadcastMessage {
-  type: 'logout' | 'sync_request';
+  type: 'logout' | 'sync_request' | CrossTabMessageType;
   reason?: LogoutReason;
+  payload?: unknown;
   timestamp: number;
   sourceTabId: string;
 }
 
+/**
+ * Non-logout messages other modules exchange over the same channel
+ */
+export type CrossTabMessageType = 'heartbeat_result' | 'heartbeat_request' | 'task_result';
+
+type CrossTabListener = (message: AuthBroadcastMessage) => void;
+
 /**
  * Channel name for cross-tab authentication events
  */
@@ -101,6 +110,11 @@ let crossTabSyncInitialized = false;
  */
 let isRemoteLogout = false;
 
+/**
+ * Listeners for non-logout cross-tab messages, by message type
+ */
+const crossTabListeners = new Map<CrossTabMessageType, Set<CrossTabListener>>();
+
 // ====================================================================
 // Cross-Tab Communication - Private Helpers
 // ====================================================================
@@ -182,6 +196,15 @@ const handleBroadcastMessage = (event: MessageEvent | StorageEvent) => {
 
   if (!message) return;
 
+  if (message.sourceTabId === tabId) return;
+
+  // Messages for other modules (heartbeat sharing, ...)
+  const listeners = crossTabListeners.get(message.type as CrossTabMessageType);
+  if (listeners) {
+    listeners.forEach(listener => listener(message!));
+    return;
+  }
+
   console.log(`📨 [authUtils] Received broadcast: ${message.type} from tab ${message.sourceTabId?.substr(0, 20)}...`);
 
   // Handle logout message from another tab
@@ -278,6 +301,7 @@ const clearAuthIndexedDB = async () => {
     await db.sessions.clear();
     await db.cars.clear();
     await db.transactions.clear();
+    clearTransactionSyncMarkers();
     await db.profiles.clear();
     await db.expenseTemplates.clear();
     await db.syncQueue.clear();
@@ -419,6 +443,7 @@ export const performGlobalLogout = async (options: LogoutOptions = {}) => {
     // ====================================================================
     clearAuthLocalStorage();
     clearAuthSessionStorage();
+    clearQueryCache();
 
     // ====================================================================
     // Step 4: Clear IndexedDB
@@ -459,6 +484,7 @@ export const performStateReset = async () => {
 
   clearAuthLocalStorage();
   clearAuthSessionStorage();
+  clearQueryCache();
   await clearAuthIndexedDB();
 
   console.log('✅ [authUtils] Local state reset complete');
@@ -590,6 +616,54 @@ export const destroyCrossTabSync = () => {
   console.log('✅ [authUtils] Cross-tab sync destroyed');
 };
 
+/**
+ * Send a non-logout message to the other tabs
+ *
+ * Uses the BroadcastChannel when available and the localStorage event
+ * fallback otherwise (frequent messages should not churn localStorage).
+ */
+export const postCrossTabMessage = (type: CrossTabMessageType, payload?: unknown) => {
+  const message: AuthBroadcastMessage = { type, payload, timestamp: Date.now(), sourceTabId: tabId };
+
+  if (broadcastChannel) {
+    try {
+      broadcastChannel.postMessage(message);
+      return;
+    } catch (e) {
+      console.warn('⚠️ [authUtils] BroadcastChannel postMessage failed, using localStorage:', e);
+    }
+  }
+
+  try {
+    const key = `${STORAGE_EVENT_KEY}_${type}`;
+    localStorage.setItem(key, JSON.stringify(message));
+    setTimeout(() => localStorage.removeItem(key), 100);
+  } catch (e) {
+    console.warn('⚠️ [authUtils] localStorage fallback failed:', e);
+  }
+};
+
+/**
+ * Listen to one type of cross-tab message (requires initCrossTabSync)
+ * @returns Unsubscribe function
+ */
+export const onCrossTabMessage = (type: CrossTabMessageType, listener: CrossTabListener): (() => void) => {
+  let listeners = crossTabListeners.get(type);
+  if (!listeners) {
+    listeners = new Set();
+    crossTabListeners.set(type, listeners);
+  }
+  listeners.add(listener);
+  return () => {
+    listeners?.delete(listener);
+  };
+};
+
+/**
+ * Identifier of this tab (stable for the page lifetime)
+ */
+export const getTabId = () => tabId;
+
 /**
  * Get the current cross-tab sync status
  * Useful for debugging and monitoring
@@ -0,0 +1,229 @@
+/**
+ * @file backupFormat.ts
+ * @description Compressed tenant backup container (version 2)
+ *
+ * Layout of a `.mfbk` file:
+ * ```
+ * "MYFLEET2"              8 bytes magic
+ * manifest length         uint32, little endian
+ * manifest                UTF-8 JSON (BackupManifest)
+ * segment × N             gzip-compressed NDJSON, one per table, in manifest order
+ * ```
+ *
+ * Every segment is listed in the manifest with its byte length, row count and
+ * the SHA-256 of its compressed bytes. readBackupFile() checks all of them
+ * (and the decompressed row counts) before returning, so a truncated or
+ * corrupted file is rejected before a single row is written.
+ *
+ * Version 1 files (plain JSON) are still accepted by readBackupFile().
+ */
+
+import type { TenantBackupFile } from './tenantBackup';
+
+// ====================================================================
+// Types
+// ====================================================================
+
+export interface BackupManifestTable {
+    name: string;
+    rows: number;
+    /** Compressed segment size in bytes */
+    bytes: number;
+    /** Hex SHA-256 of the compressed segment */
+    sha256: string;
+}
+
+export interface BackupManifest {
+    app: 'myfleet-pro';
+    version: 2;
+    exported_at: string;
+    org_id: string;
+    backup_id?: string;
+    kind?: 'full' | 'differential';
+    parent_id?: string;
+    since?: string;
+    compression: 'gzip';
+    tables: BackupManifestTable[];
+}
+
+type TableRow = Record<string, unknown>;
+
+// ====================================================================
+// Constants
+// ====================================================================
+
+const MAGIC = 'MYFLEET2';
+const HEADER_SIZE = MAGIC.length + 4;
+
+export const BACKUP_V2_EXTENSION = 'mfbk';
+export const BACKUP_V2_MIME_TYPE = 'application/octet-stream';
+
+// ====================================================================
+// Private Helpers
+// ====================================================================
+
+const toHex = (buffer: ArrayBuffer) =>
+    Array.from(new Uint8Array(buffer), byte => byte.toString(16).padStart(2, '0')).join('');
+
+const sha256 = async (data: ArrayBuffer) => toHex(await crypto.subtle.digest('SHA-256', data));
+
+/**
+ * gzip the NDJSON of one table without building the whole text as one string
+ */
+const compressRows = (rows: TableRow[]): Promise<ArrayBuffer> => {
+    const parts: BlobPart[] = rows.map(row => `${JSON.stringify(row)}\n`);
+    const stream = new Blob(parts).stream().pipeThrough(new CompressionStream('gzip'));
+    return new Response(stream).arrayBuffer();
+};
+
+/**
+ * Decompress one segment and parse it line by line
+ */
+const decompressRows = async (segment: Blob): Promise<TableRow[]> => {
+    const reader = segment.stream()
+        .pipeThrough(new DecompressionStream('gzip'))
+        .pipeThrough(new TextDecoderStream())
+        .getReader();
+
+    const rows: TableRow[] = [];
+    let buffered = '';
+    for (;;) {
+        const { done, value } = await reader.read();
+        if (value) buffered += value;
+        let newline = buffered.indexOf('\n');
+        while (newline !== -1) {
+            const line = buffered.slice(0, newline);
+            if (line) rows.push(JSON.parse(line) as TableRow);
+            buffered = buffered.slice(newline + 1);
+            newline = buffered.indexOf('\n');
+        }
+        if (done) break;
+    }
+    if (buffered.trim()) rows.push(JSON.parse(buffered) as TableRow);
+    return rows;
+};
+
+const corrupted = (detail: string) => {
+    console.error(`❌ [Backup] Corrupted backup: ${detail}`);
+    return new Error('ملف النسخة الاحتياطية تالف أو غير مكتمل');
+};
+
+// ====================================================================
+// Public API
+// ====================================================================
+
+/**
+ * Encode an exported backup as a compressed version 2 container
+ */
+export const encodeBackupV2 = async (backup: TenantBackupFile): Promise<Blob> => {
+    const segments: ArrayBuffer[] = [];
+    const tables: BackupManifestTable[] = [];
+
+    for (const [name, rows] of Object.entries(backup.data)) {
+        const segment = await compressRows(rows);
+        segments.push(segment);
+        tables.push({ name, rows: rows.length, bytes: segment.byteLength, sha256: await sha256(segment) });
+    }
+
+    const manifest: BackupManifest = {
+        app: 'myfleet-pro',
+        version: 2,
+        exported_at: backup.exported_at,
+        org_id: backup.org_id,
+        backup_id: backup.backup_id,
+        kind: backup.kind,
+        parent_id: backup.parent_id,
+        since: backup.since,
+        compression: 'gzip',
+        tables
+    };
+    const manifestBytes = new TextEncoder().encode(JSON.stringify(manifest));
+    const header = new Uint8Array(HEADER_SIZE);
+    header.set(new TextEncoder().encode(MAGIC), 0);
+    new DataView(header.buffer).setUint32(MAGIC.length, manifestBytes.byteLength, true);
+
+    return new Blob([header, manifestBytes, ...segments], { type: BACKUP_V2_MIME_TYPE });
+};
+
+/**
+ * Does the file start with the version 2 magic bytes?
+ */
+export const isBackupV2 = async (file: Blob): Promise<boolean> => {
+    if (file.size < HEADER_SIZE) return false;
+    const head = new TextDecoder().decode(await file.slice(0, MAGIC.length).arrayBuffer());
+    return head === MAGIC;
+};
+
+/**
+ * Read the manifest of a version 2 file (no segment is touched)
+ */
+export const readBackupManifest = async (file: Blob): Promise<{ manifest: BackupManifest; dataOffset: number }> => {
+    const header = new DataView(await file.slice(0, HEADER_SIZE).arrayBuffer());
+    const manifestLength = header.getUint32(MAGIC.length, true);
+    const dataOffset = HEADER_SIZE + manifestLength;
+    if (dataOffset > file.size) throw corrupted('manifest truncated');
+
+    let manifest: BackupManifest;
+    try {
+        manifest = JSON.parse(await file.slice(HEADER_SIZE, dataOffset).text()) as BackupManifest;
+    } catch {
+        throw corrupted('manifest is not valid JSON');
+    }
+    if (manifest.app !== 'myfleet-pro' || manifest.version !== 2 || !Array.isArray(manifest.tables)) {
+        throw new Error('ملف النسخة الاحتياطية غير صالح');
+    }
+    return { manifest, dataOffset };
+};
+
+/**
+ * Read a backup file of any supported version
+ *
+ * Version 2 files are fully verified (segment sizes, SHA-256, row counts)
+ * before the parsed backup is returned.
+ */
+export const readBackupFile = async (file: Blob): Promise<TenantBackupFile> => {
+    if (!(await isBackupV2(file))) {
+        return JSON.parse(await file.text()) as TenantBackupFile;
+    }
+
+    const { manifest, dataOffset } = await readBackupManifest(file);
+    const expectedSize = manifest.tables.reduce((sum, table) => sum + table.bytes, dataOffset);
+    if (expectedSize !== file.size) throw corrupted(`size ${file.size} != ${expectedSize}`);
+
+    // Pass 1: hashes of every segment, so nothing is parsed from a damaged file
+    let offset = dataOffset;
+    const segments: Blob[] = [];
+    for (const table of manifest.tables) {
+        const segment = file.slice(offset, offset + table.bytes);
+        if ((await sha256(await segment.arrayBuffer())) !== table.sha256) {
+            throw corrupted(`checksum mismatch in ${table.name}`);
+        }
+        segments.push(segment);
+        offset += table.bytes;
+    }
+
+    // Pass 2: decompress and check row counts
+    const data: Record<string, TableRow[]> = {};
+    for (const [index, table] of manifest.tables.entries()) {
+        let rows: TableRow[];
+        try {
+            rows = await decompressRows(segments[index]);
+        } catch {
+            throw corrupted(`cannot decode ${table.name}`);
+        }
+        if (rows.length !== table.rows) throw corrupted(`${table.name} has ${rows.length}/${table.rows} rows`);
+        data[table.name] = rows;
+    }
+
+    return {
+        app: manifest.app,
+        version: 2,
+        exported_at: manifest.exported_at,
+        org_id: manifest.org_id,
+        backup_id: manifest.backup_id,
+        kind: manifest.kind,
+        parent_id: manifest.parent_id,
+        since: manifest.since,
+        data
+    };
+};
@@ -0,0 +1,70 @@
+/**
+ * @file clientPerfReport.ts
+ * @description Super-admin report of real-user latency collected by lib/telemetry.ts
+ *
+ * get_client_perf_p95 merges the beaconed histograms server-side; one call
+ * returns every (kind, name, method) with p50 / p95 / p99 across tenants.
+ *
+ * Usage:
+ * ```typescript
+ * const rows = await fetchClientPerfReport({ hours: 24 });
+ * const api = rows.filter(r => r.kind === 'table' || r.kind === 'rpc');
+ * ```
+ */
+
+import { supabase } from './supabaseClient';
+import { fetchQuery, unwrap } from './queryCache';
+import type { TelemetryKind } from './telemetry';
+
+// ====================================================================
+// Types
+// ====================================================================
+
+export interface ClientPerfRow {
+    kind: TelemetryKind;
+    name: string;
+    method: string | null;
+    samples: number;
+    errors: number;
+    error_rate: number | null;
+    avg_ms: number | null;
+    p50_ms: number | null;
+    p95_ms: number | null;
+    p99_ms: number | null;
+    max_ms: number | null;
+    /** Distinct tenants that reported this entry */
+    orgs: number;
+}
+
+// ====================================================================
+// Configuration
+// ====================================================================
+
+const REPORT_TTL_MS = 60 * 1000;
+const CACHE_TABLE = 'client_perf_events';
+
+// ====================================================================
+// Public API
+// ====================================================================
+
+/**
+ * p95 latency per table / RPC / route / vital over the last `hours`
+ */
+export const fetchClientPerfReport = (
+    options: { hours?: number; orgId?: string | null } = {},
+    force = false
+): Promise<ClientPerfRow[]> => {
+    const hours = options.hours ?? 24;
+    const orgId = options.orgId ?? null;
+    return fetchQuery(
+        { table: CACHE_TABLE, filters: { hours, orgId } },
+        async () => {
+            const data = await unwrap(supabase.rpc('get_client_perf_p95', {
+                p_hours: hours,
+                p_org_id: orgId
+            })) as ClientPerfRow[] | null;
+            return data || [];
+        },
+        { ttl: REPORT_TTL_MS, force }
+    );
+};
@@ -11,6 +11,8 @@ export interface LocalCar {
     status: string;
     current_odometer?: number;
     last_updated: number; // For conflict resolution
+    /** All-time totals from get_car_profit_summary, taken at synced_at (ms) */
+    server_totals?: { income: number; expense: number; synced_at: number };
 }
 
 export interface LocalTransaction {
@@ -22,6 +24,9 @@ export interface LocalTransaction {
     amount: number;
     date: string;
     notes?: string;
+    reason?: string;
+    deleted_at?: string | null;
+    created_at?: string;
     last_updated: number; // For conflict resolution
 }
 
@@ -42,6 +47,92 @@ export interface SyncQueue {
     timestamp: number;
 }
 
+/**
+ * Income / expense totals computed from local transactions
+ */
+export interface LocalTotals {
+    income: number;
+    expense: number;
+    balance: number;
+    count: number;
+}
+
+/**
+ * Per-car totals; partial when they only cover the transactions cached locally
+ */
+export interface LocalCarTotals extends LocalTotals {
+    partial: boolean;
+}
+
+/**
+ * get_car_profit_summary row (car + all-time totals)
+ */
+export interface CarTotalsRow {
+    car: object;
+    total_income: number;
+    total_expense: number;
+}
+
+const emptyTotals = (): LocalTotals => ({ income: 0, expense: 0, balance: 0, count: 0 });
+
+const addToTotals = (totals: LocalTotals, tx: LocalTransaction) => {
+    const amount = Number(tx.amount) || 0;
+    if (tx.type === 'income') totals.income += amount;
+    else totals.expense += amount;
+    totals.balance = totals.income - totals.expense;
+    totals.count++;
+};
+
+const isLive = (tx: LocalTransaction) => !tx.deleted_at;
+
+/**
+ * Resume state of an interrupted tenant backup export (lib/tenantBackup.ts)
+ */
+export interface BackupCheckpoint {
+    id: string; // org_id (one export in flight per org)
+    org_id: string;
+    started_at: string;
+    units: Record<string, { done: boolean; cursor: string | null; rows: number }>;
+    updated_at: number;
+    /** Id of the backup being produced */
+    backup_id?: string;
+    /** Differential export: backup it is based on (null/undefined = full export) */
+    parent_id?: string | null;
+    since?: string | null;
+}
+
+/**
+ * One fetched page of a backup export, kept on disk until the export completes
+ */
+export interface BackupPage {
+    id?: number;
+    job_id: string;
+    unit: string;
+    rows: Record<string, unknown>[];
+}
+
+/**
+ * localStorage prefix of the incremental transaction sync markers
+ * (`<prefix><org_id>:<from date>` → cursor of the newest row written)
+ */
+export const TX_SYNC_MARKER_PREFIX = 'myfleet_tx_synced_';
+
+/**
+ * Forget sync markers whenever cached transactions are wiped, so the next
+ * sync starts with a full fetch
+ * @param orgId - Only this organization's markers; all when omitted
+ */
+export const clearTransactionSyncMarkers = (orgId?: string) => {
+    const prefix = orgId ? `${TX_SYNC_MARKER_PREFIX}${orgId}:` : TX_SYNC_MARKER_PREFIX;
+    try {
+        Object.keys(localStorage)
+            .filter(key => key.startsWith(prefix))
+            .forEach(key => localStorage.removeItem(key));
+    } catch {
+        // Storage unavailable: nothing to clear
+    }
+};
+
 export class MyFleetDB extends Dexie {
     cars!: Table<LocalCar>;
     transactions!: Table<LocalTransaction>;
@@ -49,6 +140,8 @@ export class MyFleetDB extends Dexie {
     profiles!: Table<Profile>;
     expenseTemplates!: Table<ExpenseTemplate>;
     syncQueue!: Table<SyncQueue>;
+    backupCheckpoints!: Table<BackupCheckpoint>;
+    backupPages!: Table<BackupPage>;
 
     constructor() {
         super('MyFleetDB');
@@ -60,6 +153,179 @@ export class MyFleetDB extends Dexie {
             expenseTemplates: 'id, user_id, title, is_active',
             syncQueue: '++id, table, action, timestamp'
         });
+        // v3: compound indexes for the local query layer (offline-first screens)
+        this.version(3).stores({
+            cars: 'id, org_id, plate_number, status, last_updated, [org_id+status]',
+            transactions: 'id, org_id, car_id, date, type, last_updated, [org_id+date], [car_id+type]'
+        });
+        // v4: checkpoints so large backup exports can resume after a network failure
+        this.version(4).stores({
+            backupCheckpoints: 'id, org_id, updated_at',
+            backupPages: '++id, job_id, [job_id+unit]'
+        });
+    }
+
+    // ------------------------------------------------------------------
+    // Local Query API
+    // ------------------------------------------------------------------
+
+    /**
+     * Cars of an organization, optionally narrowed to a single status
+     */
+    getCarsByStatus(orgId: string, status?: string): Promise<LocalCar[]> {
+        if (status) {
+            return this.cars.where('[org_id+status]').equals([orgId, status]).toArray();
+        }
+        return this.cars.where('org_id').equals(orgId).toArray();
+    }
+
+    /**
+     * Count cars of an organization, optionally narrowed to a single status
+     */
+    countCars(orgId: string, status?: string): Promise<number> {
+        if (status) {
+            return this.cars.where('[org_id+status]').equals([orgId, status]).count();
+        }
+        return this.cars.where('org_id').equals(orgId).count();
+    }
+
+    /**
+     * Non-deleted transactions of an organization between two dates (inclusive), sorted by date
+     * @param from - ISO date (YYYY-MM-DD), omit for no lower bound
+     * @param to - ISO date (YYYY-MM-DD), omit for no upper bound
+     */
+    getTransactionsInRange(orgId: string, from?: string, to?: string): Promise<LocalTransaction[]> {
+        return this.transactions
+            .where('[org_id+date]')
+            .between([orgId, from ?? Dexie.minKey], [orgId, to ?? Dexie.maxKey], true, true)
+            .filter(isLive)
+            .toArray();
+    }
+
+    /**
+     * Income / expense totals of an organization between two dates (inclusive)
+     */
+    async sumTransactionsInRange(orgId: string, from?: string, to?: string): Promise<LocalTotals> {
+        const totals = emptyTotals();
+        await this.transactions
+            .where('[org_id+date]')
+            .between([orgId, from ?? Dexie.minKey], [orgId, to ?? Dexie.maxKey], true, true)
+            .filter(isLive)
+            .each(tx => addToTotals(totals, tx));
+        return totals;
+    }
+
+    /**
+     * Income / expense totals of a single car
+     */
+    async getCarTotals(carId: string): Promise<LocalTotals> {
+        const totals = emptyTotals();
+        const [income, expense] = await Promise.all([
+            this.transactions.where('[car_id+type]').equals([carId, 'income']).filter(isLive).toArray(),
+            this.transactions.where('[car_id+type]').equals([carId, 'expense']).filter(isLive).toArray()
+        ]);
+        income.forEach(tx => addToTotals(totals, tx));
+        expense.forEach(tx => addToTotals(totals, tx));
+        return totals;
+    }
+
+    /**
+     * Per-car totals for a whole organization in a single index scan
+     * @returns Map of car_id -> totals (cars without transactions are absent)
+     */
+    async getCarTotalsByOrg(orgId: string, from?: string, to?: string): Promise<Map<string, LocalTotals>> {
+        const byCar = new Map<string, LocalTotals>();
+        await this.transactions
+            .where('[org_id+date]')
+            .between([orgId, from ?? Dexie.minKey], [orgId, to ?? Dexie.maxKey], true, true)
+            .filter(isLive)
+            .each(tx => {
+                if (!tx.car_id) return;
+                let totals = byCar.get(tx.car_id);
+                if (!totals) {
+                    totals = emptyTotals();
+                    byCar.set(tx.car_id, totals);
+                }
+                addToTotals(totals, tx);
+            });
+        return byCar;
+    }
+
+    /**
+     * Per-car all-time totals for the offline inventory
+     *
+     * Only the latest transactions are cached locally, so a plain sum is too
+     * low for cars with older history. Cars stored with server_totals start
+     * from those and add the transactions created on this device after they
+     * were taken. A local edit or delete of a row the server totals already
+     * include cannot be applied as a delta, so such a car (and any car
+     * without server totals) falls back to the local sum, marked partial.
+     */
+    async getCarStatsByOrg(orgId: string): Promise<Map<string, LocalCarTotals>> {
+        const server = new Map<string, NonNullable<LocalCar['server_totals']>>();
+        const added = new Map<string, LocalTotals>();
+        const localSum = new Map<string, LocalTotals>();
+        const diverged = new Set<string>();
+
+        const bucket = (map: Map<string, LocalTotals>, carId: string) => {
+            let totals = map.get(carId);
+            if (!totals) {
+                totals = emptyTotals();
+                map.set(carId, totals);
+            }
+            return totals;
+        };
+
+        await this.cars.where('org_id').equals(orgId).each(car => {
+            if (car.id && car.server_totals) server.set(car.id, car.server_totals);
+        });
+
+        await this.transactions
+            .where('[org_id+date]')
+            .between([orgId, Dexie.minKey], [orgId, Dexie.maxKey], true, true)
+            .each(tx => {
+                if (!tx.car_id) return;
+                if (isLive(tx)) addToTotals(bucket(localSum, tx.car_id), tx);
+
+                const snapshot = server.get(tx.car_id);
+                if (!snapshot || !((tx.last_updated || 0) > snapshot.synced_at)) return;
+
+                const createdAt = tx.created_at ? Date.parse(tx.created_at) : NaN;
+                if (createdAt > snapshot.synced_at) {
+                    // Created after the snapshot: not part of server_totals
+                    if (isLive(tx)) addToTotals(bucket(added, tx.car_id), tx);
+                } else {
+                    diverged.add(tx.car_id);
+                }
+            });
+
+        const byCar = new Map<string, LocalCarTotals>();
+        server.forEach((snapshot, carId) => {
+            if (diverged.has(carId)) return;
+            const extra = added.get(carId) ?? emptyTotals();
+            const income = snapshot.income + extra.income;
+            const expense = snapshot.expense + extra.expense;
+            byCar.set(carId, { income, expense, balance: income - expense, count: extra.count, partial: false });
+        });
+        localSum.forEach((totals, carId) => {
+            if (!byCar.has(carId)) byCar.set(carId, { ...totals, partial: true });
+        });
+        return byCar;
+    }
+
+    /**
+     * Store cars together with their server-side totals
+     */
+    putCarsWithTotals(rows: CarTotalsRow[]) {
+        const syncedAt = Date.now();
+        return this.cars.bulkPut(rows.map(row => ({
+            ...(row.car as unknown as LocalCar),
+            server_totals: {
+                income: Number(row.total_income) || 0,
+                expense: Number(row.total_expense) || 0,
+                synced_at: syncedAt
+            }
+        })));
     }
 }
 
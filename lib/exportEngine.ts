@@ -0,0 +1,226 @@
+/**
+ * @file exportEngine.ts
+ * @description Streaming exports of large tables (CSV / NDJSON / XLSX)
+ *
+ * Paging and encoding run in a Web Worker (lib/exportWorker.ts); this module
+ * only moves the encoded chunks into a file sink:
+ * - File System Access API (showSaveFilePicker): chunks go straight to disk,
+ *   memory stays constant regardless of row count
+ * - Fallback: chunks are kept as Blob parts and downloaded at the end
+ *   (no giant string is ever built)
+ *
+ * Usage:
+ * ```typescript
+ * await runExport({
+ *   table: 'transactions',
+ *   filters: { org_id: `eq.${orgId}`, deleted_at: 'is.null' },
+ *   format: 'xlsx',
+ *   filename: 'transactions',
+ *   onProgress: ({ rows, total }) => setProgress(rows / (total || rows))
+ * });
+ * ```
+ */
+
+import { SUPABASE_CONFIG } from './supabaseClient';
+import { getAccessToken, refreshAccessToken } from './apiClient';
+import {
+    createRowEncoder,
+    EXPORT_EXTENSIONS,
+    EXPORT_MIME_TYPES,
+    ExportFormat,
+    ExportRow
+} from './exportFormats';
+import type { ExportJob, ExportWorkerRequest, ExportWorkerResponse } from './exportWorker';
+
+// ====================================================================
+// Types
+// ====================================================================
+
+export interface ExportSource {
+    table: string;
+    select?: string;
+    /** Raw PostgREST filters, e.g. { org_id: 'eq.<uuid>' } */
+    filters?: Record<string, string>;
+    orderColumn?: string;
+    pageSize?: number;
+}
+
+export interface ExportProgress {
+    rows: number;
+    total: number | null;
+}
+
+export interface ExportOptions extends ExportSource {
+    format: ExportFormat;
+    /** File name without extension */
+    filename: string;
+    columns?: string[];
+    sheetName?: string;
+    onProgress?: (progress: ExportProgress) => void;
+    signal?: AbortSignal;
+}
+
+interface FileSink {
+    write(chunk: Uint8Array): Promise<void>;
+    close(): Promise<void>;
+    abort(): Promise<void>;
+}
+
+// ====================================================================
+// Sinks
+// ====================================================================
+
+type SaveFilePicker = (options: {
+    suggestedName: string;
+    types?: { description: string; accept: Record<string, string[]> }[];
+}) => Promise<{ createWritable(): Promise<{ write(data: Uint8Array): Promise<void>; close(): Promise<void>; abort(): Promise<void> }> }>;
+
+const triggerDownload = (blob: Blob, filename: string) => {
+    const url = URL.createObjectURL(blob);
+    const link = document.createElement('a');
+    link.href = url;
+    link.download = filename;
+    document.body.appendChild(link);
+    link.click();
+    document.body.removeChild(link);
+    setTimeout(() => URL.revokeObjectURL(url), 1000);
+};
+
+const createBlobSink = (filename: string, mimeType: string): FileSink => {
+    let parts: BlobPart[] = [];
+    return {
+        async write(chunk) {
+            parts.push(chunk);
+        },
+        async close() {
+            triggerDownload(new Blob(parts, { type: mimeType }), filename);
+            parts = [];
+        },
+        async abort() {
+            parts = [];
+        }
+    };
+};
+
+/**
+ * Open a sink for the export. Must be called directly from a user gesture
+ * (before any other await) so the save dialog is allowed to open.
+ */
+const openFileSink = async (filename: string, format: ExportFormat): Promise<FileSink> => {
+    const mimeType = EXPORT_MIME_TYPES[format];
+    const picker = (globalThis as unknown as { showSaveFilePicker?: SaveFilePicker }).showSaveFilePicker;
+    if (typeof picker === 'function') {
+        try {
+            const handle = await picker({
+                suggestedName: filename,
+                types: [{ description: format.toUpperCase(), accept: { [mimeType.split(';')[0]]: [`.${EXPORT_EXTENSIONS[format]}`] } }]
+            });
+            const writable = await handle.createWritable();
+            return {
+                write: chunk => writable.write(chunk),
+                close: () => writable.close(),
+                abort: () => writable.abort()
+            };
+        } catch (error) {
+            if ((error as DOMException)?.name === 'AbortError') throw error;
+            console.warn('⚠️ [Export] File picker unavailable, falling back to download:', error);
+        }
+    }
+    return createBlobSink(filename, mimeType);
+};
+
+const buildFilename = (name: string, format: ExportFormat) =>
+    `${name.replace(/[^\w\u0600-\u06FF-]+/g, '_')}_${new Date().toISOString().slice(0, 10)}.${EXPORT_EXTENSIONS[format]}`;
+
+// ====================================================================
+// Public API
+// ====================================================================
+
+/**
+ * Export a whole table (or filtered slice) without loading it into memory
+ * @returns Number of exported rows
+ */
+export const runExport = async (options: ExportOptions): Promise<number> => {
+    const sink = await openFileSink(buildFilename(options.filename, options.format), options.format);
+    const accessToken = await getAccessToken();
+
+    const job: ExportJob = {
+        restUrl: SUPABASE_CONFIG.restUrl,
+        apiKey: SUPABASE_CONFIG.anonKey,
+        accessToken,
+        table: options.table,
+        select: options.select,
+        filters: options.filters,
+        orderColumn: options.orderColumn,
+        pageSize: options.pageSize,
+        format: options.format,
+        columns: options.columns,
+        sheetName: options.sheetName
+    };
+
+    const worker = new Worker(new URL('./exportWorker.ts', import.meta.url), { type: 'module' });
+    const send = (message: ExportWorkerRequest) => worker.postMessage(message);
+    console.log(`📤 [Export] ${options.table} → ${options.format}`);
+
+    try {
+        return await new Promise<number>((resolve, reject) => {
+            // Writes are chained so chunks land in order; the ack is sent once a page is on disk
+            let writes = Promise.resolve();
+
+            const onAbort = () => {
+                send({ type: 'cancel' });
+                reject(new DOMException('Export cancelled', 'AbortError'));
+            };
+            options.signal?.addEventListener('abort', onAbort, { once: true });
+
+            worker.onmessage = (event: MessageEvent<ExportWorkerResponse>) => {
+                const message = event.data;
+                switch (message.type) {
+                    case 'chunk':
+                        writes = writes.then(() => sink.write(message.chunk));
+                        break;
+                    case 'progress':
+                        options.onProgress?.({ rows: message.rows, total: message.total });
+                        writes.then(() => send({ type: 'ack' }), reject);
+                        break;
+                    case 'token_request':
+                        refreshAccessToken()
+                            .then(token => send({ type: 'token', accessToken: token }))
+                            .catch(() => send({ type: 'token', accessToken: null }));
+                        break;
+                    case 'done':
+                        writes.then(() => sink.close()).then(() => resolve(message.rows), reject);
+                        break;
+                    case 'error':
+                        reject(new Error(message.message));
+                        break;
+                }
+            };
+            worker.onerror = event => reject(new Error(event.message || 'Export worker failed'));
+
+            send({ type: 'start', job });
+        });
+    } catch (error) {
+        await sink.abort().catch(() => { /* already closed */ });
+        throw error;
+    } finally {
+        worker.terminate();
+    }
+};
+
+/**
+ * Export rows that are already in memory (small, pre-filtered lists)
+ */
+export const exportRows = async (
+    rows: ExportRow[],
+    format: ExportFormat,
+    filename: string,
+    options: { columns?: string[]; sheetName?: string } = {}
+): Promise<void> => {
+    const sink = await openFileSink(buildFilename(filename, format), format);
+    const encoder = createRowEncoder(format, options.columns, options.sheetName);
+    for (const chunk of [...encoder.write(rows), ...encoder.finish()]) {
+        await sink.write(chunk);
+    }
+    await sink.close();
+};
@@ -0,0 +1,328 @@
+/**
+ * @file exportFormats.ts
+ * @description Incremental encoders for data exports (CSV, NDJSON, XLSX)
+ *
+ * Every encoder turns batches of rows into Uint8Array chunks as they arrive,
+ * so an export never holds the whole file in memory:
+ * - CSV: UTF-8 with BOM so Excel shows Arabic text correctly
+ * - NDJSON: one JSON object per line
+ * - XLSX: a single-sheet workbook written as a streaming ZIP (stored entries
+ *   with data descriptors, CRC-32 computed on the fly)
+ *
+ * This module has no DOM / Supabase dependencies so it can run inside
+ * the export Web Worker (lib/exportWorker.ts).
+ */
+
+// ====================================================================
+// Types
+// ====================================================================
+
+export type ExportFormat = 'csv' | 'ndjson' | 'xlsx';
+
+export type ExportRow = Record<string, unknown>;
+
+export interface RowEncoder {
+    /** Encode a batch of rows (the first batch fixes the column list when none was given) */
+    write(rows: ExportRow[]): Uint8Array[];
+    /** Flush trailing bytes (closing tags, ZIP central directory) */
+    finish(): Uint8Array[];
+}
+
+export const EXPORT_MIME_TYPES: Record<ExportFormat, string> = {
+    csv: 'text/csv;charset=utf-8',
+    ndjson: 'application/x-ndjson;charset=utf-8',
+    xlsx: 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+};
+
+export const EXPORT_EXTENSIONS: Record<ExportFormat, string> = {
+    csv: 'csv',
+    ndjson: 'ndjson',
+    xlsx: 'xlsx'
+};
+
+// ====================================================================
+// Shared Helpers
+// ====================================================================
+
+const encoder = new TextEncoder();
+
+const cellText = (value: unknown): string => {
+    if (value === null || value === undefined) return '';
+    if (typeof value === 'object') return JSON.stringify(value);
+    return String(value);
+};
+
+const columnsOf = (rows: ExportRow[]): string[] => {
+    const seen = new Set<string>();
+    rows.forEach(row => Object.keys(row).forEach(key => seen.add(key)));
+    return Array.from(seen);
+};
+
+// ====================================================================
+// CSV
+// ====================================================================
+
+const csvEscape = (value: unknown): string => {
+    const text = cellText(value);
+    return /[",\r\n]/.test(text) ? `"${text.replace(/"/g, '""')}"` : text;
+};
+
+export const createCsvEncoder = (columns?: string[]): RowEncoder => {
+    let cols = columns && columns.length > 0 ? columns : null;
+    let started = false;
+
+    return {
+        write(rows) {
+            if (rows.length === 0 && started) return [];
+            let out = '';
+            if (!started) {
+                cols = cols || columnsOf(rows);
+                out += '\uFEFF' + cols.map(csvEscape).join(',') + '\r\n';
+                started = true;
+            }
+            for (const row of rows) {
+                out += (cols as string[]).map(col => csvEscape(row[col])).join(',') + '\r\n';
+            }
+            return out ? [encoder.encode(out)] : [];
+        },
+        finish() {
+            return [];
+        }
+    };
+};
+
+// ====================================================================
+// NDJSON
+// ====================================================================
+
+export const createNdjsonEncoder = (): RowEncoder => ({
+    write(rows) {
+        if (rows.length === 0) return [];
+        return [encoder.encode(rows.map(row => JSON.stringify(row)).join('\n') + '\n')];
+    },
+    finish() {
+        return [];
+    }
+});
+
+// ====================================================================
+// CRC-32 (ZIP)
+// ====================================================================
+
+const CRC_TABLE = (() => {
+    const table = new Uint32Array(256);
+    for (let n = 0; n < 256; n++) {
+        let c = n;
+        for (let k = 0; k < 8; k++) c = c & 1 ? 0xEDB88320 ^ (c >>> 1) : c >>> 1;
+        table[n] = c >>> 0;
+    }
+    return table;
+})();
+
+export const crc32Update = (crc: number, bytes: Uint8Array): number => {
+    let c = crc ^ 0xFFFFFFFF;
+    for (let i = 0; i < bytes.length; i++) c = CRC_TABLE[(c ^ bytes[i]) & 0xFF] ^ (c >>> 8);
+    return (c ^ 0xFFFFFFFF) >>> 0;
+};
+
+// ====================================================================
+// Streaming ZIP writer (stored entries, data descriptors)
+// ====================================================================
+
+interface ZipEntryRecord {
+    name: Uint8Array;
+    crc: number;
+    size: number;
+    offset: number;
+}
+
+const DOS_TIME = 0;
+const DOS_DATE = (1 << 5) | 1; // 1980-01-01
+const FLAG_DATA_DESCRIPTOR = 0x0008;
+const FLAG_UTF8 = 0x0800;
+
+class ZipStreamWriter {
+    private offset = 0;
+    private entries: ZipEntryRecord[] = [];
+    private current: ZipEntryRecord | null = null;
+
+    private track(chunk: Uint8Array): Uint8Array {
+        this.offset += chunk.length;
+        return chunk;
+    }
+
+    beginEntry(name: string): Uint8Array[] {
+        const nameBytes = encoder.encode(name);
+        const header = new Uint8Array(30 + nameBytes.length);
+        const view = new DataView(header.buffer);
+        view.setUint32(0, 0x04034b50, true);
+        view.setUint16(4, 20, true);
+        view.setUint16(6, FLAG_DATA_DESCRIPTOR | FLAG_UTF8, true);
+        view.setUint16(8, 0, true); // stored
+        view.setUint16(10, DOS_TIME, true);
+        view.setUint16(12, DOS_DATE, true);
+        // crc / sizes are written in the data descriptor
+        view.setUint16(26, nameBytes.length, true);
+        header.set(nameBytes, 30);
+
+        this.current = { name: nameBytes, crc: 0, size: 0, offset: this.offset };
+        return [this.track(header)];
+    }
+
+    writeData(chunk: Uint8Array): Uint8Array[] {
+        if (!this.current || chunk.length === 0) return [];
+        this.current.crc = crc32Update(this.current.crc, chunk);
+        this.current.size += chunk.length;
+        return [this.track(chunk)];
+    }
+
+    endEntry(): Uint8Array[] {
+        const entry = this.current;
+        if (!entry) return [];
+        const descriptor = new Uint8Array(16);
+        const view = new DataView(descriptor.buffer);
+        view.setUint32(0, 0x08074b50, true);
+        view.setUint32(4, entry.crc, true);
+        view.setUint32(8, entry.size, true);
+        view.setUint32(12, entry.size, true);
+        this.entries.push(entry);
+        this.current = null;
+        return [this.track(descriptor)];
+    }
+
+    addFile(name: string, content: string): Uint8Array[] {
+        return [...this.beginEntry(name), ...this.writeData(encoder.encode(content)), ...this.endEntry()];
+    }
+
+    finish(): Uint8Array[] {
+        const chunks: Uint8Array[] = [];
+        const centralStart = this.offset;
+        for (const entry of this.entries) {
+            const record = new Uint8Array(46 + entry.name.length);
+            const view = new DataView(record.buffer);
+            view.setUint32(0, 0x02014b50, true);
+            view.setUint16(4, 20, true);
+            view.setUint16(6, 20, true);
+            view.setUint16(8, FLAG_DATA_DESCRIPTOR | FLAG_UTF8, true);
+            view.setUint16(10, 0, true);
+            view.setUint16(12, DOS_TIME, true);
+            view.setUint16(14, DOS_DATE, true);
+            view.setUint32(16, entry.crc, true);
+            view.setUint32(20, entry.size, true);
+            view.setUint32(24, entry.size, true);
+            view.setUint16(28, entry.name.length, true);
+            view.setUint32(42, entry.offset, true);
+            record.set(entry.name, 46);
+            chunks.push(this.track(record));
+        }
+        const centralSize = this.offset - centralStart;
+        const end = new Uint8Array(22);
+        const view = new DataView(end.buffer);
+        view.setUint32(0, 0x06054b50, true);
+        view.setUint16(8, this.entries.length, true);
+        view.setUint16(10, this.entries.length, true);
+        view.setUint32(12, centralSize, true);
+        view.setUint32(16, centralStart, true);
+        chunks.push(this.track(end));
+        return chunks;
+    }
+}
+
+// ====================================================================
+// XLSX (single sheet, inline strings)
+// ====================================================================
+
+const xmlEscape = (text: string): string =>
+    text
+        // Characters not allowed in XML 1.0
+        .replace(/[\u0000-\u0008\u000B\u000C\u000E-\u001F]/g, '')
+        .replace(/&/g, '&amp;')
+        .replace(/</g, '&lt;')
+        .replace(/>/g, '&gt;')
+        .replace(/"/g, '&quot;');
+
+const xlsxCell = (value: unknown): string => {
+    if (typeof value === 'number' && Number.isFinite(value)) return `<c t="n"><v>${value}</v></c>`;
+    if (typeof value === 'boolean') return `<c t="b"><v>${value ? 1 : 0}</v></c>`;
+    const text = cellText(value);
+    if (text === '') return '<c/>';
+    return `<c t="inlineStr"><is><t xml:space="preserve">${xmlEscape(text)}</t></is></c>`;
+};
+
+const XLSX_STATIC_FILES: [string, string][] = [
+    ['[Content_Types].xml',
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>' +
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">' +
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>' +
+        '<Default Extension="xml" ContentType="application/xml"/>' +
+        '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>' +
+        '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>' +
+        '</Types>'],
+    ['_rels/.rels',
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>' +
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">' +
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>' +
+        '</Relationships>'],
+    ['xl/_rels/workbook.xml.rels',
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>' +
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">' +
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>' +
+        '</Relationships>']
+];
+
+export const createXlsxEncoder = (columns?: string[], sheetName = 'Sheet1', rightToLeft = true): RowEncoder => {
+    const zip = new ZipStreamWriter();
+    let cols = columns && columns.length > 0 ? columns : null;
+    let started = false;
+
+    const start = (rows: ExportRow[]): Uint8Array[] => {
+        cols = cols || columnsOf(rows);
+        started = true;
+        const chunks: Uint8Array[] = [];
+        XLSX_STATIC_FILES.forEach(([name, content]) => chunks.push(...zip.addFile(name, content)));
+        chunks.push(...zip.addFile('xl/workbook.xml',
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>' +
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">' +
+            `<sheets><sheet name="${xmlEscape(sheetName.slice(0, 31))}" sheetId="1" r:id="rId1"/></sheets>` +
+            '</workbook>'));
+        chunks.push(...zip.beginEntry('xl/worksheets/sheet1.xml'));
+        chunks.push(...zip.writeData(encoder.encode(
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>' +
+            '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">' +
+            `<sheetViews><sheetView workbookViewId="0"${rightToLeft ? ' rightToLeft="1"' : ''}/></sheetViews>` +
+            '<sheetData>' +
+            `<row>${cols.map(xlsxCell).join('')}</row>`
+        )));
+        return chunks;
+    };
+
+    return {
+        write(rows) {
+            const chunks = started ? [] : start(rows);
+            if (rows.length > 0) {
+                const xml = rows.map(row => `<row>${(cols as string[]).map(col => xlsxCell(row[col])).join('')}</row>`).join('');
+                chunks.push(...zip.writeData(encoder.encode(xml)));
+            }
+            return chunks;
+        },
+        finish() {
+            const chunks = started ? [] : start([]);
+            chunks.push(...zip.writeData(encoder.encode('</sheetData></worksheet>')));
+            chunks.push(...zip.endEntry());
+            chunks.push(...zip.finish());
+            return chunks;
+        }
+    };
+};
+
+// ====================================================================
+// Factory
+// ====================================================================
+
+export const createRowEncoder = (format: ExportFormat, columns?: string[], sheetName?: string): RowEncoder => {
+    switch (format) {
+        case 'csv': return createCsvEncoder(columns);
+        case 'ndjson': return createNdjsonEncoder();
+        case 'xlsx': return createXlsxEncoder(columns, sheetName);
+    }
+};
@@ -0,0 +1,182 @@
+/**
+ * @file exportWorker.ts
+ * @description Web Worker that pages a table out of PostgREST and encodes it
+ *
+ * The worker fetches one page at a time (keyset on an ordered column + a
+ * Range header for the page size), encodes it with lib/exportFormats.ts and
+ * transfers the bytes to the main thread. It waits for an `ack` after every
+ * page, so a slow disk write throttles the network instead of piling data
+ * up in memory.
+ *
+ * Protocol:
+ * - main → worker: start { job } | ack | token { accessToken } | cancel
+ * - worker → main: chunk { chunk } | progress { rows, total } | token_request | done { rows } | error { message }
+ */
+
+import { createRowEncoder, ExportFormat, ExportRow } from './exportFormats';
+
+// ====================================================================
+// Types
+// ====================================================================
+
+export interface ExportJob {
+    /** `${SUPABASE_URL}/rest/v1` */
+    restUrl: string;
+    apiKey: string;
+    accessToken: string | null;
+    table: string;
+    select?: string;
+    /** Raw PostgREST filters, e.g. { org_id: 'eq.<uuid>', deleted_at: 'is.null' } */
+    filters?: Record<string, string>;
+    /** Unique, sortable column used as the keyset cursor */
+    orderColumn?: string;
+    pageSize?: number;
+    format: ExportFormat;
+    columns?: string[];
+    sheetName?: string;
+}
+
+export type ExportWorkerRequest =
+    | { type: 'start'; job: ExportJob }
+    | { type: 'ack' }
+    | { type: 'token'; accessToken: string | null }
+    | { type: 'cancel' };
+
+export type ExportWorkerResponse =
+    | { type: 'chunk'; chunk: Uint8Array }
+    | { type: 'progress'; rows: number; total: number | null }
+    | { type: 'token_request' }
+    | { type: 'done'; rows: number }
+    | { type: 'error'; message: string };
+
+// ====================================================================
+// State
+// ====================================================================
+
+const DEFAULT_PAGE_SIZE = 1000;
+
+let cancelled = false;
+let accessToken: string | null = null;
+let pendingAck: (() => void) | null = null;
+let pendingToken: (() => void) | null = null;
+
+const post = (message: ExportWorkerResponse, transfer: Transferable[] = []) =>
+    (self as unknown as Worker).postMessage(message, transfer);
+
+const waitFor = (slot: 'ack' | 'token') => new Promise<void>(resolve => {
+    if (slot === 'ack') pendingAck = resolve;
+    else pendingToken = resolve;
+});
+
+// ====================================================================
+// Paging
+// ====================================================================
+
+const buildUrl = (job: ExportJob, orderColumn: string, select: string, cursor: unknown) => {
+    const params = new URLSearchParams();
+    params.set('select', select);
+    Object.entries(job.filters || {}).forEach(([column, filter]) => params.append(column, filter));
+    params.set('order', `${orderColumn}.asc`);
+    if (cursor !== undefined && cursor !== null) params.append(orderColumn, `gt.${cursor}`);
+    return `${job.restUrl}/${encodeURIComponent(job.table)}?${params.toString()}`;
+};
+
+const fetchPage = async (job: ExportJob, url: string, pageSize: number, withCount: boolean): Promise<Response> => {
+    for (let attempt = 0; ; attempt++) {
+        const headers: Record<string, string> = {
+            apikey: job.apiKey,
+            Accept: 'application/json',
+            'Range-Unit': 'items',
+            Range: `0-${pageSize - 1}`
+        };
+        if (accessToken) headers.Authorization = `Bearer ${accessToken}`;
+        if (withCount) headers.Prefer = 'count=exact';
+
+        const response = await fetch(url, { headers });
+        if (response.status === 401 && attempt === 0) {
+            // Long exports can outlive the access token: ask the main thread for a fresh one
+            post({ type: 'token_request' });
+            await waitFor('token');
+            continue;
+        }
+        if (!response.ok && response.status !== 206) {
+            const text = await response.text().catch(() => '');
+            throw new Error(`${job.table}: ${response.status} ${text.slice(0, 200)}`);
+        }
+        return response;
+    }
+};
+
+const parseTotal = (response: Response): number | null => {
+    const range = response.headers.get('Content-Range');
+    const total = range?.split('/')[1];
+    return total && total !== '*' ? Number(total) : null;
+};
+
+const runJob = async (job: ExportJob) => {
+    const orderColumn = job.orderColumn || 'id';
+    const pageSize = job.pageSize || DEFAULT_PAGE_SIZE;
+    const requested = job.select || '*';
+    const needsCursorColumn = requested !== '*' && !requested.split(',').map(c => c.trim()).includes(orderColumn);
+    const select = needsCursorColumn ? `${requested},${orderColumn}` : requested;
+    const encoder = createRowEncoder(job.format, job.columns, job.sheetName);
+
+    let cursor: unknown;
+    let rowsDone = 0;
+    let total: number | null = null;
+
+    const emit = (chunks: Uint8Array[]) => chunks.forEach(chunk => post({ type: 'chunk', chunk }, [chunk.buffer]));
+
+    while (!cancelled) {
+        const response = await fetchPage(job, buildUrl(job, orderColumn, select, cursor), pageSize, rowsDone === 0);
+        if (rowsDone === 0) total = parseTotal(response);
+        const rows = (await response.json()) as ExportRow[];
+        if (rows.length === 0) break;
+
+        cursor = rows[rows.length - 1][orderColumn];
+        if (needsCursorColumn) rows.forEach(row => delete row[orderColumn]);
+
+        emit(encoder.write(rows));
+        rowsDone += rows.length;
+        post({ type: 'progress', rows: rowsDone, total });
+
+        // Back-pressure: the next page is fetched only after the sink consumed this one
+        await waitFor('ack');
+        if (rows.length < pageSize) break;
+    }
+
+    if (cancelled) return;
+    emit(encoder.finish());
+    post({ type: 'done', rows: rowsDone });
+};
+
+// ====================================================================
+// Message Handling
+// ====================================================================
+
+self.onmessage = (event: MessageEvent<ExportWorkerRequest>) => {
+    const message = event.data;
+    switch (message.type) {
+        case 'start':
+            cancelled = false;
+            accessToken = message.job.accessToken;
+            runJob(message.job).catch(error => {
+                post({ type: 'error', message: error instanceof Error ? error.message : String(error) });
+            });
+            break;
+        case 'ack':
+            pendingAck?.();
+            pendingAck = null;
+            break;
+        case 'token':
+            accessToken = message.accessToken;
+            pendingToken?.();
+            pendingToken = null;
+            break;
+        case 'cancel':
+            cancelled = true;
+            pendingAck?.();
+            pendingAck = null;
+            break;
+    }
+};
@@ -1,18 +1,22 @@
 /// <reference types="vite/client" />
 /**
  * Health Monitor Service
- * @description Background service that monitors system health and logs incidents
+ * @description Reads the server-side health snapshot and probes external services
  *
- * Monitors:
- * - WhatsApp message delivery failures
- * - Subscription activation failures
- * - API errors (5xx responses)
- * - Critical backend process failures
+ * Failure rates, latency percentiles, queue depths and incidents are computed
+ * by compute_health_metrics() on the server (pg_cron); incidents there are
+ * de-duplicated by fingerprint. The client:
+ * - probes the WhatsApp service (unreachable from the database) and reports
+ *   the raw result with record_health_probe()
+ * - reads one precomputed snapshot with get_health_snapshot()
  *
- * Runs every 5 minutes automatically
+ * Runs every 5 minutes automatically, in one tab only (tabCoordinator);
+ * the snapshot is shared with the other tabs
  */
 
 import { supabase } from './supabaseClient';
+import { getPollingInterval } from './realtimeManager';
+import { runLeaderTask, LeaderTaskHandle } from './tabCoordinator';
 
 // Incident types
 export type IncidentType = 'whatsapp_failure' | 'subscription_failure' | 'api_error' | 'process_failure' | 'database_error';
@@ -28,6 +32,10 @@ export interface SystemIncident {
   resolved: boolean;
   created_at: string;
   time_ago?: string;
+  fingerprint?: string | null;
+  /** Times the same open incident was reported (de-duplicated by fingerprint) */
+  occurrences?: number;
+  last_seen_at?: string | null;
 }
 
 export interface HealthCheckResult {
@@ -40,6 +48,44 @@ export interface HealthCheckResult {
   };
 }
 
+export interface HealthSnapshot {
+  status: HealthCheckResult['status'];
+  message: string;
+  metrics: {
+    whatsapp?: {
+      messages_1h: number;
+      failed_1h: number;
+      failure_rate_1h: number | null;
+      messages_24h: number;
+      failed_24h: number;
+      failure_rate_24h: number | null;
+    };
+    notification_queue?: {
+      pending: number;
+      processing: number;
+      oldest_pending_s: number;
+      failure_rate_24h: number | null;
+    };
+    subscriptions?: { expired_active_trials: number };
+    probes?: Record<string, {
+      samples: number;
+      error_rate: number;
+      p50_ms: number | null;
+      p95_ms: number | null;
+      p99_ms: number | null;
+      last_status: string;
+      last_at: string;
+    }>;
+  };
+  incidents: { critical: number; high: number; raised: string[] };
+  /** Live open-incident counts (read at request time, not by the aggregator) */
+  summary: Pick<HealthSummary, 'total_incidents' | 'critical_count' | 'high_count' | 'medium_count' | 'low_count' | 'resolved_today'>;
+  /** Open incidents, then those resolved in the last 24h (max 100) */
+  incident_list: SystemIncident[];
+  duration_ms: number | null;
+  computed_at: string;
+}
+
 export interface HealthSummary {
   total_incidents: number;
   critical_count: number;
@@ -54,11 +100,15 @@ export interface HealthSummary {
 
 // Configuration
 const HEALTH_CHECK_INTERVAL = 5 * 60 * 1000; // 5 minutes
+const HEALTH_CHECK_BACKOFF_INTERVAL = 15 * 60 * 1000; // 15 minutes while Realtime is connected
 const isDev = import.meta.env.DEV;
 const WHATSAPP_SERVER_URL = import.meta.env.VITE_WHATSAPP_SERVER_URL || (isDev ? 'http://localhost:3002' : '');
 const WHATSAPP_ENABLED = import.meta.env.VITE_WHATSAPP_ENABLED !== 'false'; // Default: enabled
 
-let monitoringInterval: ReturnType<typeof setInterval> | null = null;
+/** Leader task name; onTaskResult(HEALTH_CHECK_TASK) fires with the HealthSnapshot */
+export const HEALTH_CHECK_TASK = 'health_checks';
+
+let monitoringTask: LeaderTaskHandle | null = null;
 let isMonitoring = false;
 
 // =====================================================
@@ -155,6 +205,23 @@ export async function getHealthSummary(): Promise<HealthSummary | null> {
   }
 }
 
+/**
+ * Precomputed health snapshot (one row, refreshed by pg_cron)
+ *
+ * @param refresh - Ask the server to recompute first (at most once a minute)
+ */
+export async function getHealthSnapshot(refresh = false): Promise<HealthSnapshot | null> {
+  try {
+    const { data, error } = await supabase.rpc('get_health_snapshot', { p_refresh: refresh });
+
+    if (error) throw error;
+    return (data as HealthSnapshot | null) ?? null;
+  } catch (e) {
+    console.error('Error fetching health snapshot:', e);
+    return null;
+  }
+}
+
 /**
  * Check overall system health status
  */
@@ -171,170 +238,50 @@ export async function checkSystemHealth(): Promise<HealthCheckResult | null> {
 }
 
 // =====================================================
-// Health Checks
+// External Probes
 // =====================================================
 
 /**
- * Check WhatsApp service health
+ * Probe the WhatsApp service and report the raw result
+ *
+ * The aggregator turns probes into latency percentiles, error rates and
+ * (de-duplicated) incidents.
  */
-async function handleWhatsAppConnectError(e: unknown): Promise<void> {
-  const err = e as Error;
-  const isConnectionRefused =
-    err.message?.includes('Failed to fetch') ||
-    err.message?.includes('ERR_CONNECTION_REFUSED') ||
-    err.name === 'TimeoutError';
-
-  if (isDev) {
-    if (isConnectionRefused) {
-      console.warn('⚠️ [Dev] WhatsApp service not running on', WHATSAPP_SERVER_URL);
-    }
-    return;
-  }
-
-  await logIncident(
-    'whatsapp_failure',
-    'WhatsApp Service Unreachable',
-    `Cannot connect to WhatsApp service: ${err.message}`,
-    'critical',
-    { error: err.message }
-  );
-}
-
-async function checkWhatsAppHealth(): Promise<void> {
+async function probeWhatsAppService(): Promise<void> {
   if (!WHATSAPP_ENABLED || !WHATSAPP_SERVER_URL) return;
 
+  const start = Date.now();
+  let status: 'success' | 'warning' | 'error' | 'critical';
+  let message: string | null = null;
+
   try {
     const response = await fetch(`${WHATSAPP_SERVER_URL}/health`, {
       signal: AbortSignal.timeout(5000)
     });
-
-    if (!response.ok && response.status >= 500 && !isDev) {
-      await logIncident(
-        'whatsapp_failure',
-        'WhatsApp Service Error',
-        `WhatsApp service returned ${response.status}: ${response.statusText}`,
-        'high',
-        { status_code: response.status, url: WHATSAPP_SERVER_URL }
-      );
-    }
-
-    const { data: failedMessages, error } = await supabase
-      .from('whatsapp_messages')
-      .select('id, created_at, error_message')
-      .eq('status', 'failed')
-      .gte('created_at', new Date(Date.now() - 60 * 60 * 1000).toISOString())
-      .limit(10);
-
-    if (!error && failedMessages && failedMessages.length > 5) {
-      await logIncident(
-        'whatsapp_failure',
-        'High WhatsApp Message Failure Rate',
-        `${failedMessages.length} messages failed in the last hour`,
-        'medium',
-        { failed_count: failedMessages.length, recent_failures: failedMessages.slice(0, 5) }
-      );
+    if (response.ok) {
+      status = 'success';
+    } else {
+      status = response.status >= 500 ? 'error' : 'warning';
+      message = `WhatsApp service returned ${response.status}: ${response.statusText}`;
     }
   } catch (e) {
-    await handleWhatsAppConnectError(e);
+    status = 'critical';
+    message = `Cannot connect to WhatsApp service: ${(e as Error).message}`;
   }
-}
-
-/**
- * Check subscription system health
- */
-async function checkSubscriptionHealth(): Promise<void> {
-  try {
-    // Check for failed subscription activations in the last 24 hours
-    const { data: failedSubscriptions, error } = await supabase
-      .from('organizations')
-      .select('id, name, created_at')
-      .eq('subscription_plan', 'trial')
-      .gte('created_at', new Date(Date.now() - 24 * 60 * 60 * 1000).toISOString())
-      .eq('is_active', true)
-      .limit(10);
-
-    if (!error && failedSubscriptions && failedSubscriptions.length > 3) {
-      await logIncident(
-        'subscription_failure',
-        'Multiple Subscription Activation Failures',
-        `${failedSubscriptions.length} trial accounts failed to activate in the last 24 hours`,
-        'high',
-        { failed_count: failedSubscriptions.length, orgs: failedSubscriptions.map(o => o.name) }
-      );
-    }
 
-    // Check for expired trials without action
-    const { data: expiredTrials } = await supabase
-      .from('organizations')
-      .select('id, name, subscription_end')
-      .eq('subscription_plan', 'trial')
-      .lt('subscription_end', new Date().toISOString())
-      .eq('is_active', true)
-      .limit(20);
-
-    if (expiredTrials && expiredTrials.length > 10) {
-      await logIncident(
-        'subscription_failure',
-        'Many Expired Trials Still Active',
-        `${expiredTrials.length} expired trial accounts are still marked as active`,
-        'medium',
-        { expired_count: expiredTrials.length }
-      );
-    }
-  } catch (e) {
-    await logIncident(
-      'process_failure',
-      'Subscription Health Check Failed',
-      `Failed to check subscription health: ${(e as Error).message}`,
-      'medium',
-      { error: (e as Error).message }
-    );
+  if (isDev) {
+    // Local WhatsApp service is usually not running; never report from dev
+    if (status !== 'success') console.warn('⚠️ [Dev] WhatsApp service not healthy on', WHATSAPP_SERVER_URL);
+    return;
   }
-}
 
-/**
- * Check database health
- */
-async function checkDatabaseHealth(): Promise<void> {
-  try {
-    const start = Date.now();
-
-    // Simple health query
-    const { error } = await supabase
-      .from('organizations')
-      .select('id', { count: 'exact', head: true });
-
-    const responseTime = Date.now() - start;
-
-    // Log if database is slow
-    if (responseTime > 5000) {
-      await logIncident(
-        'database_error',
-        'Slow Database Response',
-        `Database query took ${responseTime}ms`,
-        'medium',
-        { response_time_ms: responseTime }
-      );
-    }
-
-    if (error) {
-      await logIncident(
-        'database_error',
-        'Database Query Failed',
-        `Health check query failed: ${error.message}`,
-        'high',
-        { error: error.message, code: error.code }
-      );
-    }
-  } catch (e) {
-    await logIncident(
-      'database_error',
-      'Database Health Check Failed',
-      `Failed to check database health: ${(e as Error).message}`,
-      'critical',
-      { error: (e as Error).message }
-    );
-  }
+  const { error } = await supabase.rpc('record_health_probe', {
+    p_check_type: 'whatsapp_service',
+    p_status: status,
+    p_response_time_ms: Date.now() - start,
+    p_message: message
+  });
+  if (error) console.error('Failed to record health probe:', error);
 }
 
 // =====================================================
@@ -342,26 +289,16 @@ async function checkDatabaseHealth(): Promise<void> {
 // =====================================================
 
 /**
- * Run all health checks once
+ * Run one monitoring pass: probe external services, read the snapshot
+ *
+ * @param refresh - Recompute the snapshot on the server first (manual refresh)
  */
-export async function runHealthChecks(): Promise<void> {
-  if (isDev) {
-    // Minimal logging in dev
-    await Promise.allSettled([
-      checkWhatsAppHealth(),
-      checkSubscriptionHealth(),
-      checkDatabaseHealth()
-    ]);
-    return;
-  }
-
-  console.log('🔍 Running health checks...');
-  await Promise.allSettled([
-    checkWhatsAppHealth(),
-    checkSubscriptionHealth(),
-    checkDatabaseHealth()
-  ]);
-  console.log('✅ Health checks completed');
+export async function runHealthChecks(refresh = false): Promise<HealthSnapshot | null> {
+  if (!isDev) console.log('🔍 Running health checks...');
+  await probeWhatsAppService().catch(e => console.error('Health probe failed:', e));
+  const snapshot = await getHealthSnapshot(refresh);
+  if (!isDev) console.log(`✅ Health checks completed (${snapshot?.status ?? 'unknown'})`);
+  return snapshot;
 }
 
 /**
@@ -373,15 +310,16 @@ export function startHealthMonitoring(): void {
     return;
   }
 
-  console.log('🚀 Starting health monitoring (every 5 minutes)...');
-
-  // Run initial check
-  runHealthChecks();
+  console.log('🚀 Starting health monitoring (every 5 minutes, leader tab only)...');
 
-  // Set up interval
-  monitoringInterval = setInterval(() => {
-    runHealthChecks();
-  }, HEALTH_CHECK_INTERVAL);
+  // Interval is re-read after each run so it follows Realtime health;
+  // only the tab holding the health_checks lease actually runs the checks
+  monitoringTask = runLeaderTask(HEALTH_CHECK_TASK, async () => {
+    return (await runHealthChecks()) ?? undefined;
+  }, {
+    interval: () => getPollingInterval(HEALTH_CHECK_INTERVAL, HEALTH_CHECK_BACKOFF_INTERVAL),
+    immediate: true
+  });
 
   isMonitoring = true;
 }
@@ -390,9 +328,9 @@ export function startHealthMonitoring(): void {
  * Stop health monitoring
  */
 export function stopHealthMonitoring(): void {
-  if (monitoringInterval) {
-    clearInterval(monitoringInterval);
-    monitoringInterval = null;
+  if (monitoringTask) {
+    monitoringTask.stop();
+    monitoringTask = null;
   }
   isMonitoring = false;
   console.log('🛑 Health monitoring stopped');
@@ -0,0 +1,131 @@
+/**
+ * @file permissionBits.ts
+ * @description Compiled permission bitsets shared by the permission guards
+ *
+ * A permissions object ({ module: { action: boolean } }) is walked once and
+ * turned into a bitset; every later check is a single bit test:
+ * - `module.action` bits for every action that is `true`
+ * - a `module.*` bit when any action of the module is `true`
+ *
+ * Bit positions come from one global index that grows as new module/action
+ * names are seen, so compiled sets of different profiles and plans line up.
+ * Results are memoized per permissions object: a refetched profile brings a
+ * new object (and a fresh compile), re-renders with the same profile reuse
+ * the cached bits.
+ *
+ * @example
+ * ```typescript
+ * const bits = compilePermissions(profile.permissions);
+ * if (hasPermissionBit(bits, 'inventory', 'delete')) { ... }
+ * if (hasPermissionBit(bits, 'finance')) { ... } // any finance action
+ * ```
+ */
+
+// ====================================================================
+// Types
+// ====================================================================
+
+export interface PermissionBits {
+  /** Bitset, 32 bits per word, positions from the shared index */
+  readonly words: Uint32Array;
+  /** Modules present in the source object (value not undefined) */
+  readonly modules: ReadonlySet<string>;
+  /** Modules whose value is a well-formed { action: boolean } object */
+  readonly validModules: ReadonlySet<string>;
+  /** `module.action` → granted, for well-formed modules only */
+  readonly flat: Readonly<Record<string, boolean>>;
+}
+
+// ====================================================================
+// State
+// ====================================================================
+
+const bitIndex = new Map<string, number>();
+const compiledCache = new WeakMap<object, PermissionBits>();
+
+const EMPTY_BITS: PermissionBits = Object.freeze({
+  words: new Uint32Array(0),
+  modules: new Set<string>(),
+  validModules: new Set<string>(),
+  flat: Object.freeze({})
+});
+
+// ====================================================================
+// Private Helpers
+// ====================================================================
+
+const bitKey = (module: string, action?: string) => `${module}.${action || '*'}`;
+
+const assignBit = (key: string): number => {
+  let bit = bitIndex.get(key);
+  if (bit === undefined) {
+    bit = bitIndex.size;
+    bitIndex.set(key, bit);
+  }
+  return bit;
+};
+
+const testBit = (words: Uint32Array, bit: number | undefined): boolean =>
+  bit !== undefined && (((words[bit >>> 5] ?? 0) >>> (bit & 31)) & 1) === 1;
+
+const isPermissionObject = (value: unknown): value is Record<string, boolean | undefined> =>
+  typeof value === 'object' &&
+  value !== null &&
+  !Array.isArray(value) &&
+  Object.values(value as Record<string, unknown>).every(v => typeof v === 'boolean' || typeof v === 'undefined');
+
+const compile = (permissions: object): PermissionBits => {
+  const granted: number[] = [];
+  const modules = new Set<string>();
+  const validModules = new Set<string>();
+  const flat: Record<string, boolean> = {};
+
+  for (const [module, value] of Object.entries(permissions)) {
+    if (value === undefined) continue;
+    modules.add(module);
+    if (typeof value !== 'object' || value === null) continue;
+
+    const valid = isPermissionObject(value);
+    if (valid) validModules.add(module);
+
+    let anyGranted = false;
+    for (const [action, allowed] of Object.entries(value as Record<string, unknown>)) {
+      if (valid) flat[`${module}.${action}`] = allowed === true;
+      if (allowed === true) {
+        granted.push(assignBit(bitKey(module, action)));
+        anyGranted = true;
+      }
+    }
+    if (anyGranted) granted.push(assignBit(bitKey(module)));
+  }
+
+  const words = new Uint32Array((bitIndex.size + 31) >>> 5);
+  for (const bit of granted) words[bit >>> 5] |= 1 << (bit & 31);
+
+  return { words, modules, validModules, flat: Object.freeze(flat) };
+};
+
+// ====================================================================
+// Public API
+// ====================================================================
+
+/**
+ * Compile (or fetch the memoized) bitset of a permissions object
+ */
+export function compilePermissions(permissions: object | null | undefined): PermissionBits {
+  if (!permissions || typeof permissions !== 'object') return EMPTY_BITS;
+
+  let bits = compiledCache.get(permissions);
+  if (!bits) {
+    bits = compile(permissions);
+    compiledCache.set(permissions, bits);
+  }
+  return bits;
+}
+
+/**
+ * Is `module.action` granted? Without an action: is any action of the module granted?
+ */
+export function hasPermissionBit(bits: PermissionBits, module: string, action?: string): boolean {
+  return testBit(bits.words, bitIndex.get(bitKey(module, action)));
+}
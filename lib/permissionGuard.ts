@@ -29,8 +29,9 @@
  * ```
  */
 
-import { supabase } from './supabaseClient';
 import { Profile, UserPermissions } from '../types';
+import { compilePermissions, hasPermissionBit } from './permissionBits';
+import { getValidatedProfile } from './profileCache';
 
 // ====================================================================
 // Types
@@ -146,22 +147,11 @@ export class PermissionError extends Error {
 // Private Helper Functions
 // ====================================================================
 
-/**
- * Check if a value is a valid permission object (has boolean properties)
- */
-function isPermissionObject(value: unknown): value is Record<string, boolean> {
-  return (
-    typeof value === 'object' &&
-    value !== null &&
-    !Array.isArray(value) &&
-    Object.values(value as Record<string, unknown>).every(
-      v => typeof v === 'boolean' || typeof v === 'undefined'
-    )
-  );
-}
-
 /**
  * Check if the user has a specific permission
+ *
+ * Reads the compiled bitset of the permissions object (see permissionBits.ts),
+ * so repeated checks for the same profile do not re-walk the object.
  */
 function hasPermission(
   permissions: UserPermissions | undefined,
@@ -178,11 +168,10 @@ function hasPermission(
     };
   }
 
-  // Get the module permissions
-  const modulePermissions = permissions[module];
+  const bits = compilePermissions(permissions);
 
   // Module not found in permissions
-  if (modulePermissions === undefined) {
+  if (!bits.modules.has(module)) {
     return {
       granted: false,
       reason: `Module '${module}' not found in permissions`,
@@ -192,7 +181,7 @@ function hasPermission(
   }
 
   // Module permissions should be an object with boolean values
-  if (!isPermissionObject(modulePermissions)) {
+  if (!bits.validModules.has(module)) {
     return {
       granted: false,
       reason: `Invalid permissions structure for module '${module}'`,
@@ -203,7 +192,7 @@ function hasPermission(
 
   // If action is specified, check that specific action
   if (action) {
-    const hasAction = modulePermissions[action] === true;
+    const hasAction = hasPermissionBit(bits, module, action);
     return {
       granted: hasAction,
       reason: hasAction ? undefined : `Action '${action}' not granted for module '${module}'`,
@@ -213,7 +202,7 @@ function hasPermission(
   }
 
   // If no action specified, check 'view' permission by default
-  const hasView = modulePermissions.view === true;
+  const hasView = hasPermissionBit(bits, module, 'view');
   return {
     granted: hasView,
     reason: hasView ? undefined : `View permission not granted for module '${module}'`,
@@ -334,17 +323,14 @@ export async function assertPermission(
 
   // ====================================================================
   // Step 2: Optional server-side validation
-  // Fetch fresh profile to ensure permissions haven't changed
+  // Compare permissions_version with the server (profileCache.ts); the full
+  // profile is only re-selected when it changed
   // ====================================================================
   let validatedProfile = profile;
 
   if (validateWithServer && profile?.id) {
     try {
-      const { data: freshProfile } = await supabase
-        .from('profiles')
-        .select('id, role, status, permissions')
-        .eq('id', profile.id)
-        .single();
+      const freshProfile = await getValidatedProfile(profile.id);
 
       if (freshProfile) {
         validatedProfile = freshProfile as Profile;
@@ -576,21 +562,8 @@ export function checkPermissions(
  * ```
  */
 export function getFlatPermissions(profile: Profile | null): Record<string, boolean> {
-  const flat: Record<string, boolean> = {};
-
-  if (!profile?.permissions) {
-    return flat;
-  }
-
-  for (const [module, modulePerms] of Object.entries(profile.permissions)) {
-    if (isPermissionObject(modulePerms)) {
-      for (const [action, granted] of Object.entries(modulePerms)) {
-        flat[`${module}.${action}`] = granted === true;
-      }
-    }
-  }
-
-  return flat;
+  // Copy of the memoized map, callers may mutate their result
+  return { ...compilePermissions(profile?.permissions).flat };
 }
 
 /**
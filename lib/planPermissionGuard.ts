@@ -9,6 +9,7 @@
  */
 
 import type { UserPermissions, PlanFeatures, Plan } from './types';
+import { compilePermissions, hasPermissionBit } from './permissionBits';
 
 // ============================================
 // 1. خريطة الصلاحيات المسموحة لكل باقة
@@ -177,16 +178,12 @@ export function isPermissionAllowedInPlan(
   // تحليل مسار الصلاحية
   const [module, action] = permissionPath.split('.');
 
-  if (!module || !maxPermissions[module]) {
+  if (!module) {
     return false;
   }
 
-  if (!action) {
-    // طلب الوصول للوحدة ككل
-    return Object.values(maxPermissions[module] || {}).some(v => v === true);
-  }
-
-  return maxPermissions[module]?.[action] === true;
+  // بدون إجراء: هل أي صلاحية في الوحدة مسموحة؟ (البتات مُجمّعة مرة واحدة لكل باقة)
+  return hasPermissionBit(compilePermissions(maxPermissions), module, action);
 }
 
 /**
@@ -245,13 +242,8 @@ export function checkPermission(
     return false;
   }
 
-  // ثانياً: التحقق من صلاحية المستخدم
-  if (!action) {
-    // طلب الوصول للوحدة ككل
-    return Object.values(userPermissions[module] || {}).some(v => v === true);
-  }
-
-  return userPermissions[module]?.[action] === true;
+  // ثانياً: التحقق من صلاحية المستخدم (بدون إجراء = أي صلاحية في الوحدة)
+  return hasPermissionBit(compilePermissions(userPermissions), module, action);
 }
 
 /**
@@ -0,0 +1,227 @@
+/**
+ * @file profileCache.ts
+ * @description Profile / permission cache validated by permissions_version
+ *
+ * profiles.permissions_version is bumped by the database whenever
+ * permissions, role, status or org change. Instead of re-selecting the whole
+ * profile before every guarded action, callers get the cached profile and:
+ * - within a short TTL: no request at all
+ * - after the TTL: one get_my_profile_version() call (three fields); the full
+ *   profile is reloaded only when the version moved
+ * - Realtime UPDATE/DELETE events on a cached profile drop it immediately
+ *
+ * Usage:
+ * ```typescript
+ * const profile = await getValidatedProfile(user.id);
+ * const current = await checkProfileVersion(user.id); // { id, status, permissions_version }
+ * ```
+ */
+
+import { supabase } from './supabaseClient';
+import { getPollingInterval, subscribeRealtime, RealtimeChange } from './realtimeManager';
+import type { Profile } from '../types';
+
+// ====================================================================
+// Types
+// ====================================================================
+
+export interface ProfileVersion {
+    id: string;
+    status?: Profile['status'];
+    permissions_version: number;
+}
+
+interface CachedProfile {
+    profile: Profile;
+    version: number;
+    checkedAt: number;
+}
+
+// ====================================================================
+// Configuration
+// ====================================================================
+
+/** Cached profile is trusted this long without asking the server */
+const VERSION_CHECK_TTL_MS = 10 * 1000;
+/** TTL while Realtime pushes profile changes */
+const VERSION_CHECK_TTL_REALTIME_MS = 60 * 1000;
+
+const PROFILE_COLUMNS = 'id, role, org_id, status, full_name, email, username, permissions, permissions_version';
+
+// ====================================================================
+// State
+// ====================================================================
+
+const cache = new Map<string, CachedProfile>();
+const inFlightProfiles = new Map<string, Promise<Profile | null>>();
+let inFlightVersion: Promise<ProfileVersion | null> | null = null;
+let unsubscribeProfiles: (() => void) | null = null;
+
+// ====================================================================
+// Private Helpers
+// ====================================================================
+
+const handleProfileChange = (change: RealtimeChange) => {
+    const id = (change.new?.id || change.old?.id) as string | undefined;
+    const cached = id ? cache.get(id) : undefined;
+    if (!id || !cached) return;
+
+    const version = Number(change.new?.permissions_version);
+    if (change.eventType === 'DELETE' || version !== cached.version) {
+        console.log(`📡 [ProfileCache] Profile ${id} changed, dropping cached copy`);
+        cache.delete(id);
+    }
+};
+
+const ensureRealtimeListener = () => {
+    if (!unsubscribeProfiles) {
+        unsubscribeProfiles = subscribeRealtime('profiles', handleProfileChange);
+    }
+};
+
+const storeProfile = (profile: Profile) => {
+    cache.set(profile.id, {
+        profile,
+        version: Number(profile.permissions_version ?? NaN),
+        checkedAt: Date.now()
+    });
+};
+
+/**
+ * Version of the signed-in user's profile (single-flight)
+ *
+ * Falls back to a plain status select if the RPC is not deployed yet; the
+ * NaN version then never matches, so cached profiles are reloaded.
+ */
+const fetchMyProfileVersion = (userId: string): Promise<ProfileVersion | null> => {
+    if (!inFlightVersion) {
+        inFlightVersion = (async () => {
+            try {
+                const { data, error } = await supabase.rpc('get_my_profile_version');
+                if (!error) return (data as ProfileVersion | null) || null;
+
+                console.warn('⚠️ [ProfileCache] get_my_profile_version failed, selecting status instead:', error.message);
+                const { data: row, error: selectError } = await supabase
+                    .from('profiles')
+                    .select('id, status')
+                    .eq('id', userId)
+                    .maybeSingle();
+                if (selectError) throw selectError;
+                return row ? { ...(row as Pick<Profile, 'id' | 'status'>), permissions_version: NaN } : null;
+            } finally {
+                inFlightVersion = null;
+            }
+        })();
+    }
+    return inFlightVersion;
+};
+
+const loadProfile = (userId: string): Promise<Profile | null> => {
+    let pending = inFlightProfiles.get(userId);
+    if (!pending) {
+        pending = (async () => {
+            try {
+                const { data, error } = await supabase
+                    .from('profiles')
+                    .select(PROFILE_COLUMNS)
+                    .eq('id', userId)
+                    .maybeSingle();
+                if (error) throw error;
+                if (!data) {
+                    cache.delete(userId);
+                    return null;
+                }
+                storeProfile(data as Profile);
+                return data as Profile;
+            } finally {
+                inFlightProfiles.delete(userId);
+            }
+        })();
+        inFlightProfiles.set(userId, pending);
+    }
+    return pending;
+};
+
+// ====================================================================
+// Public API
+// ====================================================================
+
+/**
+ * Cheap server check of the signed-in user's profile
+ *
+ * Refreshes the cache timestamp when the version still matches and drops the
+ * cached profile when it does not.
+ *
+ * @returns { id, status, permissions_version } or null when there is no profile
+ */
+export const checkProfileVersion = async (userId: string): Promise<ProfileVersion | null> => {
+    ensureRealtimeListener();
+    const current = await fetchMyProfileVersion(userId);
+    const mine = current && current.id === userId ? current : null;
+    applyProfileVersion(userId, mine);
+    return mine;
+};
+
+/**
+ * Feed a version obtained elsewhere (e.g. the session heartbeat) into the cache
+ *
+ * @param current - Server state of the profile, null when it no longer exists
+ */
+export const applyProfileVersion = (userId: string, current: ProfileVersion | null) => {
+    const cached = cache.get(userId);
+    if (!cached) return;
+    if (current && Number(current.permissions_version) === cached.version && current.status === cached.profile.status) {
+        cached.checkedAt = Date.now();
+    } else {
+        cache.delete(userId);
+    }
+};
+
+/**
+ * Profile with up-to-date permissions, from cache whenever possible
+ *
+ * @param options.force - Skip the TTL and always compare versions
+ * @returns The profile, or null when it no longer exists
+ */
+export const getValidatedProfile = async (
+    userId: string,
+    options: { force?: boolean } = {}
+): Promise<Profile | null> => {
+    ensureRealtimeListener();
+    const cached = cache.get(userId);
+    const ttl = getPollingInterval(VERSION_CHECK_TTL_MS, VERSION_CHECK_TTL_REALTIME_MS);
+
+    if (cached && !options.force && Date.now() - cached.checkedAt < ttl) {
+        return cached.profile;
+    }
+
+    if (cached) {
+        const current = await checkProfileVersion(userId);
+        const stillCached = cache.get(userId);
+        if (stillCached) return stillCached.profile;
+        if (current) console.log(`🔄 [ProfileCache] permissions_version changed, reloading profile ${userId}`);
+    }
+
+    return loadProfile(userId);
+};
+
+/**
+ * Seed the cache with a profile that was just fetched elsewhere (e.g. Layout)
+ */
+export const primeProfileCache = (profile: Profile | null | undefined) => {
+    if (!profile?.id || profile.permissions_version === undefined) return;
+    ensureRealtimeListener();
+    storeProfile(profile);
+};
+
+/**
+ * Forget one cached profile, or all of them (logout)
+ */
+export const invalidateProfileCache = (userId?: string) => {
+    if (userId) cache.delete(userId);
+    else cache.clear();
+};
+
+supabase.auth.onAuthStateChange(event => {
+    if (event === 'SIGNED_OUT') invalidateProfileCache();
+});
@@ -0,0 +1,310 @@
+/**
+ * @file queryCache.ts
+ * @description Shared stale-while-revalidate cache for Supabase reads
+ *
+ * This module keeps one in-memory cache entry per (table + filters) key so that
+ * screens re-mounting on tab navigation reuse data instead of re-downloading it:
+ * - Fresh entries (younger than their TTL) are served without a request
+ * - Stale entries are served immediately and revalidated in the background
+ * - Concurrent reads of the same key share a single in-flight request
+ * - Mutations invalidate every entry of the affected table
+ *
+ * Usage:
+ * - fetchQuery() from plain async code (handlers, loaders)
+ * - useCachedQuery() (hooks/useCachedQuery.ts) from components
+ * - invalidateQueries('drivers') after inserting/updating/deleting drivers
+ */
+
+// ====================================================================
+// Types
+// ====================================================================
+
+export interface QueryKey {
+    table: string;
+    filters?: Record<string, unknown>;
+}
+
+export interface QueryOptions {
+    /** How long data is considered fresh, in milliseconds */
+    ttl?: number;
+    /** Ignore freshness and always hit the network (still de-duplicated) */
+    force?: boolean;
+}
+
+export interface QuerySnapshot<T> {
+    data: T | undefined;
+    error: unknown;
+    updatedAt: number;
+    isFetching: boolean;
+    isStale: boolean;
+}
+
+type Fetcher<T> = () => Promise<T>;
+type Listener = () => void;
+
+interface CacheEntry<T = unknown> {
+    table: string;
+    data: T | undefined;
+    error: unknown;
+    updatedAt: number;
+    ttl: number;
+    /** Bumped on every invalidation / write so an in-flight fetch can tell its response is outdated */
+    generation: number;
+    promise: Promise<T> | null;
+    fetcher: Fetcher<T> | null;
+    listeners: Set<Listener>;
+}
+
+// ====================================================================
+// Configuration
+// ====================================================================
+
+/**
+ * Default freshness window - long enough to cover tab hopping,
+ * short enough that idle screens pick up other users' changes
+ */
+const DEFAULT_TTL_MS = 60 * 1000;
+
+/**
+ * Unused entries are dropped after this long to bound memory
+ */
+const GC_AFTER_MS = 10 * 60 * 1000;
+
+// ====================================================================
+// State
+// ====================================================================
+
+const cache = new Map<string, CacheEntry>();
+
+// ====================================================================
+// Private Helpers
+// ====================================================================
+
+/**
+ * JSON.stringify with sorted object keys so {a,b} and {b,a} share a key
+ */
+const stableStringify = (value: unknown): string => {
+    if (value === null || typeof value !== 'object') return JSON.stringify(value) ?? 'null';
+    if (Array.isArray(value)) return `[${value.map(stableStringify).join(',')}]`;
+    const obj = value as Record<string, unknown>;
+    return `{${Object.keys(obj).filter(k => obj[k] !== undefined).sort().map(k => `${JSON.stringify(k)}:${stableStringify(obj[k])}`).join(',')}}`;
+};
+
+export const serializeQueryKey = (key: QueryKey): string =>
+    `${key.table}:${stableStringify(key.filters || {})}`;
+
+const getEntry = <T>(key: QueryKey): CacheEntry<T> => {
+    const id = serializeQueryKey(key);
+    let entry = cache.get(id) as CacheEntry<T> | undefined;
+    if (!entry) {
+        entry = {
+            table: key.table,
+            data: undefined,
+            error: null,
+            updatedAt: 0,
+            ttl: DEFAULT_TTL_MS,
+            generation: 0,
+            promise: null,
+            fetcher: null,
+            listeners: new Set()
+        };
+        cache.set(id, entry as CacheEntry);
+    }
+    return entry;
+};
+
+const notify = (entry: CacheEntry) => {
+    entry.listeners.forEach(listener => {
+        try {
+            listener();
+        } catch (e) {
+            console.warn('⚠️ [queryCache] Listener failed:', e);
+        }
+    });
+};
+
+const isFresh = (entry: CacheEntry) =>
+    entry.updatedAt > 0 && Date.now() - entry.updatedAt < entry.ttl;
+
+const collectGarbage = () => {
+    const now = Date.now();
+    cache.forEach((entry, id) => {
+        if (entry.listeners.size === 0 && !entry.promise && now - entry.updatedAt > GC_AFTER_MS) {
+            cache.delete(id);
+        }
+    });
+};
+
+/**
+ * Fetch an entry, sharing the request with concurrent callers
+ *
+ * A response is only stored once no invalidation happened while it was in
+ * flight; otherwise it may predate the write, so the request is repeated
+ * (and the shared promise resolves with the refetched data).
+ */
+const runFetch = <T>(entry: CacheEntry<T>, fetcher: Fetcher<T>): Promise<T> => {
+    if (entry.promise) return entry.promise;
+
+    const promise = (async () => {
+        try {
+            let generation: number;
+            let data: T;
+            do {
+                generation = entry.generation;
+                data = await (entry.fetcher ?? fetcher)();
+            } while (entry.generation !== generation);
+
+            entry.data = data;
+            entry.error = null;
+            entry.updatedAt = Date.now();
+            return data;
+        } catch (error) {
+            entry.error = error;
+            throw error;
+        } finally {
+            entry.promise = null;
+            notify(entry as CacheEntry);
+        }
+    })();
+
+    entry.promise = promise;
+    notify(entry as CacheEntry);
+    return promise;
+};
+
+// ====================================================================
+// Public API - Reads
+// ====================================================================
+
+/**
+ * Read a query through the cache
+ *
+ * - Fresh data resolves immediately without a request
+ * - Stale data resolves immediately and a background revalidation starts
+ * - Missing data waits for the (shared) network request
+ *
+ * @example
+ * ```typescript
+ * const drivers = await fetchQuery(
+ *   { table: 'drivers', filters: { org_id: orgId } },
+ *   () => unwrap(supabase.from('drivers').select('*').eq('org_id', orgId))
+ * );
+ * ```
+ */
+export const fetchQuery = <T>(key: QueryKey, fetcher: Fetcher<T>, options: QueryOptions = {}): Promise<T> => {
+    const entry = getEntry<T>(key);
+    entry.fetcher = fetcher;
+    if (options.ttl !== undefined) entry.ttl = options.ttl;
+
+    if (!options.force && entry.data !== undefined) {
+        if (!isFresh(entry as CacheEntry)) {
+            runFetch(entry, fetcher).catch(() => { /* surfaced via snapshot.error */ });
+        }
+        return Promise.resolve(entry.data);
+    }
+
+    collectGarbage();
+    return runFetch(entry, fetcher);
+};
+
+/**
+ * Current cache state for a key (never triggers a request)
+ */
+export const getQuerySnapshot = <T>(key: QueryKey): QuerySnapshot<T> => {
+    const entry = cache.get(serializeQueryKey(key)) as CacheEntry<T> | undefined;
+    if (!entry) {
+        return { data: undefined, error: null, updatedAt: 0, isFetching: false, isStale: true };
+    }
+    return {
+        data: entry.data,
+        error: entry.error,
+        updatedAt: entry.updatedAt,
+        isFetching: entry.promise !== null,
+        isStale: !isFresh(entry as CacheEntry)
+    };
+};
+
+/**
+ * Subscribe to changes of a single key
+ * @returns Unsubscribe function
+ */
+export const subscribeQuery = (key: QueryKey, listener: Listener): (() => void) => {
+    const entry = getEntry(key);
+    entry.listeners.add(listener);
+    return () => {
+        entry.listeners.delete(listener);
+    };
+};
+
+// ====================================================================
+// Public API - Writes & Invalidation
+// ====================================================================
+
+/**
+ * Replace cached data for a key (e.g. after a successful insert)
+ */
+export const setQueryData = <T>(key: QueryKey, updater: T | ((prev: T | undefined) => T)) => {
+    const entry = getEntry<T>(key);
+    entry.data = typeof updater === 'function'
+        ? (updater as (prev: T | undefined) => T)(entry.data)
+        : updater;
+    entry.error = null;
+    entry.updatedAt = Date.now();
+    entry.generation++;
+    notify(entry as CacheEntry);
+};
+
+/**
+ * Mark every entry of a table as stale
+ *
+ * Entries with mounted subscribers are refetched right away,
+ * the rest are refetched lazily on their next read. A fetch already
+ * in flight is repeated once it settles instead of being stored as fresh.
+ *
+ * @param table - Table whose queries should be invalidated
+ * @param predicate - Optional filter on the entry's filters
+ */
+export const invalidateQueries = (
+    table: string,
+    predicate?: (filters: Record<string, unknown>) => boolean
+) => {
+    cache.forEach((entry, id) => {
+        if (entry.table !== table) return;
+        if (predicate) {
+            const filters = JSON.parse(id.slice(table.length + 1) || '{}') as Record<string, unknown>;
+            if (!predicate(filters)) return;
+        }
+        entry.updatedAt = 0;
+        entry.generation++;
+        if (entry.listeners.size > 0 && entry.fetcher) {
+            runFetch(entry, entry.fetcher).catch(() => { /* surfaced via snapshot.error */ });
+        }
+    });
+};
+
+/**
+ * Drop everything (used on logout so no tenant data outlives the session)
+ */
+export const clearQueryCache = () => {
+    cache.clear();
+};
+
+// ====================================================================
+// Helpers
+// ====================================================================
+
+/**
+ * Turn a Supabase `{ data, error }` response into a throwing promise
+ */
+export const unwrap = async <T>(
+    query: PromiseLike<{ data: T | null; error: unknown }>
+): Promise<T> => {
+    const { data, error } = await query;
+    if (error) throw error;
+    return data as T;
+};
+
+export const QUERY_CACHE_CONFIG = {
+    DEFAULT_TTL_MS,
+    GC_AFTER_MS
+};
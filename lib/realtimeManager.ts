@@ -0,0 +1,188 @@
+/**
+ * @file realtimeManager.ts
+ * @description Single multiplexed Supabase Realtime subscription per tab
+ *
+ * This module opens ONE Realtime channel for the current organization and
+ * listens to postgres_changes on the tables the UI cares about:
+ * - cars, transactions, profiles (filtered by org_id)
+ * - organizations (filtered to the current org)
+ * - public_config (global, single row)
+ *
+ * Each change is fanned out to:
+ * - the shared query cache (invalidateQueries on the changed table)
+ * - any UI listeners registered with subscribeRealtime()
+ *
+ * While the channel is connected, polling loops (session watcher, auto-update,
+ * health monitor) use getPollingInterval() to back off to long intervals.
+ *
+ * Usage:
+ * - startRealtime(orgId) once the organization is known (Layout does this)
+ * - stopRealtime() on logout / unmount
+ */
+
+import type { RealtimeChannel } from '@supabase/supabase-js';
+import { supabase } from './supabaseClient';
+import { invalidateQueries } from './queryCache';
+
+// ====================================================================
+// Types
+// ====================================================================
+
+export const REALTIME_TABLES = ['cars', 'transactions', 'profiles', 'public_config', 'organizations'] as const;
+
+export type RealtimeTable = typeof REALTIME_TABLES[number];
+
+export interface RealtimeChange<T = Record<string, unknown>> {
+    table: RealtimeTable;
+    eventType: 'INSERT' | 'UPDATE' | 'DELETE';
+    new: Partial<T>;
+    old: Partial<T>;
+    receivedAt: number;
+}
+
+type ChangeListener = (change: RealtimeChange) => void;
+type StatusListener = (connected: boolean) => void;
+
+// ====================================================================
+// State
+// ====================================================================
+
+let channel: RealtimeChannel | null = null;
+let currentOrgId: string | null = null;
+let connected = false;
+
+const changeListeners = new Map<RealtimeTable | '*', Set<ChangeListener>>();
+const statusListeners = new Set<StatusListener>();
+
+// ====================================================================
+// Private Helpers
+// ====================================================================
+
+const setConnected = (value: boolean) => {
+    if (connected === value) return;
+    connected = value;
+    console.log(value ? '📡 [Realtime] Connected' : '📴 [Realtime] Disconnected');
+    statusListeners.forEach(listener => listener(value));
+};
+
+const dispatchChange = (change: RealtimeChange) => {
+    invalidateQueries(change.table);
+
+    const targets = [changeListeners.get(change.table), changeListeners.get('*')];
+    targets.forEach(set => set?.forEach(listener => {
+        try {
+            listener(change);
+        } catch (e) {
+            console.warn('⚠️ [Realtime] Listener failed:', e);
+        }
+    }));
+};
+
+/**
+ * Row filter for each table (null = no filter)
+ */
+const filterFor = (table: RealtimeTable, orgId: string): string | null => {
+    if (table === 'public_config') return null;
+    if (table === 'organizations') return `id=eq.${orgId}`;
+    return `org_id=eq.${orgId}`;
+};
+
+// ====================================================================
+// Public API - Lifecycle
+// ====================================================================
+
+/**
+ * Open (or re-target) the shared Realtime channel for an organization
+ *
+ * Idempotent: calling it again with the same orgId is a no-op.
+ */
+export const startRealtime = (orgId: string) => {
+    if (!orgId) return;
+    if (channel && currentOrgId === orgId) return;
+    if (channel) stopRealtime();
+
+    currentOrgId = orgId;
+    let next = supabase.channel(`myfleet:org:${orgId}`);
+
+    REALTIME_TABLES.forEach(table => {
+        const filter = filterFor(table, orgId);
+        next = next.on(
+            'postgres_changes',
+            { event: '*', schema: 'public', table, filter: filter ?? undefined },
+            payload => dispatchChange({
+                table,
+                eventType: payload.eventType,
+                new: (payload.new || {}) as Record<string, unknown>,
+                old: (payload.old || {}) as Record<string, unknown>,
+                receivedAt: Date.now()
+            })
+        );
+    });
+
+    channel = next.subscribe(status => {
+        setConnected(status === 'SUBSCRIBED');
+    });
+
+    console.log(`🚀 [Realtime] Subscribing to org ${orgId.substr(0, 8)}...`);
+};
+
+/**
+ * Close the Realtime channel
+ */
+export const stopRealtime = () => {
+    if (channel) {
+        supabase.removeChannel(channel);
+        channel = null;
+    }
+    currentOrgId = null;
+    setConnected(false);
+};
+
+// ====================================================================
+// Public API - Listeners
+// ====================================================================
+
+/**
+ * Listen to changes of one table (or '*' for all watched tables)
+ * @returns Unsubscribe function
+ */
+export const subscribeRealtime = (table: RealtimeTable | '*', listener: ChangeListener): (() => void) => {
+    let set = changeListeners.get(table);
+    if (!set) {
+        set = new Set();
+        changeListeners.set(table, set);
+    }
+    set.add(listener);
+    return () => {
+        set?.delete(listener);
+    };
+};
+
+/**
+ * Listen to connection status changes
+ * @returns Unsubscribe function
+ */
+export const onRealtimeStatusChange = (listener: StatusListener): (() => void) => {
+    statusListeners.add(listener);
+    return () => {
+        statusListeners.delete(listener);
+    };
+};
+
+export const isRealtimeConnected = () => connected;
+
+/**
+ * Pick a polling interval depending on Realtime health
+ *
+ * @param baseMs - Interval used while Realtime is down (the old polling rate)
+ * @param backoffMs - Interval used while Realtime delivers changes
+ */
+export const getPollingInterval = (baseMs: number, backoffMs: number) =>
+    connected ? backoffMs : baseMs;
+
+export const getRealtimeStatus = () => ({
+    connected,
+    orgId: currentOrgId,
+    tables: [...REALTIME_TABLES],
+    listenerCount: Array.from(changeListeners.values()).reduce((sum, set) => sum + set.size, 0)
+});
@@ -8,12 +8,28 @@
  * - Triggers performGlobalLogout on session expiration or invalidation
  * - Is idempotent, safe, and minimal
  *
+ * Cross-tab heartbeat:
+ * - One session_heartbeat() RPC returns validity, status, role, plan and
+ *   permissions_version
+ * - Only the leader tab (elected by tabCoordinator) calls it; the result is
+ *   broadcast to the other tabs through the authUtils channel, so ten open
+ *   tabs cost one heartbeat
+ *
  * Usage:
  * Call initSessionWatcher() once during app initialization (e.g., in main.tsx or index.tsx)
  */
 
 import { supabase } from './supabaseClient';
-import { performGlobalLogout, isLogoutInProgress } from './authUtils';
+import {
+  performGlobalLogout,
+  isLogoutInProgress,
+  onCrossTabMessage,
+  postCrossTabMessage,
+  LogoutReason
+} from './authUtils';
+import { getPollingInterval, subscribeRealtime } from './realtimeManager';
+import { applyProfileVersion, checkProfileVersion } from './profileCache';
+import { claimLeadership, initTabCoordinator, isLeaderTab, TAB_COORDINATOR_CONFIG } from './tabCoordinator';
 
 // ====================================================================
 // Configuration
@@ -26,12 +42,51 @@ import { performGlobalLogout, isLogoutInProgress } from './authUtils';
  */
 const SESSION_VALIDATE_INTERVAL_MS = 5 * 60 * 1000;
 
+/**
+ * Validation interval while Realtime is connected
+ * - Profile changes (disable, role change) are pushed instantly via Realtime,
+ *   so the timer only guards against missed events
+ */
+const SESSION_VALIDATE_BACKOFF_MS = 30 * 60 * 1000;
+
 /**
  * Debounce delay for visibility/focus events (in milliseconds)
  * - Prevents rapid validations when user switches tabs quickly
  */
 const VISIBILITY_DEBOUNCE_MS = 1000;
 
+/**
+ * A heartbeat result (own or shared by the leader) is reused this long
+ * - Focus/visibility validations inside this window cost no request
+ */
+const HEARTBEAT_FRESH_MS = 60 * 1000;
+
+/**
+ * How long a follower waits for the leader to answer a heartbeat request
+ * before taking over
+ */
+const HEARTBEAT_REQUEST_TIMEOUT_MS = 3000;
+
+// ====================================================================
+// Types
+// ====================================================================
+
+/**
+ * Result of the session_heartbeat() RPC
+ */
+export interface SessionHeartbeat {
+  valid: boolean;
+  reason?: 'no_session' | 'no_profile' | 'account_disabled' | null;
+  user_id?: string;
+  status?: 'active' | 'disabled';
+  role?: string;
+  org_id?: string | null;
+  plan?: string | null;
+  subscription_end?: string | null;
+  permissions_version?: number;
+  server_time?: string;
+}
+
 // ====================================================================
 // State
 // ====================================================================
@@ -42,9 +97,19 @@ const VISIBILITY_DEBOUNCE_MS = 1000;
 let isInitialized = false;
 
 /**
- * The interval ID for the periodic validation timer
+ * The timeout ID for the periodic validation timer (re-armed after each run)
  */
-let validateIntervalId: ReturnType<typeof setInterval> | null = null;
+let validateIntervalId: ReturnType<typeof setTimeout> | null = null;
+
+/**
+ * Unsubscribe function for Realtime profile changes
+ */
+let unsubscribeProfileChanges: (() => void) | null = null;
+
+/**
+ * ID of the user whose session was last validated
+ */
+let validatedUserId: string | null = null;
 
 /**
  * Timeout ID for visibility change debounce
@@ -62,6 +127,152 @@ let lastValidationTime = 0;
  */
 let hasHadValidSession = false;
 
+/**
+ * Last heartbeat result (run here or received from the leader) and when
+ */
+let lastHeartbeat: SessionHeartbeat | null = null;
+let lastHeartbeatAt = 0;
+
+/**
+ * Single-flight heartbeat call of the leader
+ */
+let inFlightHeartbeat: Promise<SessionHeartbeat | null> | null = null;
+
+/**
+ * Followers waiting for the leader's next heartbeat broadcast
+ */
+let heartbeatWaiters: Array<(heartbeat: SessionHeartbeat) => void> = [];
+
+/**
+ * Cross-tab unsubscribe functions
+ */
+let crossTabUnsubscribers: Array<() => void> = [];
+
+// ====================================================================
+// Heartbeat
+// ====================================================================
+
+const rememberHeartbeat = (heartbeat: SessionHeartbeat) => {
+  lastHeartbeat = heartbeat;
+  lastHeartbeatAt = Date.now();
+  const waiters = heartbeatWaiters;
+  heartbeatWaiters = [];
+  waiters.forEach(resolve => resolve(heartbeat));
+};
+
+/**
+ * Heartbeat from the previous profile-version RPC, for databases without
+ * session_heartbeat()
+ */
+const fallbackHeartbeat = async (userId: string): Promise<SessionHeartbeat> => {
+  const profile = await checkProfileVersion(userId);
+  if (!profile) return { valid: false, reason: 'no_profile', user_id: userId };
+  return {
+    valid: profile.status !== 'disabled',
+    reason: profile.status === 'disabled' ? 'account_disabled' : null,
+    user_id: profile.id,
+    status: profile.status,
+    permissions_version: profile.permissions_version
+  };
+};
+
+/**
+ * Call session_heartbeat() (leader only) and share the result
+ * @returns null on a transient (network) failure
+ */
+const runHeartbeat = (userId: string): Promise<SessionHeartbeat | null> => {
+  if (!inFlightHeartbeat) {
+    inFlightHeartbeat = (async () => {
+      try {
+        const { data, error } = await supabase.rpc('session_heartbeat');
+        let heartbeat: SessionHeartbeat;
+
+        if (!error) {
+          heartbeat = data as SessionHeartbeat;
+        } else if (error.code === 'PGRST202' || error.code === '42883') {
+          heartbeat = await fallbackHeartbeat(userId);
+        } else if (error.code === 'PGRST301' || /jwt/i.test(error.message)) {
+          heartbeat = { valid: false, reason: 'no_session', user_id: userId };
+        } else {
+          console.warn('⚠️ [SessionWatcher] Heartbeat failed, will retry:', error.message);
+          return null;
+        }
+
+        rememberHeartbeat(heartbeat);
+        postCrossTabMessage('heartbeat_result', heartbeat);
+        return heartbeat;
+      } finally {
+        inFlightHeartbeat = null;
+      }
+    })();
+  }
+  return inFlightHeartbeat;
+};
+
+/**
+ * Ask the leader for a fresh heartbeat; resolves null if it does not answer
+ */
+const requestHeartbeatFromLeader = () => new Promise<SessionHeartbeat | null>(resolve => {
+  const timeoutId = setTimeout(() => {
+    heartbeatWaiters = heartbeatWaiters.filter(waiter => waiter !== onResult);
+    resolve(null);
+  }, HEARTBEAT_REQUEST_TIMEOUT_MS);
+  const onResult = (heartbeat: SessionHeartbeat) => {
+    clearTimeout(timeoutId);
+    resolve(heartbeat);
+  };
+  heartbeatWaiters.push(onResult);
+  postCrossTabMessage('heartbeat_request');
+});
+
+/**
+ * Current heartbeat for this user: shared result if fresh, otherwise the
+ * leader's (this tab becomes leader if nobody answers)
+ */
+const obtainHeartbeat = async (userId: string, force: boolean): Promise<SessionHeartbeat | null> => {
+  const fresh = lastHeartbeat?.user_id === userId && Date.now() - lastHeartbeatAt < HEARTBEAT_FRESH_MS;
+  if (fresh && !force) return lastHeartbeat;
+
+  if (claimLeadership()) return runHeartbeat(userId);
+
+  // Followers never act on their own triggers when forced (Realtime):
+  // the leader receives the same event and broadcasts the result
+  if (force && fresh) return lastHeartbeat;
+
+  const shared = await requestHeartbeatFromLeader();
+  if (shared) return shared;
+
+  console.log('👑 [SessionWatcher] Leader did not answer, taking over heartbeat');
+  claimLeadership(true);
+  return runHeartbeat(userId);
+};
+
+/**
+ * Act on a heartbeat: logout when invalid, refresh caches otherwise
+ */
+const applyHeartbeat = async (heartbeat: SessionHeartbeat, userId: string): Promise<boolean> => {
+  if (!heartbeat.valid) {
+    const reason: LogoutReason = heartbeat.reason === 'no_session' ? 'session_expired' : 'account_disabled';
+    console.warn(`⚠️ [SessionWatcher] Heartbeat rejected session (${heartbeat.reason})`);
+    await performGlobalLogout({
+      reason,
+      skipServerSignOut: reason === 'session_expired'  // Server session already gone
+    });
+    return false;
+  }
+
+  applyProfileVersion(userId, {
+    id: userId,
+    status: heartbeat.status,
+    permissions_version: Number(heartbeat.permissions_version)
+  });
+
+  hasHadValidSession = true;
+  validatedUserId = userId;
+  lastValidationTime = Date.now();
+  return true;
+};
+
 // ====================================================================
 // Core Validation Logic
 // ====================================================================
@@ -71,13 +282,14 @@ let hasHadValidSession = false;
  *
  * This function:
  * 1. Checks if Supabase session exists
- * 2. Validates user profile from database
- * 3. Checks if account is disabled
+ * 2. Obtains a heartbeat (shared by the leader tab when fresh)
+ * 3. Checks session validity and account status from it
  * 4. Triggers logout if any check fails
  *
+ * @param force - Ignore a fresh shared result (profile just changed)
  * @returns Promise<boolean> - true if session is valid, false otherwise
  */
-const validateSession = async (): Promise<boolean> => {
+const validateSession = async (force = false): Promise<boolean> => {
   // SECURITY: Prevent validation if logout is already in progress
   if (isLogoutInProgress()) return false;
 
@@ -85,7 +297,7 @@ const validateSession = async (): Promise<boolean> => {
 
   try {
     // ====================================================================
-    // Step 1: Check Supabase Session (server-side)
+    // Step 1: Check Supabase Session (local, no request)
     // ====================================================================
     const { data: { session }, error: sessionError } = await supabase.auth.getSession();
 
@@ -105,33 +317,20 @@ const validateSession = async (): Promise<boolean> => {
     }
 
     // ====================================================================
-    // Step 2: Validate User Profile (server-side, with status check)
-    // ====================================================================
-    const { data: profile, error: profileError } = await supabase
-      .from('profiles')
-      .select('id, status, role, org_id')
-      .eq('id', session.user.id)
-      .maybeSingle();
-
+    // Step 2: Heartbeat (one RPC in the leader tab, shared with the others)
     // ====================================================================
-    // Step 3: Check for Disabled Account or Missing Profile
-    // ====================================================================
-    if (!profile || profileError || profile.status === 'disabled') {
-      console.warn('⚠️ [SessionWatcher] Account disabled or profile not found');
-      await performGlobalLogout({
-        reason: 'account_disabled',
-        skipServerSignOut: false  // Need to revoke server session
-      });
-      return false;
+    const heartbeat = await obtainHeartbeat(session.user.id, force);
+    if (!heartbeat) {
+      // Transient failure: keep the session, next trigger retries
+      return hasHadValidSession;
     }
 
     // ====================================================================
-    // Step 4: Session is Valid - Mark that we've had a valid session
+    // Step 3: Check validity / disabled account, refresh profile cache
     // ====================================================================
-    hasHadValidSession = true;
-    lastValidationTime = Date.now();
-    console.log('✅ [SessionWatcher] Session validated successfully');
-    return true;
+    const valid = await applyHeartbeat(heartbeat, session.user.id);
+    if (valid) console.log('✅ [SessionWatcher] Session validated successfully');
+    return valid;
 
   } catch (error) {
     console.error('❌ [SessionWatcher] Validation error:', error);
@@ -183,6 +382,62 @@ const handleWindowFocus = () => {
   }, VISIBILITY_DEBOUNCE_MS);
 };
 
+/**
+ * Arm the next periodic validation
+ * Interval backs off while Realtime pushes profile changes
+ */
+const scheduleNextValidation = () => {
+  const delay = getPollingInterval(SESSION_VALIDATE_INTERVAL_MS, SESSION_VALIDATE_BACKOFF_MS);
+  validateIntervalId = setTimeout(() => {
+    // Only the leader runs the periodic heartbeat; followers take over
+    // through claimLeadership() once the lease expires
+    if (claimLeadership()) {
+      validateSession(true);
+    }
+    scheduleNextValidation();
+  }, delay);
+};
+
+/**
+ * Heartbeat shared by the leader
+ */
+const handleHeartbeatResult = (message: { payload?: unknown }) => {
+  const heartbeat = message.payload as SessionHeartbeat | undefined;
+  if (!heartbeat) return;
+  rememberHeartbeat(heartbeat);
+  if (validatedUserId && heartbeat.user_id === validatedUserId) {
+    applyHeartbeat(heartbeat, validatedUserId);
+  }
+};
+
+/**
+ * A follower needs a heartbeat: the leader answers (fresh result or a new call)
+ */
+const handleHeartbeatRequest = async () => {
+  if (!isLeaderTab()) return;
+  const { data: { session } } = await supabase.auth.getSession();
+  if (!session?.user) return;
+
+  const fresh = lastHeartbeat?.user_id === session.user.id && Date.now() - lastHeartbeatAt < HEARTBEAT_FRESH_MS;
+  if (fresh) {
+    postCrossTabMessage('heartbeat_result', lastHeartbeat);
+  } else {
+    await runHeartbeat(session.user.id);
+  }
+};
+
+/**
+ * Handler for Realtime profile changes
+ * Validates immediately when the signed-in user's own profile changes
+ */
+const handleProfileChange = (change: { new: Record<string, unknown>; old: Record<string, unknown> }) => {
+  const changedId = (change.new?.id || change.old?.id) as string | undefined;
+  if (validatedUserId && changedId === validatedUserId) {
+    console.log('📡 [SessionWatcher] Own profile changed, validating now...');
+    validateSession(true);
+  }
+};
+
 // ====================================================================
 // Public API - Initialization
 // ====================================================================
@@ -234,13 +489,23 @@ export const initSessionWatcher = () => {
   // ====================================================================
   // Start periodic validation timer
   // ====================================================================
-  validateIntervalId = setInterval(() => {
-    // Only validate if tab is visible (don't waste resources on hidden tabs)
-    if (!document.hidden) {
-      validateSession();
-    }
-  }, SESSION_VALIDATE_INTERVAL_MS);
-  console.log(`✅ [SessionWatcher] Periodic validation started (${SESSION_VALIDATE_INTERVAL_MS}ms interval)`);
+  scheduleNextValidation();
+  console.log(`✅ [SessionWatcher] Periodic validation started (${SESSION_VALIDATE_INTERVAL_MS}ms interval, ${SESSION_VALIDATE_BACKOFF_MS}ms with Realtime)`);
+
+  // ====================================================================
+  // Cross-tab heartbeat: tabCoordinator lease + shared results
+  // ====================================================================
+  initTabCoordinator();
+  crossTabUnsubscribers = [
+    onCrossTabMessage('heartbeat_result', handleHeartbeatResult),
+    onCrossTabMessage('heartbeat_request', () => { handleHeartbeatRequest(); })
+  ];
+  console.log(`✅ [SessionWatcher] Heartbeat ${isLeaderTab() ? 'leader' : 'follower'} tab`);
+
+  // ====================================================================
+  // React to pushed profile changes (disable / role change)
+  // ====================================================================
+  unsubscribeProfileChanges = subscribeRealtime('profiles', handleProfileChange);
 
   // ====================================================================
   // Perform initial validation
@@ -269,7 +534,7 @@ export const initSessionWatcher = () => {
  */
 export const validateSessionNow = async () => {
   console.log('🔄 [SessionWatcher] Manual validation requested');
-  return validateSession();
+  return validateSession(true);
 };
 
 // ====================================================================
@@ -297,10 +562,20 @@ export const destroySessionWatcher = () => {
 
   // Clear interval timer
   if (validateIntervalId) {
-    clearInterval(validateIntervalId);
+    clearTimeout(validateIntervalId);
     validateIntervalId = null;
   }
 
+  // Stop heartbeat coordination (the tab lease belongs to tabCoordinator)
+  crossTabUnsubscribers.forEach(unsubscribe => unsubscribe());
+  crossTabUnsubscribers = [];
+
+  // Stop listening to Realtime profile changes
+  if (unsubscribeProfileChanges) {
+    unsubscribeProfileChanges();
+    unsubscribeProfileChanges = null;
+  }
+
   // Clear visibility debounce timeout
   if (visibilityTimeoutId) {
     clearTimeout(visibilityTimeoutId);
@@ -315,6 +590,9 @@ export const destroySessionWatcher = () => {
   isInitialized = false;
   lastValidationTime = 0;
   hasHadValidSession = false;
+  validatedUserId = null;
+  lastHeartbeat = null;
+  lastHeartbeatAt = 0;
 
   console.log('✅ [SessionWatcher] Destroyed successfully');
 };
@@ -344,9 +622,11 @@ export const getSessionWatcherStatus = () => {
     isActive: isInitialized && validateIntervalId !== null,
     lastValidationTime,
     timeSinceLastValidation: lastValidationTime ? Date.now() - lastValidationTime : null,
-    validateInterval: SESSION_VALIDATE_INTERVAL_MS,
+    validateInterval: getPollingInterval(SESSION_VALIDATE_INTERVAL_MS, SESSION_VALIDATE_BACKOFF_MS),
     visibilityDebounce: VISIBILITY_DEBOUNCE_MS,
     hasHadValidSession,
+    isHeartbeatLeader: isLeaderTab(),
+    lastHeartbeatAt,
   };
 };
 
@@ -356,6 +636,9 @@ export const getSessionWatcherStatus = () => {
 
 export const SESSION_WATCHER_CONFIG = {
   SESSION_VALIDATE_INTERVAL_MS,
+  SESSION_VALIDATE_BACKOFF_MS,
   VISIBILITY_DEBOUNCE_MS,
-  VERSION: '1.1.0',  // Added hasHadValidSession flag to prevent logout on initial load
+  HEARTBEAT_FRESH_MS,
+  LEADER_LEASE_MS: TAB_COORDINATOR_CONFIG.LEADER_LEASE_MS,
+  VERSION: '1.4.0',  // Leader-tab session heartbeat shared across tabs
 };
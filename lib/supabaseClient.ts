@@ -1,4 +1,5 @@
 import { createClient } from '@supabase/supabase-js';
+import { initTelemetry, telemetryFetch } from './telemetry';
 
 // ------------------------------------------------------------------
 // إعدادات الاتصال بـ Supabase
@@ -12,6 +13,19 @@ if (!SUPABASE_URL || !SUPABASE_ANON_KEY) {
     throw new Error('Missing Supabase environment variables');
 }
 
+// Connection settings for code that talks to PostgREST directly (e.g. the export worker)
+export const SUPABASE_CONFIG = {
+    url: SUPABASE_URL as string,
+    anonKey: SUPABASE_ANON_KEY as string,
+    restUrl: `${SUPABASE_URL}/rest/v1`
+};
+
+// Real-user latency of every supabase-js call (sampled; see lib/telemetry.ts)
+initTelemetry({
+    endpoint: `${SUPABASE_CONFIG.restUrl}/rpc/ingest_client_perf_events`,
+    apiKey: SUPABASE_CONFIG.anonKey
+});
+
 // Create Supabase client with security-enhanced configuration
 export const supabase = createClient(SUPABASE_URL, SUPABASE_ANON_KEY, {
     auth: {
@@ -41,7 +55,9 @@ export const supabase = createClient(SUPABASE_URL, SUPABASE_ANON_KEY, {
     global: {
         headers: {
             'X-Client-Info': 'myfleet-pro-web'
-        }
+        },
+        // Times requests for telemetry, passes responses through untouched
+        fetch: telemetryFetch
     },
     // Database schema
     db: {
@@ -1,5 +1,9 @@
-import { db } from './db';
+import { db, CarTotalsRow, TX_SYNC_MARKER_PREFIX, clearTransactionSyncMarkers } from './db';
 import { supabase } from './supabaseClient';
+import { runOnLeader } from './tabCoordinator';
+
+// get_car_profit_summary returns at most this many cars per call
+const CAR_SUMMARY_PAGE_SIZE = 500;
 
 /**
  * Syncs local pending changes from IndexDB to Supabase
@@ -51,11 +55,25 @@ export const syncData = async () => {
 export const seedLocalDB = async (orgId: string) => {
     if (!navigator.onLine || !orgId) return;
 
-    // Fetch cars
-    const { data: cars } = await supabase.from('cars').select('*').eq('org_id', orgId);
-    if (cars) {
+    // Fetch cars with their all-time totals (only the latest transactions are cached below)
+    const rows: CarTotalsRow[] = [];
+    let total = Infinity;
+    while (rows.length < total) {
+        const { data, error } = await supabase.rpc('get_car_profit_summary', {
+            p_org_id: orgId,
+            p_search: null,
+            p_limit: CAR_SUMMARY_PAGE_SIZE,
+            p_offset: rows.length
+        });
+        if (error || !data) break;
+        const page = data as { total_count: number; cars: CarTotalsRow[] };
+        total = Number(page.total_count) || 0;
+        if (!page.cars?.length) break;
+        rows.push(...page.cars);
+    }
+    if (total !== Infinity && rows.length >= total) {
         await db.cars.clear();
-        await db.cars.bulkPut(cars);
+        await db.putCarsWithTotals(rows);
     }
 
     // Fetch transactions (limit to recent for performance)
@@ -66,11 +84,56 @@ export const seedLocalDB = async (orgId: string) => {
         .limit(500);
     if (txs) {
         await db.transactions.clear();
+        clearTransactionSyncMarkers();
         await db.transactions.bulkPut(txs);
     }
 };
 
+/**
+ * Write an organization's transactions dated `fromDate` or later to IndexedDB
+ *
+ * Incremental: only rows changed since the last call for the same
+ * (org, fromDate) are downloaded, soft deletes included (local reads skip
+ * them). A new fromDate starts with a full fetch of its period. Before the
+ * change-tracking migration adds transactions.updated_at, new rows are
+ * detected by created_at (edits then wait for the next seed).
+ */
+export const syncRecentTransactions = async (orgId: string, fromDate: string) => {
+    if (!navigator.onLine || !orgId) return;
+
+    const markerKey = `${TX_SYNC_MARKER_PREFIX}${orgId}:${fromDate}`;
+    const since = localStorage.getItem(markerKey);
+    if (!since) clearTransactionSyncMarkers(orgId);
+
+    const fetchChanged = (column: 'updated_at' | 'created_at') => {
+        let query = supabase.from('transactions').select('*').eq('org_id', orgId).gte('date', fromDate);
+        if (since) query = query.gt(column, since);
+        return query.order(column, { ascending: true });
+    };
+
+    let column: 'updated_at' | 'created_at' = 'updated_at';
+    let { data, error } = await fetchChanged(column);
+    if (error?.code === '42703') {
+        column = 'created_at';
+        ({ data, error } = await fetchChanged(column));
+    }
+
+    if (error) {
+        console.warn('Local transaction sync failed:', error);
+        return;
+    }
+    if (!data || data.length === 0) return;
+
+    await db.transactions.bulkPut(data);
+    const newest = data[data.length - 1][column];
+    if (newest) localStorage.setItem(markerKey, newest);
+};
+
 // Auto-sync when coming back online
+// `online` fires in every tab at once while syncQueue is one shared IndexedDB
+// store, so only the leader tab flushes it (no duplicate upserts / deletes)
 if (typeof window !== 'undefined') {
-    window.addEventListener('online', syncData);
+    window.addEventListener('online', () => {
+        runOnLeader('offline_sync', syncData);
+    });
 }
@@ -0,0 +1,336 @@
+/**
+ * @file tabCoordinator.ts
+ * @description Leader election across browser tabs for background work
+ *
+ * Every open tab used to run its own health checks, update polling, session
+ * validation and offline sync. This module elects a leader tab:
+ * - Leadership is a lease in localStorage ({ tabId, expiresAt }), renewed
+ *   while the leader lives and released on pagehide; when it lapses (tab
+ *   closed, frozen or throttled) the next tab that looks takes over
+ * - The default lease covers tab-wide work (session heartbeat, offline
+ *   sync); each leader task competes for a lease of its own name, so a task
+ *   still runs when the tab-wide leader never loaded the module behind it
+ * - runLeaderTask() schedules a periodic task in every tab, but only the
+ *   leader executes it; its result is broadcast through the authUtils
+ *   channel (BroadcastChannel, localStorage fallback) to onTaskResult()
+ *   listeners in all tabs, the leader included
+ *
+ * Usage:
+ * ```typescript
+ * const task = runLeaderTask('app_update_check', checkVersion, { interval: () => 30_000 });
+ * const stop = onTaskResult<string>('app_update_check', version => setLatest(version));
+ * task.runNow(); // leader only
+ * task.stop();
+ * ```
+ */
+
+import { getTabId, onCrossTabMessage, postCrossTabMessage } from './authUtils';
+
+// ====================================================================
+// Types
+// ====================================================================
+
+interface LeaderLease {
+    tabId: string;
+    expiresAt: number;
+}
+
+interface TaskResultMessage {
+    name: string;
+    result: unknown;
+}
+
+export interface LeaderTaskOptions {
+    /** Delay before the next run, re-read after every run */
+    interval: () => number;
+    /** Run once right away (if leader) instead of waiting a full interval */
+    immediate?: boolean;
+}
+
+export interface LeaderTaskHandle {
+    /** Run now if this tab is the leader; resolves to the result or undefined */
+    runNow: () => Promise<unknown>;
+    stop: () => void;
+}
+
+type LeadershipListener = (isLeader: boolean) => void;
+type TaskResultListener<T> = (result: T) => void;
+
+// ====================================================================
+// Configuration
+// ====================================================================
+
+const LEADER_LEASE_KEY = 'securefleet_tab_leader';
+/** Lease used when no task name is given */
+const DEFAULT_LEASE = 'tab';
+const LEADER_LEASE_MS = 45 * 1000;
+const LEADER_RENEW_MS = 15 * 1000;
+
+// ====================================================================
+// State
+// ====================================================================
+
+let initialized = false;
+let renewIntervalId: ReturnType<typeof setInterval> | null = null;
+let unsubscribeResults: (() => void) | null = null;
+
+/** Leases this tab competes for → whether it held them at the last look */
+const leases = new Map<string, boolean>([[DEFAULT_LEASE, false]]);
+const leadershipListeners = new Map<string, Set<LeadershipListener>>();
+const resultListeners = new Map<string, Set<TaskResultListener<unknown>>>();
+
+// ====================================================================
+// Private Helpers
+// ====================================================================
+
+const leaseKey = (lease: string) =>
+    lease === DEFAULT_LEASE ? LEADER_LEASE_KEY : `${LEADER_LEASE_KEY}:${lease}`;
+
+const readLease = (lease: string): LeaderLease | null => {
+    try {
+        const raw = localStorage.getItem(leaseKey(lease));
+        return raw ? JSON.parse(raw) as LeaderLease : null;
+    } catch {
+        return null;
+    }
+};
+
+const notifyLeadership = (lease: string) => {
+    const leader = isLeaderTab(lease);
+    if (leases.get(lease) === leader) return;
+    leases.set(lease, leader);
+    console.log(`👑 [TabCoordinator] ${leader ? 'This tab now leads' : 'Another tab now leads'} "${lease}"`);
+    leadershipListeners.get(lease)?.forEach(listener => listener(leader));
+};
+
+/**
+ * Keep held leases alive and pick up the ones that lapsed
+ */
+const renewLeases = () => {
+    leases.forEach((_held, lease) => claimLeadership(false, lease));
+};
+
+const deliverResult = (name: string, result: unknown) => {
+    resultListeners.get(name)?.forEach(listener => listener(result));
+};
+
+const handlePageHide = () => {
+    leases.forEach((_held, lease) => releaseLeadership(lease));
+};
+
+// ====================================================================
+// Public API - Leadership
+// ====================================================================
+
+/**
+ * Does this tab hold a valid lease?
+ * @param lease - Task name; the tab-wide lease when omitted
+ */
+export const isLeaderTab = (lease = DEFAULT_LEASE): boolean => {
+    const current = readLease(lease);
+    return !!current && current.tabId === getTabId() && current.expiresAt > Date.now();
+};
+
+/**
+ * Take (or renew) the lease unless another tab holds a valid one
+ *
+ * Last writer wins when two tabs claim at once; both read the lease back.
+ *
+ * @param force - Take over even if another tab's lease is still valid
+ * @param lease - Task name; the tab-wide lease when omitted
+ * @returns true if this tab is the leader afterwards
+ */
+export const claimLeadership = (force = false, lease = DEFAULT_LEASE): boolean => {
+    if (!leases.has(lease)) leases.set(lease, false);
+    const current = readLease(lease);
+    if (!force && current && current.tabId !== getTabId() && current.expiresAt > Date.now()) {
+        notifyLeadership(lease);
+        return false;
+    }
+    try {
+        localStorage.setItem(leaseKey(lease), JSON.stringify({ tabId: getTabId(), expiresAt: Date.now() + LEADER_LEASE_MS }));
+    } catch {
+        // Storage unavailable (private mode): every tab acts on its own
+        return true;
+    }
+    notifyLeadership(lease);
+    return isLeaderTab(lease);
+};
+
+/**
+ * Give the lease up so another tab can take over right away
+ */
+export const releaseLeadership = (lease = DEFAULT_LEASE) => {
+    if (isLeaderTab(lease)) {
+        localStorage.removeItem(leaseKey(lease));
+        notifyLeadership(lease);
+    }
+};
+
+/**
+ * Listen to this tab gaining / losing a lease
+ * @returns Unsubscribe function
+ */
+export const onLeadershipChange = (listener: LeadershipListener, lease = DEFAULT_LEASE): (() => void) => {
+    let listeners = leadershipListeners.get(lease);
+    if (!listeners) {
+        listeners = new Set();
+        leadershipListeners.set(lease, listeners);
+    }
+    listeners.add(listener);
+    return () => {
+        listeners?.delete(listener);
+    };
+};
+
+// ====================================================================
+// Public API - Shared Results
+// ====================================================================
+
+/**
+ * Broadcast a task result to every tab (delivered locally as well)
+ */
+export const shareTaskResult = (name: string, result: unknown) => {
+    postCrossTabMessage('task_result', { name, result } as TaskResultMessage);
+    deliverResult(name, result);
+};
+
+/**
+ * Listen to the results of a leader task, whichever tab ran it
+ * @returns Unsubscribe function
+ */
+export const onTaskResult = <T = unknown>(name: string, listener: TaskResultListener<T>): (() => void) => {
+    let listeners = resultListeners.get(name);
+    if (!listeners) {
+        listeners = new Set();
+        resultListeners.set(name, listeners);
+    }
+    listeners.add(listener as TaskResultListener<unknown>);
+    return () => {
+        listeners?.delete(listener as TaskResultListener<unknown>);
+    };
+};
+
+// ====================================================================
+// Public API - Leader Tasks
+// ====================================================================
+
+/**
+ * Schedule a periodic task that only the leader tab executes
+ *
+ * The task competes for a lease of its own name. Every tab keeps the timer
+ * so a follower picks the task up as soon as the lease lapses. A
+ * non-undefined result is shared with all tabs.
+ */
+export const runLeaderTask = <T>(
+    name: string,
+    task: () => Promise<T> | T,
+    options: LeaderTaskOptions
+): LeaderTaskHandle => {
+    initTabCoordinator();
+    let timeoutId: ReturnType<typeof setTimeout> | null = null;
+    let stopped = false;
+    let running: Promise<T | undefined> | null = null;
+
+    const runNow = (): Promise<T | undefined> => {
+        if (!claimLeadership(false, name)) return Promise.resolve(undefined);
+        if (!running) {
+            running = (async () => {
+                try {
+                    const result = await task();
+                    if (result !== undefined) shareTaskResult(name, result);
+                    return result;
+                } catch (error) {
+                    console.error(`❌ [TabCoordinator] Task ${name} failed:`, error);
+                    return undefined;
+                } finally {
+                    running = null;
+                }
+            })();
+        }
+        return running;
+    };
+
+    const schedule = () => {
+        timeoutId = setTimeout(async () => {
+            await runNow();
+            if (!stopped) schedule();
+        }, options.interval());
+    };
+
+    if (options.immediate) runNow();
+    schedule();
+
+    return {
+        runNow,
+        stop: () => {
+            stopped = true;
+            if (timeoutId) clearTimeout(timeoutId);
+            releaseLeadership(name);
+            leases.delete(name);
+        }
+    };
+};
+
+/**
+ * Run a one-off job only in the tab-wide leader (e.g. on the `online` event,
+ * which fires in every tab at once)
+ */
+export const runOnLeader = async <T>(name: string, job: () => Promise<T> | T): Promise<T | undefined> => {
+    initTabCoordinator();
+    if (!claimLeadership()) {
+        console.log(`⏭️ [TabCoordinator] ${name} left to the leader tab`);
+        return undefined;
+    }
+    return job();
+};
+
+// ====================================================================
+// Public API - Lifecycle
+// ====================================================================
+
+/**
+ * Start lease renewal and result delivery (idempotent; called lazily)
+ */
+export const initTabCoordinator = () => {
+    if (initialized || typeof window === 'undefined') return;
+    initialized = true;
+
+    claimLeadership();
+    renewIntervalId = setInterval(renewLeases, LEADER_RENEW_MS);
+    unsubscribeResults = onCrossTabMessage('task_result', message => {
+        const { name, result } = (message.payload || {}) as TaskResultMessage;
+        if (name) deliverResult(name, result);
+    });
+    window.addEventListener('pagehide', handlePageHide);
+    console.log(`✅ [TabCoordinator] Initialized as ${isLeaderTab() ? 'leader' : 'follower'}`);
+};
+
+/**
+ * Stop coordination and hand the lease to another tab
+ */
+export const destroyTabCoordinator = () => {
+    if (!initialized) return;
+    if (renewIntervalId) {
+        clearInterval(renewIntervalId);
+        renewIntervalId = null;
+    }
+    unsubscribeResults?.();
+    unsubscribeResults = null;
+    window.removeEventListener('pagehide', handlePageHide);
+    handlePageHide();
+    initialized = false;
+};
+
+export const getTabCoordinatorStatus = () => ({
+    initialized,
+    tabId: getTabId(),
+    isLeader: isLeaderTab(),
+    leases: Object.fromEntries([...leases.keys()].map(lease => [lease, readLease(lease)]))
+});
+
+export const TAB_COORDINATOR_CONFIG = {
+    LEADER_LEASE_KEY,
+    LEADER_LEASE_MS,
+    LEADER_RENEW_MS
+};
@@ -0,0 +1,440 @@
+/**
+ * @file telemetry.ts
+ * @description Real-user performance telemetry (API latency, routes, Web Vitals)
+ *
+ * Measurements are aggregated in memory and shipped in batches:
+ * - telemetryFetch: fetch wrapper handed to supabase-js (supabaseClient.ts);
+ *   times every PostgREST table / RPC, auth, storage and edge function call
+ * - trackRouteChange(): time from the triggering interaction (click, key,
+ *   back/forward) to the first paint of the new route
+ * - Web Vitals (LCP, FCP, TTFB, INP, CLS×1000) via PerformanceObserver
+ * - Sampling is decided once per tab (VITE_TELEMETRY_SAMPLE_RATE, default
+ *   10%); unsampled tabs only pay for one boolean check per request
+ * - Each (kind, name, method) keeps a fixed-bucket histogram; every minute
+ *   and when the page is hidden the histograms are sent with
+ *   navigator.sendBeacon to ingest_client_perf_events → client_perf_events
+ * - The tenant is proven with a short-lived token from issue_telemetry_token()
+ *   (fetched through the issuer passed to setTelemetryContext, sampled tabs
+ *   only); the server ignores any org_id in the payload
+ *
+ * This module must not import supabaseClient (it is imported by it).
+ *
+ * Usage:
+ * ```typescript
+ * initTelemetry({ endpoint, apiKey });             // supabaseClient.ts
+ * createClient(url, key, { global: { fetch: telemetryFetch } });
+ * setTelemetryContext({ role, issueToken });       // once the profile is known
+ * recordMetric('custom', 'export_pdf', elapsedMs);
+ * ```
+ */
+
+// ====================================================================
+// Types
+// ====================================================================
+
+export type TelemetryKind = 'table' | 'rpc' | 'auth' | 'storage' | 'function' | 'route' | 'vital' | 'custom';
+
+export interface TelemetryConfig {
+    /** ingest_client_perf_events RPC URL */
+    endpoint: string;
+    /** Anon key, sent as ?apikey= (beacons cannot carry headers) */
+    apiKey: string;
+    /** Overrides VITE_TELEMETRY_SAMPLE_RATE */
+    sampleRate?: number;
+}
+
+/** issue_telemetry_token() result */
+export interface TelemetryToken {
+    token: string;
+    expires_at: string;
+}
+
+interface Histogram {
+    kind: TelemetryKind;
+    name: string;
+    method: string | null;
+    count: number;
+    errors: number;
+    sum: number;
+    min: number;
+    max: number;
+    buckets: number[];
+}
+
+// ====================================================================
+// Configuration
+// ====================================================================
+
+/** Upper bucket bounds (ms); one extra overflow bucket follows */
+const BUCKET_BOUNDS_MS = [10, 25, 50, 100, 200, 300, 500, 750, 1000, 1500, 2000, 3000, 5000, 10000];
+const DEFAULT_SAMPLE_RATE = 0.1;
+const FLUSH_INTERVAL_MS = 60 * 1000;
+/** Histograms per beacon (keeps the payload well under the ~64KB beacon limit) */
+const MAX_EVENTS_PER_BEACON = 100;
+/** An interaction older than this did not trigger the route change */
+const ROUTE_INTERACTION_WINDOW_MS = 5000;
+const MAX_NAME_LENGTH = 120;
+/** Tokens live one hour; a new one is requested this long before expiry */
+const TOKEN_REFRESH_MARGIN_MS = 5 * 60 * 1000;
+
+// ====================================================================
+// State
+// ====================================================================
+
+let config: TelemetryConfig | null = null;
+let sampled = false;
+let flushIntervalId: ReturnType<typeof setInterval> | null = null;
+
+const histograms = new Map<string, Histogram>();
+const sessionId = Math.random().toString(36).slice(2) + Date.now().toString(36);
+let context: { role: string | null } = { role: null };
+
+let issueToken: (() => Promise<TelemetryToken | null>) | null = null;
+let token: { value: string; expiresAt: number } | null = null;
+let tokenRequest: Promise<void> | null = null;
+
+let lastInteractionAt: number | null = null;
+let currentRoute: string | null = null;
+
+const vitals = { lcp: 0, cls: 0, inp: 0, reported: false };
+
+// ====================================================================
+// Private Helpers
+// ====================================================================
+
+const readSampleRate = (): number => {
+    const raw = (window as any)._env_?.VITE_TELEMETRY_SAMPLE_RATE ?? import.meta.env.VITE_TELEMETRY_SAMPLE_RATE;
+    const rate = raw === undefined || raw === '' ? DEFAULT_SAMPLE_RATE : Number(raw);
+    return Number.isFinite(rate) ? Math.min(Math.max(rate, 0), 1) : DEFAULT_SAMPLE_RATE;
+};
+
+const bucketIndex = (value: number): number => {
+    for (let i = 0; i < BUCKET_BOUNDS_MS.length; i++) {
+        if (value <= BUCKET_BOUNDS_MS[i]) return i;
+    }
+    return BUCKET_BOUNDS_MS.length;
+};
+
+/**
+ * /orders/3f2a…-uuid/edit → /orders/:id/edit
+ */
+const normalizeRoute = (path: string): string =>
+    (path.split('?')[0] || '/')
+        .replace(/\/[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}(?=\/|$)/gi, '/:id')
+        .replace(/\/\d+(?=\/|$)/g, '/:id')
+        .slice(0, MAX_NAME_LENGTH);
+
+/**
+ * Map a Supabase URL to (kind, name); null for URLs that are not tracked
+ */
+const classifyRequest = (url: string): { kind: TelemetryKind; name: string } | null => {
+    let path: string;
+    try {
+        path = new URL(url, window.location.href).pathname;
+    } catch {
+        return null;
+    }
+    const [, service, version, first, second] = path.split('/');
+    if (version !== 'v1' || !first) return null;
+
+    switch (service) {
+        case 'rest':
+            return first === 'rpc'
+                ? (second && second !== 'ingest_client_perf_events' ? { kind: 'rpc', name: second } : null)
+                : { kind: 'table', name: first };
+        case 'auth':
+            return { kind: 'auth', name: first };
+        case 'storage':
+            return { kind: 'storage', name: second ? `${first}/${second}` : first };
+        case 'functions':
+            return { kind: 'function', name: first };
+        default:
+            return null;
+    }
+};
+
+const requestMethod = (input: RequestInfo | URL, init?: RequestInit): string =>
+    (init?.method || (input instanceof Request ? input.method : 'GET')).toUpperCase();
+
+const requestUrl = (input: RequestInfo | URL): string =>
+    input instanceof Request ? input.url : String(input);
+
+/**
+ * Resolve after the browser painted what the last commit rendered
+ */
+const afterNextPaint = (callback: () => void) => {
+    requestAnimationFrame(() => setTimeout(callback, 0));
+};
+
+const markInteraction = () => {
+    lastInteractionAt = performance.now();
+};
+
+/**
+ * Fetch a tenant token when there is none or it is about to expire
+ */
+const refreshToken = () => {
+    if (!sampled || !issueToken || tokenRequest) return;
+    if (token && token.expiresAt - Date.now() > TOKEN_REFRESH_MARGIN_MS) return;
+
+    const issuer = issueToken;
+    tokenRequest = issuer()
+        .then(next => {
+            // Ignore a token issued for a context that has been replaced since
+            if (issuer !== issueToken) return;
+            token = next ? { value: next.token, expiresAt: Date.parse(next.expires_at) } : null;
+        })
+        .catch(() => { /* beacons go out without a tenant */ })
+        .finally(() => {
+            tokenRequest = null;
+        });
+};
+
+// ====================================================================
+// Web Vitals
+// ====================================================================
+
+const observe = (type: string, callback: (entries: PerformanceEntryList) => void, options: Record<string, unknown> = {}) => {
+    try {
+        const observer = new PerformanceObserver(list => callback(list.getEntries()));
+        observer.observe({ type, buffered: true, ...options } as PerformanceObserverInit);
+    } catch {
+        // Entry type not supported by this browser
+    }
+};
+
+const observeWebVitals = () => {
+    const navigation = performance.getEntriesByType('navigation')[0] as PerformanceNavigationTiming | undefined;
+    if (navigation && navigation.responseStart > 0) {
+        recordMetric('vital', 'TTFB', navigation.responseStart);
+    }
+
+    observe('paint', entries => {
+        const fcp = entries.find(entry => entry.name === 'first-contentful-paint');
+        if (fcp) recordMetric('vital', 'FCP', fcp.startTime);
+    });
+
+    observe('largest-contentful-paint', entries => {
+        const last = entries[entries.length - 1];
+        if (last) vitals.lcp = last.startTime;
+    });
+
+    observe('layout-shift', entries => {
+        for (const entry of entries as Array<PerformanceEntry & { value: number; hadRecentInput: boolean }>) {
+            if (!entry.hadRecentInput) vitals.cls += entry.value;
+        }
+    });
+
+    // INP approximation: slowest interaction of the page
+    observe('event', entries => {
+        for (const entry of entries as Array<PerformanceEntry & { interactionId?: number }>) {
+            if (entry.interactionId && entry.duration > vitals.inp) vitals.inp = entry.duration;
+        }
+    }, { durationThreshold: 40 });
+};
+
+/**
+ * LCP / CLS / INP are final once the page is hidden; report them once
+ */
+const reportFinalVitals = () => {
+    if (vitals.reported) return;
+    vitals.reported = true;
+    if (vitals.lcp > 0) recordMetric('vital', 'LCP', vitals.lcp);
+    recordMetric('vital', 'CLS', vitals.cls * 1000);
+    if (vitals.inp > 0) recordMetric('vital', 'INP', vitals.inp);
+};
+
+// ====================================================================
+// Flushing
+// ====================================================================
+
+const sendBatch = (events: Histogram[]) => {
+    if (!config) return;
+    const body = JSON.stringify({
+        session_id: sessionId,
+        token: token && token.expiresAt > Date.now() ? token.value : null,
+        role: context.role,
+        app_version: (window as any)._env_?.APP_VERSION ?? null,
+        events: events.map(h => ({
+            kind: h.kind,
+            name: h.name,
+            method: h.method,
+            count: h.count,
+            errors: h.errors,
+            sum_ms: Math.round(h.sum),
+            min_ms: Math.round(h.min),
+            max_ms: Math.round(h.max),
+            buckets: h.buckets
+        }))
+    });
+    const url = `${config.endpoint}?apikey=${encodeURIComponent(config.apiKey)}`;
+
+    // text/plain keeps the beacon a CORS "simple" request; the RPC takes the
+    // raw body as its single text argument
+    const queued = typeof navigator.sendBeacon === 'function'
+        && navigator.sendBeacon(url, new Blob([body], { type: 'text/plain' }));
+    if (!queued) {
+        fetch(url, { method: 'POST', body, keepalive: true, headers: { 'Content-Type': 'text/plain' } })
+            .catch(() => { /* telemetry is best effort */ });
+    }
+};
+
+const handleVisibilityChange = () => {
+    if (document.visibilityState === 'hidden') {
+        reportFinalVitals();
+        flushTelemetry();
+    }
+};
+
+// ====================================================================
+// Public API
+// ====================================================================
+
+/**
+ * Add one measurement to the in-memory histogram of (kind, name, method)
+ */
+export const recordMetric = (
+    kind: TelemetryKind,
+    name: string,
+    value: number,
+    options: { method?: string | null; error?: boolean } = {}
+) => {
+    if (!sampled || !Number.isFinite(value) || value < 0) return;
+    const method = options.method ?? null;
+    const key = `${kind}|${name}|${method ?? ''}`;
+
+    let histogram = histograms.get(key);
+    if (!histogram) {
+        histogram = {
+            kind,
+            name: name.slice(0, MAX_NAME_LENGTH),
+            method,
+            count: 0,
+            errors: 0,
+            sum: 0,
+            min: value,
+            max: value,
+            buckets: new Array(BUCKET_BOUNDS_MS.length + 1).fill(0)
+        };
+        histograms.set(key, histogram);
+    }
+    histogram.count++;
+    histogram.sum += value;
+    histogram.min = Math.min(histogram.min, value);
+    histogram.max = Math.max(histogram.max, value);
+    histogram.buckets[bucketIndex(value)]++;
+    if (options.error) histogram.errors++;
+};
+
+/**
+ * fetch for supabase-js: times the request, then hands back the untouched response
+ *
+ * Calls the global fetch at request time so other wrappers keep working.
+ */
+export const telemetryFetch: typeof fetch = async (input, init) => {
+    if (!sampled) return fetch(input, init);
+    const target = classifyRequest(requestUrl(input));
+    if (!target) return fetch(input, init);
+
+    const method = requestMethod(input, init);
+    const start = performance.now();
+    try {
+        const response = await fetch(input, init);
+        recordMetric(target.kind, target.name, performance.now() - start, {
+            method,
+            error: response.status >= 500
+        });
+        return response;
+    } catch (error) {
+        // Aborted requests say nothing about latency
+        if ((error as Error)?.name !== 'AbortError') {
+            recordMetric(target.kind, target.name, performance.now() - start, { method, error: true });
+        }
+        throw error;
+    }
+};
+
+/**
+ * Record a route transition; call from an effect keyed on the pathname
+ *
+ * The first call (initial render) is covered by the Web Vitals instead.
+ */
+export const trackRouteChange = (pathname: string) => {
+    const route = normalizeRoute(pathname);
+    const previous = currentRoute;
+    currentRoute = route;
+    if (!sampled || previous === null || previous === route) return;
+
+    const startedAt = lastInteractionAt;
+    lastInteractionAt = null;
+    if (startedAt === null || performance.now() - startedAt > ROUTE_INTERACTION_WINDOW_MS) return;
+
+    afterNextPaint(() => recordMetric('route', route, performance.now() - startedAt));
+};
+
+/**
+ * Role and tenant-token issuer for every following beacon
+ *
+ * A new issuer (another user signed in) drops the current token; null
+ * stops attributing beacons to a tenant.
+ */
+export const setTelemetryContext = (next: {
+    role?: string | null;
+    issueToken?: (() => Promise<TelemetryToken | null>) | null;
+}) => {
+    context = {
+        role: next.role !== undefined ? next.role : context.role
+    };
+    if (next.issueToken !== undefined && next.issueToken !== issueToken) {
+        issueToken = next.issueToken;
+        token = null;
+        refreshToken();
+    }
+};
+
+/**
+ * Send the collected histograms now and start a new window
+ */
+export const flushTelemetry = () => {
+    refreshToken();
+    if (!sampled || histograms.size === 0) return;
+    const events = Array.from(histograms.values());
+    histograms.clear();
+    for (let i = 0; i < events.length; i += MAX_EVENTS_PER_BEACON) {
+        sendBatch(events.slice(i, i + MAX_EVENTS_PER_BEACON));
+    }
+};
+
+/**
+ * Decide sampling and start collectors (idempotent)
+ */
+export const initTelemetry = (options: TelemetryConfig) => {
+    if (config || typeof window === 'undefined') return;
+    config = options;
+    sampled = Math.random() < (options.sampleRate ?? readSampleRate());
+    if (!sampled) return;
+
+    observeWebVitals();
+    window.addEventListener('pointerdown', markInteraction, { capture: true, passive: true });
+    window.addEventListener('keydown', markInteraction, { capture: true, passive: true });
+    window.addEventListener('popstate', markInteraction);
+    window.addEventListener('hashchange', markInteraction);
+    document.addEventListener('visibilitychange', handleVisibilityChange);
+    window.addEventListener('pagehide', flushTelemetry);
+    flushIntervalId = setInterval(flushTelemetry, FLUSH_INTERVAL_MS);
+    console.log('📈 [Telemetry] Sampling this session');
+};
+
+export const getTelemetryStatus = () => ({
+    sampled,
+    sessionId,
+    pendingHistograms: histograms.size,
+    flushing: flushIntervalId !== null
+});
+
+export const TELEMETRY_CONFIG = {
+    BUCKET_BOUNDS_MS,
+    DEFAULT_SAMPLE_RATE,
+    FLUSH_INTERVAL_MS,
+    MAX_EVENTS_PER_BEACON
+};
@@ -1,15 +1,35 @@
 import { supabase } from './supabaseClient';
+import { db } from './db';
+import { BACKUP_V2_EXTENSION, encodeBackupV2 } from './backupFormat';
 
 type TableRow = Record<string, unknown>;
 
 export interface TenantBackupFile {
   app: 'myfleet-pro';
-  version: 1;
+  /** 1 = plain JSON file, 2 = compressed container (lib/backupFormat.ts) */
+  version: 1 | 2;
   exported_at: string;
   org_id: string;
+  /** Referenced by differential backups built on top of this one (absent in old files) */
+  backup_id?: string;
+  /** Differential backups only contain rows changed since `since` */
+  kind?: BackupKind;
+  parent_id?: string;
+  since?: string;
   data: Record<string, TableRow[]>;
 }
 
+export type BackupKind = 'full' | 'differential';
+
+/**
+ * The part of a previous backup a differential export needs
+ */
+export interface BackupReference {
+  backup_id: string;
+  exported_at: string;
+  kind: BackupKind;
+}
+
 const ORG_TABLES = [
   'drivers',
   'cars',
@@ -44,23 +64,146 @@ const RESTORE_ORDER = [
   'notification_queue'
 ] as const;
 
-async function selectTable(table: string, column: string, value: string): Promise<TableRow[]> {
-  const { data, error } = await supabase.from(table).select('*').eq(column, value);
+// Rows per request when paging a table, and ids per request for IN (...) filters
+const PAGE_SIZE = 1000;
+const IN_CHUNK_SIZE = 150;
+const EXPORT_CONCURRENCY = 4;
+// Checkpoints older than this are discarded instead of resumed
+const CHECKPOINT_MAX_AGE_MS = 24 * 60 * 60 * 1000;
+// Rows per upsert / staged chunk when restoring, and chunks in flight per table
+const RESTORE_CHUNK_SIZE = 1000;
+const RESTORE_CONCURRENCY = 3;
+/** Rows applied per restore_tenant_backup call; smaller restores run in one transaction */
+const RESTORE_APPLY_ROWS = 5000;
+// Differential exports look this far before the parent's exported_at to absorb client clock skew
+const SINCE_OVERLAP_MS = 5 * 60 * 1000;
+const LAST_BACKUP_KEY_PREFIX = 'myfleet_last_backup_';
+
+export interface BackupProgress {
+  table: string;
+  rows: number;
+  completedUnits: number;
+  totalUnits: number;
+}
+
+export interface ExportBackupOptions {
+  onProgress?: (progress: BackupProgress) => void;
+  concurrency?: number;
+  /** Continue an interrupted export of the same org (default true) */
+  resume?: boolean;
+  /** Export only rows changed since this backup (differential backup) */
+  since?: BackupReference;
+}
+
+export interface RestoreProgress {
+  table: string;
+  done: number;
+  total: number;
+  tableIndex: number;
+  tableCount: number;
+  /** Position of the backup being applied when replaying a chain */
+  step?: number;
+  steps?: number;
+}
+
+export interface ImportBackupOptions {
+  onProgress?: (progress: RestoreProgress) => void;
+  chunkSize?: number;
+  concurrency?: number;
+  /** Stage all chunks and apply them server-side (one transaction up to RESTORE_APPLY_ROWS rows) */
+  transactional?: boolean;
+}
+
+/**
+ * One independently fetchable slice of the backup: a table filtered by
+ * `column = value` or `column IN (values)`, paged by id
+ */
+interface ExportUnit {
+  key: string;
+  table: string;
+  column: string;
+  values: string[];
+}
+
+function isMissingTable(error: { code?: string } | null): boolean {
+  return !!error && (error.code === '42P01' || error.code === 'PGRST205');
+}
+
+function isMissingColumn(error: { code?: string } | null): boolean {
+  return !!error && (error.code === '42703' || error.code === 'PGRST204');
+}
+
+/**
+ * Fetch one page ordered by id, starting after `cursor` (keyset + range).
+ * With `since`, only rows updated after that instant are returned.
+ */
+async function selectPage(unit: ExportUnit, cursor: string | null, since: string | null): Promise<TableRow[] | null> {
+  let query = supabase.from(unit.table).select('*');
+  query = unit.values.length === 1 ? query.eq(unit.column, unit.values[0]) : query.in(unit.column, unit.values);
+  if (since) query = query.gt('updated_at', since);
+  if (cursor) query = query.gt('id', cursor);
+
+  const { data, error } = await query.order('id', { ascending: true }).range(0, PAGE_SIZE - 1);
   if (error) {
-    if (error.code === '42P01' || error.code === 'PGRST205') return [];
-    throw new Error(`${table}: ${error.message}`);
+    if (isMissingTable(error)) return null;
+    if (since && isMissingColumn(error)) {
+      throw new Error(`${unit.table}: النسخ التفاضلي يتطلب تحديث قاعدة البيانات (عمود updated_at غير موجود)`);
+    }
+    throw new Error(`${unit.table}: ${error.message}`);
   }
   return (data || []) as TableRow[];
 }
 
-async function selectIn(table: string, column: string, values: string[]): Promise<TableRow[]> {
-  if (values.length === 0) return [];
-  const { data, error } = await supabase.from(table).select('*').in(column, values);
-  if (error) {
-    if (error.code === '42P01' || error.code === 'PGRST205') return [];
-    throw new Error(`${table}: ${error.message}`);
+/**
+ * All ids of a table for one filter value (differential exports still need
+ * every parent id to find changed child rows)
+ */
+async function selectAllIds(table: string, column: string, value: string): Promise<string[]> {
+  const ids: string[] = [];
+  let cursor: string | null = null;
+  for (;;) {
+    let query = supabase.from(table).select('id').eq(column, value);
+    if (cursor) query = query.gt('id', cursor);
+    const { data, error } = await query.order('id', { ascending: true }).range(0, PAGE_SIZE - 1);
+    if (error) {
+      if (isMissingTable(error)) return ids;
+      throw new Error(`${table}: ${error.message}`);
+    }
+    const page = rowIds((data || []) as TableRow[]);
+    ids.push(...page);
+    if (page.length < PAGE_SIZE) return ids;
+    cursor = page[page.length - 1];
   }
-  return (data || []) as TableRow[];
+}
+
+/**
+ * Run async tasks with at most `limit` in flight
+ */
+async function runPool<T>(items: T[], limit: number, task: (item: T) => Promise<void>): Promise<void> {
+  let next = 0;
+  const workers = Array.from({ length: Math.min(limit, items.length) }, async () => {
+    while (next < items.length) {
+      const item = items[next++];
+      await task(item);
+    }
+  });
+  await Promise.all(workers);
+}
+
+function chunk<T>(values: T[], size: number): T[][] {
+  const result: T[][] = [];
+  for (let i = 0; i < values.length; i += size) result.push(values.slice(i, i + size));
+  return result;
+}
+
+function unitsFor(table: string, column: string, values: string[]): ExportUnit[] {
+  const sorted = [...new Set(values)].sort();
+  return chunk(sorted, IN_CHUNK_SIZE).map((part, index) => ({
+    key: `${table}:${column}:${index}`,
+    table,
+    column,
+    values: part
+  }));
 }
 
 function rowIds(rows: TableRow[]): string[] {
@@ -79,79 +222,380 @@ function normalizeRowsForRestore(table: string, rows: TableRow[], orgId: string)
   });
 }
 
-export async function exportTenantBackup(orgId: string): Promise<TenantBackupFile> {
-  const organization = await selectTable('organizations', 'id', orgId);
-  const profiles = await selectTable('profiles', 'org_id', orgId);
-  const profileIds = rowIds(profiles);
+/**
+ * Export every row that belongs to an organization
+ *
+ * Independent tables are fetched concurrently (bounded pool), each one paged
+ * by id. Every page is written to IndexedDB with a cursor checkpoint, so an
+ * export interrupted by a network failure continues where it stopped the next
+ * time it is started for the same org.
+ *
+ * With `options.since`, only rows whose updated_at is newer than that backup
+ * are exported and the result is a differential backup chained to it.
+ */
+export async function exportTenantBackup(orgId: string, options: ExportBackupOptions = {}): Promise<TenantBackupFile> {
+  const concurrency = options.concurrency || EXPORT_CONCURRENCY;
+  const jobId = orgId;
+
+  const parentId = options.since?.backup_id || null;
+  const since = options.since
+    ? new Date(Date.parse(options.since.exported_at) - SINCE_OVERLAP_MS).toISOString()
+    : null;
+
+  let checkpoint = await db.backupCheckpoints.get(jobId);
+  const stale = checkpoint && (
+    options.resume === false ||
+    Date.now() - checkpoint.updated_at > CHECKPOINT_MAX_AGE_MS ||
+    (checkpoint.parent_id || null) !== parentId
+  );
+  if (checkpoint && stale) {
+    await discardCheckpoint(jobId);
+    checkpoint = undefined;
+  }
+  if (checkpoint) {
+    console.log(`♻️ [Backup] Resuming export started at ${checkpoint.started_at}`);
+  } else {
+    checkpoint = {
+      id: jobId,
+      org_id: orgId,
+      started_at: new Date().toISOString(),
+      units: {},
+      updated_at: Date.now(),
+      backup_id: crypto.randomUUID(),
+      parent_id: parentId,
+      since
+    };
+    await db.backupCheckpoints.put(checkpoint);
+  }
+  const state = checkpoint;
+  let completedUnits = 0;
+  let totalUnits = 0;
+
+  const runUnit = async (unit: ExportUnit) => {
+    const progress = state.units[unit.key] || { done: false, cursor: null, rows: 0 };
+    state.units[unit.key] = progress;
 
-  const data: Record<string, TableRow[]> = {
-    organizations: organization,
-    profiles
+    while (!progress.done) {
+      const rows = await selectPage(unit, progress.cursor, since);
+      if (rows && rows.length > 0) {
+        await db.backupPages.add({ job_id: jobId, unit: unit.key, rows });
+        progress.cursor = String(rows[rows.length - 1].id);
+        progress.rows += rows.length;
+      }
+      progress.done = !rows || rows.length < PAGE_SIZE;
+      state.updated_at = Date.now();
+      await db.backupCheckpoints.put(state);
+      options.onProgress?.({ table: unit.table, rows: progress.rows, completedUnits, totalUnits });
+    }
+    completedUnits++;
+    options.onProgress?.({ table: unit.table, rows: progress.rows, completedUnits, totalUnits });
   };
 
-  for (const table of ORG_TABLES) {
-    data[table] = await selectTable(table, 'org_id', orgId);
+  const runPhase = async (units: ExportUnit[]) => {
+    totalUnits += units.length;
+    await runPool(units, concurrency, runUnit);
+  };
+
+  const readTable = async (table: string, units: ExportUnit[]): Promise<TableRow[]> => {
+    const keys = units.filter(unit => unit.table === table).map(unit => unit.key);
+    const pages = await db.backupPages.where('[job_id+unit]').anyOf(keys.map(key => [jobId, key])).toArray();
+    const seen = new Set<unknown>();
+    const rows: TableRow[] = [];
+    pages.forEach(page => page.rows.forEach(row => {
+      if (seen.has(row.id)) return;
+      seen.add(row.id);
+      rows.push(row);
+    }));
+    return rows;
+  };
+
+  // Phase 1: tables filtered directly by the organization
+  const phaseOne: ExportUnit[] = [
+    { key: 'organizations', table: 'organizations', column: 'id', values: [orgId] },
+    { key: 'profiles', table: 'profiles', column: 'org_id', values: [orgId] },
+    ...ORG_TABLES.map(table => ({ key: table, table, column: 'org_id', values: [orgId] }))
+  ];
+  await runPhase(phaseOne);
+
+  const data: Record<string, TableRow[]> = {};
+  for (const table of ['organizations', 'profiles', ...ORG_TABLES]) {
+    data[table] = await readTable(table, phaseOne);
   }
 
-  const carIds = rowIds(data.cars || []);
-  const assetIds = rowIds(data.assets || []);
-  const sessionIds = rowIds(data.whatsapp_sessions || []);
+  // Phase 2: child tables filtered by ids collected in phase 1. A differential
+  // phase 1 only holds changed parents, so parent ids are listed separately.
+  const parentIds = async (table: string) => since
+    ? selectAllIds(table, 'org_id', orgId)
+    : rowIds(data[table] || []);
+  const profileIds = await parentIds('profiles');
+  const phaseTwo: ExportUnit[] = [
+    ...unitsFor('transactions', 'car_id', await parentIds('cars')),
+    ...unitsFor('transactions', 'user_id', profileIds),
+    ...unitsFor('asset_installments', 'asset_id', await parentIds('assets')),
+    ...unitsFor('expense_templates', 'user_id', profileIds),
+    ...unitsFor('whatsapp_messages', 'session_id', await parentIds('whatsapp_sessions'))
+  ];
+  await runPhase(phaseTwo);
 
-  data.transactions = [
-    ...await selectIn('transactions', 'car_id', carIds),
-    ...await selectIn('transactions', 'user_id', profileIds)
-  ].filter((row, index, rows) => rows.findIndex(item => item.id === row.id) === index);
+  for (const table of ['transactions', 'asset_installments', 'expense_templates', 'whatsapp_messages']) {
+    data[table] = await readTable(table, phaseTwo);
+  }
 
-  data.asset_installments = await selectIn('asset_installments', 'asset_id', assetIds);
-  data.expense_templates = await selectIn('expense_templates', 'user_id', profileIds);
-  data.whatsapp_messages = await selectIn('whatsapp_messages', 'session_id', sessionIds);
+  await discardCheckpoint(jobId);
 
   return {
     app: 'myfleet-pro',
-    version: 1,
-    exported_at: new Date().toISOString(),
+    version: 2,
+    exported_at: state.started_at,
     org_id: orgId,
+    backup_id: state.backup_id || crypto.randomUUID(),
+    kind: state.parent_id ? 'differential' : 'full',
+    ...(state.parent_id ? { parent_id: state.parent_id, since: state.since || undefined } : {}),
     data
   };
 }
 
-export async function importTenantBackup(orgId: string, backup: TenantBackupFile): Promise<Record<string, number>> {
-  if (backup.app !== 'myfleet-pro' || backup.version !== 1 || !backup.data) {
+/**
+ * Is there an interrupted export that exportTenantBackup() would resume?
+ */
+export async function hasPendingBackupExport(orgId: string): Promise<boolean> {
+  const checkpoint = await db.backupCheckpoints.get(orgId);
+  return !!checkpoint && Date.now() - checkpoint.updated_at <= CHECKPOINT_MAX_AGE_MS;
+}
+
+export async function discardCheckpoint(orgId: string): Promise<void> {
+  await db.transaction('rw', db.backupCheckpoints, db.backupPages, async () => {
+    await db.backupPages.where('job_id').equals(orgId).delete();
+    await db.backupCheckpoints.delete(orgId);
+  });
+}
+
+/**
+ * Validate a parsed backup file against the organization it is restored into
+ */
+function assertRestorable(orgId: string, backup: TenantBackupFile): void {
+  if (backup.app !== 'myfleet-pro' || (backup.version !== 1 && backup.version !== 2) || !backup.data) {
     throw new Error('ملف النسخة الاحتياطية غير صالح');
   }
 
   if (backup.org_id !== orgId) {
     throw new Error('هذه النسخة تخص منشأة أخرى ولا يمكن استيرادها هنا');
   }
+}
 
+/**
+ * Restore table by table; chunks of the same table are upserted concurrently.
+ * Rows are normalized per chunk so only one chunk copy per worker is alive.
+ */
+async function restoreChunked(orgId: string, backup: TenantBackupFile, options: ImportBackupOptions): Promise<Record<string, number>> {
+  const chunkSize = options.chunkSize || RESTORE_CHUNK_SIZE;
+  const concurrency = options.concurrency || RESTORE_CONCURRENCY;
+  const tables = RESTORE_ORDER.filter(table => (backup.data[table] || []).length > 0);
   const counts: Record<string, number> = {};
 
-  for (const table of RESTORE_ORDER) {
-    const rows = backup.data[table] || [];
-    if (rows.length === 0) continue;
+  for (const [tableIndex, table] of tables.entries()) {
+    const rows = backup.data[table];
+    const offsets = Array.from({ length: Math.ceil(rows.length / chunkSize) }, (_, i) => i * chunkSize);
+    let done = 0;
+    let missing = false;
 
-    const { error } = await supabase
-      .from(table)
-      .upsert(normalizeRowsForRestore(table, rows, orgId), { onConflict: 'id' });
+    options.onProgress?.({ table, done, total: rows.length, tableIndex, tableCount: tables.length });
+    await runPool(offsets, concurrency, async offset => {
+      if (missing) return;
+      const part = rows.slice(offset, offset + chunkSize);
+      const { error } = await supabase
+        .from(table)
+        .upsert(normalizeRowsForRestore(table, part, orgId), { onConflict: 'id' });
 
-    if (error) {
-      if (error.code === '42P01' || error.code === 'PGRST205') continue;
-      throw new Error(`${table}: ${error.message}`);
+      if (error) {
+        if (isMissingTable(error)) {
+          missing = true;
+          return;
+        }
+        throw new Error(`${table}: ${error.message}`);
+      }
+      done += part.length;
+      options.onProgress?.({ table, done, total: rows.length, tableIndex, tableCount: tables.length });
+    });
+
+    if (!missing) counts[table] = rows.length;
+  }
+
+  return counts;
+}
+
+/**
+ * Upload chunks into backup_restore_staging, then let restore_tenant_backup()
+ * apply them server-side. Up to RESTORE_APPLY_ROWS rows are applied inside a
+ * single Postgres transaction (all or nothing); larger restores are applied
+ * in steps of that size so no call runs into statement_timeout, and a failed
+ * step rolls back only its own chunks.
+ */
+async function restoreTransactional(orgId: string, backup: TenantBackupFile, options: ImportBackupOptions): Promise<Record<string, number>> {
+  const chunkSize = options.chunkSize || RESTORE_CHUNK_SIZE;
+  const concurrency = options.concurrency || RESTORE_CONCURRENCY;
+  const restoreId = crypto.randomUUID();
+  const tables = RESTORE_ORDER.filter(table => (backup.data[table] || []).length > 0);
+  const totalRows = tables.reduce((sum, table) => sum + backup.data[table].length, 0);
+
+  try {
+    for (const [tableIndex, table] of tables.entries()) {
+      const rows = backup.data[table];
+      const offsets = Array.from({ length: Math.ceil(rows.length / chunkSize) }, (_, i) => i * chunkSize);
+      let done = 0;
+
+      options.onProgress?.({ table, done, total: rows.length, tableIndex, tableCount: tables.length });
+      await runPool(offsets, concurrency, async offset => {
+        const part = rows.slice(offset, offset + chunkSize);
+        const { error } = await supabase.from('backup_restore_staging').insert({
+          restore_id: restoreId,
+          org_id: orgId,
+          table_name: table,
+          seq: offset / chunkSize,
+          rows: part
+        });
+        if (error) throw new Error(`${table}: ${error.message}`);
+        done += part.length;
+        options.onProgress?.({ table, done, total: rows.length, tableIndex, tableCount: tables.length });
+      });
+    }
+
+    const maxRows = totalRows > RESTORE_APPLY_ROWS ? RESTORE_APPLY_ROWS : null;
+    console.log(`🧩 [Backup] Applying staged restore ${restoreId.substr(0, 8)} ${maxRows ? `in steps of ${maxRows} rows` : 'in one transaction'}`);
+
+    const counts: Record<string, number> = {};
+    let remaining = 1;
+    while (remaining > 0) {
+      const { data, error } = await supabase.rpc('restore_tenant_backup', {
+        p_restore_id: restoreId,
+        p_org_id: orgId,
+        p_max_rows: maxRows
+      });
+      if (error) throw new Error(error.message);
+
+      const step = (data || {}) as { counts?: Record<string, number>; remaining?: number };
+      Object.entries(step.counts || {}).forEach(([table, count]) => {
+        counts[table] = (counts[table] || 0) + count;
+      });
+      remaining = step.remaining || 0;
     }
+    return counts;
+  } catch (error) {
+    // Applied steps stay; the chunks that were not applied need to go
+    await supabase.from('backup_restore_staging').delete().eq('restore_id', restoreId);
+    throw error;
+  }
+}
+
+/**
+ * Restore a backup into the current organization
+ *
+ * - Default: chunked upserts (RESTORE_CHUNK_SIZE rows per request, bounded
+ *   concurrency within a table, tables in dependency order)
+ * - `transactional: true`: chunks are staged server-side and applied by the
+ *   restore_tenant_backup RPC, in one transaction up to RESTORE_APPLY_ROWS
+ *   rows and in steps of that size beyond
+ */
+export async function importTenantBackup(
+  orgId: string,
+  backup: TenantBackupFile,
+  options: ImportBackupOptions = {}
+): Promise<Record<string, number>> {
+  assertRestorable(orgId, backup);
+  return options.transactional
+    ? restoreTransactional(orgId, backup, options)
+    : restoreChunked(orgId, backup, options);
+}
 
-    counts[table] = rows.length;
+/**
+ * Order backup files into one chain (each file's parent_id is the previous
+ * file's backup_id). The chain may start with a full backup or, to update
+ * data that is already restored, with a differential one.
+ */
+export function orderBackupChain(backups: TenantBackupFile[]): TenantBackupFile[] {
+  if (backups.length <= 1) return backups;
+
+  const ids = new Set(backups.map(backup => backup.backup_id).filter(Boolean));
+  const heads = backups.filter(backup => !backup.parent_id || !ids.has(backup.parent_id));
+  if (heads.length !== 1) {
+    throw new Error('الملفات المختارة لا تشكل سلسلة نسخ واحدة متصلة');
+  }
+
+  const chain = [heads[0]];
+  while (chain.length < backups.length) {
+    const last = chain[chain.length - 1];
+    const children = backups.filter(backup => last.backup_id && backup.parent_id === last.backup_id);
+    if (children.length !== 1) {
+      throw new Error('سلسلة النسخ غير مكتملة أو تحتوي على تفرعات');
+    }
+    chain.push(children[0]);
+  }
+  return chain;
+}
+
+/**
+ * Replay a base backup and its differential backups in order. Every file is
+ * validated before the first one is applied.
+ */
+export async function importBackupChain(
+  orgId: string,
+  backups: TenantBackupFile[],
+  options: ImportBackupOptions = {}
+): Promise<Record<string, number>> {
+  backups.forEach(backup => assertRestorable(orgId, backup));
+  const chain = orderBackupChain(backups);
+  const counts: Record<string, number> = {};
+
+  for (const [step, backup] of chain.entries()) {
+    console.log(`🔗 [Backup] Applying ${backup.kind || 'full'} backup ${step + 1}/${chain.length} (${backup.exported_at})`);
+    const stepCounts = await importTenantBackup(orgId, backup, {
+      ...options,
+      onProgress: progress => options.onProgress?.({ ...progress, step, steps: chain.length })
+    });
+    Object.entries(stepCounts).forEach(([table, count]) => {
+      counts[table] = (counts[table] || 0) + count;
+    });
   }
 
   return counts;
 }
 
-export function downloadBackupFile(backup: TenantBackupFile, orgName?: string): void {
+/**
+ * Last backup downloaded on this device, used as the base of the next
+ * differential backup
+ */
+export function getLastBackup(orgId: string): BackupReference | null {
+  try {
+    const raw = localStorage.getItem(`${LAST_BACKUP_KEY_PREFIX}${orgId}`);
+    return raw ? (JSON.parse(raw) as BackupReference) : null;
+  } catch {
+    return null;
+  }
+}
+
+function rememberBackup(backup: TenantBackupFile): void {
+  if (!backup.backup_id) return;
+  const reference: BackupReference = {
+    backup_id: backup.backup_id,
+    exported_at: backup.exported_at,
+    kind: backup.kind || 'full'
+  };
+  localStorage.setItem(`${LAST_BACKUP_KEY_PREFIX}${backup.org_id}`, JSON.stringify(reference));
+}
+
+/**
+ * Download a backup as a compressed version 2 file (gzip NDJSON per table
+ * with a checksummed manifest)
+ */
+export async function downloadBackupFile(backup: TenantBackupFile, orgName?: string): Promise<void> {
   const safeName = (orgName || backup.org_id).replace(/[^\w\u0600-\u06FF-]+/g, '_');
-  const blob = new Blob([JSON.stringify(backup, null, 2)], { type: 'application/json;charset=utf-8' });
+  const blob = await encodeBackupV2(backup);
+  const kind = backup.kind === 'differential' ? '-diff' : '';
   const url = URL.createObjectURL(blob);
   const link = document.createElement('a');
   link.href = url;
-  link.download = `myfleet-backup-${safeName}-${new Date().toISOString().slice(0, 10)}.json`;
+  link.download = `myfleet-backup-${safeName}${kind}-${backup.exported_at.slice(0, 19).replace(/:/g, '-')}.${BACKUP_V2_EXTENSION}`;
   link.click();
   URL.revokeObjectURL(url);
+  rememberBackup(backup);
 }
@@ -0,0 +1,44 @@
+-- =====================================================
+-- Realtime Publication for Client Cache Invalidation
+-- =====================================================
+-- The web client keeps ONE Realtime channel per tab (lib/realtimeManager.ts)
+-- and listens to changes on these tables instead of polling.
+-- =====================================================
+
+-- ==========================================
+-- 1. Ensure the supabase_realtime publication exists
+-- ==========================================
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_publication WHERE pubname = 'supabase_realtime') THEN
+        CREATE PUBLICATION supabase_realtime;
+    END IF;
+END $$;
+
+-- ==========================================
+-- 2. Add watched tables (idempotent)
+-- ==========================================
+DO $$
+DECLARE
+    v_table TEXT;
+BEGIN
+    FOREACH v_table IN ARRAY ARRAY['cars', 'transactions', 'profiles', 'public_config', 'organizations']
+    LOOP
+        IF to_regclass('public.' || v_table) IS NOT NULL AND NOT EXISTS (
+            SELECT 1 FROM pg_publication_tables
+            WHERE pubname = 'supabase_realtime'
+              AND schemaname = 'public'
+              AND tablename = v_table
+        ) THEN
+            EXECUTE format('ALTER PUBLICATION supabase_realtime ADD TABLE public.%I', v_table);
+        END IF;
+    END LOOP;
+END $$;
+
+-- ==========================================
+-- 3. Include old row values on UPDATE/DELETE
+-- ==========================================
+-- Lets clients match DELETE events and soft-delete transitions by id / org_id
+ALTER TABLE public.cars REPLICA IDENTITY FULL;
+ALTER TABLE public.transactions REPLICA IDENTITY FULL;
+ALTER TABLE public.profiles REPLICA IDENTITY FULL;
@@ -0,0 +1,96 @@
+-- =====================================================
+-- Dashboard Summary RPC
+-- =====================================================
+-- Returns every Dashboard KPI in one round trip instead of downloading
+-- all transactions since the start of the month/week and summing in JS.
+-- Payload size is constant regardless of tenant size.
+-- =====================================================
+
+-- ==========================================
+-- 1. Tenant access helper (reused by reporting RPCs)
+-- ==========================================
+CREATE OR REPLACE FUNCTION public.can_access_org(p_org_id UUID)
+RETURNS BOOLEAN
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+    SELECT EXISTS (
+        SELECT 1 FROM profiles
+        WHERE id = auth.uid()
+          AND status IS DISTINCT FROM 'disabled'
+          AND (org_id = p_org_id OR role = 'super_admin')
+    ) OR auth.role() = 'service_role';
+$$;
+
+-- ==========================================
+-- 2. Index for per-org date range scans on live rows
+-- ==========================================
+CREATE INDEX IF NOT EXISTS idx_transactions_org_date_live
+    ON public.transactions (org_id, date DESC)
+    WHERE deleted_at IS NULL;
+
+-- ==========================================
+-- 3. get_dashboard_summary
+-- ==========================================
+CREATE OR REPLACE FUNCTION public.get_dashboard_summary(
+    p_org_id UUID,
+    p_month_start DATE,
+    p_week_start DATE,
+    p_recent_limit INTEGER DEFAULT 5
+)
+RETURNS JSON
+LANGUAGE plpgsql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_result JSON;
+BEGIN
+    IF NOT public.can_access_org(p_org_id) THEN
+        RAISE EXCEPTION 'Access denied';
+    END IF;
+
+    WITH period AS (
+        SELECT t.type, t.amount, t.date
+        FROM transactions t
+        WHERE t.org_id = p_org_id
+          AND t.deleted_at IS NULL
+          AND t.date >= LEAST(p_month_start, p_week_start)
+    ),
+    totals AS (
+        SELECT
+            COALESCE(SUM(amount) FILTER (WHERE type = 'income'  AND date >= p_month_start), 0) AS monthly_income,
+            COALESCE(SUM(amount) FILTER (WHERE type = 'expense' AND date >= p_month_start), 0) AS monthly_expense,
+            COALESCE(SUM(amount) FILTER (WHERE type = 'income'  AND date >= p_week_start), 0)  AS weekly_income,
+            COALESCE(SUM(amount) FILTER (WHERE type = 'expense' AND date >= p_week_start), 0)  AS weekly_expense
+        FROM period
+    ),
+    recent AS (
+        SELECT t.id, t.car_id, t.type, t.amount, t.reason, t.notes, t.category, t.date, t.created_at
+        FROM transactions t
+        WHERE t.org_id = p_org_id
+          AND t.deleted_at IS NULL
+        ORDER BY t.date DESC, t.created_at DESC
+        LIMIT GREATEST(p_recent_limit, 0)
+    )
+    SELECT json_build_object(
+        'monthly_income', totals.monthly_income,
+        'monthly_expense', totals.monthly_expense,
+        'weekly_income', totals.weekly_income,
+        'weekly_expense', totals.weekly_expense,
+        'total_cars', (SELECT COUNT(*) FROM cars WHERE org_id = p_org_id),
+        'total_users', (SELECT COUNT(*) FROM profiles WHERE org_id = p_org_id),
+        'recent_transactions', COALESCE((SELECT json_agg(recent ORDER BY recent.date DESC, recent.created_at DESC) FROM recent), '[]'::json)
+    )
+    INTO v_result
+    FROM totals;
+
+    RETURN v_result;
+END;
+$$;
+
+GRANT EXECUTE ON FUNCTION public.can_access_org(UUID) TO authenticated;
+GRANT EXECUTE ON FUNCTION public.get_dashboard_summary(UUID, DATE, DATE, INTEGER) TO authenticated;
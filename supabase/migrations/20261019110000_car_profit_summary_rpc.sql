@@ -0,0 +1,96 @@
+-- =====================================================
+-- Car Profit Summary RPC
+-- =====================================================
+-- Per-car income / expense / net for the Inventory screen, paginated and
+-- searchable, so the browser no longer downloads every transaction of the
+-- organization and joins them to cars in JavaScript.
+-- Aggregation only runs for the cars of the requested page.
+-- =====================================================
+
+-- ==========================================
+-- 1. Index for per-car aggregation on live rows
+-- ==========================================
+CREATE INDEX IF NOT EXISTS idx_transactions_car_type_live
+    ON public.transactions (car_id, type)
+    INCLUDE (amount, date)
+    WHERE deleted_at IS NULL;
+
+-- ==========================================
+-- 2. get_car_profit_summary
+-- ==========================================
+-- p_from / p_to   optional date window for the totals (NULL = all time)
+-- p_search        optional case-insensitive match on make / model / plate
+-- p_limit/offset  page of cars, newest first
+-- Returns: { total_count, cars: [{ car, total_income, total_expense, balance }] }
+CREATE OR REPLACE FUNCTION public.get_car_profit_summary(
+    p_org_id UUID,
+    p_from DATE DEFAULT NULL,
+    p_to DATE DEFAULT NULL,
+    p_search TEXT DEFAULT NULL,
+    p_limit INTEGER DEFAULT 50,
+    p_offset INTEGER DEFAULT 0
+)
+RETURNS JSON
+LANGUAGE plpgsql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_pattern TEXT;
+    v_total BIGINT;
+    v_cars JSON;
+BEGIN
+    IF NOT public.can_access_org(p_org_id) THEN
+        RAISE EXCEPTION 'Access denied';
+    END IF;
+
+    v_pattern := CASE
+        WHEN p_search IS NULL OR btrim(p_search) = '' THEN NULL
+        ELSE '%' || replace(replace(replace(btrim(p_search), '\', '\\'), '%', '\%'), '_', '\_') || '%'
+    END;
+
+    SELECT COUNT(*) INTO v_total
+    FROM cars c
+    WHERE c.org_id = p_org_id
+      AND (v_pattern IS NULL
+           OR c.make ILIKE v_pattern
+           OR c.model ILIKE v_pattern
+           OR c.plate_number ILIKE v_pattern);
+
+    WITH page AS (
+        SELECT c.*
+        FROM cars c
+        WHERE c.org_id = p_org_id
+          AND (v_pattern IS NULL
+               OR c.make ILIKE v_pattern
+               OR c.model ILIKE v_pattern
+               OR c.plate_number ILIKE v_pattern)
+        ORDER BY c.created_at DESC, c.id
+        LIMIT GREATEST(LEAST(p_limit, 500), 1)
+        OFFSET GREATEST(p_offset, 0)
+    )
+    SELECT COALESCE(json_agg(json_build_object(
+        'car', to_jsonb(page),
+        'total_income', totals.income,
+        'total_expense', totals.expense,
+        'balance', totals.income - totals.expense
+    ) ORDER BY page.created_at DESC, page.id), '[]'::json)
+    INTO v_cars
+    FROM page
+    CROSS JOIN LATERAL (
+        SELECT
+            COALESCE(SUM(t.amount) FILTER (WHERE t.type = 'income'), 0) AS income,
+            COALESCE(SUM(t.amount) FILTER (WHERE t.type = 'expense'), 0) AS expense
+        FROM transactions t
+        WHERE t.car_id = page.id
+          AND t.deleted_at IS NULL
+          AND (p_from IS NULL OR t.date >= p_from)
+          AND (p_to IS NULL OR t.date <= p_to)
+    ) totals;
+
+    RETURN json_build_object('total_count', v_total, 'cars', v_cars);
+END;
+$$;
+
+GRANT EXECUTE ON FUNCTION public.get_car_profit_summary(UUID, DATE, DATE, TEXT, INTEGER, INTEGER) TO authenticated;
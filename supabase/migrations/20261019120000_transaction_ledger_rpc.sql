@@ -0,0 +1,60 @@
+-- =====================================================
+-- Transaction Ledger: keyset index + totals RPC
+-- =====================================================
+-- The Financials screen pages the ledger with a keyset on (date, id) and
+-- asks the database for the totals of the active filter, so totals stay
+-- correct no matter how many pages have been loaded.
+-- =====================================================
+
+-- ==========================================
+-- 1. Keyset index: WHERE org_id = ? ORDER BY date DESC, id DESC
+-- ==========================================
+CREATE INDEX IF NOT EXISTS idx_transactions_org_date_id_live
+    ON public.transactions (org_id, date DESC, id DESC)
+    WHERE deleted_at IS NULL;
+
+-- ==========================================
+-- 2. get_transaction_totals
+-- ==========================================
+-- All filters are optional (NULL = no filter).
+-- Returns: { income, expense, balance, count }
+CREATE OR REPLACE FUNCTION public.get_transaction_totals(
+    p_org_id UUID,
+    p_type TEXT DEFAULT NULL,
+    p_from DATE DEFAULT NULL,
+    p_to DATE DEFAULT NULL,
+    p_category TEXT DEFAULT NULL
+)
+RETURNS JSON
+LANGUAGE plpgsql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_result JSON;
+BEGIN
+    IF NOT public.can_access_org(p_org_id) THEN
+        RAISE EXCEPTION 'Access denied';
+    END IF;
+
+    SELECT json_build_object(
+        'income', COALESCE(SUM(t.amount) FILTER (WHERE t.type = 'income'), 0),
+        'expense', COALESCE(SUM(t.amount) FILTER (WHERE t.type = 'expense'), 0),
+        'balance', COALESCE(SUM(CASE WHEN t.type = 'income' THEN t.amount ELSE -t.amount END), 0),
+        'count', COUNT(*)
+    )
+    INTO v_result
+    FROM transactions t
+    WHERE t.org_id = p_org_id
+      AND t.deleted_at IS NULL
+      AND (p_type IS NULL OR t.type = p_type)
+      AND (p_from IS NULL OR t.date >= p_from)
+      AND (p_to IS NULL OR t.date <= p_to)
+      AND (p_category IS NULL OR t.category = p_category);
+
+    RETURN v_result;
+END;
+$$;
+
+GRANT EXECUTE ON FUNCTION public.get_transaction_totals(UUID, TEXT, DATE, DATE, TEXT) TO authenticated;
@@ -0,0 +1,85 @@
+-- =====================================================
+-- Asset ROI RPC
+-- =====================================================
+-- One compact row per asset with income / expense / net of the linked car
+-- and installment progress, aggregated with GROUP BY instead of shipping
+-- every transaction of every linked car to the browser.
+--
+-- SECURITY INVOKER on purpose: the assets RLS policies (owner/admin see all,
+-- staff only see assets assigned to them) keep applying unchanged.
+-- =====================================================
+
+CREATE INDEX IF NOT EXISTS idx_asset_installments_asset
+    ON public.asset_installments (asset_id);
+
+-- ==========================================
+-- get_asset_roi
+-- ==========================================
+-- p_org_id NULL = every asset visible to the caller (platform staff)
+CREATE OR REPLACE FUNCTION public.get_asset_roi(p_org_id UUID DEFAULT NULL)
+RETURNS JSON
+LANGUAGE plpgsql
+STABLE
+SECURITY INVOKER
+SET search_path = public
+AS $$
+DECLARE
+    v_result JSON;
+BEGIN
+    WITH visible_assets AS (
+        SELECT a.*
+        FROM assets a
+        WHERE p_org_id IS NULL OR a.org_id = p_org_id
+    ),
+    car_totals AS (
+        SELECT
+            t.car_id,
+            COALESCE(SUM(t.amount) FILTER (WHERE t.type = 'income'), 0) AS total_income,
+            COALESCE(SUM(t.amount) FILTER (WHERE t.type = 'expense'), 0) AS total_expense
+        FROM transactions t
+        WHERE t.car_id IN (SELECT car_id FROM visible_assets WHERE car_id IS NOT NULL)
+          AND t.deleted_at IS NULL
+        GROUP BY t.car_id
+    ),
+    installment_totals AS (
+        SELECT
+            i.asset_id,
+            COUNT(*) AS installments_count,
+            COUNT(*) FILTER (WHERE i.status = 'paid') AS installments_paid_count,
+            COALESCE(SUM(i.amount), 0) AS installments_total,
+            COALESCE(SUM(i.amount) FILTER (WHERE i.status = 'paid'), 0) AS installments_paid,
+            MIN(i.due_date) FILTER (WHERE i.status <> 'paid') AS next_due_date
+        FROM asset_installments i
+        WHERE i.asset_id IN (SELECT id FROM visible_assets)
+        GROUP BY i.asset_id
+    )
+    SELECT COALESCE(json_agg(
+        to_jsonb(a)
+        || jsonb_build_object(
+            'car_details', CASE WHEN c.id IS NULL THEN NULL ELSE jsonb_build_object(
+                'id', c.id, 'name', c.name, 'make', c.make, 'model', c.model, 'plate_number', c.plate_number
+            ) END,
+            'driver_name', d.full_name,
+            'total_income', COALESCE(ct.total_income, 0),
+            'total_expense', COALESCE(ct.total_expense, 0),
+            'roi', COALESCE(ct.total_income, 0) - COALESCE(ct.total_expense, 0),
+            'installments_count', COALESCE(it.installments_count, 0),
+            'installments_paid_count', COALESCE(it.installments_paid_count, 0),
+            'installments_total', COALESCE(it.installments_total, 0),
+            'installments_paid', COALESCE(it.installments_paid, 0),
+            'next_due_date', it.next_due_date
+        )
+        ORDER BY a.created_at DESC
+    ), '[]'::json)
+    INTO v_result
+    FROM visible_assets a
+    LEFT JOIN cars c ON c.id = a.car_id
+    LEFT JOIN drivers d ON d.id = a.assigned_driver_id
+    LEFT JOIN car_totals ct ON ct.car_id = a.car_id
+    LEFT JOIN installment_totals it ON it.asset_id = a.id;
+
+    RETURN v_result;
+END;
+$$;
+
+GRANT EXECUTE ON FUNCTION public.get_asset_roi(UUID) TO authenticated;
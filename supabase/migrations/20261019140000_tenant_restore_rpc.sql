@@ -0,0 +1,177 @@
+-- =====================================================
+-- Transactional Tenant Restore
+-- =====================================================
+-- Large backups cannot be sent in a single request, and restoring table by
+-- table from the browser leaves partial state when one chunk fails.
+--
+-- Flow:
+--   1. The client uploads the backup in chunks into backup_restore_staging
+--      (one row per chunk, bounded request size)
+--   2. restore_tenant_backup(restore_id, org_id, max_rows) upserts staged
+--      chunks in dependency order and deletes each chunk once applied.
+--      Without max_rows everything is applied inside ONE transaction; with
+--      it, each call applies at most ~max_rows rows (whole chunks) and
+--      reports how many chunks remain, so large restores are driven in
+--      several calls that each stay under statement_timeout. A failed call
+--      rolls back only its own chunks, which stay staged for a retry.
+--
+-- Only the columns present in the backup rows are written: columns added
+-- after the backup was taken keep their defaults on insert and their
+-- current values on update.
+--
+-- The function runs as SECURITY INVOKER so the normal RLS policies of each
+-- target table still apply, exactly like the chunked client-side restore.
+-- =====================================================
+
+-- ==========================================
+-- 1. Staging table
+-- ==========================================
+CREATE TABLE IF NOT EXISTS public.backup_restore_staging (
+    id BIGSERIAL PRIMARY KEY,
+    restore_id UUID NOT NULL,
+    org_id UUID NOT NULL,
+    created_by UUID NOT NULL DEFAULT auth.uid(),
+    table_name TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    rows JSONB NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_backup_restore_staging_restore
+    ON public.backup_restore_staging (restore_id, table_name, seq);
+
+ALTER TABLE public.backup_restore_staging ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Own staged restore chunks" ON public.backup_restore_staging;
+CREATE POLICY "Own staged restore chunks" ON public.backup_restore_staging
+    FOR ALL TO authenticated
+    USING (created_by = auth.uid())
+    WITH CHECK (created_by = auth.uid() AND public.can_access_org(org_id));
+
+GRANT SELECT, INSERT, DELETE ON public.backup_restore_staging TO authenticated;
+GRANT USAGE, SELECT ON SEQUENCE public.backup_restore_staging_id_seq TO authenticated;
+
+-- ==========================================
+-- 2. restore_tenant_backup
+-- ==========================================
+-- Returns: { "counts": { "<table>": <rows restored>, ... }, "remaining": <staged chunks left> }
+DROP FUNCTION IF EXISTS public.restore_tenant_backup(UUID, UUID);
+
+CREATE OR REPLACE FUNCTION public.restore_tenant_backup(
+    p_restore_id UUID,
+    p_org_id UUID,
+    p_max_rows INTEGER DEFAULT NULL
+)
+RETURNS JSON
+LANGUAGE plpgsql
+SECURITY INVOKER
+SET search_path = public
+AS $$
+DECLARE
+    -- Dependency order (parents before children); also the whitelist of restorable tables
+    v_order TEXT[] := ARRAY[
+        'organizations', 'profiles', 'drivers', 'cars', 'transactions', 'assets',
+        'asset_installments', 'expense_templates', 'subscriptions', 'payment_requests',
+        'whatsapp_sessions', 'whatsapp_templates', 'whatsapp_messages',
+        'whatsapp_notification_logs', 'whatsapp_notification_queue',
+        'whatsapp_audit_logs', 'notification_queue'
+    ];
+    v_table TEXT;
+    v_chunk RECORD;
+    v_override JSONB;
+    v_columns TEXT;
+    v_set_list TEXT;
+    v_count INTEGER;
+    v_applied INTEGER := 0;
+    v_budget_spent BOOLEAN := FALSE;
+    v_remaining INTEGER;
+    v_counts JSONB := '{}'::jsonb;
+BEGIN
+    IF NOT public.can_access_org(p_org_id) THEN
+        RAISE EXCEPTION 'Access denied';
+    END IF;
+
+    IF EXISTS (
+        SELECT 1 FROM backup_restore_staging
+        WHERE restore_id = p_restore_id AND table_name <> ALL (v_order)
+    ) THEN
+        RAISE EXCEPTION 'Backup contains a table that cannot be restored';
+    END IF;
+
+    FOREACH v_table IN ARRAY v_order LOOP
+        CONTINUE WHEN NOT EXISTS (
+            SELECT 1 FROM backup_restore_staging
+            WHERE restore_id = p_restore_id AND table_name = v_table
+        );
+        -- Tables missing in this deployment are skipped (same as the client restore)
+        IF to_regclass('public.' || quote_ident(v_table)) IS NULL THEN
+            DELETE FROM backup_restore_staging
+            WHERE restore_id = p_restore_id AND table_name = v_table;
+            CONTINUE;
+        END IF;
+
+        -- Rows are always re-homed to the target organization
+        v_override := CASE
+            WHEN v_table = 'organizations' THEN jsonb_build_object('id', p_org_id)
+            WHEN EXISTS (
+                SELECT 1 FROM information_schema.columns
+                WHERE table_schema = 'public' AND table_name = v_table AND column_name = 'org_id'
+            ) THEN jsonb_build_object('org_id', p_org_id)
+            ELSE '{}'::jsonb
+        END;
+
+        v_count := 0;
+        FOR v_chunk IN
+            SELECT id, rows FROM backup_restore_staging
+            WHERE restore_id = p_restore_id AND table_name = v_table
+            ORDER BY seq
+        LOOP
+            IF p_max_rows IS NOT NULL AND v_applied > 0
+               AND v_applied + jsonb_array_length(v_chunk.rows) > p_max_rows THEN
+                v_budget_spent := TRUE;
+                EXIT;
+            END IF;
+
+            -- Columns the backup actually carries (rows of one export share their keys)
+            SELECT
+                string_agg(format('%I', column_name), ', ' ORDER BY ordinal_position),
+                string_agg(format('%I = EXCLUDED.%I', column_name, column_name), ', ' ORDER BY ordinal_position)
+                    FILTER (WHERE column_name <> 'id')
+            INTO v_columns, v_set_list
+            FROM information_schema.columns
+            WHERE table_schema = 'public'
+              AND table_name = v_table
+              AND is_generated = 'NEVER'
+              AND column_name IN (SELECT jsonb_object_keys(COALESCE(v_chunk.rows->0, '{}'::jsonb) || v_override));
+
+            IF v_columns IS NOT NULL THEN
+                EXECUTE format(
+                    'INSERT INTO public.%I (%s) SELECT %s FROM jsonb_populate_recordset(NULL::public.%I, '
+                    || '(SELECT jsonb_agg(e || $2) FROM jsonb_array_elements($1) e)) '
+                    || 'ON CONFLICT (id) DO ' || CASE WHEN v_set_list IS NULL THEN 'NOTHING' ELSE 'UPDATE SET ' || v_set_list END,
+                    v_table, v_columns, v_columns, v_table
+                ) USING v_chunk.rows, v_override;
+            END IF;
+
+            DELETE FROM backup_restore_staging WHERE id = v_chunk.id;
+            v_count := v_count + jsonb_array_length(v_chunk.rows);
+            v_applied := v_applied + jsonb_array_length(v_chunk.rows);
+        END LOOP;
+
+        IF v_count > 0 THEN
+            v_counts := v_counts || jsonb_build_object(v_table, v_count);
+        END IF;
+
+        -- Later tables wait until this one is fully applied (dependency order)
+        EXIT WHEN v_budget_spent OR (p_max_rows IS NOT NULL AND v_applied >= p_max_rows);
+    END LOOP;
+
+    SELECT COUNT(*) INTO v_remaining
+    FROM backup_restore_staging
+    WHERE restore_id = p_restore_id;
+
+    RETURN json_build_object('counts', v_counts, 'remaining', v_remaining);
+END;
+$$;
+
+GRANT EXECUTE ON FUNCTION public.restore_tenant_backup(UUID, UUID, INTEGER) TO authenticated;
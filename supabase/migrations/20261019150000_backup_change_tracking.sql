@@ -0,0 +1,68 @@
+-- =====================================================
+-- Change Tracking for Differential Backups
+-- =====================================================
+-- Differential tenant backups export only rows changed since a previous
+-- backup (updated_at > since). Several backed-up tables (cars, drivers,
+-- transactions, ...) never had an updated_at column, so edits to them were
+-- invisible. This migration gives every backed-up table:
+--   - updated_at TIMESTAMPTZ DEFAULT NOW() (existing rows get the migration time)
+--   - a BEFORE UPDATE trigger keeping it current (soft deletes included)
+--   - an (org_id, updated_at) index for the differential scan
+-- Hard deletes are not tracked; restores are merges and never delete rows.
+-- =====================================================
+
+-- ==========================================
+-- 1. Shared trigger function
+-- ==========================================
+CREATE OR REPLACE FUNCTION public.update_updated_at_column()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at = NOW();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+-- ==========================================
+-- 2. Columns, triggers and indexes
+-- ==========================================
+DO $$
+DECLARE
+    v_table TEXT;
+BEGIN
+    FOREACH v_table IN ARRAY ARRAY[
+        'organizations', 'profiles', 'drivers', 'cars', 'transactions', 'assets',
+        'asset_installments', 'expense_templates', 'subscriptions', 'payment_requests',
+        'whatsapp_sessions', 'whatsapp_templates', 'whatsapp_messages',
+        'whatsapp_notification_logs', 'whatsapp_notification_queue',
+        'whatsapp_audit_logs', 'notification_queue'
+    ] LOOP
+        CONTINUE WHEN to_regclass('public.' || quote_ident(v_table)) IS NULL;
+
+        EXECUTE format(
+            'ALTER TABLE public.%I ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ DEFAULT NOW()',
+            v_table
+        );
+
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_%s_touch_updated_at ON public.%I', v_table, v_table);
+        EXECUTE format(
+            'CREATE TRIGGER trg_%s_touch_updated_at BEFORE UPDATE ON public.%I '
+            || 'FOR EACH ROW EXECUTE FUNCTION public.update_updated_at_column()',
+            v_table, v_table
+        );
+
+        IF EXISTS (
+            SELECT 1 FROM information_schema.columns
+            WHERE table_schema = 'public' AND table_name = v_table AND column_name = 'org_id'
+        ) THEN
+            EXECUTE format(
+                'CREATE INDEX IF NOT EXISTS idx_%s_org_updated_at ON public.%I (org_id, updated_at)',
+                v_table, v_table
+            );
+        ELSE
+            EXECUTE format(
+                'CREATE INDEX IF NOT EXISTS idx_%s_updated_at ON public.%I (updated_at)',
+                v_table, v_table
+            );
+        END IF;
+    END LOOP;
+END $$;
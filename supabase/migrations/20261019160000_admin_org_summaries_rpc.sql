@@ -0,0 +1,212 @@
+-- =====================================================
+-- Super Admin Organization Summaries
+-- =====================================================
+-- The super-admin panel used to download every organization and then fire
+-- six count/list queries per previewed org. These RPCs return:
+--   - get_admin_org_summaries: one filtered, paginated page of orgs with
+--     per-org counts, last activity and balance, plus platform counters
+--   - get_admin_org_previews: preview payloads for many orgs in one call
+-- so the panel costs O(1) requests per page instead of O(orgs).
+-- =====================================================
+
+-- ==========================================
+-- 1. Platform admin helper
+-- ==========================================
+-- Only super_admin (and service_role) is platform-wide; 'admin' is a tenant
+-- role and must not see other organizations (same rule as can_access_org).
+CREATE OR REPLACE FUNCTION public.is_platform_admin()
+RETURNS BOOLEAN
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+    SELECT EXISTS (
+        SELECT 1 FROM profiles
+        WHERE id = auth.uid()
+          AND status IS DISTINCT FROM 'disabled'
+          AND role = 'super_admin'
+    ) OR auth.role() = 'service_role';
+$$;
+
+-- ==========================================
+-- 2. Indexes for per-org counts
+-- ==========================================
+CREATE INDEX IF NOT EXISTS idx_cars_org_created
+    ON public.cars (org_id, created_at DESC);
+
+CREATE INDEX IF NOT EXISTS idx_profiles_org
+    ON public.profiles (org_id);
+
+-- ==========================================
+-- 3. get_admin_org_summaries
+-- ==========================================
+-- p_search   optional case-insensitive match on name / id prefix
+-- p_plan     'all' | subscription_plan value
+-- p_status   'all' | 'active' | 'disabled' | 'expired'
+-- p_limit    page size (0 = only counters)
+-- Returns: {
+--   total_count,                      -- orgs matching the filters
+--   stats: { total, active, disabled, expired, trial, starter, pro },
+--   orgs: [{ org, cars_count, users_count, transactions_count, last_activity_at, balance }]
+-- }
+CREATE OR REPLACE FUNCTION public.get_admin_org_summaries(
+    p_search TEXT DEFAULT NULL,
+    p_plan TEXT DEFAULT 'all',
+    p_status TEXT DEFAULT 'all',
+    p_limit INTEGER DEFAULT 20,
+    p_offset INTEGER DEFAULT 0
+)
+RETURNS JSON
+LANGUAGE plpgsql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_pattern TEXT;
+    v_total INTEGER;
+    v_stats JSON;
+    v_orgs JSON;
+BEGIN
+    IF NOT public.is_platform_admin() THEN
+        RAISE EXCEPTION 'Access denied';
+    END IF;
+
+    v_pattern := CASE WHEN NULLIF(trim(p_search), '') IS NULL THEN NULL
+                      ELSE '%' || trim(p_search) || '%' END;
+
+    SELECT json_build_object(
+        'total', COUNT(*),
+        'active', COUNT(*) FILTER (WHERE is_active IS DISTINCT FROM FALSE),
+        'disabled', COUNT(*) FILTER (WHERE is_active = FALSE),
+        'expired', COUNT(*) FILTER (WHERE subscription_end < NOW()),
+        'trial', COUNT(*) FILTER (WHERE subscription_plan = 'trial'),
+        'starter', COUNT(*) FILTER (WHERE subscription_plan = 'starter'),
+        'pro', COUNT(*) FILTER (WHERE subscription_plan = 'pro')
+    )
+    INTO v_stats
+    FROM organizations;
+
+    WITH filtered AS (
+        SELECT o.id, o.created_at
+        FROM organizations o
+        WHERE (v_pattern IS NULL OR o.name ILIKE v_pattern OR o.id::text ILIKE v_pattern)
+          AND (p_plan IS NULL OR p_plan = 'all' OR o.subscription_plan = p_plan)
+          AND (
+              p_status IS NULL OR p_status = 'all'
+              OR (p_status = 'active' AND o.is_active IS DISTINCT FROM FALSE)
+              OR (p_status = 'disabled' AND o.is_active = FALSE)
+              OR (p_status = 'expired' AND o.subscription_end < NOW())
+          )
+    ),
+    page AS (
+        SELECT id, ROW_NUMBER() OVER (ORDER BY created_at DESC, id) AS position
+        FROM filtered
+        ORDER BY created_at DESC, id
+        LIMIT GREATEST(p_limit, 0) OFFSET GREATEST(p_offset, 0)
+    )
+    SELECT
+        (SELECT COUNT(*) FROM filtered),
+        -- Aggregates only run for the orgs of the requested page
+        (
+            SELECT COALESCE(json_agg(row_to_json(s) ORDER BY s.position), '[]'::json)
+            FROM (
+                SELECT
+                    p.position,
+                    to_jsonb(o) AS org,
+                    (SELECT COUNT(*) FROM cars c WHERE c.org_id = o.id) AS cars_count,
+                    (SELECT COUNT(*) FROM profiles pr WHERE pr.org_id = o.id) AS users_count,
+                    tx.transactions_count,
+                    tx.balance,
+                    GREATEST(
+                        tx.last_activity_at,
+                        (SELECT MAX(c.updated_at) FROM cars c WHERE c.org_id = o.id)
+                    ) AS last_activity_at
+                FROM page p
+                JOIN organizations o ON o.id = p.id
+                CROSS JOIN LATERAL (
+                    SELECT
+                        COUNT(*) AS transactions_count,
+                        COALESCE(SUM(CASE WHEN t.type = 'income' THEN t.amount ELSE -t.amount END)
+                            FILTER (WHERE t.deleted_at IS NULL), 0) AS balance,
+                        MAX(t.updated_at) AS last_activity_at
+                    FROM transactions t
+                    WHERE t.org_id = o.id
+                ) tx
+            ) s
+        )
+    INTO v_total, v_orgs;
+
+    RETURN json_build_object(
+        'total_count', v_total,
+        'stats', v_stats,
+        'orgs', v_orgs
+    );
+END;
+$$;
+
+-- ==========================================
+-- 4. get_admin_org_previews
+-- ==========================================
+-- Returns: { "<org_id>": { cars_count, users_count, transactions_count, balance,
+--                          recent_cars, recent_users, recent_transactions }, ... }
+CREATE OR REPLACE FUNCTION public.get_admin_org_previews(p_org_ids UUID[])
+RETURNS JSON
+LANGUAGE plpgsql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_result JSON;
+BEGIN
+    IF NOT public.is_platform_admin() THEN
+        RAISE EXCEPTION 'Access denied';
+    END IF;
+
+    SELECT COALESCE(json_object_agg(ids.id, json_build_object(
+        'cars_count', (SELECT COUNT(*) FROM cars c WHERE c.org_id = ids.id),
+        'users_count', (SELECT COUNT(*) FROM profiles pr WHERE pr.org_id = ids.id),
+        'transactions_count', tx.transactions_count,
+        'balance', tx.balance,
+        'recent_cars', (
+            SELECT COALESCE(json_agg(c), '[]'::json) FROM (
+                SELECT id, name, make, model, plate_number, status, created_at
+                FROM cars WHERE org_id = ids.id
+                ORDER BY created_at DESC LIMIT 5
+            ) c
+        ),
+        'recent_users', (
+            SELECT COALESCE(json_agg(u), '[]'::json) FROM (
+                SELECT id, full_name, email, role, status
+                FROM profiles WHERE org_id = ids.id
+                LIMIT 5
+            ) u
+        ),
+        'recent_transactions', (
+            SELECT COALESCE(json_agg(t), '[]'::json) FROM (
+                SELECT id, type, amount, date, category, reason
+                FROM transactions WHERE org_id = ids.id
+                ORDER BY date DESC LIMIT 8
+            ) t
+        )
+    )), '{}'::json)
+    INTO v_result
+    FROM (SELECT DISTINCT unnest(p_org_ids) AS id) ids
+    CROSS JOIN LATERAL (
+        SELECT
+            COUNT(*) AS transactions_count,
+            COALESCE(SUM(CASE WHEN t.type = 'income' THEN t.amount ELSE -t.amount END)
+                FILTER (WHERE t.deleted_at IS NULL), 0) AS balance
+        FROM transactions t
+        WHERE t.org_id = ids.id
+    ) tx;
+
+    RETURN v_result;
+END;
+$$;
+
+GRANT EXECUTE ON FUNCTION public.is_platform_admin() TO authenticated;
+GRANT EXECUTE ON FUNCTION public.get_admin_org_summaries(TEXT, TEXT, TEXT, INTEGER, INTEGER) TO authenticated;
+GRANT EXECUTE ON FUNCTION public.get_admin_org_previews(UUID[]) TO authenticated;
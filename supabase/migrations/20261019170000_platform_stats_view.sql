@@ -0,0 +1,161 @@
+-- =====================================================
+-- Platform Stats Materialized View
+-- =====================================================
+-- The super-admin analytics page used to download every organization, every
+-- approved payment request (twice) and 12 months of org/profile created_at
+-- values, then aggregate in JavaScript. All of it is now precomputed into a
+-- single-row materialized view and read with one small RPC call.
+--
+-- Refresh:
+--   - every 10 minutes by pg_cron when the extension is available
+--   - on demand via refresh_platform_stats() (throttled to once a minute),
+--     which the client calls when the snapshot is stale or on manual refresh
+-- =====================================================
+
+-- ==========================================
+-- 1. Materialized view (one row)
+-- ==========================================
+DROP MATERIALIZED VIEW IF EXISTS public.platform_stats_mv;
+
+CREATE MATERIALIZED VIEW public.platform_stats_mv AS
+WITH months AS (
+    SELECT generate_series(
+        date_trunc('month', NOW()) - INTERVAL '11 months',
+        date_trunc('month', NOW()),
+        INTERVAL '1 month'
+    ) AS month_start
+),
+org_stats AS (
+    SELECT
+        COUNT(*) AS total_orgs,
+        COUNT(*) FILTER (WHERE is_active IS DISTINCT FROM FALSE
+                           AND COALESCE(subscription_plan, '') NOT ILIKE '%trial%') AS active_subscriptions,
+        COUNT(*) FILTER (WHERE is_active IS DISTINCT FROM FALSE
+                           AND COALESCE(subscription_plan, '') ILIKE '%trial%') AS trial_subscriptions,
+        COUNT(*) FILTER (WHERE is_active = FALSE) AS cancelled_subscriptions
+    FROM organizations
+),
+plan_breakdown AS (
+    SELECT COALESCE(jsonb_object_agg(plan, n), '{}'::jsonb) AS plans
+    FROM (
+        SELECT COALESCE(subscription_plan, 'none') AS plan, COUNT(*) AS n
+        FROM organizations
+        GROUP BY 1
+    ) p
+),
+revenue AS (
+    SELECT
+        COALESCE(SUM(final_amount), 0) AS total_revenue,
+        COALESCE(SUM(final_amount) FILTER (WHERE created_at >= date_trunc('month', NOW())), 0) AS monthly_revenue
+    FROM payment_requests
+    WHERE status = 'approved'
+),
+growth AS (
+    SELECT jsonb_agg(jsonb_build_object(
+        'month', to_char(m.month_start, 'YYYY-MM'),
+        'organizations', (
+            SELECT COUNT(*) FROM organizations o
+            WHERE o.created_at >= m.month_start AND o.created_at < m.month_start + INTERVAL '1 month'
+        ),
+        'users', (
+            SELECT COUNT(*) FROM profiles p
+            WHERE p.created_at >= m.month_start AND p.created_at < m.month_start + INTERVAL '1 month'
+        ),
+        'revenue', (
+            SELECT COALESCE(SUM(r.final_amount), 0) FROM payment_requests r
+            WHERE r.status = 'approved'
+              AND r.created_at >= m.month_start AND r.created_at < m.month_start + INTERVAL '1 month'
+        )
+    ) ORDER BY m.month_start) AS months
+    FROM months m
+)
+SELECT
+    1 AS id,
+    o.total_orgs,
+    (SELECT COUNT(*) FROM profiles) AS total_users,
+    o.active_subscriptions,
+    o.trial_subscriptions,
+    o.cancelled_subscriptions,
+    pb.plans AS plan_breakdown,
+    r.total_revenue,
+    r.monthly_revenue,
+    g.months AS growth,
+    NOW() AS refreshed_at
+FROM org_stats o, plan_breakdown pb, revenue r, growth g;
+
+-- Required for REFRESH ... CONCURRENTLY (readers are never blocked)
+CREATE UNIQUE INDEX IF NOT EXISTS idx_platform_stats_mv_id ON public.platform_stats_mv (id);
+
+-- Materialized views have no RLS: only the RPCs below may read it
+REVOKE ALL ON public.platform_stats_mv FROM PUBLIC, anon, authenticated;
+
+CREATE INDEX IF NOT EXISTS idx_payment_requests_status_created
+    ON public.payment_requests (status, created_at);
+
+-- ==========================================
+-- 2. get_platform_stats
+-- ==========================================
+CREATE OR REPLACE FUNCTION public.get_platform_stats()
+RETURNS JSON
+LANGUAGE plpgsql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_result JSON;
+BEGIN
+    IF NOT public.is_platform_admin() THEN
+        RAISE EXCEPTION 'Access denied';
+    END IF;
+
+    SELECT row_to_json(s) INTO v_result FROM platform_stats_mv s WHERE id = 1;
+    RETURN v_result;
+END;
+$$;
+
+-- ==========================================
+-- 3. refresh_platform_stats
+-- ==========================================
+-- Returns the refreshed_at of the snapshot after the call
+CREATE OR REPLACE FUNCTION public.refresh_platform_stats()
+RETURNS TIMESTAMPTZ
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_refreshed_at TIMESTAMPTZ;
+BEGIN
+    -- auth.uid() is NULL for pg_cron / service jobs; end users must be platform admins
+    IF auth.uid() IS NOT NULL AND NOT public.is_platform_admin() THEN
+        RAISE EXCEPTION 'Access denied';
+    END IF;
+
+    SELECT refreshed_at INTO v_refreshed_at FROM platform_stats_mv WHERE id = 1;
+    IF v_refreshed_at IS NOT NULL AND v_refreshed_at > NOW() - INTERVAL '1 minute' THEN
+        RETURN v_refreshed_at;
+    END IF;
+
+    REFRESH MATERIALIZED VIEW CONCURRENTLY public.platform_stats_mv;
+    RETURN NOW();
+END;
+$$;
+
+REVOKE EXECUTE ON FUNCTION public.refresh_platform_stats() FROM PUBLIC, anon;
+GRANT EXECUTE ON FUNCTION public.get_platform_stats() TO authenticated;
+GRANT EXECUTE ON FUNCTION public.refresh_platform_stats() TO authenticated;
+
+-- ==========================================
+-- 4. Scheduled refresh (only if pg_cron is installed)
+-- ==========================================
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_cron') THEN
+        PERFORM cron.schedule(
+            'refresh-platform-stats',
+            '*/10 * * * *',
+            'SELECT public.refresh_platform_stats()'
+        );
+    END IF;
+END $$;
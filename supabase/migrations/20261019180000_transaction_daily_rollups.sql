@@ -0,0 +1,575 @@
+-- =====================================================
+-- Transaction Daily Rollups
+-- =====================================================
+-- Every KPI RPC (dashboard, ledger totals, car profit, asset ROI, super-admin
+-- org summaries) used to scan raw transactions. transaction_daily_rollups
+-- keeps one row per (org, car, day, type, category) with the live amount
+-- and count, maintained by a trigger on insert / update / soft delete /
+-- restore / hard delete of transactions. The RPCs below are redefined to
+-- read the rollups, so their cost grows with days instead of transactions.
+--
+-- backfill_transaction_rollups() rebuilds the table (whole platform or one
+-- org) and runs once at the end of this migration.
+-- =====================================================
+
+-- ==========================================
+-- 1. Rollup table
+-- ==========================================
+CREATE TABLE IF NOT EXISTS public.transaction_daily_rollups (
+    id BIGSERIAL PRIMARY KEY,
+    org_id UUID NOT NULL,
+    car_id UUID,
+    date DATE NOT NULL,
+    type TEXT NOT NULL,
+    category TEXT,
+    amount_sum NUMERIC NOT NULL DEFAULT 0,
+    tx_count INTEGER NOT NULL DEFAULT 0
+);
+
+-- One row per key; NULL car / category collapse to a sentinel
+CREATE UNIQUE INDEX IF NOT EXISTS uq_transaction_daily_rollups_key
+    ON public.transaction_daily_rollups (
+        org_id,
+        (COALESCE(car_id, '00000000-0000-0000-0000-000000000000'::uuid)),
+        date,
+        type,
+        (COALESCE(category, ''))
+    );
+
+CREATE INDEX IF NOT EXISTS idx_transaction_daily_rollups_org_date
+    ON public.transaction_daily_rollups (org_id, date)
+    INCLUDE (type, amount_sum, tx_count);
+
+CREATE INDEX IF NOT EXISTS idx_transaction_daily_rollups_car_date
+    ON public.transaction_daily_rollups (car_id, date)
+    INCLUDE (type, amount_sum)
+    WHERE car_id IS NOT NULL;
+
+ALTER TABLE public.transaction_daily_rollups ENABLE ROW LEVEL SECURITY;
+
+-- Read-only for tenants; only the trigger / backfill (SECURITY DEFINER) write
+DROP POLICY IF EXISTS "Org members read rollups" ON public.transaction_daily_rollups;
+CREATE POLICY "Org members read rollups" ON public.transaction_daily_rollups
+    FOR SELECT TO authenticated
+    USING (public.can_access_org(org_id));
+
+GRANT SELECT ON public.transaction_daily_rollups TO authenticated;
+
+-- ==========================================
+-- 2. Incremental maintenance
+-- ==========================================
+CREATE OR REPLACE FUNCTION public.bump_transaction_rollup(
+    p_org_id UUID,
+    p_car_id UUID,
+    p_date DATE,
+    p_type TEXT,
+    p_category TEXT,
+    p_amount NUMERIC,
+    p_count INTEGER
+)
+RETURNS VOID
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    IF p_org_id IS NULL OR p_date IS NULL OR p_type IS NULL THEN
+        RETURN;
+    END IF;
+
+    INSERT INTO transaction_daily_rollups (org_id, car_id, date, type, category, amount_sum, tx_count)
+    VALUES (p_org_id, p_car_id, p_date, p_type, p_category, p_amount, p_count)
+    ON CONFLICT (
+        org_id,
+        (COALESCE(car_id, '00000000-0000-0000-0000-000000000000'::uuid)),
+        date,
+        type,
+        (COALESCE(category, ''))
+    )
+    DO UPDATE SET
+        amount_sum = transaction_daily_rollups.amount_sum + EXCLUDED.amount_sum,
+        tx_count = transaction_daily_rollups.tx_count + EXCLUDED.tx_count;
+
+    IF p_count < 0 THEN
+        DELETE FROM transaction_daily_rollups
+        WHERE org_id = p_org_id
+          AND COALESCE(car_id, '00000000-0000-0000-0000-000000000000'::uuid)
+              = COALESCE(p_car_id, '00000000-0000-0000-0000-000000000000'::uuid)
+          AND date = p_date
+          AND type = p_type
+          AND COALESCE(category, '') = COALESCE(p_category, '')
+          AND tx_count <= 0;
+    END IF;
+END;
+$$;
+
+REVOKE EXECUTE ON FUNCTION public.bump_transaction_rollup(UUID, UUID, DATE, TEXT, TEXT, NUMERIC, INTEGER) FROM PUBLIC, anon, authenticated;
+
+-- Live rows (deleted_at IS NULL) are counted; a soft delete subtracts the
+-- row and a restore adds it back
+CREATE OR REPLACE FUNCTION public.transactions_rollup_trigger()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    IF TG_OP = 'UPDATE'
+       AND NEW.org_id IS NOT DISTINCT FROM OLD.org_id
+       AND NEW.car_id IS NOT DISTINCT FROM OLD.car_id
+       AND NEW.date IS NOT DISTINCT FROM OLD.date
+       AND NEW.type IS NOT DISTINCT FROM OLD.type
+       AND NEW.category IS NOT DISTINCT FROM OLD.category
+       AND NEW.amount IS NOT DISTINCT FROM OLD.amount
+       AND (NEW.deleted_at IS NULL) = (OLD.deleted_at IS NULL) THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.deleted_at IS NULL THEN
+        PERFORM public.bump_transaction_rollup(
+            OLD.org_id, OLD.car_id, OLD.date::date, OLD.type, OLD.category,
+            -COALESCE(OLD.amount, 0), -1
+        );
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.deleted_at IS NULL THEN
+        PERFORM public.bump_transaction_rollup(
+            NEW.org_id, NEW.car_id, NEW.date::date, NEW.type, NEW.category,
+            COALESCE(NEW.amount, 0), 1
+        );
+    END IF;
+
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_transactions_rollup ON public.transactions;
+CREATE TRIGGER trg_transactions_rollup
+    AFTER INSERT OR UPDATE OR DELETE ON public.transactions
+    FOR EACH ROW EXECUTE FUNCTION public.transactions_rollup_trigger();
+
+-- ==========================================
+-- 3. Backfill / rebuild
+-- ==========================================
+-- p_org_id NULL = whole platform. Writers are blocked while the rebuild runs
+-- so no transaction is counted twice or missed.
+-- Returns the number of rollup rows written.
+CREATE OR REPLACE FUNCTION public.backfill_transaction_rollups(p_org_id UUID DEFAULT NULL)
+RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_rows INTEGER;
+BEGIN
+    -- auth.uid() is NULL for migrations / service jobs
+    IF auth.uid() IS NOT NULL AND NOT public.is_platform_admin() THEN
+        RAISE EXCEPTION 'Access denied';
+    END IF;
+
+    LOCK TABLE transactions IN SHARE MODE;
+
+    DELETE FROM transaction_daily_rollups
+    WHERE p_org_id IS NULL OR org_id = p_org_id;
+
+    INSERT INTO transaction_daily_rollups (org_id, car_id, date, type, category, amount_sum, tx_count)
+    SELECT t.org_id, t.car_id, t.date::date, t.type, t.category, SUM(COALESCE(t.amount, 0)), COUNT(*)
+    FROM transactions t
+    WHERE t.deleted_at IS NULL
+      AND t.org_id IS NOT NULL
+      AND t.date IS NOT NULL
+      AND t.type IS NOT NULL
+      AND (p_org_id IS NULL OR t.org_id = p_org_id)
+    GROUP BY t.org_id, t.car_id, t.date::date, t.type, t.category;
+
+    GET DIAGNOSTICS v_rows = ROW_COUNT;
+    RETURN v_rows;
+END;
+$$;
+
+REVOKE EXECUTE ON FUNCTION public.backfill_transaction_rollups(UUID) FROM PUBLIC, anon;
+GRANT EXECUTE ON FUNCTION public.backfill_transaction_rollups(UUID) TO authenticated;
+
+-- ==========================================
+-- 4. KPI RPCs on rollups
+-- ==========================================
+CREATE OR REPLACE FUNCTION public.get_dashboard_summary(
+    p_org_id UUID,
+    p_month_start DATE,
+    p_week_start DATE,
+    p_recent_limit INTEGER DEFAULT 5
+)
+RETURNS JSON
+LANGUAGE plpgsql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_result JSON;
+BEGIN
+    IF NOT public.can_access_org(p_org_id) THEN
+        RAISE EXCEPTION 'Access denied';
+    END IF;
+
+    WITH period AS (
+        SELECT r.type, r.amount_sum AS amount, r.date
+        FROM transaction_daily_rollups r
+        WHERE r.org_id = p_org_id
+          AND r.date >= LEAST(p_month_start, p_week_start)
+    ),
+    totals AS (
+        SELECT
+            COALESCE(SUM(amount) FILTER (WHERE type = 'income'  AND date >= p_month_start), 0) AS monthly_income,
+            COALESCE(SUM(amount) FILTER (WHERE type = 'expense' AND date >= p_month_start), 0) AS monthly_expense,
+            COALESCE(SUM(amount) FILTER (WHERE type = 'income'  AND date >= p_week_start), 0)  AS weekly_income,
+            COALESCE(SUM(amount) FILTER (WHERE type = 'expense' AND date >= p_week_start), 0)  AS weekly_expense
+        FROM period
+    ),
+    recent AS (
+        SELECT t.id, t.car_id, t.type, t.amount, t.reason, t.notes, t.category, t.date, t.created_at
+        FROM transactions t
+        WHERE t.org_id = p_org_id
+          AND t.deleted_at IS NULL
+        ORDER BY t.date DESC, t.created_at DESC
+        LIMIT GREATEST(p_recent_limit, 0)
+    )
+    SELECT json_build_object(
+        'monthly_income', totals.monthly_income,
+        'monthly_expense', totals.monthly_expense,
+        'weekly_income', totals.weekly_income,
+        'weekly_expense', totals.weekly_expense,
+        'total_cars', (SELECT COUNT(*) FROM cars WHERE org_id = p_org_id),
+        'total_users', (SELECT COUNT(*) FROM profiles WHERE org_id = p_org_id),
+        'recent_transactions', COALESCE((SELECT json_agg(recent ORDER BY recent.date DESC, recent.created_at DESC) FROM recent), '[]'::json)
+    )
+    INTO v_result
+    FROM totals;
+
+    RETURN v_result;
+END;
+$$;
+CREATE OR REPLACE FUNCTION public.get_transaction_totals(
+    p_org_id UUID,
+    p_type TEXT DEFAULT NULL,
+    p_from DATE DEFAULT NULL,
+    p_to DATE DEFAULT NULL,
+    p_category TEXT DEFAULT NULL
+)
+RETURNS JSON
+LANGUAGE plpgsql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_result JSON;
+BEGIN
+    IF NOT public.can_access_org(p_org_id) THEN
+        RAISE EXCEPTION 'Access denied';
+    END IF;
+
+    SELECT json_build_object(
+        'income', COALESCE(SUM(t.amount_sum) FILTER (WHERE t.type = 'income'), 0),
+        'expense', COALESCE(SUM(t.amount_sum) FILTER (WHERE t.type = 'expense'), 0),
+        'balance', COALESCE(SUM(CASE WHEN t.type = 'income' THEN t.amount_sum ELSE -t.amount_sum END), 0),
+        'count', COALESCE(SUM(t.tx_count), 0)
+    )
+    INTO v_result
+    FROM transaction_daily_rollups t
+    WHERE t.org_id = p_org_id
+      AND (p_type IS NULL OR t.type = p_type)
+      AND (p_from IS NULL OR t.date >= p_from)
+      AND (p_to IS NULL OR t.date <= p_to)
+      AND (p_category IS NULL OR t.category = p_category);
+
+    RETURN v_result;
+END;
+$$;
+CREATE OR REPLACE FUNCTION public.get_car_profit_summary(
+    p_org_id UUID,
+    p_from DATE DEFAULT NULL,
+    p_to DATE DEFAULT NULL,
+    p_search TEXT DEFAULT NULL,
+    p_limit INTEGER DEFAULT 50,
+    p_offset INTEGER DEFAULT 0
+)
+RETURNS JSON
+LANGUAGE plpgsql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_pattern TEXT;
+    v_total BIGINT;
+    v_cars JSON;
+BEGIN
+    IF NOT public.can_access_org(p_org_id) THEN
+        RAISE EXCEPTION 'Access denied';
+    END IF;
+
+    v_pattern := CASE
+        WHEN p_search IS NULL OR btrim(p_search) = '' THEN NULL
+        ELSE '%' || replace(replace(replace(btrim(p_search), '\', '\\'), '%', '\%'), '_', '\_') || '%'
+    END;
+
+    SELECT COUNT(*) INTO v_total
+    FROM cars c
+    WHERE c.org_id = p_org_id
+      AND (v_pattern IS NULL
+           OR c.make ILIKE v_pattern
+           OR c.model ILIKE v_pattern
+           OR c.plate_number ILIKE v_pattern);
+
+    WITH page AS (
+        SELECT c.*
+        FROM cars c
+        WHERE c.org_id = p_org_id
+          AND (v_pattern IS NULL
+               OR c.make ILIKE v_pattern
+               OR c.model ILIKE v_pattern
+               OR c.plate_number ILIKE v_pattern)
+        ORDER BY c.created_at DESC, c.id
+        LIMIT GREATEST(LEAST(p_limit, 500), 1)
+        OFFSET GREATEST(p_offset, 0)
+    )
+    SELECT COALESCE(json_agg(json_build_object(
+        'car', to_jsonb(page),
+        'total_income', totals.income,
+        'total_expense', totals.expense,
+        'balance', totals.income - totals.expense
+    ) ORDER BY page.created_at DESC, page.id), '[]'::json)
+    INTO v_cars
+    FROM page
+    CROSS JOIN LATERAL (
+        SELECT
+            COALESCE(SUM(t.amount_sum) FILTER (WHERE t.type = 'income'), 0) AS income,
+            COALESCE(SUM(t.amount_sum) FILTER (WHERE t.type = 'expense'), 0) AS expense
+        FROM transaction_daily_rollups t
+        WHERE t.car_id = page.id
+          AND (p_from IS NULL OR t.date >= p_from)
+          AND (p_to IS NULL OR t.date <= p_to)
+    ) totals;
+
+    RETURN json_build_object('total_count', v_total, 'cars', v_cars);
+END;
+$$;
+CREATE OR REPLACE FUNCTION public.get_asset_roi(p_org_id UUID DEFAULT NULL)
+RETURNS JSON
+LANGUAGE plpgsql
+STABLE
+SECURITY INVOKER
+SET search_path = public
+AS $$
+DECLARE
+    v_result JSON;
+BEGIN
+    WITH visible_assets AS (
+        SELECT a.*
+        FROM assets a
+        WHERE p_org_id IS NULL OR a.org_id = p_org_id
+    ),
+    car_totals AS (
+        SELECT
+            t.car_id,
+            COALESCE(SUM(t.amount_sum) FILTER (WHERE t.type = 'income'), 0) AS total_income,
+            COALESCE(SUM(t.amount_sum) FILTER (WHERE t.type = 'expense'), 0) AS total_expense
+        FROM transaction_daily_rollups t
+        WHERE t.car_id IN (SELECT car_id FROM visible_assets WHERE car_id IS NOT NULL)
+        GROUP BY t.car_id
+    ),
+    installment_totals AS (
+        SELECT
+            i.asset_id,
+            COUNT(*) AS installments_count,
+            COUNT(*) FILTER (WHERE i.status = 'paid') AS installments_paid_count,
+            COALESCE(SUM(i.amount), 0) AS installments_total,
+            COALESCE(SUM(i.amount) FILTER (WHERE i.status = 'paid'), 0) AS installments_paid,
+            MIN(i.due_date) FILTER (WHERE i.status <> 'paid') AS next_due_date
+        FROM asset_installments i
+        WHERE i.asset_id IN (SELECT id FROM visible_assets)
+        GROUP BY i.asset_id
+    )
+    SELECT COALESCE(json_agg(
+        to_jsonb(a)
+        || jsonb_build_object(
+            'car_details', CASE WHEN c.id IS NULL THEN NULL ELSE jsonb_build_object(
+                'id', c.id, 'name', c.name, 'make', c.make, 'model', c.model, 'plate_number', c.plate_number
+            ) END,
+            'driver_name', d.full_name,
+            'total_income', COALESCE(ct.total_income, 0),
+            'total_expense', COALESCE(ct.total_expense, 0),
+            'roi', COALESCE(ct.total_income, 0) - COALESCE(ct.total_expense, 0),
+            'installments_count', COALESCE(it.installments_count, 0),
+            'installments_paid_count', COALESCE(it.installments_paid_count, 0),
+            'installments_total', COALESCE(it.installments_total, 0),
+            'installments_paid', COALESCE(it.installments_paid, 0),
+            'next_due_date', it.next_due_date
+        )
+        ORDER BY a.created_at DESC
+    ), '[]'::json)
+    INTO v_result
+    FROM visible_assets a
+    LEFT JOIN cars c ON c.id = a.car_id
+    LEFT JOIN drivers d ON d.id = a.assigned_driver_id
+    LEFT JOIN car_totals ct ON ct.car_id = a.car_id
+    LEFT JOIN installment_totals it ON it.asset_id = a.id;
+
+    RETURN v_result;
+END;
+$$;
+CREATE OR REPLACE FUNCTION public.get_admin_org_summaries(
+    p_search TEXT DEFAULT NULL,
+    p_plan TEXT DEFAULT 'all',
+    p_status TEXT DEFAULT 'all',
+    p_limit INTEGER DEFAULT 20,
+    p_offset INTEGER DEFAULT 0
+)
+RETURNS JSON
+LANGUAGE plpgsql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_pattern TEXT;
+    v_total INTEGER;
+    v_stats JSON;
+    v_orgs JSON;
+BEGIN
+    IF NOT public.is_platform_admin() THEN
+        RAISE EXCEPTION 'Access denied';
+    END IF;
+
+    v_pattern := CASE WHEN NULLIF(trim(p_search), '') IS NULL THEN NULL
+                      ELSE '%' || trim(p_search) || '%' END;
+
+    SELECT json_build_object(
+        'total', COUNT(*),
+        'active', COUNT(*) FILTER (WHERE is_active IS DISTINCT FROM FALSE),
+        'disabled', COUNT(*) FILTER (WHERE is_active = FALSE),
+        'expired', COUNT(*) FILTER (WHERE subscription_end < NOW()),
+        'trial', COUNT(*) FILTER (WHERE subscription_plan = 'trial'),
+        'starter', COUNT(*) FILTER (WHERE subscription_plan = 'starter'),
+        'pro', COUNT(*) FILTER (WHERE subscription_plan = 'pro')
+    )
+    INTO v_stats
+    FROM organizations;
+
+    WITH filtered AS (
+        SELECT o.id, o.created_at
+        FROM organizations o
+        WHERE (v_pattern IS NULL OR o.name ILIKE v_pattern OR o.id::text ILIKE v_pattern)
+          AND (p_plan IS NULL OR p_plan = 'all' OR o.subscription_plan = p_plan)
+          AND (
+              p_status IS NULL OR p_status = 'all'
+              OR (p_status = 'active' AND o.is_active IS DISTINCT FROM FALSE)
+              OR (p_status = 'disabled' AND o.is_active = FALSE)
+              OR (p_status = 'expired' AND o.subscription_end < NOW())
+          )
+    ),
+    page AS (
+        SELECT id, ROW_NUMBER() OVER (ORDER BY created_at DESC, id) AS position
+        FROM filtered
+        ORDER BY created_at DESC, id
+        LIMIT GREATEST(p_limit, 0) OFFSET GREATEST(p_offset, 0)
+    )
+    SELECT
+        (SELECT COUNT(*) FROM filtered),
+        -- Aggregates only run for the orgs of the requested page
+        (
+            SELECT COALESCE(json_agg(row_to_json(s) ORDER BY s.position), '[]'::json)
+            FROM (
+                SELECT
+                    p.position,
+                    to_jsonb(o) AS org,
+                    (SELECT COUNT(*) FROM cars c WHERE c.org_id = o.id) AS cars_count,
+                    (SELECT COUNT(*) FROM profiles pr WHERE pr.org_id = o.id) AS users_count,
+                    tx.transactions_count,
+                    tx.balance,
+                    GREATEST(
+                        tx.last_activity_at,
+                        (SELECT MAX(c.updated_at) FROM cars c WHERE c.org_id = o.id)
+                    ) AS last_activity_at
+                FROM page p
+                JOIN organizations o ON o.id = p.id
+                CROSS JOIN LATERAL (
+                    SELECT
+                        COALESCE(SUM(r.tx_count), 0) AS transactions_count,
+                        COALESCE(SUM(CASE WHEN r.type = 'income' THEN r.amount_sum ELSE -r.amount_sum END), 0) AS balance,
+                        (SELECT MAX(t.updated_at) FROM transactions t WHERE t.org_id = o.id) AS last_activity_at
+                    FROM transaction_daily_rollups r
+                    WHERE r.org_id = o.id
+                ) tx
+            ) s
+        )
+    INTO v_total, v_orgs;
+
+    RETURN json_build_object(
+        'total_count', v_total,
+        'stats', v_stats,
+        'orgs', v_orgs
+    );
+END;
+$$;
+CREATE OR REPLACE FUNCTION public.get_admin_org_previews(p_org_ids UUID[])
+RETURNS JSON
+LANGUAGE plpgsql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_result JSON;
+BEGIN
+    IF NOT public.is_platform_admin() THEN
+        RAISE EXCEPTION 'Access denied';
+    END IF;
+
+    SELECT COALESCE(json_object_agg(ids.id, json_build_object(
+        'cars_count', (SELECT COUNT(*) FROM cars c WHERE c.org_id = ids.id),
+        'users_count', (SELECT COUNT(*) FROM profiles pr WHERE pr.org_id = ids.id),
+        'transactions_count', tx.transactions_count,
+        'balance', tx.balance,
+        'recent_cars', (
+            SELECT COALESCE(json_agg(c), '[]'::json) FROM (
+                SELECT id, name, make, model, plate_number, status, created_at
+                FROM cars WHERE org_id = ids.id
+                ORDER BY created_at DESC LIMIT 5
+            ) c
+        ),
+        'recent_users', (
+            SELECT COALESCE(json_agg(u), '[]'::json) FROM (
+                SELECT id, full_name, email, role, status
+                FROM profiles WHERE org_id = ids.id
+                LIMIT 5
+            ) u
+        ),
+        'recent_transactions', (
+            SELECT COALESCE(json_agg(t), '[]'::json) FROM (
+                SELECT id, type, amount, date, category, reason
+                FROM transactions WHERE org_id = ids.id
+                ORDER BY date DESC LIMIT 8
+            ) t
+        )
+    )), '{}'::json)
+    INTO v_result
+    FROM (SELECT DISTINCT unnest(p_org_ids) AS id) ids
+    CROSS JOIN LATERAL (
+        SELECT
+            COALESCE(SUM(r.tx_count), 0) AS transactions_count,
+            COALESCE(SUM(CASE WHEN r.type = 'income' THEN r.amount_sum ELSE -r.amount_sum END), 0) AS balance
+        FROM transaction_daily_rollups r
+        WHERE r.org_id = ids.id
+    ) tx;
+
+    RETURN v_result;
+END;
+$$;
+
+-- ==========================================
+-- 5. Initial backfill
+-- ==========================================
+SELECT public.backfill_transaction_rollups();
@@ -0,0 +1,70 @@
+-- =====================================================
+-- Profile Permissions Version
+-- =====================================================
+-- Guarded actions and the session watcher used to re-select the whole
+-- profile to detect permission / status changes. profiles.permissions_version
+-- is bumped whenever something that affects access changes (permissions,
+-- role, status, org), so clients keep the profile cached and only compare
+-- one number:
+--   - get_my_profile_version(): { id, status, permissions_version }
+--   - Realtime UPDATE events on profiles carry the new version as well
+-- =====================================================
+
+-- ==========================================
+-- 1. Column
+-- ==========================================
+ALTER TABLE public.profiles
+    ADD COLUMN IF NOT EXISTS permissions_version BIGINT NOT NULL DEFAULT 1;
+
+-- ==========================================
+-- 2. Bump trigger
+-- ==========================================
+-- Fires for update_permissions, toggle_user_status and any direct update,
+-- so no RPC can forget to bump the version.
+CREATE OR REPLACE FUNCTION public.bump_profile_permissions_version()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    IF NEW.permissions IS DISTINCT FROM OLD.permissions
+       OR NEW.role IS DISTINCT FROM OLD.role
+       OR NEW.status IS DISTINCT FROM OLD.status
+       OR NEW.org_id IS DISTINCT FROM OLD.org_id THEN
+        NEW.permissions_version := OLD.permissions_version + 1;
+    ELSE
+        -- Clients must not move the version themselves
+        NEW.permissions_version := OLD.permissions_version;
+    END IF;
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_profiles_permissions_version ON public.profiles;
+CREATE TRIGGER trg_profiles_permissions_version
+    BEFORE UPDATE ON public.profiles
+    FOR EACH ROW
+    EXECUTE FUNCTION public.bump_profile_permissions_version();
+
+-- ==========================================
+-- 3. get_my_profile_version
+-- ==========================================
+-- Primary-key lookup with a three-field payload; NULL when the caller has
+-- no profile.
+CREATE OR REPLACE FUNCTION public.get_my_profile_version()
+RETURNS JSON
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+    SELECT json_build_object(
+        'id', p.id,
+        'status', p.status,
+        'permissions_version', p.permissions_version
+    )
+    FROM profiles p
+    WHERE p.id = auth.uid();
+$$;
+
+REVOKE EXECUTE ON FUNCTION public.get_my_profile_version() FROM PUBLIC, anon;
+GRANT EXECUTE ON FUNCTION public.get_my_profile_version() TO authenticated;
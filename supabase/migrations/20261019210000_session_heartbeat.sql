@@ -0,0 +1,54 @@
+-- =====================================================
+-- Session Heartbeat
+-- =====================================================
+-- sessionWatcher used to combine getSession() with a profiles select in
+-- every open tab. session_heartbeat() answers everything the watcher needs
+-- in one primary-key lookup:
+--   { valid, reason, user_id, status, role, org_id, plan, subscription_end,
+--     permissions_version, server_time }
+-- Only the leader tab calls it; the result is shared with the other tabs.
+-- =====================================================
+
+CREATE OR REPLACE FUNCTION public.session_heartbeat()
+RETURNS JSON
+LANGUAGE plpgsql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_user_id UUID := auth.uid();
+    v_result JSON;
+BEGIN
+    IF v_user_id IS NULL THEN
+        RETURN json_build_object('valid', false, 'reason', 'no_session', 'server_time', NOW());
+    END IF;
+
+    SELECT json_build_object(
+        'valid', p.status IS DISTINCT FROM 'disabled',
+        'reason', CASE WHEN p.status = 'disabled' THEN 'account_disabled' END,
+        'user_id', p.id,
+        'status', p.status,
+        'role', p.role,
+        'org_id', p.org_id,
+        'plan', o.subscription_plan,
+        'subscription_end', o.subscription_end,
+        'permissions_version', p.permissions_version,
+        'server_time', NOW()
+    )
+    INTO v_result
+    FROM profiles p
+    LEFT JOIN organizations o ON o.id = p.org_id
+    WHERE p.id = v_user_id;
+
+    RETURN COALESCE(v_result, json_build_object(
+        'valid', false,
+        'reason', 'no_profile',
+        'user_id', v_user_id,
+        'server_time', NOW()
+    ));
+END;
+$$;
+
+REVOKE EXECUTE ON FUNCTION public.session_heartbeat() FROM PUBLIC, anon;
+GRANT EXECUTE ON FUNCTION public.session_heartbeat() TO authenticated;
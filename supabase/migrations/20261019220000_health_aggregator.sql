@@ -0,0 +1,546 @@
+-- =====================================================
+-- Server-side Health Aggregator
+-- =====================================================
+-- healthMonitor used to fetch failed WhatsApp messages, count trials and time
+-- a query from every admin client every 5 minutes, inserting a fresh
+-- system_incidents row each time a threshold was crossed. Health is now
+-- computed once, on the server:
+--   - compute_health_metrics() (pg_cron, every 5 minutes) writes rolling
+--     failure rates, latency percentiles and queue depths to health_metrics
+--     and one precomputed row to health_snapshot
+--   - incidents are de-duplicated by fingerprint: a repeat bumps
+--     occurrences / last_seen_at on the open incident instead of inserting;
+--     aggregator incidents resolve themselves once the condition clears
+--   - clients read get_health_snapshot(); the only client write left is
+--     record_health_probe() for the external WhatsApp service, which the
+--     database cannot reach
+-- =====================================================
+
+-- ==========================================
+-- 1. Incident fingerprints
+-- ==========================================
+ALTER TABLE public.system_incidents
+    ADD COLUMN IF NOT EXISTS fingerprint TEXT,
+    ADD COLUMN IF NOT EXISTS occurrences INTEGER NOT NULL DEFAULT 1,
+    ADD COLUMN IF NOT EXISTS last_seen_at TIMESTAMPTZ DEFAULT NOW();
+
+-- Collapse existing open duplicates onto the newest row of each (type, title)
+WITH ranked AS (
+    SELECT
+        id,
+        ROW_NUMBER() OVER (PARTITION BY incident_type, title ORDER BY created_at DESC) AS rn,
+        COUNT(*) OVER (PARTITION BY incident_type, title) AS cnt
+    FROM public.system_incidents
+    WHERE resolved = false AND fingerprint IS NULL
+),
+resolved_dupes AS (
+    UPDATE public.system_incidents i
+    SET resolved = true, resolved_at = NOW(), updated_at = NOW()
+    FROM ranked r
+    WHERE i.id = r.id AND r.rn > 1
+    RETURNING i.id
+)
+UPDATE public.system_incidents i
+SET fingerprint = md5(i.incident_type || ':' || i.title),
+    occurrences = r.cnt,
+    last_seen_at = i.created_at
+FROM ranked r
+WHERE i.id = r.id AND r.rn = 1;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_system_incidents_open_fingerprint
+    ON public.system_incidents(fingerprint)
+    WHERE resolved = false;
+
+-- ==========================================
+-- 2. log_system_incident with de-duplication
+-- ==========================================
+-- The extra parameter would create an ambiguous overload, so the old
+-- signature is dropped first.
+DROP FUNCTION IF EXISTS public.log_system_incident(TEXT, TEXT, TEXT, TEXT, JSONB);
+
+CREATE OR REPLACE FUNCTION public.log_system_incident(
+    p_incident_type TEXT,
+    p_title TEXT,
+    p_message TEXT DEFAULT NULL,
+    p_severity TEXT DEFAULT 'medium',
+    p_metadata JSONB DEFAULT '{}'::jsonb,
+    p_fingerprint TEXT DEFAULT NULL
+)
+RETURNS BIGINT
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_incident_id BIGINT;
+BEGIN
+    -- Same type + title (or explicit fingerprint) while open = same incident
+    INSERT INTO system_incidents (incident_type, title, message, severity, metadata, fingerprint)
+    VALUES (
+        p_incident_type, p_title, p_message, p_severity, COALESCE(p_metadata, '{}'::jsonb),
+        COALESCE(p_fingerprint, md5(p_incident_type || ':' || p_title))
+    )
+    ON CONFLICT (fingerprint) WHERE resolved = false
+    DO UPDATE SET
+        message = EXCLUDED.message,
+        metadata = EXCLUDED.metadata,
+        -- Escalate, never downgrade, while the incident stays open
+        severity = CASE
+            WHEN array_position(ARRAY['low', 'medium', 'high', 'critical'], EXCLUDED.severity)
+               > array_position(ARRAY['low', 'medium', 'high', 'critical'], system_incidents.severity)
+            THEN EXCLUDED.severity
+            ELSE system_incidents.severity
+        END,
+        occurrences = system_incidents.occurrences + 1,
+        last_seen_at = NOW(),
+        updated_at = NOW()
+    RETURNING id INTO v_incident_id;
+
+    RETURN v_incident_id;
+END;
+$$;
+
+GRANT EXECUTE ON FUNCTION public.log_system_incident(TEXT, TEXT, TEXT, TEXT, JSONB, TEXT) TO service_role;
+
+-- ==========================================
+-- 3. Metrics and snapshot tables
+-- ==========================================
+CREATE TABLE IF NOT EXISTS public.health_metrics (
+    id BIGSERIAL PRIMARY KEY,
+    metric TEXT NOT NULL,
+    window_minutes INTEGER NOT NULL,
+    value NUMERIC,
+    labels JSONB NOT NULL DEFAULT '{}',
+    computed_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_health_metrics_metric_time ON public.health_metrics(metric, computed_at DESC);
+CREATE INDEX IF NOT EXISTS idx_health_metrics_computed_at ON public.health_metrics(computed_at);
+
+-- One row, replaced by every aggregation run
+CREATE TABLE IF NOT EXISTS public.health_snapshot (
+    id SMALLINT PRIMARY KEY DEFAULT 1 CHECK (id = 1),
+    status TEXT NOT NULL CHECK (status IN ('healthy', 'warning', 'critical')),
+    message TEXT NOT NULL,
+    metrics JSONB NOT NULL DEFAULT '{}',
+    incidents JSONB NOT NULL DEFAULT '{}',
+    duration_ms INTEGER,
+    computed_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+ALTER TABLE public.health_metrics ENABLE ROW LEVEL SECURITY;
+ALTER TABLE public.health_snapshot ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Admins can view health metrics" ON public.health_metrics;
+CREATE POLICY "Admins can view health metrics"
+ON public.health_metrics FOR SELECT
+TO authenticated
+USING (
+    EXISTS (
+        SELECT 1 FROM profiles
+        WHERE profiles.id = auth.uid()
+        AND profiles.role IN ('admin', 'super_admin', 'owner')
+    )
+);
+
+DROP POLICY IF EXISTS "Admins can view health snapshot" ON public.health_snapshot;
+CREATE POLICY "Admins can view health snapshot"
+ON public.health_snapshot FOR SELECT
+TO authenticated
+USING (
+    EXISTS (
+        SELECT 1 FROM profiles
+        WHERE profiles.id = auth.uid()
+        AND profiles.role IN ('admin', 'super_admin', 'owner')
+    )
+);
+
+-- Probes are aggregated by check_type over the last hour
+CREATE INDEX IF NOT EXISTS idx_health_monitor_log_type_time ON public.health_monitor_log(check_type, created_at DESC);
+
+-- ==========================================
+-- 4. compute_health_metrics
+-- ==========================================
+CREATE OR REPLACE FUNCTION public.compute_health_metrics()
+RETURNS JSONB
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_started TIMESTAMPTZ := clock_timestamp();
+    v_now TIMESTAMPTZ := NOW();
+    v_raised TEXT[] := ARRAY[]::TEXT[];
+    v_wa RECORD;
+    v_queue RECORD;
+    v_probe RECORD;
+    v_expired_trials BIGINT;
+    v_critical INTEGER;
+    v_high INTEGER;
+    v_status TEXT := 'healthy';
+    v_message TEXT := 'All systems operational';
+    v_metrics JSONB;
+    v_probes JSONB := '{}'::jsonb;
+BEGIN
+    -- auth.uid() is NULL for pg_cron / service jobs; end users must be admins
+    IF auth.uid() IS NOT NULL AND NOT EXISTS (
+        SELECT 1 FROM profiles
+        WHERE id = auth.uid() AND role IN ('admin', 'super_admin', 'owner')
+    ) THEN
+        RAISE EXCEPTION 'Access denied';
+    END IF;
+
+    -- WhatsApp delivery: rolling failure rates (1h / 24h)
+    SELECT
+        COUNT(*) FILTER (WHERE created_at >= v_now - INTERVAL '1 hour') AS total_1h,
+        COUNT(*) FILTER (WHERE created_at >= v_now - INTERVAL '1 hour' AND status = 'failed') AS failed_1h,
+        COUNT(*) AS total_24h,
+        COUNT(*) FILTER (WHERE status = 'failed') AS failed_24h
+    INTO v_wa
+    FROM whatsapp_messages
+    WHERE created_at >= v_now - INTERVAL '24 hours';
+
+    -- Notification queue depth and age
+    SELECT
+        COUNT(*) FILTER (WHERE status = 'pending') AS pending,
+        COUNT(*) FILTER (WHERE status = 'processing') AS processing,
+        COALESCE(EXTRACT(EPOCH FROM v_now - MIN(created_at) FILTER (WHERE status = 'pending')), 0)::INTEGER AS oldest_pending_s,
+        COUNT(*) FILTER (WHERE status = 'failed' AND created_at >= v_now - INTERVAL '24 hours') AS failed_24h,
+        COUNT(*) FILTER (WHERE created_at >= v_now - INTERVAL '24 hours') AS total_24h
+    INTO v_queue
+    FROM whatsapp_notification_queue;
+
+    -- Expired trials still active
+    SELECT COUNT(*) INTO v_expired_trials
+    FROM organizations
+    WHERE subscription_plan = 'trial' AND subscription_end < v_now AND is_active = true;
+
+    -- Probe latency percentiles and error rate per check type (1h)
+    FOR v_probe IN
+        SELECT
+            check_type,
+            COUNT(*) AS samples,
+            COUNT(*) FILTER (WHERE status IN ('error', 'critical')) AS errors,
+            percentile_cont(0.5) WITHIN GROUP (ORDER BY response_time_ms) AS p50,
+            percentile_cont(0.95) WITHIN GROUP (ORDER BY response_time_ms) AS p95,
+            percentile_cont(0.99) WITHIN GROUP (ORDER BY response_time_ms) AS p99,
+            (ARRAY_AGG(status ORDER BY created_at DESC))[1] AS last_status,
+            (ARRAY_AGG(message ORDER BY created_at DESC))[1] AS last_message,
+            MAX(created_at) AS last_at
+        FROM health_monitor_log
+        WHERE created_at >= v_now - INTERVAL '1 hour'
+        GROUP BY check_type
+    LOOP
+        v_probes := v_probes || jsonb_build_object(v_probe.check_type, jsonb_build_object(
+            'samples', v_probe.samples,
+            'error_rate', ROUND(v_probe.errors::NUMERIC / v_probe.samples, 4),
+            'p50_ms', ROUND(v_probe.p50::NUMERIC),
+            'p95_ms', ROUND(v_probe.p95::NUMERIC),
+            'p99_ms', ROUND(v_probe.p99::NUMERIC),
+            'last_status', v_probe.last_status,
+            'last_at', v_probe.last_at
+        ));
+
+        INSERT INTO health_metrics (metric, window_minutes, value, labels, computed_at) VALUES
+            ('probe.latency_p50_ms', 60, v_probe.p50, jsonb_build_object('check_type', v_probe.check_type), v_now),
+            ('probe.latency_p95_ms', 60, v_probe.p95, jsonb_build_object('check_type', v_probe.check_type), v_now),
+            ('probe.latency_p99_ms', 60, v_probe.p99, jsonb_build_object('check_type', v_probe.check_type), v_now),
+            ('probe.error_rate', 60, v_probe.errors::NUMERIC / v_probe.samples, jsonb_build_object('check_type', v_probe.check_type), v_now);
+
+        IF v_probe.check_type = 'whatsapp_service'
+           AND v_probe.last_status IN ('error', 'critical')
+           AND v_probe.last_at >= v_now - INTERVAL '15 minutes' THEN
+            PERFORM log_system_incident(
+                'whatsapp_failure', 'WhatsApp Service Unreachable',
+                COALESCE(v_probe.last_message, 'WhatsApp service health probe failed'),
+                'critical', jsonb_build_object('error_rate', ROUND(v_probe.errors::NUMERIC / v_probe.samples, 4)),
+                'agg:whatsapp_service_down'
+            );
+            v_raised := array_append(v_raised, 'agg:whatsapp_service_down');
+        ELSIF v_probe.p95 > 5000 THEN
+            PERFORM log_system_incident(
+                'api_error', 'Slow ' || v_probe.check_type || ' Responses',
+                CONCAT('p95 latency ', ROUND(v_probe.p95::NUMERIC), 'ms over the last hour'),
+                'medium', jsonb_build_object('p95_ms', ROUND(v_probe.p95::NUMERIC), 'samples', v_probe.samples),
+                'agg:slow:' || v_probe.check_type
+            );
+            v_raised := array_append(v_raised, 'agg:slow:' || v_probe.check_type);
+        END IF;
+    END LOOP;
+
+    INSERT INTO health_metrics (metric, window_minutes, value, computed_at) VALUES
+        ('whatsapp.messages_total', 60, v_wa.total_1h, v_now),
+        ('whatsapp.messages_failed', 60, v_wa.failed_1h, v_now),
+        ('whatsapp.failure_rate', 60, v_wa.failed_1h::NUMERIC / NULLIF(v_wa.total_1h, 0), v_now),
+        ('whatsapp.messages_total', 1440, v_wa.total_24h, v_now),
+        ('whatsapp.messages_failed', 1440, v_wa.failed_24h, v_now),
+        ('whatsapp.failure_rate', 1440, v_wa.failed_24h::NUMERIC / NULLIF(v_wa.total_24h, 0), v_now),
+        ('notifications.queue_pending', 0, v_queue.pending, v_now),
+        ('notifications.queue_processing', 0, v_queue.processing, v_now),
+        ('notifications.oldest_pending_s', 0, v_queue.oldest_pending_s, v_now),
+        ('notifications.failure_rate', 1440, v_queue.failed_24h::NUMERIC / NULLIF(v_queue.total_24h, 0), v_now),
+        ('subscriptions.expired_active_trials', 0, v_expired_trials, v_now);
+
+    -- Threshold incidents (same thresholds the client checks used)
+    IF v_wa.failed_1h > 5 THEN
+        PERFORM log_system_incident(
+            'whatsapp_failure', 'High WhatsApp Message Failure Rate',
+            CONCAT(v_wa.failed_1h, ' of ', v_wa.total_1h, ' messages failed in the last hour'),
+            CASE WHEN v_wa.failed_1h::NUMERIC / v_wa.total_1h >= 0.5 THEN 'high' ELSE 'medium' END,
+            jsonb_build_object('failed_count', v_wa.failed_1h, 'total_count', v_wa.total_1h),
+            'agg:whatsapp_failure_rate'
+        );
+        v_raised := array_append(v_raised, 'agg:whatsapp_failure_rate');
+    END IF;
+
+    IF v_queue.pending > 0 AND v_queue.oldest_pending_s > 15 * 60 THEN
+        PERFORM log_system_incident(
+            'process_failure', 'Notification Queue Stalled',
+            CONCAT(v_queue.pending, ' notifications pending, oldest for ', v_queue.oldest_pending_s / 60, ' minutes'),
+            'high',
+            jsonb_build_object('pending', v_queue.pending, 'oldest_pending_s', v_queue.oldest_pending_s),
+            'agg:notification_queue_stalled'
+        );
+        v_raised := array_append(v_raised, 'agg:notification_queue_stalled');
+    END IF;
+
+    IF v_expired_trials > 10 THEN
+        PERFORM log_system_incident(
+            'subscription_failure', 'Many Expired Trials Still Active',
+            CONCAT(v_expired_trials, ' expired trial accounts are still marked as active'),
+            'medium',
+            jsonb_build_object('expired_count', v_expired_trials),
+            'agg:expired_active_trials'
+        );
+        v_raised := array_append(v_raised, 'agg:expired_active_trials');
+    END IF;
+
+    -- Conditions that cleared resolve their aggregator incidents
+    UPDATE system_incidents
+    SET resolved = true, resolved_at = v_now, updated_at = v_now
+    WHERE resolved = false
+      AND fingerprint LIKE 'agg:%'
+      AND NOT (fingerprint = ANY (v_raised));
+
+    -- Overall status (same rules as check_system_health)
+    SELECT
+        COUNT(*) FILTER (WHERE severity = 'critical'),
+        COUNT(*) FILTER (WHERE severity = 'high')
+    INTO v_critical, v_high
+    FROM system_incidents
+    WHERE resolved = false;
+
+    IF v_critical > 0 THEN
+        v_status := 'critical';
+        v_message := CONCAT(v_critical, ' حالة حرجة تتطلب انتباهك');
+    ELSIF v_high > 0 THEN
+        v_status := 'warning';
+        v_message := CONCAT(v_high, ' حالة عالية الأهمية تحت المراقبة');
+    END IF;
+
+    v_metrics := jsonb_build_object(
+        'whatsapp', jsonb_build_object(
+            'messages_1h', v_wa.total_1h,
+            'failed_1h', v_wa.failed_1h,
+            'failure_rate_1h', ROUND(v_wa.failed_1h::NUMERIC / NULLIF(v_wa.total_1h, 0), 4),
+            'messages_24h', v_wa.total_24h,
+            'failed_24h', v_wa.failed_24h,
+            'failure_rate_24h', ROUND(v_wa.failed_24h::NUMERIC / NULLIF(v_wa.total_24h, 0), 4)
+        ),
+        'notification_queue', jsonb_build_object(
+            'pending', v_queue.pending,
+            'processing', v_queue.processing,
+            'oldest_pending_s', v_queue.oldest_pending_s,
+            'failure_rate_24h', ROUND(v_queue.failed_24h::NUMERIC / NULLIF(v_queue.total_24h, 0), 4)
+        ),
+        'subscriptions', jsonb_build_object('expired_active_trials', v_expired_trials),
+        'probes', v_probes
+    );
+
+    INSERT INTO health_snapshot (id, status, message, metrics, incidents, duration_ms, computed_at)
+    VALUES (
+        1, v_status, v_message, v_metrics,
+        jsonb_build_object('critical', v_critical, 'high', v_high, 'raised', to_jsonb(v_raised)),
+        (EXTRACT(EPOCH FROM clock_timestamp() - v_started) * 1000)::INTEGER,
+        v_now
+    )
+    ON CONFLICT (id) DO UPDATE SET
+        status = EXCLUDED.status,
+        message = EXCLUDED.message,
+        metrics = EXCLUDED.metrics,
+        incidents = EXCLUDED.incidents,
+        duration_ms = EXCLUDED.duration_ms,
+        computed_at = EXCLUDED.computed_at;
+
+    -- Rolling window: a week of metric history and probes
+    DELETE FROM health_metrics WHERE computed_at < v_now - INTERVAL '7 days';
+    DELETE FROM health_monitor_log WHERE created_at < v_now - INTERVAL '7 days';
+
+    RETURN jsonb_build_object('status', v_status, 'raised', to_jsonb(v_raised), 'computed_at', v_now);
+END;
+$$;
+
+REVOKE EXECUTE ON FUNCTION public.compute_health_metrics() FROM PUBLIC, anon;
+GRANT EXECUTE ON FUNCTION public.compute_health_metrics() TO authenticated, service_role;
+
+-- ==========================================
+-- 5. get_health_snapshot
+-- ==========================================
+-- Returns the precomputed row. Recomputes inline when the snapshot is older
+-- than 10 minutes (pg_cron missing or behind) or on an explicit refresh,
+-- at most once a minute.
+-- The incident summary and list are read live (open incidents are one row
+-- per fingerprint) so a resolve shows up without waiting for the next run:
+--   summary:       { total_incidents, critical_count, high_count,
+--                    medium_count, low_count, resolved_today }
+--   incident_list: open incidents, then those resolved in the last 24h
+--                  (newest activity first, at most 100)
+CREATE OR REPLACE FUNCTION public.get_health_snapshot(p_refresh BOOLEAN DEFAULT FALSE)
+RETURNS JSON
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_computed_at TIMESTAMPTZ;
+    v_summary JSON;
+    v_incidents JSON;
+    v_result JSON;
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM profiles
+        WHERE id = auth.uid() AND role IN ('admin', 'super_admin', 'owner')
+    ) THEN
+        RAISE EXCEPTION 'Access denied';
+    END IF;
+
+    SELECT computed_at INTO v_computed_at FROM health_snapshot WHERE id = 1;
+    IF v_computed_at IS NULL
+       OR v_computed_at < NOW() - INTERVAL '10 minutes'
+       OR (p_refresh AND v_computed_at < NOW() - INTERVAL '1 minute') THEN
+        PERFORM compute_health_metrics();
+    END IF;
+
+    SELECT json_build_object(
+        'total_incidents', COUNT(*) FILTER (WHERE NOT resolved),
+        'critical_count', COUNT(*) FILTER (WHERE NOT resolved AND severity = 'critical'),
+        'high_count', COUNT(*) FILTER (WHERE NOT resolved AND severity = 'high'),
+        'medium_count', COUNT(*) FILTER (WHERE NOT resolved AND severity = 'medium'),
+        'low_count', COUNT(*) FILTER (WHERE NOT resolved AND severity = 'low'),
+        'resolved_today', COUNT(*) FILTER (WHERE resolved AND resolved_at >= date_trunc('day', NOW()))
+    )
+    INTO v_summary
+    FROM system_incidents
+    WHERE resolved = false OR resolved_at >= NOW() - INTERVAL '24 hours';
+
+    SELECT COALESCE(json_agg(i ORDER BY i.resolved, i.last_seen_at DESC NULLS LAST), '[]'::json)
+    INTO v_incidents
+    FROM (
+        SELECT id, incident_type, title, message, severity, metadata, resolved,
+               created_at, fingerprint, occurrences, last_seen_at
+        FROM system_incidents
+        WHERE resolved = false OR resolved_at >= NOW() - INTERVAL '24 hours'
+        ORDER BY resolved, last_seen_at DESC NULLS LAST
+        LIMIT 100
+    ) i;
+
+    SELECT json_build_object(
+        'status', s.status,
+        'message', s.message,
+        'metrics', s.metrics,
+        'incidents', s.incidents,
+        'summary', v_summary,
+        'incident_list', v_incidents,
+        'duration_ms', s.duration_ms,
+        'computed_at', s.computed_at
+    )
+    INTO v_result
+    FROM health_snapshot s
+    WHERE s.id = 1;
+
+    RETURN v_result;
+END;
+$$;
+
+REVOKE EXECUTE ON FUNCTION public.get_health_snapshot(BOOLEAN) FROM PUBLIC, anon;
+GRANT EXECUTE ON FUNCTION public.get_health_snapshot(BOOLEAN) TO authenticated;
+
+-- ==========================================
+-- 6. record_health_probe
+-- ==========================================
+-- External services (the WhatsApp server) can only be probed from outside
+-- the database; the leader admin tab reports the raw result, the aggregator
+-- turns it into percentiles and incidents.
+CREATE OR REPLACE FUNCTION public.record_health_probe(
+    p_check_type TEXT,
+    p_status TEXT,
+    p_response_time_ms INTEGER DEFAULT NULL,
+    p_message TEXT DEFAULT NULL
+)
+RETURNS VOID
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM profiles
+        WHERE id = auth.uid() AND role IN ('admin', 'super_admin', 'owner')
+    ) THEN
+        RAISE EXCEPTION 'Access denied';
+    END IF;
+
+    INSERT INTO health_monitor_log (check_type, status, response_time_ms, message)
+    VALUES (p_check_type, p_status, p_response_time_ms, LEFT(p_message, 500));
+END;
+$$;
+
+REVOKE EXECUTE ON FUNCTION public.record_health_probe(TEXT, TEXT, INTEGER, TEXT) FROM PUBLIC, anon;
+GRANT EXECUTE ON FUNCTION public.record_health_probe(TEXT, TEXT, INTEGER, TEXT) TO authenticated;
+
+-- ==========================================
+-- 7. check_system_health reads the snapshot
+-- ==========================================
+CREATE OR REPLACE FUNCTION public.check_system_health()
+RETURNS TABLE (
+    status TEXT,
+    message TEXT,
+    checks JSONB
+)
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    RETURN QUERY
+    SELECT
+        s.status,
+        s.message,
+        jsonb_build_object(
+            'critical_incidents', COALESCE((s.incidents->>'critical')::INTEGER, 0),
+            'high_incidents', COALESCE((s.incidents->>'high')::INTEGER, 0),
+            'last_check', s.computed_at
+        )
+    FROM health_snapshot s
+    WHERE s.id = 1;
+
+    IF NOT FOUND THEN
+        RETURN QUERY SELECT 'healthy'::TEXT, 'All systems operational'::TEXT,
+            jsonb_build_object('critical_incidents', 0, 'high_incidents', 0, 'last_check', NULL);
+    END IF;
+END;
+$$;
+
+-- ==========================================
+-- 8. Schedule (only if pg_cron is installed)
+-- ==========================================
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_cron') THEN
+        PERFORM cron.schedule(
+            'compute-health-metrics',
+            '*/5 * * * *',
+            'SELECT public.compute_health_metrics()'
+        );
+    END IF;
+END $$;
@@ -0,0 +1,349 @@
+-- =====================================================
+-- Client Performance Telemetry
+-- =====================================================
+-- lib/telemetry.ts keeps fixed-bucket latency histograms per
+-- (kind, name, method) in the browser and ships them with
+-- navigator.sendBeacon every minute / when the page is hidden:
+--   - kinds: table, rpc, auth, storage, function (supabase-js calls),
+--     route (interaction → paint of the new route), vital (LCP, FCP, TTFB,
+--     INP, CLS×1000), custom
+--   - buckets: counts for upper bounds 10, 25, 50, 100, 200, 300, 500, 750,
+--     1000, 1500, 2000, 3000, 5000, 10000 ms and one overflow bucket
+-- Beacons cannot carry an Authorization header, so ingestion runs as anon
+-- through ingest_client_perf_events(text) (PostgREST passes a text/plain
+-- body to a single unnamed text parameter). Because that endpoint is open:
+--   - payloads are validated and capped (64KB, 100 events)
+--   - rows are rate limited per minute, per client IP (per session when
+--     no IP header is present) and globally, with fixed-window counters
+--   - the tenant is never taken from the payload: signed-in tabs fetch a
+--     short-lived token with issue_telemetry_token() and beacons carry it;
+--     without a valid token the rows are stored without org_id
+-- get_client_perf_p95() merges the histograms for the super-admin view.
+-- =====================================================
+
+-- ==========================================
+-- 1. Table
+-- ==========================================
+CREATE TABLE IF NOT EXISTS public.client_perf_events (
+    id BIGSERIAL PRIMARY KEY,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    session_id TEXT NOT NULL,
+    org_id UUID REFERENCES public.organizations(id) ON DELETE SET NULL,
+    role TEXT,
+    app_version TEXT,
+    kind TEXT NOT NULL CHECK (kind IN ('table', 'rpc', 'auth', 'storage', 'function', 'route', 'vital', 'custom')),
+    name TEXT NOT NULL,
+    method TEXT,
+    count INTEGER NOT NULL CHECK (count > 0),
+    errors INTEGER NOT NULL DEFAULT 0,
+    sum_ms NUMERIC NOT NULL,
+    min_ms NUMERIC,
+    max_ms NUMERIC,
+    buckets INTEGER[] NOT NULL CHECK (array_length(buckets, 1) = 15)
+);
+
+CREATE INDEX IF NOT EXISTS idx_client_perf_events_created_at ON public.client_perf_events(created_at);
+CREATE INDEX IF NOT EXISTS idx_client_perf_events_kind_name ON public.client_perf_events(kind, name, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_client_perf_events_org ON public.client_perf_events(org_id, created_at DESC);
+
+-- No direct access; writes go through ingest, reads through the report RPC
+ALTER TABLE public.client_perf_events ENABLE ROW LEVEL SECURITY;
+
+-- ==========================================
+-- 2. Telemetry tokens and rate limits
+-- ==========================================
+CREATE TABLE IF NOT EXISTS public.client_perf_tokens (
+    token UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    user_id UUID NOT NULL,
+    org_id UUID NOT NULL REFERENCES public.organizations(id) ON DELETE CASCADE,
+    expires_at TIMESTAMPTZ NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_client_perf_tokens_expires ON public.client_perf_tokens(expires_at);
+
+-- Fixed one-minute windows: bucket → rows accepted in window_start's minute
+CREATE TABLE IF NOT EXISTS public.client_perf_rate_limits (
+    bucket TEXT PRIMARY KEY,
+    window_start TIMESTAMPTZ NOT NULL,
+    rows INTEGER NOT NULL DEFAULT 0
+);
+
+-- Only reachable through the SECURITY DEFINER functions below
+ALTER TABLE public.client_perf_tokens ENABLE ROW LEVEL SECURITY;
+ALTER TABLE public.client_perf_rate_limits ENABLE ROW LEVEL SECURITY;
+
+-- Returns: { "token": <uuid>, "expires_at": <timestamptz> }, or NULL for
+-- users without an organization
+CREATE OR REPLACE FUNCTION public.issue_telemetry_token()
+RETURNS JSON
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_org_id UUID;
+    v_result JSON;
+BEGIN
+    IF auth.uid() IS NULL THEN
+        RAISE EXCEPTION 'Access denied';
+    END IF;
+
+    SELECT org_id INTO v_org_id FROM profiles WHERE id = auth.uid();
+    IF v_org_id IS NULL THEN
+        RETURN NULL;
+    END IF;
+
+    DELETE FROM client_perf_tokens
+    WHERE user_id = auth.uid() AND expires_at < NOW();
+
+    INSERT INTO client_perf_tokens (user_id, org_id, expires_at)
+    VALUES (auth.uid(), v_org_id, NOW() + INTERVAL '1 hour')
+    RETURNING json_build_object('token', token, 'expires_at', expires_at)
+    INTO v_result;
+
+    RETURN v_result;
+END;
+$$;
+
+REVOKE EXECUTE ON FUNCTION public.issue_telemetry_token() FROM PUBLIC, anon;
+GRANT EXECUTE ON FUNCTION public.issue_telemetry_token() TO authenticated;
+
+-- Add p_rows to the bucket's current window; false once it exceeds p_cap
+CREATE OR REPLACE FUNCTION public.take_client_perf_quota(p_bucket TEXT, p_rows INTEGER, p_cap INTEGER)
+RETURNS BOOLEAN
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_window TIMESTAMPTZ := date_trunc('minute', NOW());
+    v_rows INTEGER;
+BEGIN
+    INSERT INTO client_perf_rate_limits AS l (bucket, window_start, rows)
+    VALUES (p_bucket, v_window, p_rows)
+    ON CONFLICT (bucket) DO UPDATE SET
+        rows = CASE WHEN l.window_start = v_window THEN l.rows + EXCLUDED.rows ELSE EXCLUDED.rows END,
+        window_start = v_window
+    RETURNING rows INTO v_rows;
+
+    RETURN v_rows <= p_cap;
+END;
+$$;
+
+REVOKE EXECUTE ON FUNCTION public.take_client_perf_quota(TEXT, INTEGER, INTEGER) FROM PUBLIC, anon, authenticated;
+
+-- ==========================================
+-- 3. ingest_client_perf_events (beacon target)
+-- ==========================================
+CREATE OR REPLACE FUNCTION public.ingest_client_perf_events(TEXT)
+RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    c_max_events CONSTANT INTEGER := 100;
+    -- One sampled tab sends at most a few beacons a minute; an office NAT
+    -- shares one IP between many tabs
+    c_max_rows_per_source CONSTANT INTEGER := 1000;
+    c_max_rows_global CONSTANT INTEGER := 20000;
+    v_payload JSONB;
+    v_token UUID;
+    v_org_id UUID;
+    v_session TEXT;
+    v_source TEXT;
+    v_rows INTEGER;
+    v_inserted INTEGER;
+BEGIN
+    IF $1 IS NULL OR length($1) > 65536 THEN
+        RETURN 0;
+    END IF;
+
+    BEGIN
+        v_payload := $1::jsonb;
+        v_token := NULLIF(v_payload->>'token', '')::UUID;
+    EXCEPTION WHEN others THEN
+        RETURN 0;
+    END;
+
+    IF jsonb_typeof(v_payload->'events') <> 'array' THEN
+        RETURN 0;
+    END IF;
+
+    v_rows := LEAST(jsonb_array_length(v_payload->'events'), c_max_events);
+    IF v_rows = 0 THEN
+        RETURN 0;
+    END IF;
+
+    v_session := LEFT(COALESCE(v_payload->>'session_id', 'unknown'), 64);
+    v_source := btrim(split_part(
+        COALESCE(current_setting('request.headers', true)::json->>'x-forwarded-for', ''), ',', 1
+    ));
+    v_source := CASE WHEN v_source = '' THEN 'session:' || v_session ELSE 'ip:' || v_source END;
+
+    IF NOT take_client_perf_quota(v_source, v_rows, c_max_rows_per_source)
+       OR NOT take_client_perf_quota('global', v_rows, c_max_rows_global) THEN
+        RETURN 0;
+    END IF;
+
+    IF v_token IS NOT NULL THEN
+        SELECT org_id INTO v_org_id
+        FROM client_perf_tokens
+        WHERE token = v_token AND expires_at > NOW();
+    END IF;
+
+    INSERT INTO client_perf_events (
+        session_id, org_id, role, app_version,
+        kind, name, method, count, errors, sum_ms, min_ms, max_ms, buckets
+    )
+    SELECT
+        v_session,
+        v_org_id,
+        LEFT(v_payload->>'role', 32),
+        LEFT(v_payload->>'app_version', 32),
+        e.kind,
+        LEFT(e.name, 120),
+        LEFT(e.method, 10),
+        e.count,
+        LEAST(GREATEST(COALESCE(e.errors, 0), 0), e.count),
+        GREATEST(e.sum_ms, 0),
+        e.min_ms,
+        e.max_ms,
+        e.buckets
+    FROM (
+        SELECT *
+        FROM jsonb_to_recordset(v_payload->'events') AS x(
+            kind TEXT, name TEXT, method TEXT, count INTEGER, errors INTEGER,
+            sum_ms NUMERIC, min_ms NUMERIC, max_ms NUMERIC, buckets INTEGER[]
+        )
+        LIMIT c_max_events
+    ) e
+    WHERE e.kind IN ('table', 'rpc', 'auth', 'storage', 'function', 'route', 'vital', 'custom')
+      AND e.name IS NOT NULL
+      AND e.count BETWEEN 1 AND 100000
+      AND e.sum_ms IS NOT NULL
+      AND array_length(e.buckets, 1) = 15;
+
+    GET DIAGNOSTICS v_inserted = ROW_COUNT;
+    RETURN v_inserted;
+EXCEPTION WHEN others THEN
+    -- Telemetry must never surface errors to the page
+    RETURN 0;
+END;
+$$;
+
+REVOKE EXECUTE ON FUNCTION public.ingest_client_perf_events(TEXT) FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION public.ingest_client_perf_events(TEXT) TO anon, authenticated;
+
+-- ==========================================
+-- 4. get_client_perf_p95 (super-admin report)
+-- ==========================================
+-- Percentiles are estimated from the merged histograms: the upper bound of
+-- the bucket holding the percentile (max_ms for the overflow bucket).
+-- Returns [{ kind, name, method, samples, errors, error_rate, avg_ms,
+--            p50_ms, p95_ms, p99_ms, max_ms, orgs }] ordered by p95.
+CREATE OR REPLACE FUNCTION public.get_client_perf_p95(
+    p_hours INTEGER DEFAULT 24,
+    p_org_id UUID DEFAULT NULL
+)
+RETURNS JSON
+LANGUAGE plpgsql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    c_bounds CONSTANT NUMERIC[] := ARRAY[10, 25, 50, 100, 200, 300, 500, 750, 1000, 1500, 2000, 3000, 5000, 10000];
+    v_result JSON;
+BEGIN
+    IF NOT public.is_platform_admin() THEN
+        RAISE EXCEPTION 'Access denied';
+    END IF;
+
+    WITH scoped AS (
+        SELECT *
+        FROM client_perf_events
+        WHERE created_at >= NOW() - make_interval(hours => LEAST(GREATEST(p_hours, 1), 24 * 30))
+          AND (p_org_id IS NULL OR org_id = p_org_id)
+    ),
+    totals AS (
+        SELECT
+            kind, name, COALESCE(method, '') AS method,
+            SUM(count) AS samples,
+            SUM(errors) AS errors,
+            SUM(sum_ms) AS sum_ms,
+            MAX(max_ms) AS max_ms,
+            COUNT(DISTINCT org_id) AS orgs
+        FROM scoped
+        GROUP BY 1, 2, 3
+    ),
+    cumulative AS (
+        SELECT
+            s.kind, s.name, COALESCE(s.method, '') AS method, b.idx::INTEGER AS idx,
+            SUM(SUM(b.cnt)) OVER (
+                PARTITION BY s.kind, s.name, COALESCE(s.method, '') ORDER BY b.idx::INTEGER
+            ) AS cum
+        FROM scoped s
+        CROSS JOIN LATERAL unnest(s.buckets) WITH ORDINALITY AS b(cnt, idx)
+        GROUP BY s.kind, s.name, COALESCE(s.method, ''), b.idx::INTEGER
+    ),
+    percentiles AS (
+        SELECT
+            c.kind, c.name, c.method,
+            MIN(c.idx) FILTER (WHERE c.cum >= 0.50 * t.samples) AS p50_idx,
+            MIN(c.idx) FILTER (WHERE c.cum >= 0.95 * t.samples) AS p95_idx,
+            MIN(c.idx) FILTER (WHERE c.cum >= 0.99 * t.samples) AS p99_idx
+        FROM cumulative c
+        JOIN totals t USING (kind, name, method)
+        GROUP BY c.kind, c.name, c.method
+    )
+    SELECT COALESCE(json_agg(row_to_json(r) ORDER BY r.p95_ms DESC NULLS LAST), '[]'::json)
+    INTO v_result
+    FROM (
+        SELECT
+            t.kind,
+            t.name,
+            NULLIF(t.method, '') AS method,
+            t.samples,
+            t.errors,
+            ROUND(t.errors::NUMERIC / NULLIF(t.samples, 0), 4) AS error_rate,
+            ROUND(t.sum_ms / NULLIF(t.samples, 0)) AS avg_ms,
+            COALESCE(c_bounds[p.p50_idx], t.max_ms) AS p50_ms,
+            COALESCE(c_bounds[p.p95_idx], t.max_ms) AS p95_ms,
+            COALESCE(c_bounds[p.p99_idx], t.max_ms) AS p99_ms,
+            t.max_ms,
+            t.orgs
+        FROM totals t
+        JOIN percentiles p USING (kind, name, method)
+        ORDER BY COALESCE(c_bounds[p.p95_idx], t.max_ms) DESC NULLS LAST
+        LIMIT 300
+    ) r;
+
+    RETURN v_result;
+END;
+$$;
+
+REVOKE EXECUTE ON FUNCTION public.get_client_perf_p95(INTEGER, UUID) FROM PUBLIC, anon;
+GRANT EXECUTE ON FUNCTION public.get_client_perf_p95(INTEGER, UUID) TO authenticated;
+
+-- ==========================================
+-- 5. Retention (only if pg_cron is installed)
+-- ==========================================
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_cron') THEN
+        PERFORM cron.schedule(
+            'purge-client-perf-events',
+            '30 3 * * *',
+            $cron$DELETE FROM public.client_perf_events WHERE created_at < NOW() - INTERVAL '30 days'$cron$
+        );
+        PERFORM cron.schedule(
+            'purge-client-perf-limits',
+            '*/15 * * * *',
+            $cron$
+                DELETE FROM public.client_perf_rate_limits WHERE window_start < NOW() - INTERVAL '5 minutes';
+                DELETE FROM public.client_perf_tokens WHERE expires_at < NOW();
+            $cron$
+        );
+    END IF;
+END $$;
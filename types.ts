@@ -65,6 +65,8 @@ export interface Profile {
   status?: 'active' | 'disabled';
   whatsapp_number?: string;
   permissions: UserPermissions;
+  /** Bumped by the database on permission / role / status changes */
+  permissions_version?: number;
   settings?: {
     transaction_categories?: {
       income: { id: string, label: string }[];
@@ -93,6 +95,8 @@ export interface CarStats {
   total_income: number;
   total_expense: number;
   balance: number;
+  /** Computed from locally cached transactions only (offline, before the server totals arrive) */
+  partial?: boolean;
 }
 
 export interface Car {
@@ -155,6 +159,11 @@ export interface Asset {
   roi?: number;
   remaining_value?: number;
   installments?: AssetInstallment[];
+  installments_count?: number;
+  installments_paid_count?: number;
+  installments_total?: number;
+  installments_paid?: number;
+  next_due_date?: string | null;
   driver_name?: string; // For display
   car_details?: Car; // For display
 }